@@ -0,0 +1,539 @@
+"""
+InfraFlow AI - Bulk Ingestion
+Command-line ingestion of a directory or ZIP/TAR archive into a project
+
+Usage:
+    python bulk_ingest.py PATH --project-id UUID [--workers 4]
+        [--checkpoint FILE] [--report FILE] [--extensions .pdf,.docx]
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+import os
+import sys
+import json
+import time
+import shutil
+import zipfile
+import tarfile
+import hashlib
+import logging
+import argparse
+import asyncio
+import tempfile
+
+from database import Database
+from document_processor import DocumentProcessor
+from ingestion_progress import ProgressReporter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXTENSIONS = (
+    '.pdf', '.docx', '.doc', '.txt', '.md', '.rtf', '.html', '.htm',
+    '.pptx', '.xlsx', '.xlsm', '.xls', '.csv'
+)
+
+# Journal statuses that mean a file needs no further work
+DONE_STATUSES = ("completed", "duplicate")
+
+
+# ============================================================================
+# SOURCES
+# ============================================================================
+
+def is_archive(path: str) -> bool:
+    """Whether a path is a ZIP or TAR archive rather than a directory"""
+    return os.path.isfile(path) and (zipfile.is_zipfile(path) or tarfile.is_tarfile(path))
+
+
+def list_source(path: str, extensions: Tuple[str, ...]) -> List[Tuple[str, int]]:
+    """
+    Ingestible files in a directory tree or archive
+
+    Args:
+        path: Directory, ZIP or TAR (optionally compressed) archive
+        extensions: Lower-case file extensions to include
+
+    Returns:
+        (relative POSIX name, size in bytes) pairs in name order
+    """
+    def wanted(name: str) -> bool:
+        base = os.path.basename(name)
+        return (
+            not base.startswith(".")
+            and "__MACOSX" not in name
+            and os.path.splitext(base)[1].lower() in extensions
+        )
+
+    if os.path.isdir(path):
+        members = []
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for filename in files:
+                full_path = os.path.join(root, filename)
+                name = os.path.relpath(full_path, path).replace(os.sep, "/")
+                if wanted(name):
+                    members.append((name, os.path.getsize(full_path)))
+        return sorted(members)
+
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            return sorted(
+                (info.filename, info.file_size) for info in archive.infolist()
+                if not info.is_dir() and wanted(info.filename)
+            )
+
+    with tarfile.open(path) as archive:
+        return sorted(
+            (member.name, member.size) for member in archive.getmembers()
+            if member.isfile() and wanted(member.name)
+        )
+
+
+class ArchiveReader:
+    """
+    Extracts archive members one at a time into a staging directory
+
+    Archive handles are not safe for concurrent reads, so members are
+    extracted sequentially by the producer and processed in parallel.
+    """
+
+    def __init__(self, path: str, staging_dir: str):
+        self.path = path
+        self.staging_dir = staging_dir
+        if zipfile.is_zipfile(path):
+            self.zip = zipfile.ZipFile(path)
+            self.tar = None
+        else:
+            self.zip = None
+            self.tar = tarfile.open(path)
+
+    def extract(self, name: str) -> str:
+        """Copy one member to a staging file and return its path"""
+        suffix = os.path.splitext(name)[1]
+        fd, staged_path = tempfile.mkstemp(suffix=suffix, dir=self.staging_dir)
+        with os.fdopen(fd, "wb") as staged:
+            if self.zip:
+                source = self.zip.open(name)
+            else:
+                source = self.tar.extractfile(name)
+            with source:
+                shutil.copyfileobj(source, staged, 1024 * 1024)
+        return staged_path
+
+    def close(self):
+        if self.zip:
+            self.zip.close()
+        if self.tar:
+            self.tar.close()
+
+
+def sha256_file(path: str) -> str:
+    """Hex SHA-256 of a file, read in blocks"""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+# ============================================================================
+# CHECKPOINT JOURNAL
+# ============================================================================
+
+class CheckpointJournal:
+    """
+    Append-only JSON-lines record of per-file progress
+
+    Each line is a file's latest state: a pipeline ``stage`` checkpoint,
+    ``completed``, ``duplicate`` or ``failed``. On restart the last line per
+    file wins, so finished files are skipped and interrupted ones resume
+    at the pipeline stage they reached.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn final line from a crash mid-write
+                        continue
+                    self.entries[record["name"]] = record
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a")
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(name)
+
+    def record(self, name: str, status: str, **fields):
+        """Append a record and make it durable"""
+        entry = {"name": name, "status": status, "at": time.time(), **fields}
+        self.entries[name] = entry
+        self._file.write(json.dumps(entry, default=str) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+# ============================================================================
+# STATISTICS
+# ============================================================================
+
+class BulkIngestStats:
+    """Counters and throughput of a bulk ingestion run"""
+
+    def __init__(self, total_files: int):
+        self.total_files = total_files
+        self.started = time.perf_counter()
+        self.counts = {
+            "completed": 0,
+            "duplicate": 0,
+            "resumed_skipped": 0,
+            "failed": 0
+        }
+        self.pages = 0
+        self.chunks = 0
+        self.embedding_tokens = 0
+        self.bytes = 0
+        self.failures: List[Dict[str, str]] = []
+        self.active: Dict[str, ProgressReporter] = {}
+
+    @property
+    def elapsed(self) -> float:
+        return max(time.perf_counter() - self.started, 1e-9)
+
+    def add_document(self, size: int, snapshot: Dict[str, Any]):
+        self.counts["completed"] += 1
+        self.bytes += size
+        self.pages += snapshot.get("pages_parsed") or 0
+        self.chunks += snapshot.get("chunks") or 0
+        self.embedding_tokens += snapshot.get("embedding_tokens") or 0
+
+    def rates(self) -> Dict[str, float]:
+        """Throughput including documents still in flight"""
+        pages = self.pages + sum(p.state["pages_parsed"] for p in self.active.values())
+        tokens = self.embedding_tokens + sum(
+            p.state.get("embedding_tokens") or 0 for p in self.active.values()
+        )
+        return {
+            "docs_per_min": self.counts["completed"] * 60 / self.elapsed,
+            "pages_per_sec": pages / self.elapsed,
+            "embedding_tokens_per_sec": tokens / self.elapsed
+        }
+
+    def line(self) -> str:
+        done = sum(self.counts.values())
+        rates = self.rates()
+        return (
+            f"{done}/{self.total_files} files "
+            f"({self.counts['completed']} ingested, {self.counts['duplicate']} duplicate, "
+            f"{self.counts['failed']} failed, {len(self.active)} in flight) | "
+            f"{rates['docs_per_min']:.1f} docs/min | "
+            f"{rates['pages_per_sec']:.1f} pages/s | "
+            f"{rates['embedding_tokens_per_sec']:.0f} embedding tokens/s"
+        )
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "total_files": self.total_files,
+            **self.counts,
+            "pages": self.pages,
+            "chunks": self.chunks,
+            "embedding_tokens": self.embedding_tokens,
+            "megabytes": round(self.bytes / 1e6, 2),
+            "elapsed_seconds": round(self.elapsed, 1),
+            **{key: round(value, 2) for key, value in self.rates().items()},
+            "failures": self.failures
+        }
+
+
+# ============================================================================
+# INGESTION
+# ============================================================================
+
+class BulkIngestor:
+    """
+    Streams the files of a directory or archive through the pipeline
+
+    A producer lists the source and hands files to a bounded queue; a pool
+    of workers hashes each file, skips content already ingested into the
+    project (or seen earlier in the run) and runs the rest through
+    ``DocumentProcessor.run_pipeline`` with stage checkpoints journaled,
+    so an interrupted run resumes where it stopped.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        processor: DocumentProcessor,
+        project_id: str,
+        journal: CheckpointJournal,
+        workers: int = 4,
+        stats_interval: float = 10.0,
+        retry_failed: bool = True
+    ):
+        self.db = db
+        self.processor = processor
+        self.project_id = project_id
+        self.journal = journal
+        self.workers = workers
+        self.stats_interval = stats_interval
+        self.retry_failed = retry_failed
+        # Content hash -> name of the file that claimed it in this run
+        self._hashes: Dict[str, str] = {
+            entry["hash"]: name for name, entry in journal.entries.items()
+            if entry.get("hash") and entry["status"] in DONE_STATUSES
+        }
+
+    async def run(self, source: str, extensions: Tuple[str, ...]) -> BulkIngestStats:
+        """
+        Ingest every matching file of a directory or archive
+
+        Args:
+            source: Directory or archive path
+            extensions: File extensions to include
+
+        Returns:
+            Final statistics
+        """
+        loop = asyncio.get_event_loop()
+        members = await loop.run_in_executor(None, list_source, source, extensions)
+        stats = BulkIngestStats(len(members))
+        logger.info(f"Found {len(members)} files in {source}")
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.workers * 2)
+        staging_dir = tempfile.mkdtemp(prefix="infraflow_bulk_")
+        reader = ArchiveReader(source, staging_dir) if is_archive(source) else None
+
+        async def produce():
+            try:
+                for name, size in members:
+                    entry = self.journal.get(name)
+                    if entry and (
+                        entry["status"] in DONE_STATUSES
+                        or (entry["status"] == "failed" and not self.retry_failed)
+                    ):
+                        stats.counts["resumed_skipped"] += 1
+                        continue
+
+                    if reader:
+                        path = await loop.run_in_executor(None, reader.extract, name)
+                    else:
+                        path = os.path.join(source, name)
+                    await queue.put((name, size, path))
+            finally:
+                for _ in range(self.workers):
+                    await queue.put(None)
+
+        async def work():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                name, size, path = item
+                try:
+                    await self._ingest_file(name, size, path, stats)
+                finally:
+                    if reader and os.path.exists(path):
+                        os.unlink(path)
+
+        reporter = asyncio.create_task(self._report_loop(stats))
+        try:
+            await asyncio.gather(produce(), *(work() for _ in range(self.workers)))
+        finally:
+            reporter.cancel()
+            if reader:
+                reader.close()
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+        logger.info(stats.line())
+        return stats
+
+    async def _ingest_file(self, name: str, size: int, path: str, stats: BulkIngestStats):
+        """Deduplicate and ingest one file, journaling its outcome"""
+        loop = asyncio.get_event_loop()
+        started = time.perf_counter()
+
+        try:
+            content_hash = await loop.run_in_executor(None, sha256_file, path)
+
+            # Same content earlier in this run, or already in the project
+            first = self._hashes.setdefault(content_hash, name)
+            if first != name:
+                stats.counts["duplicate"] += 1
+                self.journal.record(name, "duplicate", hash=content_hash, duplicate_of=first)
+                return
+
+            existing = await self.db.get_document_by_hash(self.project_id, content_hash)
+            entry = self.journal.get(name)
+            resuming = bool(
+                entry and entry.get("checkpoint") and entry.get("hash") == content_hash
+            )
+            if existing and not resuming:
+                stats.counts["duplicate"] += 1
+                self.journal.record(
+                    name, "duplicate", hash=content_hash,
+                    duplicate_of=existing["name"], document_id=existing["id"]
+                )
+                return
+
+            progress = ProgressReporter()
+            stats.active[name] = progress
+
+            async def on_checkpoint(stage: str, checkpoint: Dict[str, Any]):
+                self.journal.record(name, "stage", hash=content_hash, stage=stage, checkpoint=checkpoint)
+
+            try:
+                result = await self.processor.run_pipeline(
+                    path,
+                    name,
+                    self.project_id,
+                    checkpoint=entry["checkpoint"] if resuming else None,
+                    on_checkpoint=on_checkpoint,
+                    progress=progress
+                )
+            finally:
+                stats.active.pop(name, None)
+
+            snapshot = progress.snapshot()
+            stats.add_document(size, snapshot)
+            self.journal.record(
+                name, "completed",
+                hash=content_hash,
+                document_id=result["id"],
+                type=result.get("type"),
+                pages=snapshot["pages_parsed"],
+                chunks=snapshot["chunks"],
+                embedding_tokens=snapshot.get("embedding_tokens", 0),
+                seconds=round(time.perf_counter() - started, 2)
+            )
+
+        except Exception as e:
+            logger.error(f"Failed to ingest {name}: {str(e)}")
+            stats.counts["failed"] += 1
+            stats.failures.append({"name": name, "error": str(e)})
+            # Keep the last stage checkpoint so a retry resumes from it
+            last = self.journal.get(name) or {}
+            self.journal.record(
+                name, "failed", error=str(e),
+                hash=last.get("hash"), checkpoint=last.get("checkpoint")
+            )
+
+    async def _report_loop(self, stats: BulkIngestStats):
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            logger.info(stats.line())
+
+
+def print_report(report: Dict[str, Any]):
+    """Print the end-of-run summary"""
+    print("=" * 72)
+    print("InfraFlow AI - Bulk Ingestion Summary")
+    print("=" * 72)
+    print(f"Files found:            {report['total_files']}")
+    print(f"Ingested:               {report['completed']}")
+    print(f"Duplicates skipped:     {report['duplicate']}")
+    print(f"Already done (resumed): {report['resumed_skipped']}")
+    print(f"Failed:                 {report['failed']}")
+    print(f"Pages / chunks:         {report['pages']} / {report['chunks']}")
+    print(f"Embedding tokens (est): {report['embedding_tokens']}")
+    print(f"Data ingested:          {report['megabytes']} MB")
+    print(f"Elapsed:                {report['elapsed_seconds']} s")
+    print(f"Throughput:             {report['docs_per_min']} docs/min, "
+          f"{report['pages_per_sec']} pages/s, "
+          f"{report['embedding_tokens_per_sec']} embedding tokens/s")
+    for failure in report["failures"]:
+        print(f"  FAILED {failure['name']}: {failure['error']}")
+    print("=" * 72)
+
+
+async def run(args: argparse.Namespace) -> int:
+    """Run a bulk ingestion from parsed arguments"""
+    extensions = tuple(
+        ext.strip().lower() if ext.strip().startswith(".") else f".{ext.strip().lower()}"
+        for ext in args.extensions.split(",") if ext.strip()
+    ) if args.extensions else DEFAULT_EXTENSIONS
+
+    checkpoint_path = args.checkpoint or os.path.join(
+        os.getenv("BULK_INGEST_CHECKPOINT_DIR", "./data/bulk"),
+        f"{args.project_id}_{os.path.basename(os.path.normpath(args.source))}.jsonl"
+    )
+
+    db = Database()
+    await db.connect()
+    processor = DocumentProcessor()
+    processor.db = db
+    journal = CheckpointJournal(checkpoint_path)
+    logger.info(f"Checkpoint journal: {checkpoint_path}")
+
+    try:
+        project = await db.get_project(args.project_id)
+        if not project:
+            logger.error(f"Project {args.project_id} not found")
+            return 2
+
+        ingestor = BulkIngestor(
+            db,
+            processor,
+            args.project_id,
+            journal,
+            workers=args.workers,
+            stats_interval=args.stats_interval,
+            retry_failed=not args.skip_failed
+        )
+        stats = await ingestor.run(args.source, extensions)
+    finally:
+        journal.close()
+        await db.disconnect()
+
+    report = stats.report()
+    print_report(report)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+
+    return 1 if report["failed"] else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Ingest a directory or ZIP/TAR archive of documents into a project"
+    )
+    parser.add_argument("source", help="Directory, .zip or .tar[.gz|.bz2|.xz] archive")
+    parser.add_argument("--project-id", required=True, help="Target project UUID")
+    parser.add_argument(
+        "--workers", type=int,
+        default=int(os.getenv("BULK_INGEST_WORKERS", "4")),
+        help="Documents processed concurrently (default: BULK_INGEST_WORKERS or 4)"
+    )
+    parser.add_argument("--checkpoint", help="Checkpoint journal path (resumes if it exists)")
+    parser.add_argument("--report", help="Write the summary report as JSON to this path")
+    parser.add_argument("--extensions", help="Comma-separated extensions to include")
+    parser.add_argument("--stats-interval", type=float, default=10.0, help="Seconds between throughput lines")
+    parser.add_argument("--skip-failed", action="store_true", help="Do not retry files that failed in a previous run")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.source) and not is_archive(args.source):
+        parser.error(f"{args.source} is not a directory or a ZIP/TAR archive")
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
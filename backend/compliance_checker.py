@@ -3,158 +3,88 @@ InfraFlow AI - Compliance Checker
 Compliance verification against DFI and international standards
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple, Iterator
+from collections import OrderedDict
+from contextlib import contextmanager
 import logging
 import os
 import asyncio
-import anthropic
+
+from llm_gateway import get_llm_gateway, slot_wait
+from project_facts import (
+    get_fact_sheet_cache,
+    document_set_version,
+    document_versions,
+    changed_documents
+)
+from requirement_matcher import RequirementMatcher
+from standards_registry import get_standards_registry
+from compliance_evidence import EvidenceMatcher
 
 logger = logging.getLogger(__name__)
 
 
+@contextmanager
+def _paused(deadline: asyncio.Timeout) -> Iterator[None]:
+    """Stop a timeout's clock while inside, resuming with the time it had left"""
+    if deadline.expired() or deadline.when() is None:
+        yield
+        return
+
+    loop = asyncio.get_running_loop()
+    remaining = deadline.when() - loop.time()
+    deadline.reschedule(None)
+    try:
+        yield
+    finally:
+        deadline.reschedule(loop.time() + remaining)
+
+
 class ComplianceChecker:
     """
     Compliance checking engine for infrastructure projects
     Checks against EBRD, IFC, EU Taxonomy, and other standards
     """
 
-    def __init__(self):
-        """Initialize compliance checker"""
-        # Initialize Claude for compliance analysis
-        self.claude_api_key = os.getenv("ANTHROPIC_API_KEY")
-        if self.claude_api_key:
-            self.claude = anthropic.Anthropic(api_key=self.claude_api_key)
-        else:
-            logger.warning("Anthropic API key not configured")
-            self.claude = None
-
-        # Compliance standards database
-        self.standards = self._load_standards()
-
-    def _load_standards(self) -> Dict[str, Dict[str, Any]]:
+    def __init__(self, processor: Optional[Any] = None):
         """
-        Load compliance standards definitions
+        Initialize compliance checker
 
-        Returns:
-            Dictionary of standards with their requirements
+        Args:
+            processor: DocumentProcessor whose chunk embeddings back
+                evidence matching; without one only extracted data is used
         """
-        return {
-            "ebrd_environmental": {
-                "name": "EBRD Environmental and Social Policy",
-                "categories": [
-                    "Environmental and Social Assessment",
-                    "Labour and Working Conditions",
-                    "Resource Efficiency and Pollution Prevention",
-                    "Health and Safety",
-                    "Land Acquisition and Involuntary Resettlement",
-                    "Biodiversity Conservation",
-                    "Indigenous Peoples",
-                    "Cultural Heritage",
-                    "Financial Intermediaries",
-                    "Information Disclosure and Stakeholder Engagement"
-                ],
-                "key_requirements": [
-                    "Environmental and Social Impact Assessment (ESIA)",
-                    "Stakeholder Engagement Plan",
-                    "Environmental and Social Management System (ESMS)",
-                    "Grievance Mechanism",
-                    "Disclosure of project information"
-                ]
-            },
-            "ifc_performance": {
-                "name": "IFC Performance Standards",
-                "categories": [
-                    "PS1: Assessment and Management of Environmental and Social Risks",
-                    "PS2: Labor and Working Conditions",
-                    "PS3: Resource Efficiency and Pollution Prevention",
-                    "PS4: Community Health, Safety, and Security",
-                    "PS5: Land Acquisition and Involuntary Resettlement",
-                    "PS6: Biodiversity Conservation and Sustainable Management",
-                    "PS7: Indigenous Peoples",
-                    "PS8: Cultural Heritage"
-                ],
-                "key_requirements": [
-                    "Environmental and Social Management System",
-                    "Stakeholder Engagement",
-                    "Environmental and Social Assessment",
-                    "Management Program",
-                    "Monitoring and Review"
-                ]
-            },
-            "eu_taxonomy": {
-                "name": "EU Taxonomy for Sustainable Activities",
-                "categories": [
-                    "Climate Change Mitigation",
-                    "Climate Change Adaptation",
-                    "Sustainable Use of Water and Marine Resources",
-                    "Transition to Circular Economy",
-                    "Pollution Prevention and Control",
-                    "Protection of Healthy Ecosystems"
-                ],
-                "key_requirements": [
-                    "Substantial Contribution to Environmental Objective",
-                    "Do No Significant Harm (DNSH) to other objectives",
-                    "Minimum Social Safeguards",
-                    "Technical Screening Criteria compliance"
-                ]
-            },
-            "local_content": {
-                "name": "Local Content Requirements",
-                "categories": [
-                    "Local Employment",
-                    "Local Procurement",
-                    "Skills Transfer",
-                    "Community Development"
-                ],
-                "key_requirements": [
-                    "Local employment targets",
-                    "Local supplier engagement",
-                    "Training and capacity building",
-                    "Community benefit agreements"
-                ]
-            },
-            "esg_scoring": {
-                "name": "ESG Scoring Framework",
-                "categories": [
-                    "Environmental Performance",
-                    "Social Impact",
-                    "Governance Structure"
-                ],
-                "key_requirements": [
-                    "Carbon footprint disclosure",
-                    "Diversity and inclusion metrics",
-                    "Board independence",
-                    "Anti-corruption measures"
-                ]
-            },
-            "equator_principles": {
-                "name": "Equator Principles",
-                "categories": [
-                    "Review and Categorization",
-                    "Environmental and Social Assessment",
-                    "Applicable Standards",
-                    "Action Plan and Management System",
-                    "Stakeholder Engagement",
-                    "Grievance Mechanism",
-                    "Independent Review",
-                    "Covenants",
-                    "Independent Monitoring and Reporting",
-                    "Reporting and Transparency"
-                ],
-                "key_requirements": [
-                    "Project categorization (A, B, or C)",
-                    "Environmental and Social Impact Assessment",
-                    "Environmental and Social Management Plan",
-                    "Stakeholder engagement process",
-                    "Independent environmental and social consultant"
-                ]
-            }
-        }
+        # Shared Claude gateway for compliance analysis
+        self.llm = get_llm_gateway()
+
+        # Compliance standards registry (built-in and research data standards)
+        self.standards = get_standards_registry()
+
+        # Requirement-to-passage matching over project chunk embeddings
+        self.evidence = EvidenceMatcher(processor, self.standards) if processor else None
+        self.max_ambiguous = int(os.getenv("EVIDENCE_MAX_AMBIGUOUS", "25"))
+
+        # Shared consolidated project data
+        self.facts = get_fact_sheet_cache()
+
+        # Standards checked at once, and seconds allowed per standard
+        self.concurrency = int(os.getenv("COMPLIANCE_CONCURRENCY", "6"))
+        self.standard_timeout = float(os.getenv("COMPLIANCE_STANDARD_TIMEOUT", "90"))
+
+        # Per-standard results keyed by (project, standard, standard version,
+        # document set); persisted in compliance_checks once ``db`` is set
+        self.db = None
+        self.cache_size = int(os.getenv("COMPLIANCE_CACHE_SIZE", "512"))
+        self._results: "OrderedDict[Tuple[str, str, str, str], Dict[str, Any]]" = OrderedDict()
+        self._pending: Dict[Tuple[str, str, str, str], asyncio.Future] = {}
+        self._cache_stats = {"memory_hits": 0, "db_hits": 0, "misses": 0}
 
     async def check_project(
         self,
         project_id: str,
-        documents: List[Dict[str, Any]]
+        documents: List[Dict[str, Any]],
+        force: bool = False,
+        use_llm: bool = True
     ) -> Dict[str, Any]:
         """
         Check project compliance across all relevant standards
@@ -162,6 +92,9 @@ class ComplianceChecker:
         Args:
             project_id: Project ID
             documents: Project documents with extracted data
+            force: Recompute even if results for the current documents
+                and standard versions are cached
+            use_llm: Allow LLM calls (see ``_run_standards``)
 
         Returns:
             Comprehensive compliance assessment
@@ -172,41 +105,21 @@ class ComplianceChecker:
             # Determine applicable standards based on project data
             applicable_standards = self._determine_applicable_standards(documents)
 
-            # Run checks for each standard
-            all_issues = []
-            all_recommendations = []
-            standard_results = {}
-
-            for standard in applicable_standards:
-                result = await self._check_standard(standard, documents)
-                standard_results[standard] = result
-
-                if result.get("issues"):
-                    all_issues.extend(result["issues"])
-                if result.get("recommendations"):
-                    all_recommendations.extend(result["recommendations"])
-
-            # Determine overall status
-            critical_issues = [i for i in all_issues if i.get("severity") == "critical"]
-            high_issues = [i for i in all_issues if i.get("severity") == "high"]
-
-            if critical_issues:
-                overall_status = "non_compliant"
-            elif high_issues:
-                overall_status = "partial"
-            else:
-                overall_status = "compliant"
+            # Run checks for all standards concurrently
+            standard_results = await self._run_standards(
+                applicable_standards,
+                documents,
+                tenant_id=project_id,
+                force=force,
+                use_llm=use_llm
+            )
+            summary = self._summarize(standard_results)
 
             return {
                 "project_id": project_id,
-                "overall_status": overall_status,
                 "standards_checked": applicable_standards,
                 "standard_results": standard_results,
-                "issues": all_issues,
-                "recommendations": list(set(all_recommendations)),  # Deduplicate
-                "total_issues": len(all_issues),
-                "critical_issues": len(critical_issues),
-                "high_issues": len(high_issues)
+                **summary
             }
 
         except Exception as e:
@@ -217,7 +130,9 @@ class ComplianceChecker:
         self,
         project_id: str,
         documents: List[Dict[str, Any]],
-        standards: List[str]
+        standards: List[str],
+        force: bool = False,
+        use_llm: bool = True
     ) -> Dict[str, Any]:
         """
         Check project against specific standards
@@ -226,6 +141,9 @@ class ComplianceChecker:
             project_id: Project ID
             documents: Project documents
             standards: List of standard codes to check
+            force: Recompute even if results for the current documents
+                and standard versions are cached
+            use_llm: Allow LLM calls (see ``_run_standards``)
 
         Returns:
             Compliance check results
@@ -233,47 +151,342 @@ class ComplianceChecker:
         try:
             logger.info(f"Checking standards {standards} for project {project_id}")
 
-            all_issues = []
-            all_recommendations = []
-            standard_results = {}
-
+            known = []
             for standard in standards:
                 if standard not in self.standards:
                     logger.warning(f"Unknown standard: {standard}")
                     continue
-
-                result = await self._check_standard(standard, documents)
-                standard_results[standard] = result
-
-                if result.get("issues"):
-                    all_issues.extend(result["issues"])
-                if result.get("recommendations"):
-                    all_recommendations.extend(result["recommendations"])
-
-            # Determine overall status
-            critical_issues = [i for i in all_issues if i.get("severity") == "critical"]
-            high_issues = [i for i in all_issues if i.get("severity") == "high"]
-
-            if critical_issues:
-                overall_status = "non_compliant"
-            elif high_issues:
-                overall_status = "partial"
-            else:
-                overall_status = "compliant"
+                known.append(standard)
+
+            standard_results = await self._run_standards(
+                known,
+                documents,
+                tenant_id=project_id,
+                force=force,
+                use_llm=use_llm
+            )
+            summary = self._summarize(standard_results)
 
             return {
                 "project_id": project_id,
-                "overall_status": overall_status,
                 "standards_checked": standards,
                 "standard_results": standard_results,
-                "issues": all_issues,
-                "recommendations": list(set(all_recommendations))
+                **summary
             }
 
         except Exception as e:
             logger.error(f"Error checking standards: {str(e)}")
             raise
 
+    async def _run_standards(
+        self,
+        standard_codes: List[str],
+        documents: List[Dict[str, Any]],
+        tenant_id: Optional[str] = None,
+        force: bool = False,
+        use_llm: bool = True
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Check several standards concurrently
+
+        At most ``concurrency`` standards are checked at once. A standard
+        whose check exceeds ``standard_timeout`` falls back to the
+        rule-based check and is marked ``timed_out``, so one slow LLM call
+        never holds back or fails the others. Time spent waiting for an LLM
+        gateway slot is not counted against the timeout.
+
+        A project's result for a standard is reused until its documents or
+        the standard's definition change (see ``_cached_results``); reused
+        results are marked ``cached``. After a document change, the
+        previous result of each standard is updated incrementally where
+        possible (see ``_evidence_based_check``).
+
+        Without ``use_llm`` only embedding evidence, rule matching and
+        earlier LLM verdicts are used. Such results are marked
+        ``screened``, with the number of requirements an LLM could still
+        settle as ``unresolved``; they are cached and stored, but never
+        served to a check that allows LLM calls.
+
+        Args:
+            standard_codes: Standard codes to check
+            documents: Project documents
+            tenant_id: Tenant key for LLM concurrency limiting; also the
+                project the results are cached for
+            force: Recompute every standard, replacing cached results
+            use_llm: Allow LLM calls
+
+        Returns:
+            Results keyed by standard code, in the order given
+        """
+        # Consolidated once and shared by every standard
+        project_data = self._extract_project_data(documents)
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+
+        document_hash = document_set_version(documents, with_series=False)
+        versions = document_versions(documents)
+        cached, previous = {}, {}
+        if tenant_id and not force:
+            cached, previous = await self._cached_results(
+                tenant_id,
+                standard_codes,
+                document_hash,
+                use_llm=use_llm
+            )
+
+        async def check(standard_code: str) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    async with asyncio.timeout(self.standard_timeout) as deadline:
+                        token = slot_wait.set(lambda: _paused(deadline))
+                        try:
+                            return await self._check_standard(
+                                standard_code,
+                                documents,
+                                tenant_id=tenant_id,
+                                project_data=project_data,
+                                project_id=tenant_id,
+                                previous=previous.get(standard_code),
+                                use_llm=use_llm
+                            )
+                        finally:
+                            slot_wait.reset(token)
+                except asyncio.TimeoutError:
+                    logger.warning(
+                        f"Compliance check for {standard_code} timed out after "
+                        f"{self.standard_timeout}s, using rule-based result"
+                    )
+                    result = self._rule_based_check(
+                        standard_code,
+                        self.standards.get(standard_code, {}),
+                        project_data
+                    )
+                    result["timed_out"] = True
+                    return result
+
+        async def run(standard_code: str) -> Dict[str, Any]:
+            if standard_code in cached:
+                return {**cached[standard_code], "cached": True}
+            if not tenant_id:
+                return await check(standard_code)
+
+            key = self._result_key(tenant_id, standard_code, document_hash)
+
+            # Concurrent checks of the same project and standard share one
+            # full run; screening runs are cheap and never shared
+            pending = self._pending.get(key)
+            if pending is not None and not force:
+                return await asyncio.shield(pending)
+            if not use_llm:
+                result = await check(standard_code)
+                result["document_versions"] = versions
+                await self._store_result(key, result)
+                return result
+
+            future = asyncio.get_event_loop().create_future()
+            self._pending[key] = future
+            try:
+                result = await check(standard_code)
+                future.set_result(result)
+            except Exception as e:
+                future.set_exception(e)
+                # Mark the exception retrieved when nobody else was waiting
+                future.exception()
+                raise
+            finally:
+                if self._pending.get(key) is future:
+                    self._pending.pop(key, None)
+
+            result["document_versions"] = versions
+            await self._store_result(key, result)
+            return result
+
+        results = await asyncio.gather(*(run(code) for code in standard_codes))
+        return dict(zip(standard_codes, results))
+
+    def _result_key(
+        self,
+        project_id: str,
+        standard_code: str,
+        document_hash: str
+    ) -> Tuple[str, str, str, str]:
+        """Cache key of a standard's result for a project's document set"""
+        standard = self.standards.get(standard_code) or {}
+        return (
+            str(project_id),
+            standard_code,
+            standard.get("fingerprint", ""),
+            document_hash
+        )
+
+    async def _cached_results(
+        self,
+        project_id: str,
+        standard_codes: List[str],
+        document_hash: str,
+        use_llm: bool = True
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """
+        Results still valid for a project's current documents
+
+        Looks in the in-process LRU first and then in compliance_checks,
+        where a row is reused only if it was checked against the same
+        document set and the same standard version. A result for the same
+        standard version but an older document set, or a screened result
+        when LLM calls are allowed, is returned as the previous check, to
+        be updated incrementally.
+
+        Args:
+            project_id: Project ID
+            standard_codes: Standard codes to look up
+            document_hash: Version of the project's document set
+            use_llm: Whether the check allows LLM calls
+
+        Returns:
+            Tuple of (cached results, previous results), keyed by standard code
+        """
+        cached = {}
+        previous = {}
+        missing = []
+        for code in standard_codes:
+            key = self._result_key(project_id, code, document_hash)
+            result = self._results.get(key)
+            if result is not None and not (use_llm and result.get("screened")):
+                self._results.move_to_end(key)
+                self._cache_stats["memory_hits"] += 1
+                cached[code] = result
+                continue
+            missing.append(code)
+
+            # Newest in-process result for an earlier document set
+            for other, result in reversed(self._results.items()):
+                if other[:3] == key[:3]:
+                    previous[code] = result
+                    break
+
+        if missing and self.db is not None:
+            try:
+                rows = await self.db.get_latest_compliance_results(project_id, missing)
+            except Exception as e:
+                logger.error(f"Error loading cached compliance results: {str(e)}")
+                rows = {}
+
+            for code, row in rows.items():
+                key = self._result_key(project_id, code, document_hash)
+                if row["standard_version"] != key[2] or not isinstance(row["result"], dict):
+                    continue
+                if row["document_set_hash"] == document_hash and not (
+                    use_llm and row["result"].get("screened")
+                ):
+                    self._cache_stats["db_hits"] += 1
+                    self._remember(key, row["result"])
+                    cached[code] = row["result"]
+                    previous.pop(code, None)
+                else:
+                    previous.setdefault(code, row["result"])
+
+        self._cache_stats["misses"] += len(standard_codes) - len(cached)
+        return cached, previous
+
+    def _remember(self, key: Tuple[str, str, str, str], result: Dict[str, Any]):
+        """Keep a result in the in-process LRU"""
+        if self.cache_size <= 0:
+            return
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.cache_size:
+            self._results.popitem(last=False)
+
+    async def _store_result(self, key: Tuple[str, str, str, str], result: Dict[str, Any]):
+        """
+        Cache a freshly computed result in memory and compliance_checks
+
+        The stored row carries the result itself; issues live only there,
+        and rows with a result are kept out of the check history. Failed
+        and timed-out checks are not cached so the next check retries them.
+
+        Args:
+            key: (project, standard, standard version, document set) key
+            result: Standard result
+        """
+        if result.get("status") == "error" or result.get("timed_out"):
+            return
+
+        self._remember(key, result)
+        if self.db is None:
+            return
+
+        project_id, standard_code, standard_version, document_hash = key
+        # Stored statuses are one of the three compliance outcomes, as in the
+        # screening history; an LLM may answer anything else, so fall back
+        # to the status implied by the issue severities
+        status = result.get("status")
+        if status not in ("compliant", "partial", "non_compliant"):
+            status = self._summarize({standard_code: result})["overall_status"]
+        try:
+            await self.db.create_compliance_check({
+                "project_id": project_id,
+                "standard": standard_code,
+                "status": status,
+                "standard_version": standard_version,
+                "document_set_hash": document_hash,
+                "result": result
+            })
+        except Exception as e:
+            logger.error(f"Error saving compliance result for {standard_code}: {str(e)}")
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Result cache hit/miss counters and current size"""
+        stats = dict(self._cache_stats)
+        stats["entries"] = len(self._results)
+        lookups = stats["memory_hits"] + stats["db_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["db_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def _summarize(self, standard_results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Combine per-standard results into an overall assessment
+
+        Args:
+            standard_results: Results keyed by standard code
+
+        Returns:
+            Overall status, issues, deduplicated recommendations and counts
+        """
+        all_issues = []
+        all_recommendations = []
+
+        for result in standard_results.values():
+            if result.get("issues"):
+                all_issues.extend(result["issues"])
+            if result.get("recommendations"):
+                all_recommendations.extend(result["recommendations"])
+
+        # Determine overall status
+        critical_issues = [i for i in all_issues if i.get("severity") == "critical"]
+        high_issues = [i for i in all_issues if i.get("severity") == "high"]
+
+        if critical_issues:
+            overall_status = "non_compliant"
+        elif high_issues:
+            overall_status = "partial"
+        else:
+            overall_status = "compliant"
+
+        return {
+            "overall_status": overall_status,
+            "issues": all_issues,
+            "recommendations": list(dict.fromkeys(all_recommendations)),  # Deduplicate
+            "total_issues": len(all_issues),
+            "critical_issues": len(critical_issues),
+            "high_issues": len(high_issues),
+            "timed_out_standards": [
+                code for code, result in standard_results.items() if result.get("timed_out")
+            ],
+            "cached_standards": [
+                code for code, result in standard_results.items() if result.get("cached")
+            ]
+        }
+
     def _determine_applicable_standards(
         self,
         documents: List[Dict[str, Any]]
@@ -290,45 +503,50 @@ class ComplianceChecker:
         applicable = []
 
         # Extract project information
-        project_info = {}
-        for doc in documents:
-            if doc.get("extracted_data"):
-                project_info.update(doc["extracted_data"])
-
-        # Check for DFI involvement
-        dfi_involvement = project_info.get("dfi_involvement", "").lower()
-
-        if "ebrd" in dfi_involvement:
-            applicable.append("ebrd_environmental")
-
-        if any(dfi in dfi_involvement for dfi in ["ifc", "world bank", "adb", "afdb"]):
-            applicable.append("ifc_performance")
-
-        # Check if EU-related
-        country = project_info.get("location", "").lower()
-        if any(eu_term in country for eu_term in ["eu", "europe", "european"]):
-            applicable.append("eu_taxonomy")
-
-        # Always check local content and ESG
-        applicable.extend(["local_content", "esg_scoring"])
-
-        # Check for project finance
-        if "project finance" in project_info.get("financial_structure", "").lower():
-            applicable.append("equator_principles")
+        project_info = self.facts.get(documents)["merged"]
+
+        # Each standard lists the project facts that make it apply, e.g.
+        # {"dfi_involvement": ["ebrd"]}, or {"always": true}
+        for code in self.standards:
+            rules = self.standards.applicability(code)
+            if rules.get("always"):
+                applicable.append(code)
+                continue
+
+            for field, terms in rules.items():
+                value = str(project_info.get(field) or "").lower()
+                if isinstance(terms, list) and any(term.lower() in value for term in terms):
+                    applicable.append(code)
+                    break
 
-        return list(set(applicable))
+        return applicable
 
     async def _check_standard(
         self,
         standard_code: str,
-        documents: List[Dict[str, Any]]
+        documents: List[Dict[str, Any]],
+        tenant_id: Optional[str] = None,
+        project_data: Optional[Dict[str, Any]] = None,
+        project_id: Optional[str] = None,
+        previous: Optional[Dict[str, Any]] = None,
+        use_llm: bool = True
     ) -> Dict[str, Any]:
         """
         Check compliance against a specific standard
 
+        When the project's chunks are embedded, requirements are checked
+        against the document text itself (see ``_evidence_based_check``);
+        otherwise against the extracted project data.
+
         Args:
             standard_code: Standard code
             documents: Project documents
+            tenant_id: Tenant key for LLM concurrency limiting
+            project_data: Consolidated project data, if already extracted
+            project_id: Project whose chunks are searched for evidence
+            previous: Earlier result of this standard for the project,
+                whose verdicts are reused where no changed document is involved
+            use_llm: Allow LLM calls; otherwise the result is ``screened``
 
         Returns:
             Standard-specific compliance results
@@ -337,19 +555,44 @@ class ComplianceChecker:
             standard = self.standards.get(standard_code, {})
 
             # Extract relevant information from documents
-            project_data = self._extract_project_data(documents)
-
+            if project_data is None:
+                project_data = self._extract_project_data(documents)
+
+            evidence = None
+            if project_id and self.evidence and self.evidence.enabled and standard_code in self.standards:
+                try:
+                    evidence = await self.evidence.match(project_id, standard_code)
+                except Exception as e:
+                    logger.error(f"Error matching evidence for {standard_code}: {str(e)}")
+
+            if evidence:
+                result = await self._evidence_based_check(
+                    standard_code,
+                    standard,
+                    project_data,
+                    evidence,
+                    tenant_id=tenant_id,
+                    sources=self._evidence_sources(documents),
+                    previous=previous,
+                    use_llm=use_llm
+                )
             # Use AI to check compliance if available
-            if self.claude:
+            elif self.llm.enabled and use_llm:
                 result = await self._ai_compliance_check(
                     standard_code,
                     standard,
-                    project_data
+                    project_data,
+                    tenant_id=tenant_id
                 )
             else:
                 # Fallback to rule-based checking
                 result = self._rule_based_check(standard_code, standard, project_data)
+                if not use_llm:
+                    # Any requirement the keywords missed may still be met
+                    result["unresolved"] = len(result["issues"])
 
+            if not use_llm:
+                result["screened"] = True
             return result
 
         except Exception as e:
@@ -360,11 +603,287 @@ class ComplianceChecker:
                 "recommendations": []
             }
 
+    async def _evidence_based_check(
+        self,
+        standard_code: str,
+        standard: Dict[str, Any],
+        project_data: Dict[str, Any],
+        evidence: List[Dict[str, Any]],
+        tenant_id: Optional[str] = None,
+        sources: Optional[Dict[str, Any]] = None,
+        previous: Optional[Dict[str, Any]] = None,
+        use_llm: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Compliance check backed by matched document passages
+
+        Requirements with strong evidence are compliant and those with none
+        are missing, without any LLM call. Only ambiguous requirements are
+        sent to the LLM with their passages; without an LLM, the
+        rule-based matcher over the extracted data decides them.
+
+        Each requirement's dependencies (the documents its passages came
+        from and the extracted facts that matched it) are recorded. Given
+        the previous evidence-based result, only ambiguous requirements
+        whose old or new dependencies include an added, revised or removed
+        document are reviewed again; the other verdicts are carried over.
+
+        Args:
+            standard_code: Standard code
+            standard: Standard definition
+            project_data: Extracted project data
+            evidence: Per-requirement matches from ``EvidenceMatcher.match``
+            tenant_id: Tenant key for LLM concurrency limiting
+            sources: Document ids by filename, fact sources and document
+                versions (see ``_evidence_sources``)
+            previous: Earlier result of this standard for the project
+            use_llm: Allow LLM reviews; otherwise ambiguous requirements
+                without an earlier review are counted as ``unresolved``
+
+        Returns:
+            Compliance check results with evidence passages, dependencies
+            and LLM reviews per requirement
+        """
+        issues = []
+        recommendations = []
+        compliant_areas = []
+        statuses = {}
+        sources = sources or {"files": {}, "facts": {}, "versions": {}}
+
+        # Rule-based hits in the extracted data settle what evidence does not
+        hits = self.standards.matcher(standard_code).match(project_data)
+        dependencies = {
+            r["text"]: self._requirement_dependencies(r, hits.get(r["text"], []), sources)
+            for r in evidence
+        }
+
+        changed = None
+        if previous and previous.get("method") == "evidence" and previous.get("document_versions") is not None:
+            changed = set(changed_documents(previous["document_versions"], sources["versions"]))
+        previous_reviews = {}
+        previous_dependencies = {}
+        if changed is not None:
+            previous_reviews = previous.get("reviews") or {}
+            previous_dependencies = previous.get("dependencies") or {}
+
+        reviewed = {}
+        reused = 0
+        to_review = []
+        for requirement in evidence:
+            if requirement["status"] != "ambiguous":
+                continue
+            review = previous_reviews.get(requirement["id"])
+            if review is not None:
+                touched = set(dependencies[requirement["text"]]["documents"])
+                touched.update(previous_dependencies.get(requirement["text"], {}).get("documents", []))
+                if not touched & changed:
+                    reviewed[requirement["id"]] = review
+                    reused += 1
+                    continue
+            to_review.append(requirement)
+
+        if to_review and self.llm.enabled and use_llm:
+            reviewed.update(await self._ai_review_requirements(
+                standard_code,
+                standard,
+                to_review[:self.max_ambiguous],
+                tenant_id=tenant_id
+            ))
+
+        for requirement in evidence:
+            text = requirement["text"]
+            status = requirement["status"]
+            if status == "ambiguous":
+                review = reviewed.get(requirement["id"])
+                if review is not None:
+                    status = "supported" if review["met"] else "missing"
+                elif text in hits:
+                    status = "supported"
+            elif status == "missing" and text in hits:
+                status = "supported"
+            statuses[text] = status
+
+            if status == "supported":
+                compliant_areas.append(text)
+                continue
+
+            review = reviewed.get(requirement["id"]) or {}
+            issues.append({
+                "standard": standard_code,
+                "severity": review.get("severity") or ("medium" if status == "missing" else "low"),
+                "description": (
+                    f"Missing or incomplete: {text}" if status == "missing"
+                    else f"Evidence inconclusive: {text}"
+                ),
+                "reference": requirement.get("category") or standard["name"],
+                "recommendation": review.get("recommendation") or f"Provide documentation for {text}"
+            })
+            recommendations.append(f"Develop and submit {text}")
+
+        if len(issues) == 0:
+            status = "compliant"
+        elif len(issues) > len(evidence) / 2:
+            status = "non_compliant"
+        else:
+            status = "partial"
+
+        return {
+            "status": status,
+            "issues": issues,
+            "recommendations": recommendations,
+            "compliant_areas": compliant_areas,
+            "missing_documents": [
+                i["description"] for i in issues if i["description"].startswith("Missing")
+            ],
+            "requirement_status": statuses,
+            "evidence": {
+                r["text"]: r["evidence"] for r in evidence if r["evidence"]
+            },
+            "dependencies": dependencies,
+            "reviews": reviewed,
+            "unresolved": sum(
+                1 for r in evidence
+                if r["status"] == "ambiguous" and r["id"] not in reviewed
+            ),
+            "incremental": {
+                "changed_documents": sorted(changed),
+                "reused_reviews": reused,
+                "reviewed": min(len(to_review), self.max_ambiguous)
+            } if changed is not None else None,
+            "method": "evidence"
+        }
+
+    def _evidence_sources(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Where evidence can come from in a project's document set
+
+        Args:
+            documents: Project documents
+
+        Returns:
+            Dict with files (filename -> document id), facts (compliance
+            data field -> ids of supplying documents) and versions
+            (document id -> revision marker)
+        """
+        return {
+            "files": {doc.get("name"): str(doc.get("id")) for doc in documents},
+            "facts": self.facts.get(documents)["fact_sources"],
+            "versions": document_versions(documents)
+        }
+
+    def _requirement_dependencies(
+        self,
+        requirement: Dict[str, Any],
+        hits: List[Dict[str, Any]],
+        sources: Dict[str, Any]
+    ) -> Dict[str, List[str]]:
+        """
+        Documents and facts a requirement's verdict depends on
+
+        Args:
+            requirement: Evidence match of the requirement
+            hits: Rule-based matcher hits of the requirement
+            sources: See ``_evidence_sources``
+
+        Returns:
+            Dict with sorted document ids and matched fact field paths
+        """
+        documents = set()
+        for passage in requirement["evidence"]:
+            doc_id = sources["files"].get(passage.get("filename"))
+            if doc_id:
+                documents.add(doc_id)
+
+        facts = sorted({hit["field"] for hit in hits})
+        for field in facts:
+            top = field.split(".", 1)[0].split("[", 1)[0]
+            supplying = sources["facts"].get(top, [])
+            if top == "documents_available":
+                # One entry per document, in document order
+                index = int(field[len(top) + 1:].split("]", 1)[0])
+                supplying = supplying[index:index + 1]
+            documents.update(supplying)
+
+        return {"documents": sorted(documents), "facts": facts}
+
+    async def _ai_review_requirements(
+        self,
+        standard_code: str,
+        standard: Dict[str, Any],
+        requirements: List[Dict[str, Any]],
+        tenant_id: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Ask the LLM whether passages satisfy ambiguous requirements
+
+        Args:
+            standard_code: Standard code
+            standard: Standard definition
+            requirements: Ambiguous requirements with evidence passages
+            tenant_id: Tenant key for LLM concurrency limiting
+
+        Returns:
+            Mapping of requirement id to {met, severity, recommendation};
+            empty if the call fails
+        """
+        try:
+            blocks = []
+            for requirement in requirements:
+                passages = "\n".join(
+                    f"  - [{p.get('filename')}, page {p.get('page')}] {p['snippet']}"
+                    for p in requirement["evidence"]
+                ) or "  - (no relevant passage)"
+                blocks.append(f"{requirement['id']}: {requirement['text']}\n{passages}")
+
+            prompt = f"""
+You are an expert in infrastructure project compliance. For each requirement of the {standard['name']} below, decide whether the quoted passages from the project's documents show that it is met.
+
+{chr(10).join(blocks)}
+"""
+            schema = {
+                "type": "object",
+                "properties": {
+                    "requirements": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "id": {"type": "string"},
+                                "met": {"type": "boolean"},
+                                "severity": {"type": "string", "enum": ["critical", "high", "medium", "low"]},
+                                "recommendation": {"type": "string"}
+                            },
+                            "required": ["id", "met"]
+                        }
+                    }
+                },
+                "required": ["requirements"]
+            }
+
+            response = await self.llm.complete_json(
+                prompt,
+                schema,
+                max_tokens=min(2048, 100 + 60 * len(requirements)),
+                tenant_id=tenant_id,
+                purpose="review_requirement_evidence"
+            )
+
+            known = {r["id"] for r in requirements}
+            return {
+                item["id"]: item for item in response["data"].get("requirements") or []
+                if isinstance(item, dict) and item.get("id") in known
+            }
+
+        except Exception as e:
+            logger.error(f"Error reviewing requirement evidence for {standard_code}: {str(e)}")
+            return {}
+
     async def _ai_compliance_check(
         self,
         standard_code: str,
         standard: Dict[str, Any],
-        project_data: Dict[str, Any]
+        project_data: Dict[str, Any],
+        tenant_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Use AI to perform comprehensive compliance check
@@ -373,6 +892,7 @@ class ComplianceChecker:
             standard_code: Standard code
             standard: Standard definition
             project_data: Extracted project data
+            tenant_id: Tenant key for LLM concurrency limiting
 
         Returns:
             Compliance check results
@@ -380,11 +900,16 @@ class ComplianceChecker:
         try:
             import json
 
+            summary = {
+                key: standard.get(key)
+                for key in ("name", "version", "categories", "key_requirements")
+            }
+
             prompt = f"""
 You are an expert in infrastructure project compliance. Check this project against the {standard['name']}.
 
 Standard Requirements:
-{json.dumps(standard, indent=2)}
+{json.dumps(summary, indent=2)}
 
 Project Data:
 {json.dumps(project_data, indent=2)}
@@ -413,22 +938,21 @@ Return your analysis as a JSON object with this structure:
 }}
 """
 
-            message = self.claude.messages.create(
-                model="claude-3-5-sonnet-20241022",
+            response = await self.llm.complete(
+                prompt,
                 max_tokens=2048,
-                messages=[{
-                    "role": "user",
-                    "content": prompt
-                }]
+                tenant_id=tenant_id,
+                purpose="ai_compliance_check"
             )
 
-            response_text = message.content[0].text
+            response_text = response["text"]
 
             # Extract JSON from response
             import re
             json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
             if json_match:
                 result = json.loads(json_match.group())
+                result["method"] = "ai"
                 return result
             else:
                 # Fallback
@@ -461,25 +985,27 @@ Return your analysis as a JSON object with this structure:
 
         # Check for key requirements
         key_requirements = standard.get("key_requirements", [])
+        if standard_code in self.standards and self.standards[standard_code] is standard:
+            matcher = self.standards.matcher(standard_code)
+        else:
+            matcher = RequirementMatcher(key_requirements)
+        categories = {
+            requirement["text"]: requirement.get("category")
+            for requirement in standard.get("requirements", [])
+        }
 
-        for requirement in key_requirements:
-            # Simple keyword-based checking
-            requirement_lower = requirement.lower()
-
-            # Check if requirement is mentioned in project data
-            found = False
-            for key, value in project_data.items():
-                if isinstance(value, str) and requirement_lower in value.lower():
-                    found = True
-                    compliant_areas.append(requirement)
-                    break
+        # One pass over all project text finds every requirement
+        evidence = matcher.match(project_data)
 
-            if not found:
+        for requirement in key_requirements:
+            if requirement in evidence:
+                compliant_areas.append(requirement)
+            else:
                 issues.append({
                     "standard": standard_code,
                     "severity": "medium",
                     "description": f"Missing or incomplete: {requirement}",
-                    "reference": standard["name"],
+                    "reference": categories.get(requirement) or standard["name"],
                     "recommendation": f"Provide documentation for {requirement}"
                 })
                 recommendations.append(f"Develop and submit {requirement}")
@@ -497,7 +1023,9 @@ Return your analysis as a JSON object with this structure:
             "issues": issues,
             "recommendations": recommendations,
             "compliant_areas": compliant_areas,
-            "missing_documents": [i["description"] for i in issues]
+            "missing_documents": [i["description"] for i in issues],
+            "evidence": evidence,
+            "method": "rules"
         }
 
     def _extract_project_data(
@@ -511,54 +1039,9 @@ Return your analysis as a JSON object with this structure:
             documents: Project documents
 
         Returns:
-            Consolidated project data
-        """
-        project_data = {
-            "documents_available": [],
-            "stakeholders": [],
-            "environmental_data": {},
-            "social_data": {},
-            "governance_data": {}
-        }
-
-        for doc in documents:
-            # Document metadata
-            project_data["documents_available"].append({
-                "name": doc.get("name"),
-                "type": doc.get("type")
-            })
-
-            # Extracted data
-            if doc.get("extracted_data"):
-                extracted = doc["extracted_data"]
-
-                # Stakeholders
-                if extracted.get("stakeholders"):
-                    project_data["stakeholders"].extend(extracted["stakeholders"])
-
-                # Environmental impact
-                if extracted.get("environmental_impact"):
-                    project_data["environmental_data"].update({
-                        "impact_assessment": extracted["environmental_impact"]
-                    })
-
-                # Risk factors
-                if extracted.get("risk_factors"):
-                    project_data["risk_factors"] = extracted["risk_factors"]
-
-                # Financial structure
-                if extracted.get("financial_structure"):
-                    project_data["financial_structure"] = extracted["financial_structure"]
-
-                # Location and basic info
-                for key in ["project_name", "location", "technology", "capacity"]:
-                    if extracted.get(key):
-                        project_data[key] = extracted[key]
-
-        # Deduplicate stakeholders
-        project_data["stakeholders"] = list(set(project_data["stakeholders"]))
-
-        return project_data
+            Consolidated project data (shared, read-only)
+        """
+        return self.facts.get(documents)["compliance_data"]
 
     async def generate_compliance_report(
         self,
@@ -575,41 +1058,60 @@ Return your analysis as a JSON object with this structure:
         Returns:
             Formatted report as markdown
         """
-        report_lines = [
-            f"# Compliance Report - Project {project_id}",
-            f"\n**Overall Status:** {compliance_results['overall_status'].upper()}",
-            f"\n**Date:** {datetime.utcnow().strftime('%Y-%m-%d')}",
-            f"\n## Summary",
-            f"- Standards Checked: {len(compliance_results['standards_checked'])}",
-            f"- Total Issues: {compliance_results.get('total_issues', 0)}",
-            f"- Critical Issues: {compliance_results.get('critical_issues', 0)}",
-            f"- High Priority Issues: {compliance_results.get('high_issues', 0)}",
-            "\n## Standards Checked"
-        ]
+        return "".join(self.iter_compliance_report(project_id, compliance_results))
+
+    def iter_compliance_report(
+        self,
+        project_id: str,
+        compliance_results: Dict[str, Any]
+    ) -> Iterator[str]:
+        """
+        Render a compliance report as markdown, line by line
+
+        Reports of large projects run to hundreds of issues; yielding
+        lines lets callers stream them without building the whole report.
+
+        Args:
+            project_id: Project ID
+            compliance_results: Compliance check results; ``checked_at``
+                is used as the report date when present
+
+        Yields:
+            Newline-terminated markdown lines
+        """
+        checked_at = compliance_results.get("checked_at") or datetime.utcnow()
+        if isinstance(checked_at, str):
+            checked_at = datetime.fromisoformat(checked_at.replace("Z", "+00:00"))
+
+        yield f"# Compliance Report - Project {project_id}\n"
+        yield f"\n**Overall Status:** {compliance_results['overall_status'].upper()}\n"
+        yield f"\n**Date:** {checked_at.strftime('%Y-%m-%d')}\n"
+        yield "\n## Summary\n"
+        yield f"- Standards Checked: {len(compliance_results['standards_checked'])}\n"
+        yield f"- Total Issues: {compliance_results.get('total_issues', 0)}\n"
+        yield f"- Critical Issues: {compliance_results.get('critical_issues', 0)}\n"
+        yield f"- High Priority Issues: {compliance_results.get('high_issues', 0)}\n"
+        yield "\n## Standards Checked\n"
 
         for standard in compliance_results['standards_checked']:
             standard_name = self.standards.get(standard, {}).get("name", standard)
-            report_lines.append(f"- {standard_name}")
+            yield f"- {standard_name}\n"
 
         if compliance_results.get('issues'):
-            report_lines.append("\n## Issues Identified")
+            yield "\n## Issues Identified\n"
             for i, issue in enumerate(compliance_results['issues'], 1):
-                report_lines.append(
-                    f"\n### {i}. {issue.get('description', 'Unknown Issue')}"
-                )
-                report_lines.append(f"- **Severity:** {issue.get('severity', 'unknown')}")
-                report_lines.append(f"- **Standard:** {issue.get('standard', 'unknown')}")
+                yield f"\n### {i}. {issue.get('description', 'Unknown Issue')}\n"
+                yield f"- **Severity:** {issue.get('severity', 'unknown')}\n"
+                yield f"- **Standard:** {issue.get('standard', 'unknown')}\n"
                 if issue.get('reference'):
-                    report_lines.append(f"- **Reference:** {issue['reference']}")
+                    yield f"- **Reference:** {issue['reference']}\n"
                 if issue.get('recommendation'):
-                    report_lines.append(f"- **Recommendation:** {issue['recommendation']}")
+                    yield f"- **Recommendation:** {issue['recommendation']}\n"
 
         if compliance_results.get('recommendations'):
-            report_lines.append("\n## Recommendations")
+            yield "\n## Recommendations\n"
             for rec in compliance_results['recommendations']:
-                report_lines.append(f"- {rec}")
-
-        return "\n".join(report_lines)
+                yield f"- {rec}\n"
 
 
 # Import at module level for datetime usage
@@ -0,0 +1,196 @@
+"""
+InfraFlow AI - Compliance Evidence
+Embedding-based matching of standard requirements to document passages
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict
+import os
+import logging
+import asyncio
+import threading
+
+import numpy as np
+
+from standards_registry import StandardsRegistry, get_standards_registry
+
+logger = logging.getLogger(__name__)
+
+SNIPPET_CHARS = 400
+
+
+class EvidenceMatcher:
+    """
+    Finds the document passages that best support each requirement
+
+    Requirement embeddings are computed once per standard version (the
+    registry fingerprint) and kept in memory. A standard is matched
+    against a project with one batched similarity query over the
+    project's chunk vectors, and each requirement is classified by its
+    best score:
+
+    - supported: score >= support_threshold
+    - missing: score < missing_threshold
+    - ambiguous: in between; the only requirements worth an LLM call
+    """
+
+    def __init__(
+        self,
+        processor: Any,
+        registry: Optional[StandardsRegistry] = None,
+        top_k: Optional[int] = None,
+        support_threshold: Optional[float] = None,
+        missing_threshold: Optional[float] = None,
+        cache_size: Optional[int] = None
+    ):
+        """
+        Initialize matcher
+
+        Args:
+            processor: DocumentProcessor providing embeddings and vector store
+            registry: Standards registry
+            top_k: Passages kept per requirement (EVIDENCE_TOP_K)
+            support_threshold: Cosine score that counts as support
+                (EVIDENCE_SUPPORT_THRESHOLD)
+            missing_threshold: Cosine score below which a requirement is
+                missing (EVIDENCE_MISSING_THRESHOLD)
+            cache_size: Standards whose requirement embeddings are kept
+                (EVIDENCE_EMBEDDING_CACHE_SIZE)
+        """
+        self.processor = processor
+        self.registry = registry or get_standards_registry()
+        self.top_k = top_k or int(os.getenv("EVIDENCE_TOP_K", "3"))
+        self.support_threshold = (
+            support_threshold if support_threshold is not None
+            else float(os.getenv("EVIDENCE_SUPPORT_THRESHOLD", "0.55"))
+        )
+        self.missing_threshold = (
+            missing_threshold if missing_threshold is not None
+            else float(os.getenv("EVIDENCE_MISSING_THRESHOLD", "0.35"))
+        )
+        self.cache_size = cache_size or int(os.getenv("EVIDENCE_EMBEDDING_CACHE_SIZE", "64"))
+
+        self._lock = threading.Lock()
+        # (code, fingerprint) -> normalized (requirements x dimension) matrix
+        self._vectors: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._pending: Dict[Tuple[str, str], asyncio.Future] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """Whether embeddings and a vector store are configured"""
+        return bool(
+            getattr(self.processor, "embeddings", None)
+            and getattr(self.processor, "vector_store", None)
+        )
+
+    async def requirement_vectors(self, code: str) -> np.ndarray:
+        """
+        Embeddings of a standard's requirements, computed once per version
+
+        Args:
+            code: Standard code
+
+        Returns:
+            L2-normalized matrix with one row per requirement
+        """
+        standard = self.registry[code]
+        key = (code, standard["fingerprint"])
+
+        with self._lock:
+            vectors = self._vectors.get(key)
+            if vectors is not None:
+                self._vectors.move_to_end(key)
+                return vectors
+
+        # Concurrent checks of the same standard share one embedding call
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_event_loop().create_future()
+        self._pending[key] = future
+        try:
+            texts = [
+                f"{r['category']}: {r['text']}" if r.get("category") else r["text"]
+                for r in standard["requirements"]
+            ]
+            loop = asyncio.get_event_loop()
+            embedded = await loop.run_in_executor(
+                None,
+                self.processor.embeddings.embed_documents,
+                texts
+            )
+            vectors = np.asarray(embedded, dtype=np.float32).reshape(len(texts), -1)
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+            with self._lock:
+                self._vectors[key] = vectors
+                while len(self._vectors) > self.cache_size:
+                    self._vectors.popitem(last=False)
+            future.set_result(vectors)
+            return vectors
+
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when nobody else was waiting
+            future.exception()
+            raise
+
+        finally:
+            self._pending.pop(key, None)
+
+    async def match(self, project_id: str, code: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Match a standard's requirements against a project's documents
+
+        Args:
+            project_id: Project ID
+            code: Standard code
+
+        Returns:
+            One entry per requirement with id, text, category, status
+            (supported/ambiguous/missing), best score and evidence passages;
+            None if the project has no indexed chunks
+        """
+        standard = self.registry[code]
+        if not standard["requirements"]:
+            return []
+
+        vectors = await self.requirement_vectors(code)
+        matches = await self.processor.vector_store.query_many(
+            f"project_{project_id}",
+            vectors.tolist(),
+            top_k=self.top_k
+        )
+        if not any(matches):
+            return None
+
+        results = []
+        for requirement, passages in zip(standard["requirements"], matches):
+            score = passages[0]["score"] if passages else 0.0
+            if score >= self.support_threshold:
+                status = "supported"
+            elif score < self.missing_threshold:
+                status = "missing"
+            else:
+                status = "ambiguous"
+
+            results.append({
+                "id": requirement["id"],
+                "text": requirement["text"],
+                "category": requirement.get("category"),
+                "status": status,
+                "score": round(float(score), 4),
+                "evidence": [
+                    {
+                        "chunk_id": passage["id"],
+                        "filename": passage["metadata"].get("filename"),
+                        "page": passage["metadata"].get("page"),
+                        "score": round(float(passage["score"]), 4),
+                        "snippet": (passage["metadata"].get("text") or "")[:SNIPPET_CHARS]
+                    }
+                    for passage in passages
+                    if passage["score"] >= self.missing_threshold
+                ]
+            })
+        return results
@@ -0,0 +1,226 @@
+"""
+InfraFlow AI - Compliance Reports
+Streamed rendering and storage of compliance check reports
+"""
+
+from typing import Dict, Any, List, Optional, Iterable, Iterator, AsyncIterator, Tuple
+import os
+import re
+import html
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bump when the rendered output changes so stored reports are re-rendered
+REPORT_TEMPLATE = "compliance_report_v1"
+
+# format -> (media type, file extension)
+REPORT_FORMATS: Dict[str, Tuple[str, str]] = {
+    "markdown": ("text/markdown; charset=utf-8", "md"),
+    "html": ("text/html; charset=utf-8", "html")
+}
+
+_BOLD = re.compile(r"\*\*(.+?)\*\*")
+_HEADING = re.compile(r"^(#{1,3}) (.*)$")
+
+# Print styles make the HTML report save cleanly as PDF from a browser
+HTML_STYLE = """
+body { font-family: -apple-system, "Segoe UI", Helvetica, Arial, sans-serif;
+       max-width: 52rem; margin: 2rem auto; padding: 0 1rem; color: #1f2933; line-height: 1.5; }
+h1 { border-bottom: 2px solid #1f2933; padding-bottom: .3rem; }
+h2 { margin-top: 2rem; border-bottom: 1px solid #cbd2d9; }
+h3 { margin-bottom: .3rem; page-break-after: avoid; }
+ul { margin-top: .3rem; }
+@page { size: A4; margin: 18mm; }
+@media print { body { margin: 0; max-width: none; } h2 { page-break-after: avoid; } }
+"""
+
+
+def check_results(check: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Report input from a stored compliance check
+
+    Args:
+        check: compliance_checks row (issues and recommendations decoded)
+
+    Returns:
+        Results in the shape ``ComplianceChecker.iter_compliance_report`` expects
+    """
+    issues = check.get("issues") or []
+    return {
+        "overall_status": check.get("status") or "unknown",
+        "standards_checked": [
+            standard.strip() for standard in (check.get("standard") or "").split(",")
+            if standard.strip()
+        ],
+        "issues": issues,
+        "recommendations": check.get("recommendations") or [],
+        "total_issues": len(issues),
+        "critical_issues": sum(1 for i in issues if i.get("severity") == "critical"),
+        "high_issues": sum(1 for i in issues if i.get("severity") == "high"),
+        "checked_at": check.get("checked_at")
+    }
+
+
+def _inline(text: str) -> str:
+    """Escape text and render **bold** spans"""
+    return _BOLD.sub(r"<strong>\1</strong>", html.escape(text.strip()))
+
+
+def markdown_to_html(lines: Iterable[str], title: str) -> Iterator[str]:
+    """
+    Convert report markdown to a standalone HTML page, line by line
+
+    Handles the subset the report renderer emits: headings, bullet
+    lists, bold labels and paragraphs.
+
+    Args:
+        lines: Markdown chunks (may contain several lines each)
+        title: Page title
+
+    Yields:
+        HTML fragments
+    """
+    yield (
+        "<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n<meta charset=\"utf-8\">\n"
+        f"<title>{html.escape(title)}</title>\n<style>{HTML_STYLE}</style>\n"
+        "</head>\n<body>\n"
+    )
+
+    in_list = False
+    for chunk in lines:
+        for line in chunk.splitlines():
+            line = line.rstrip()
+            if in_list and not line.startswith("- "):
+                yield "</ul>\n"
+                in_list = False
+            if not line:
+                continue
+
+            heading = _HEADING.match(line)
+            if heading:
+                level = len(heading.group(1))
+                yield f"<h{level}>{_inline(heading.group(2))}</h{level}>\n"
+            elif line.startswith("- "):
+                if not in_list:
+                    yield "<ul>\n"
+                    in_list = True
+                yield f"<li>{_inline(line[2:])}</li>\n"
+            else:
+                yield f"<p>{_inline(line)}</p>\n"
+
+    if in_list:
+        yield "</ul>\n"
+    yield "</body>\n</html>\n"
+
+
+class ComplianceReportService:
+    """
+    Serves compliance check reports, rendering each at most once
+
+    A report is rendered as a stream of chunks and sent while it is
+    rendered; once complete it is stored in the reports table under its
+    compliance check, format and template version. Later downloads are
+    streamed from the stored copy. The API never modifies a recorded
+    compliance check, so a stored report does not go stale.
+    """
+
+    def __init__(self, db: Any, checker: Any, chunk_size: Optional[int] = None):
+        """
+        Initialize report service
+
+        Args:
+            db: Database instance
+            checker: ComplianceChecker rendering the markdown
+            chunk_size: Characters per streamed chunk (REPORT_STREAM_CHUNK_SIZE)
+        """
+        self.db = db
+        self.checker = checker
+        self.chunk_size = chunk_size or int(os.getenv("REPORT_STREAM_CHUNK_SIZE", "65536"))
+
+    async def open(
+        self,
+        project_id: str,
+        check: Dict[str, Any],
+        report_format: str = "markdown",
+        user_id: Optional[str] = None
+    ) -> Tuple[bool, AsyncIterator[str]]:
+        """
+        Open a compliance check report for streaming
+
+        Args:
+            project_id: Project ID
+            check: compliance_checks row
+            report_format: One of ``REPORT_FORMATS``
+            user_id: Requesting user, recorded on a newly stored report
+
+        Returns:
+            Tuple of (served from storage, chunk iterator)
+        """
+        check_id = str(check["id"])
+        stored = None
+        try:
+            stored = await self.db.get_compliance_report(check_id, report_format, REPORT_TEMPLATE)
+        except Exception as e:
+            logger.error(f"Error loading stored report for check {check_id}: {str(e)}")
+
+        if stored is not None:
+            return True, self._chunks(stored["body"])
+        return False, self._render_and_store(project_id, check, report_format, user_id)
+
+    async def _chunks(self, body: str) -> AsyncIterator[str]:
+        for start in range(0, len(body), self.chunk_size):
+            yield body[start:start + self.chunk_size]
+
+    def _render(self, project_id: str, check: Dict[str, Any], report_format: str) -> Iterator[str]:
+        lines = self.checker.iter_compliance_report(project_id, check_results(check))
+        if report_format == "html":
+            return markdown_to_html(lines, f"Compliance Report - Project {project_id}")
+        return lines
+
+    async def _render_and_store(
+        self,
+        project_id: str,
+        check: Dict[str, Any],
+        report_format: str,
+        user_id: Optional[str]
+    ) -> AsyncIterator[str]:
+        """Stream a fresh rendering, storing it once fully sent"""
+        rendered: List[str] = []
+        buffer: List[str] = []
+        size = 0
+
+        for piece in self._render(project_id, check, report_format):
+            buffer.append(piece)
+            size += len(piece)
+            if size >= self.chunk_size:
+                chunk = "".join(buffer)
+                rendered.append(chunk)
+                buffer, size = [], 0
+                yield chunk
+        if buffer:
+            chunk = "".join(buffer)
+            rendered.append(chunk)
+            yield chunk
+
+        # Only reached when the client received the whole report
+        results = check_results(check)
+        try:
+            await self.db.save_compliance_report({
+                "project_id": project_id,
+                "compliance_check_id": str(check["id"]),
+                "title": f"Compliance Report - Project {project_id}",
+                "format": report_format,
+                "template_used": REPORT_TEMPLATE,
+                "body": "".join(rendered),
+                "content": {
+                    "overall_status": results["overall_status"],
+                    "standards_checked": results["standards_checked"],
+                    "total_issues": results["total_issues"],
+                    "critical_issues": results["critical_issues"],
+                    "high_issues": results["high_issues"]
+                },
+                "generated_by": user_id
+            })
+        except Exception as e:
+            logger.error(f"Error storing report for check {check['id']}: {str(e)}")
@@ -0,0 +1,478 @@
+"""
+InfraFlow AI - Compliance Screening
+Portfolio-wide screening of projects against one compliance standard
+"""
+
+from typing import Dict, Any, List, Optional, AsyncIterator
+from collections import OrderedDict
+from datetime import datetime
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class LLMBudget:
+    """Number of LLM escalations a screening job may still make"""
+
+    def __init__(self, limit: int):
+        self.limit = max(0, limit)
+        self.used = 0
+
+    @property
+    def remaining(self) -> int:
+        return self.limit - self.used
+
+    def try_acquire(self) -> bool:
+        """Take one escalation from the budget, if any is left"""
+        if self.used >= self.limit:
+            return False
+        self.used += 1
+        return True
+
+
+class ScreeningJob:
+    """State, per-project outcomes and throughput of one screening run"""
+
+    def __init__(
+        self,
+        standard: str,
+        project_ids: List[str],
+        llm_budget: int,
+        created_by: Optional[str] = None
+    ):
+        self.id = str(uuid.uuid4())
+        self.standard = standard
+        self.project_ids = project_ids
+        self.budget = LLMBudget(llm_budget)
+        self.created_by = created_by
+        self.created_at = datetime.utcnow()
+        self.status = "pending"
+        self.error: Optional[str] = None
+
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.counts = {"screened": 0, "escalated": 0, "skipped": 0, "failed": 0}
+        self.results: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Project ids in the order their outcomes were recorded
+        self.log: List[str] = []
+        self.updated = asyncio.Event()
+
+    @property
+    def elapsed(self) -> float:
+        return max((self.finished or time.perf_counter()) - self.started, 1e-9)
+
+    def record(self, project_id: str, outcome: Dict[str, Any], counter: str):
+        """Store a project's latest outcome and wake progress streams"""
+        self.results[project_id] = outcome
+        self.log.append(project_id)
+        self.counts[counter] += 1
+        self._notify()
+
+    def set_status(self, status: str, error: Optional[str] = None):
+        self.status = status
+        self.error = error
+        if status in TERMINAL_STATUSES:
+            self.finished = time.perf_counter()
+        self._notify()
+
+    def _notify(self):
+        self.updated.set()
+        self.updated = asyncio.Event()
+
+    def progress(self) -> Dict[str, Any]:
+        """Counts, LLM budget use and throughput"""
+        total = len(self.project_ids)
+        done = self.counts["screened"] + self.counts["skipped"] + self.counts["failed"]
+        rate = done / self.elapsed
+        statuses: Dict[str, int] = {}
+        for outcome in self.results.values():
+            statuses[outcome["status"]] = statuses.get(outcome["status"], 0) + 1
+
+        return {
+            "job_id": self.id,
+            "standard": self.standard,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "total_projects": total,
+            "processed_projects": done,
+            **self.counts,
+            "results_by_status": statuses,
+            "llm_budget": {"limit": self.budget.limit, "used": self.budget.used},
+            "elapsed_seconds": round(self.elapsed, 1),
+            "projects_per_min": round(rate * 60, 1),
+            "eta_seconds": (
+                round((total - done) / rate, 1)
+                if self.status not in TERMINAL_STATUSES and rate > 0 and done < total
+                else None
+            )
+        }
+
+    def report(self, status_filter: Optional[str] = None) -> Dict[str, Any]:
+        """Progress plus per-project outcomes, failing projects first"""
+        order = {"non_compliant": 0, "partial": 1, "error": 2, "compliant": 3}
+        results = [
+            outcome for outcome in self.results.values()
+            if status_filter is None or outcome["status"] == status_filter
+        ]
+        results.sort(key=lambda o: (order.get(o["status"], 4), -o.get("critical_issues", 0)))
+        return {**self.progress(), "results": results}
+
+
+class ComplianceScreener:
+    """
+    Screens a set of projects against one standard
+
+    Every project first goes through the checker without LLM calls:
+    embedding evidence and rule matching, plus any LLM verdicts cached
+    from earlier checks. Projects whose screening left requirements
+    unresolved are then escalated to a full check, most unresolved
+    first, until the job's LLM budget is used up. Both passes run on a
+    pool of ``concurrency`` projects.
+
+    Each project's outcome is recorded as one compliance check as soon as
+    it is known, so v_compliance_summary fills in while the job runs; an
+    escalation replaces the screened outcome rather than adding a check.
+    """
+
+    def __init__(
+        self,
+        db: Any,
+        checker: Any,
+        concurrency: Optional[int] = None,
+        llm_budget: Optional[int] = None,
+        jobs_kept: Optional[int] = None
+    ):
+        """
+        Initialize screener
+
+        Args:
+            db: Database instance
+            checker: ComplianceChecker (with ``db`` set, to persist results)
+            concurrency: Projects screened at once (COMPLIANCE_SCREENING_CONCURRENCY)
+            llm_budget: Default escalations per job (COMPLIANCE_SCREENING_LLM_BUDGET)
+            jobs_kept: Finished jobs kept in memory (COMPLIANCE_SCREENING_JOBS_KEPT)
+        """
+        self.db = db
+        self.checker = checker
+        self.concurrency = concurrency or int(os.getenv("COMPLIANCE_SCREENING_CONCURRENCY", "8"))
+        self.llm_budget = (
+            llm_budget if llm_budget is not None
+            else int(os.getenv("COMPLIANCE_SCREENING_LLM_BUDGET", "50"))
+        )
+        self.max_projects = int(os.getenv("COMPLIANCE_SCREENING_MAX_PROJECTS", "1000"))
+        self.jobs_kept = jobs_kept or int(os.getenv("COMPLIANCE_SCREENING_JOBS_KEPT", "20"))
+
+        self._jobs: "OrderedDict[str, ScreeningJob]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def start(
+        self,
+        standard: str,
+        user_id: str,
+        is_admin: bool = False,
+        project_ids: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        llm_budget: Optional[int] = None
+    ) -> ScreeningJob:
+        """
+        Start a screening job in the background
+
+        Args:
+            standard: Standard code
+            user_id: Requesting user; only their projects are screened
+                unless they are an admin
+            is_admin: Whether the user may screen any project
+            project_ids: Projects to screen; defaults to the user's projects
+                matching ``filters``
+            filters: Project filters (country, sector, status)
+            llm_budget: Escalations allowed (defaults to ``llm_budget``)
+
+        Returns:
+            The started job
+        """
+        if project_ids is None:
+            projects = await self.db.list_projects(
+                user_id=user_id,
+                filters=filters or {},
+                limit=self.max_projects
+            )
+            project_ids = [str(p["id"]) for p in projects]
+        project_ids = list(dict.fromkeys(project_ids))[:self.max_projects]
+
+        job = ScreeningJob(
+            standard,
+            project_ids,
+            self.llm_budget if llm_budget is None else llm_budget,
+            created_by=user_id
+        )
+        self._jobs[job.id] = job
+        self._prune()
+        self._tasks[job.id] = asyncio.create_task(self._run(job, user_id, is_admin))
+
+        logger.info(
+            f"Started compliance screening {job.id}: {standard} across "
+            f"{len(project_ids)} projects"
+        )
+        return job
+
+    def get_job(self, job_id: str) -> Optional[ScreeningJob]:
+        return self._jobs.get(job_id)
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond ``jobs_kept``"""
+        finished = [j for j in self._jobs.values() if j.status in TERMINAL_STATUSES]
+        for job in finished[:max(0, len(finished) - self.jobs_kept)]:
+            self._jobs.pop(job.id, None)
+
+    async def stop(self):
+        """Cancel running jobs"""
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+
+    async def _run(self, job: ScreeningJob, user_id: str, is_admin: bool):
+        try:
+            semaphore = asyncio.Semaphore(max(1, self.concurrency))
+
+            async def pooled(coroutine):
+                async with semaphore:
+                    await coroutine
+
+            job.set_status("screening")
+            await asyncio.gather(*(
+                pooled(self._screen(job, project_id, user_id, is_admin))
+                for project_id in job.project_ids
+            ))
+
+            candidates = []
+            if self.checker.llm.enabled:
+                candidates = sorted(
+                    (o for o in job.results.values() if o.get("unresolved")),
+                    key=lambda o: -o["unresolved"]
+                )
+
+            escalations = []
+            for outcome in candidates:
+                if not job.budget.try_acquire():
+                    break
+                escalations.append(pooled(
+                    self._escalate(job, outcome["project_id"], user_id, is_admin)
+                ))
+            if escalations:
+                job.set_status("escalating")
+                await asyncio.gather(*escalations)
+
+            job.set_status("completed")
+            progress = job.progress()
+            logger.info(
+                f"Compliance screening {job.id} completed: "
+                f"{progress['processed_projects']} projects in {progress['elapsed_seconds']}s "
+                f"({progress['projects_per_min']} projects/min), "
+                f"{job.counts['escalated']} escalated"
+            )
+
+        except asyncio.CancelledError:
+            job.set_status("cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"Error in compliance screening {job.id}: {str(e)}")
+            job.set_status("failed", str(e))
+        finally:
+            self._tasks.pop(job.id, None)
+
+    async def _load(
+        self,
+        job: ScreeningJob,
+        project_id: str,
+        user_id: Optional[str],
+        is_admin: bool,
+        record_skip: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Project and documents, or None if the project cannot be checked
+
+        Args:
+            job: Screening job
+            project_id: Project to load
+            user_id: User who started the job
+            is_admin: Whether that user may check any project
+            record_skip: Record a skipped outcome, with its reason, for a
+                project that cannot be checked
+
+        Returns:
+            Project and its documents, or None
+        """
+        project = await self.db.get_project(project_id)
+        reason = None
+        if not project:
+            reason = "not_found"
+        elif not is_admin and str(project.get("user_id")) != str(user_id):
+            reason = "forbidden"
+        else:
+            documents = await self.db.list_project_documents(project_id)
+            if documents:
+                return {"project": project, "documents": documents}
+            reason = "no_documents"
+
+        if not record_skip:
+            logger.info(f"Project {project_id} can no longer be checked: {reason}")
+            return None
+        job.record(project_id, {
+            "project_id": project_id,
+            "project_name": (project or {}).get("name"),
+            "status": "skipped",
+            "reason": reason
+        }, "skipped")
+        return None
+
+    async def _screen(self, job: ScreeningJob, project_id: str, user_id: str, is_admin: bool):
+        """First pass: check a project without LLM calls"""
+        try:
+            loaded = await self._load(job, project_id, user_id, is_admin)
+            if loaded is None:
+                return
+            result = await self.checker.check_standards(
+                project_id,
+                loaded["documents"],
+                [job.standard],
+                use_llm=False
+            )
+            outcome = self._outcome(loaded["project"], job.standard, result)
+            outcome["check_id"] = await self._save_check(project_id, job.standard, result)
+            job.record(project_id, outcome, "screened")
+
+        except Exception as e:
+            logger.error(f"Error screening project {project_id}: {str(e)}")
+            job.record(project_id, {
+                "project_id": project_id,
+                "status": "error",
+                "error": str(e)
+            }, "failed")
+
+    async def _escalate(self, job: ScreeningJob, project_id: str, user_id: str, is_admin: bool):
+        """Second pass: full check of a project with LLM review"""
+        try:
+            # A project gone since screening keeps its screened outcome
+            loaded = await self._load(job, project_id, user_id, is_admin, record_skip=False)
+            if loaded is None:
+                return
+            result = await self.checker.check_standards(
+                project_id,
+                loaded["documents"],
+                [job.standard]
+            )
+            outcome = self._outcome(loaded["project"], job.standard, result)
+            outcome["check_id"] = await self._save_check(
+                project_id,
+                job.standard,
+                result,
+                check_id=job.results[project_id].get("check_id")
+            )
+            job.record(project_id, outcome, "escalated")
+
+        except Exception as e:
+            # Keep the screening outcome; it is still the best answer
+            logger.error(f"Error escalating project {project_id}: {str(e)}")
+
+    async def _save_check(
+        self,
+        project_id: str,
+        standard: str,
+        result: Dict[str, Any],
+        check_id: Optional[str] = None
+    ) -> Optional[str]:
+        """Record a project's outcome in its check history, replacing ``check_id``"""
+        status = (result["standard_results"].get(standard) or {}).get("status")
+        if status not in ("compliant", "partial", "non_compliant"):
+            status = result["overall_status"]
+        check_data = {
+            "project_id": project_id,
+            "standard": standard,
+            "status": status,
+            "issues": result["issues"],
+            "recommendations": result["recommendations"],
+            "checked_at": datetime.utcnow()
+        }
+        try:
+            if check_id:
+                await self.db.update_compliance_check(check_id, check_data)
+                return check_id
+            return await self.db.create_compliance_check(check_data)
+        except Exception as e:
+            logger.error(f"Error saving compliance check for project {project_id}: {str(e)}")
+            return check_id
+
+    def _outcome(
+        self,
+        project: Dict[str, Any],
+        standard: str,
+        result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Compact per-project outcome of a check"""
+        standard_result = result["standard_results"].get(standard) or {}
+        unresolved = standard_result.get("unresolved", 0)
+        if standard_result.get("timed_out"):
+            unresolved = len(standard_result.get("issues") or [])
+
+        return {
+            "project_id": str(project["id"]),
+            "project_name": project.get("name"),
+            "country": project.get("country"),
+            "sector": project.get("sector"),
+            "status": standard_result.get("status", "error"),
+            "issues": result["total_issues"],
+            "critical_issues": result["critical_issues"],
+            "high_issues": result["high_issues"],
+            "method": standard_result.get("method"),
+            "screened": bool(standard_result.get("screened")),
+            "unresolved": unresolved if standard_result.get("screened") else 0,
+            "cached": bool(standard_result.get("cached"))
+        }
+
+
+async def stream_screening_events(
+    job: ScreeningJob,
+    heartbeat: float = 15.0
+) -> AsyncIterator[str]:
+    """
+    Stream a screening job as Server-Sent Events
+
+    Args:
+        job: Screening job
+        heartbeat: Seconds between keep-alive comments when idle
+
+    Yields:
+        SSE-formatted ``result`` (one per project outcome), ``progress``
+        and ``done`` events
+    """
+    position = 0
+    while True:
+        updated = job.updated
+        recorded = job.log[position:]
+        position += len(recorded)
+        for project_id in dict.fromkeys(recorded):
+            yield _sse("result", job.results[project_id])
+
+        yield _sse("progress", job.progress())
+        if job.status in TERMINAL_STATUSES:
+            yield _sse("done", job.progress())
+            return
+
+        try:
+            await asyncio.wait_for(updated.wait(), heartbeat)
+        except asyncio.TimeoutError:
+            yield ": keep-alive\n\n"
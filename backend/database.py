@@ -13,6 +13,9 @@ import json
 
 logger = logging.getLogger(__name__)
 
+# Score columns of esg_scores that can be ranked and filtered on
+ESG_SCORE_COLUMNS = ("overall_score", "environmental_score", "social_score", "governance_score")
+
 
 class Database:
     """Database connection and operations handler"""
@@ -75,6 +78,10 @@ class Database:
                 logger.info("Creating database schema...")
                 await self._create_schema(conn)
 
+            # Tables and columns added after the initial schema; idempotent,
+            # so existing databases are brought up to date on every start
+            await self._apply_migrations(conn)
+
     async def _create_schema(self, conn):
         """Create database schema"""
         schema_sql = """
@@ -147,6 +154,120 @@ class Database:
         await conn.execute(schema_sql)
         logger.info("Database schema created successfully")
 
+    async def _apply_migrations(self, conn):
+        """Create tables and columns added after the initial schema"""
+        await conn.execute("""
+        CREATE TABLE IF NOT EXISTS ingestion_jobs (
+            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+            project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+            document_id UUID REFERENCES documents(id) ON DELETE SET NULL,
+            filename TEXT NOT NULL,
+            staged_path TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            stage TEXT,
+            checkpoint JSONB DEFAULT '{}'::jsonb,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            last_error TEXT,
+            locked_by TEXT,
+            locked_at TIMESTAMP,
+            available_at TIMESTAMP DEFAULT NOW(),
+            created_by TEXT,
+            created_at TIMESTAMP DEFAULT NOW(),
+            updated_at TIMESTAMP DEFAULT NOW()
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_claim
+            ON ingestion_jobs(status, available_at, created_at);
+        CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_project_id
+            ON ingestion_jobs(project_id);
+
+        ALTER TABLE ingestion_jobs ADD COLUMN IF NOT EXISTS batch_id UUID;
+        ALTER TABLE ingestion_jobs ADD COLUMN IF NOT EXISTS progress JSONB DEFAULT '{}'::jsonb;
+
+        CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_batch_id
+            ON ingestion_jobs(batch_id);
+
+        -- Document revisions
+        ALTER TABLE documents ADD COLUMN IF NOT EXISTS content_hash TEXT;
+        ALTER TABLE documents ADD COLUMN IF NOT EXISTS revision INTEGER DEFAULT 1;
+        ALTER TABLE documents ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT NOW();
+        CREATE INDEX IF NOT EXISTS idx_documents_project_name ON documents(project_id, name);
+        CREATE INDEX IF NOT EXISTS idx_documents_project_hash ON documents(project_id, content_hash);
+
+        -- Financial time series parsed from spreadsheets
+        CREATE TABLE IF NOT EXISTS document_series (
+            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+            document_id UUID REFERENCES documents(id) ON DELETE CASCADE,
+            project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+            series TEXT NOT NULL,
+            sheet TEXT,
+            label TEXT,
+            periods INTEGER[] NOT NULL,
+            values DOUBLE PRECISION[] NOT NULL,
+            created_at TIMESTAMP DEFAULT NOW(),
+            UNIQUE (document_id, series)
+        );
+        CREATE INDEX IF NOT EXISTS idx_document_series_project_id ON document_series(project_id);
+
+        -- Confidence of the detected document type
+        ALTER TABLE documents ADD COLUMN IF NOT EXISTS type_confidence FLOAT;
+
+        -- Extracted field to source chunk references
+        ALTER TABLE documents ADD COLUMN IF NOT EXISTS provenance JSONB DEFAULT '{}'::jsonb;
+
+        -- Compliance results reused while standard and documents are unchanged
+        ALTER TABLE compliance_checks ADD COLUMN IF NOT EXISTS standard_version TEXT;
+        ALTER TABLE compliance_checks ADD COLUMN IF NOT EXISTS document_set_hash TEXT;
+        ALTER TABLE compliance_checks ADD COLUMN IF NOT EXISTS result JSONB;
+        CREATE INDEX IF NOT EXISTS idx_compliance_checks_cache
+            ON compliance_checks(project_id, document_set_hash, standard)
+            WHERE result IS NOT NULL;
+        CREATE INDEX IF NOT EXISTS idx_compliance_checks_history
+            ON compliance_checks(project_id, checked_at DESC)
+            WHERE result IS NULL;
+
+        -- Rendered reports, stored per compliance check and format
+        CREATE TABLE IF NOT EXISTS reports (
+            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+            project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+            report_type TEXT NOT NULL,
+            title TEXT NOT NULL,
+            content JSONB NOT NULL,
+            format TEXT DEFAULT 'json',
+            file_url TEXT,
+            generated_by TEXT,
+            template_used TEXT,
+            metadata JSONB DEFAULT '{}'::jsonb,
+            created_at TIMESTAMP DEFAULT NOW(),
+            updated_at TIMESTAMP DEFAULT NOW()
+        );
+        ALTER TABLE reports ADD COLUMN IF NOT EXISTS compliance_check_id UUID
+            REFERENCES compliance_checks(id) ON DELETE CASCADE;
+        ALTER TABLE reports ADD COLUMN IF NOT EXISTS body TEXT;
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_reports_compliance_check
+            ON reports(compliance_check_id, format, template_used);
+
+        -- Latest ESG score of each project, kept for ranking and filtering
+        CREATE TABLE IF NOT EXISTS esg_scores (
+            project_id UUID PRIMARY KEY REFERENCES projects(id) ON DELETE CASCADE,
+            overall_score DOUBLE PRECISION NOT NULL,
+            environmental_score DOUBLE PRECISION NOT NULL,
+            social_score DOUBLE PRECISION NOT NULL,
+            governance_score DOUBLE PRECISION NOT NULL,
+            coverage JSONB DEFAULT '{}'::jsonb,
+            framework_scores JSONB DEFAULT '{}'::jsonb,
+            indicators_met INTEGER DEFAULT 0,
+            model_version TEXT NOT NULL,
+            document_set_hash TEXT,
+            scored_at TIMESTAMP DEFAULT NOW()
+        );
+        CREATE INDEX IF NOT EXISTS idx_esg_scores_overall ON esg_scores(overall_score DESC);
+        CREATE INDEX IF NOT EXISTS idx_esg_scores_environmental ON esg_scores(environmental_score DESC);
+        CREATE INDEX IF NOT EXISTS idx_esg_scores_social ON esg_scores(social_score DESC);
+        CREATE INDEX IF NOT EXISTS idx_esg_scores_governance ON esg_scores(governance_score DESC);
+        """)
+
     # ========================================================================
     # PROJECT OPERATIONS
     # ========================================================================
@@ -301,6 +422,41 @@ class Database:
                 DELETE FROM projects WHERE id = $1
             """, project_id)
 
+    async def list_project_ids(self, user_id: str) -> List[str]:
+        """
+        IDs of all projects owned by a user
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Project IDs, newest first
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT id FROM projects WHERE user_id = $1 ORDER BY created_at DESC
+            """, user_id)
+            return [str(row["id"]) for row in rows]
+
+    async def get_project_owners(self, project_ids: List[str]) -> Dict[str, str]:
+        """
+        Owners of existing projects
+
+        Args:
+            project_ids: Project UUIDs (unknown IDs are ignored)
+
+        Returns:
+            Mapping of project ID to owning user ID
+        """
+        if not project_ids:
+            return {}
+
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT id, user_id FROM projects WHERE id = ANY($1::uuid[])
+            """, project_ids)
+            return {str(row["id"]): str(row["user_id"]) for row in rows}
+
     # ========================================================================
     # DOCUMENT OPERATIONS
     # ========================================================================
@@ -319,9 +475,10 @@ class Database:
             row = await conn.fetchrow("""
                 INSERT INTO documents (
                     project_id, name, type, url, processed,
-                    extracted_data, embeddings_id, created_at
+                    extracted_data, embeddings_id, content_hash, revision,
+                    type_confidence, provenance, created_at
                 )
-                VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
                 RETURNING id
             """,
                 document_data["project_id"],
@@ -331,6 +488,10 @@ class Database:
                 document_data.get("processed", False),
                 json.dumps(document_data.get("extracted_data")) if document_data.get("extracted_data") else None,
                 document_data.get("embeddings_id"),
+                document_data.get("content_hash"),
+                document_data.get("revision", 1),
+                document_data.get("type_confidence"),
+                json.dumps(document_data.get("provenance") or {}),
                 document_data.get("created_at", datetime.utcnow())
             )
 
@@ -352,15 +513,87 @@ class Database:
             """, document_id)
 
             if row:
-                return dict(row)
+                return self._decode_document(row)
             return None
 
-    async def list_project_documents(self, project_id: str) -> List[Dict[str, Any]]:
+    def _decode_document(self, row: Any) -> Dict[str, Any]:
+        """Document row with id as str and JSONB columns decoded"""
+        document = dict(row)
+        document["id"] = str(document["id"])
+        for key in ("extracted_data", "provenance"):
+            if isinstance(document.get(key), str):
+                document[key] = json.loads(document[key])
+        return document
+
+    async def get_document_by_name(
+        self,
+        project_id: str,
+        name: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get the latest document with a given name in a project
+
+        Used to match an upload to the previous revision of the same
+        logical document.
+
+        Args:
+            project_id: Project UUID
+            name: Document filename
+
+        Returns:
+            Document data with decoded extracted_data and provenance, or None
+        """
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow("""
+                SELECT * FROM documents
+                WHERE project_id = $1 AND name = $2
+                ORDER BY created_at DESC
+                LIMIT 1
+            """, project_id, name)
+
+            if not row:
+                return None
+            return self._decode_document(row)
+
+    async def get_document_by_hash(
+        self,
+        project_id: str,
+        content_hash: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get a document in a project by the SHA-256 of its file content
+
+        Args:
+            project_id: Project UUID
+            content_hash: Hex SHA-256 of the file
+
+        Returns:
+            Document id, name and revision, or None
+        """
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow("""
+                SELECT id, name, revision FROM documents
+                WHERE project_id = $1 AND content_hash = $2
+                ORDER BY created_at DESC
+                LIMIT 1
+            """, project_id, content_hash)
+
+            if not row:
+                return None
+            return {"id": str(row["id"]), "name": row["name"], "revision": row["revision"]}
+
+    async def list_project_documents(
+        self,
+        project_id: str,
+        include_series: bool = False
+    ) -> List[Dict[str, Any]]:
         """
         List all documents for a project
 
         Args:
             project_id: Project UUID
+            include_series: Attach parsed spreadsheet time series to each
+                document as ``financial_series`` ({series: {periods, values, ...}})
 
         Returns:
             List of documents
@@ -372,7 +605,65 @@ class Database:
                 ORDER BY created_at DESC
             """, project_id)
 
-            return [dict(row) for row in rows]
+            documents = [self._decode_document(row) for row in rows]
+
+            if include_series:
+                series_rows = await conn.fetch("""
+                    SELECT document_id, series, sheet, label, periods, values
+                    FROM document_series
+                    WHERE project_id = $1
+                """, project_id)
+
+                by_document: Dict[str, Dict[str, Any]] = {}
+                for row in series_rows:
+                    by_document.setdefault(str(row["document_id"]), {})[row["series"]] = {
+                        "sheet": row["sheet"],
+                        "label": row["label"],
+                        "periods": list(row["periods"]),
+                        "values": list(row["values"])
+                    }
+                for document in documents:
+                    document["financial_series"] = by_document.get(str(document["id"]), {})
+
+            return documents
+
+    async def replace_document_series(
+        self,
+        document_id: str,
+        project_id: str,
+        series: List[Dict[str, Any]]
+    ):
+        """
+        Replace the time series stored for a document
+
+        Args:
+            document_id: Document UUID
+            project_id: Project UUID
+            series: Dicts with series, sheet, label, periods and values
+        """
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("""
+                    DELETE FROM document_series WHERE document_id = $1
+                """, document_id)
+
+                await conn.executemany("""
+                    INSERT INTO document_series (
+                        document_id, project_id, series, sheet, label, periods, values
+                    )
+                    VALUES ($1, $2, $3, $4, $5, $6, $7)
+                """, [
+                    (
+                        document_id,
+                        project_id,
+                        item["series"],
+                        item.get("sheet"),
+                        item.get("label"),
+                        item["periods"],
+                        item["values"]
+                    )
+                    for item in series
+                ])
 
     async def update_document(self, document_id: str, updates: Dict[str, Any]):
         """
@@ -387,10 +678,13 @@ class Database:
         param_idx = 1
 
         for key, value in updates.items():
-            if key in ["name", "type", "url", "processed", "extracted_data", "embeddings_id"]:
+            if key in ["name", "type", "url", "processed", "extracted_data", "embeddings_id",
+                       "content_hash", "revision", "type_confidence", "provenance"]:
                 set_clauses.append(f"{key} = ${param_idx}")
                 if key == "extracted_data":
                     params.append(json.dumps(value) if value else None)
+                elif key == "provenance":
+                    params.append(json.dumps(value or {}))
                 else:
                     params.append(value)
                 param_idx += 1
@@ -399,6 +693,7 @@ class Database:
             return
 
         params.append(document_id)
+        set_clauses.append("updated_at = NOW()")
         query = f"""
             UPDATE documents
             SET {', '.join(set_clauses)}
@@ -408,6 +703,251 @@ class Database:
         async with self.pool.acquire() as conn:
             await conn.execute(query, *params)
 
+    # ========================================================================
+    # INGESTION JOB OPERATIONS
+    # ========================================================================
+
+    async def create_ingestion_job(self, job_data: Dict[str, Any]) -> str:
+        """
+        Enqueue a document processing job
+
+        Args:
+            job_data: Job data (project_id, filename, staged_path, batch_id,
+                created_by)
+
+        Returns:
+            Created job ID
+        """
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow("""
+                INSERT INTO ingestion_jobs (
+                    project_id, filename, staged_path, max_attempts, batch_id, created_by
+                )
+                VALUES ($1, $2, $3, $4, $5, $6)
+                RETURNING id
+            """,
+                job_data["project_id"],
+                job_data["filename"],
+                job_data["staged_path"],
+                job_data.get("max_attempts", 3),
+                job_data.get("batch_id"),
+                job_data.get("created_by")
+            )
+
+            return str(row["id"])
+
+    async def claim_ingestion_jobs(
+        self,
+        worker_id: str,
+        limit: int = 1,
+        lease_seconds: int = 900
+    ) -> List[Dict[str, Any]]:
+        """
+        Claim pending jobs for a worker
+
+        Uses FOR UPDATE SKIP LOCKED so concurrent workers never claim the same
+        job. Jobs whose lease has expired (worker crashed) are reclaimed.
+
+        Args:
+            worker_id: Claiming worker identifier
+            limit: Maximum jobs to claim
+            lease_seconds: Lease duration before a job may be reclaimed
+
+        Returns:
+            Claimed jobs
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                UPDATE ingestion_jobs j
+                SET status = 'processing',
+                    locked_by = $1,
+                    locked_at = NOW(),
+                    attempts = j.attempts + 1,
+                    updated_at = NOW()
+                WHERE j.id IN (
+                    SELECT q.id
+                    FROM ingestion_jobs q
+                    WHERE (q.status = 'pending' AND q.available_at <= NOW())
+                       OR (q.status = 'processing'
+                           AND q.locked_at < NOW() - make_interval(secs => $3))
+                    ORDER BY q.created_at ASC
+                    LIMIT $2
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING j.*
+            """, worker_id, limit, lease_seconds)
+
+            return [self._decode_job(row) for row in rows]
+
+    async def checkpoint_ingestion_job(
+        self,
+        job_id: str,
+        worker_id: str,
+        stage: str,
+        checkpoint: Dict[str, Any]
+    ) -> bool:
+        """
+        Record a completed pipeline stage and renew the job lease
+
+        Args:
+            job_id: Job UUID
+            worker_id: Worker holding the lease
+            stage: Completed stage name
+            checkpoint: Accumulated stage outputs
+
+        Returns:
+            False if the worker no longer holds the lease
+        """
+        async with self.pool.acquire() as conn:
+            result = await conn.execute("""
+                UPDATE ingestion_jobs
+                SET stage = $3, checkpoint = $4, locked_at = NOW(), updated_at = NOW()
+                WHERE id = $1 AND locked_by = $2
+            """, job_id, worker_id, stage, json.dumps(checkpoint, default=str))
+            return result != "UPDATE 0"
+
+    async def update_ingestion_progress(
+        self,
+        job_id: str,
+        worker_id: str,
+        progress: Dict[str, Any]
+    ) -> bool:
+        """
+        Store the latest progress snapshot of a job and renew its lease
+
+        Args:
+            job_id: Job UUID
+            worker_id: Worker holding the lease
+            progress: Stage, counts and per-stage timings
+
+        Returns:
+            False if the worker no longer holds the lease
+        """
+        async with self.pool.acquire() as conn:
+            result = await conn.execute("""
+                UPDATE ingestion_jobs
+                SET progress = $3, locked_at = NOW(), updated_at = NOW()
+                WHERE id = $1 AND locked_by = $2
+            """, job_id, worker_id, json.dumps(progress, default=str))
+            return result != "UPDATE 0"
+
+    async def complete_ingestion_job(
+        self,
+        job_id: str,
+        worker_id: str,
+        document_id: str
+    ) -> bool:
+        """
+        Mark a job as completed
+
+        Args:
+            job_id: Job UUID
+            worker_id: Worker holding the lease
+            document_id: Created document UUID
+
+        Returns:
+            False if the worker no longer holds the lease
+        """
+        async with self.pool.acquire() as conn:
+            result = await conn.execute("""
+                UPDATE ingestion_jobs
+                SET status = 'completed', document_id = $3, locked_by = NULL,
+                    locked_at = NULL, last_error = NULL, updated_at = NOW()
+                WHERE id = $1 AND locked_by = $2
+            """, job_id, worker_id, document_id)
+            return result != "UPDATE 0"
+
+    async def fail_ingestion_job(
+        self,
+        job_id: str,
+        worker_id: str,
+        error: str,
+        retry_delay_seconds: Optional[int] = None
+    ) -> bool:
+        """
+        Record a job failure, rescheduling it or marking it failed
+
+        Args:
+            job_id: Job UUID
+            worker_id: Worker holding the lease
+            error: Error message
+            retry_delay_seconds: Delay before retry; None marks the job failed
+
+        Returns:
+            False if the worker no longer holds the lease
+        """
+        async with self.pool.acquire() as conn:
+            if retry_delay_seconds is None:
+                result = await conn.execute("""
+                    UPDATE ingestion_jobs
+                    SET status = 'failed', last_error = $3, locked_by = NULL,
+                        locked_at = NULL, updated_at = NOW()
+                    WHERE id = $1 AND locked_by = $2
+                """, job_id, worker_id, error)
+            else:
+                result = await conn.execute("""
+                    UPDATE ingestion_jobs
+                    SET status = 'pending', last_error = $3, locked_by = NULL,
+                        locked_at = NULL,
+                        available_at = NOW() + make_interval(secs => $4),
+                        updated_at = NOW()
+                    WHERE id = $1 AND locked_by = $2
+                """, job_id, worker_id, error, retry_delay_seconds)
+            return result != "UPDATE 0"
+
+    async def get_ingestion_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get ingestion job by ID
+
+        Args:
+            job_id: Job UUID
+
+        Returns:
+            Job data or None
+        """
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow("""
+                SELECT * FROM ingestion_jobs WHERE id = $1
+            """, job_id)
+
+            if row:
+                return self._decode_job(row)
+            return None
+
+    async def get_batch_ingestion_jobs(self, batch_id: str) -> List[Dict[str, Any]]:
+        """
+        Get all jobs of an upload batch
+
+        Args:
+            batch_id: Batch UUID
+
+        Returns:
+            Jobs in upload order
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT * FROM ingestion_jobs
+                WHERE batch_id = $1
+                ORDER BY created_at ASC
+            """, batch_id)
+
+            return [self._decode_job(row) for row in rows]
+
+    def _decode_job(self, row) -> Dict[str, Any]:
+        """Convert a job row to a dict with decoded checkpoint"""
+        job = dict(row)
+        job["id"] = str(job["id"])
+        job["project_id"] = str(job["project_id"])
+        if job.get("document_id"):
+            job["document_id"] = str(job["document_id"])
+        if job.get("batch_id"):
+            job["batch_id"] = str(job["batch_id"])
+        for field in ("checkpoint", "progress"):
+            if isinstance(job.get(field), str):
+                job[field] = json.loads(job[field])
+            job[field] = job.get(field) or {}
+        return job
+
     # ========================================================================
     # FINANCIAL MODEL OPERATIONS
     # ========================================================================
@@ -476,9 +1016,10 @@ class Database:
         async with self.pool.acquire() as conn:
             row = await conn.fetchrow("""
                 INSERT INTO compliance_checks (
-                    project_id, standard, status, issues, recommendations, checked_at
+                    project_id, standard, status, issues, recommendations, checked_at,
+                    standard_version, document_set_hash, result
                 )
-                VALUES ($1, $2, $3, $4, $5, $6)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
                 RETURNING id
             """,
                 check_data["project_id"],
@@ -486,7 +1027,10 @@ class Database:
                 check_data["status"],
                 json.dumps(check_data.get("issues", [])),
                 json.dumps(check_data.get("recommendations", [])),
-                check_data.get("checked_at", datetime.utcnow())
+                check_data.get("checked_at", datetime.utcnow()),
+                check_data.get("standard_version"),
+                check_data.get("document_set_hash"),
+                json.dumps(check_data["result"]) if check_data.get("result") is not None else None
             )
 
             return str(row["id"])
@@ -495,20 +1039,320 @@ class Database:
         """
         List all compliance checks for a project
 
+        Per-standard result cache rows (``result`` set) are not part of
+        the check history and are left out.
+
         Args:
             project_id: Project UUID
 
         Returns:
-            List of compliance checks
+            List of compliance checks, newest first
         """
         async with self.pool.acquire() as conn:
             rows = await conn.fetch("""
-                SELECT * FROM compliance_checks
-                WHERE project_id = $1
+                SELECT id, project_id, standard, status, issues, recommendations, checked_at
+                FROM compliance_checks
+                WHERE project_id = $1 AND result IS NULL
                 ORDER BY checked_at DESC
             """, project_id)
 
-            return [dict(row) for row in rows]
+            checks = []
+            for row in rows:
+                check = dict(row)
+                for key in ("issues", "recommendations"):
+                    if isinstance(check[key], str):
+                        check[key] = json.loads(check[key])
+                checks.append(check)
+            return checks
+
+    async def update_compliance_check(self, check_id: str, check_data: Dict[str, Any]):
+        """
+        Replace the outcome of a compliance check
+
+        Args:
+            check_id: Compliance check UUID
+            check_data: New status, issues, recommendations and checked_at
+        """
+        async with self.pool.acquire() as conn:
+            await conn.execute("""
+                UPDATE compliance_checks
+                SET status = $2, issues = $3, recommendations = $4, checked_at = $5
+                WHERE id = $1 AND result IS NULL
+            """,
+                check_id,
+                check_data["status"],
+                json.dumps(check_data.get("issues", [])),
+                json.dumps(check_data.get("recommendations", [])),
+                check_data.get("checked_at", datetime.utcnow())
+            )
+
+    async def get_latest_compliance_results(
+        self,
+        project_id: str,
+        standards: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Latest stored per-standard results of a project
+
+        Args:
+            project_id: Project UUID
+            standards: Standard codes to look up
+
+        Returns:
+            Mapping of standard code to {standard_version, document_set_hash,
+            result, checked_at}
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT DISTINCT ON (standard)
+                    standard, standard_version, document_set_hash, result, checked_at
+                FROM compliance_checks
+                WHERE project_id = $1
+                  AND standard = ANY($2::text[])
+                  AND result IS NOT NULL
+                ORDER BY standard, checked_at DESC
+            """, project_id, standards)
+
+            latest = {}
+            for row in rows:
+                result = row["result"]
+                if isinstance(result, str):
+                    result = json.loads(result)
+                latest[row["standard"]] = {
+                    "standard_version": row["standard_version"],
+                    "document_set_hash": row["document_set_hash"],
+                    "result": result,
+                    "checked_at": row["checked_at"]
+                }
+            return latest
+
+    async def get_compliance_check(self, check_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a compliance check record
+
+        Args:
+            check_id: Compliance check UUID
+
+        Returns:
+            Check data with issues and recommendations decoded, or None
+            (also for per-standard result cache rows)
+        """
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow("""
+                SELECT id, project_id, standard, status, issues, recommendations, checked_at
+                FROM compliance_checks
+                WHERE id = $1 AND result IS NULL
+            """, check_id)
+
+            if not row:
+                return None
+            check = dict(row)
+            check["id"] = str(check["id"])
+            for key in ("issues", "recommendations"):
+                if isinstance(check.get(key), str):
+                    check[key] = json.loads(check[key])
+            return check
+
+    # ========================================================================
+    # REPORT OPERATIONS
+    # ========================================================================
+
+    async def get_compliance_report(
+        self,
+        compliance_check_id: str,
+        report_format: str,
+        template: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get the stored rendering of a compliance check report
+
+        Args:
+            compliance_check_id: Compliance check UUID
+            report_format: Report format (markdown, html)
+            template: Template version the report was rendered with
+
+        Returns:
+            Report id, body and created_at, or None if not rendered yet
+        """
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow("""
+                SELECT id, body, created_at FROM reports
+                WHERE compliance_check_id = $1
+                  AND format = $2
+                  AND template_used = $3
+                  AND body IS NOT NULL
+            """, compliance_check_id, report_format, template)
+
+            return dict(row) if row else None
+
+    async def save_compliance_report(self, report_data: Dict[str, Any]) -> str:
+        """
+        Store a rendered compliance report, replacing an earlier rendering
+
+        Args:
+            report_data: Report data with project_id, compliance_check_id,
+                title, format, template_used, body and content
+
+        Returns:
+            Report ID
+        """
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow("""
+                INSERT INTO reports (
+                    project_id, compliance_check_id, report_type, title, content,
+                    format, template_used, body, generated_by
+                )
+                VALUES ($1, $2, 'compliance_report', $3, $4, $5, $6, $7, $8)
+                ON CONFLICT (compliance_check_id, format, template_used) DO UPDATE SET
+                    body = EXCLUDED.body,
+                    content = EXCLUDED.content,
+                    updated_at = NOW()
+                RETURNING id
+            """,
+                report_data["project_id"],
+                report_data["compliance_check_id"],
+                report_data["title"],
+                json.dumps(report_data.get("content", {})),
+                report_data["format"],
+                report_data["template_used"],
+                report_data["body"],
+                report_data.get("generated_by")
+            )
+
+            return str(row["id"])
+
+    # ========================================================================
+    # ESG SCORE OPERATIONS
+    # ========================================================================
+
+    async def save_esg_scores(self, scores: List[Dict[str, Any]]):
+        """
+        Store ESG scores, replacing each project's previous score
+
+        Args:
+            scores: Scores with project_id, overall_score, pillar scores,
+                coverage, framework_scores, indicators_met, model_version
+                and document_set_hash
+        """
+        async with self.pool.acquire() as conn:
+            await conn.executemany("""
+                INSERT INTO esg_scores (
+                    project_id, overall_score, environmental_score, social_score,
+                    governance_score, coverage, framework_scores, indicators_met,
+                    model_version, document_set_hash, scored_at
+                )
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, NOW())
+                ON CONFLICT (project_id) DO UPDATE SET
+                    overall_score = EXCLUDED.overall_score,
+                    environmental_score = EXCLUDED.environmental_score,
+                    social_score = EXCLUDED.social_score,
+                    governance_score = EXCLUDED.governance_score,
+                    coverage = EXCLUDED.coverage,
+                    framework_scores = EXCLUDED.framework_scores,
+                    indicators_met = EXCLUDED.indicators_met,
+                    model_version = EXCLUDED.model_version,
+                    document_set_hash = EXCLUDED.document_set_hash,
+                    scored_at = NOW()
+            """, [
+                (
+                    score["project_id"],
+                    score["overall_score"],
+                    score["environmental_score"],
+                    score["social_score"],
+                    score["governance_score"],
+                    json.dumps(score.get("coverage", {})),
+                    json.dumps(score.get("framework_scores", {})),
+                    score.get("indicators_met", 0),
+                    score["model_version"],
+                    score.get("document_set_hash")
+                )
+                for score in scores
+            ])
+
+    async def list_esg_scores(
+        self,
+        user_id: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        sort_by: str = "overall_score",
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        List stored ESG scores, ranked
+
+        Args:
+            user_id: Only projects of this user (all projects when None)
+            filters: Minimum scores (min_overall, min_environmental,
+                min_social, min_governance), country, sector
+            sort_by: Score column to rank by
+            limit: Maximum results
+            offset: Pagination offset
+
+        Returns:
+            Scores with project name, country and sector, best first
+        """
+        if sort_by not in ESG_SCORE_COLUMNS:
+            raise ValueError(f"Cannot sort by {sort_by}")
+
+        query = """
+            SELECT s.*, p.name AS project_name, p.country, p.sector
+            FROM esg_scores s
+            JOIN projects p ON p.id = s.project_id
+            WHERE TRUE
+        """
+        params: List[Any] = []
+
+        if user_id is not None:
+            params.append(user_id)
+            query += f" AND p.user_id = ${len(params)}"
+
+        for key, value in (filters or {}).items():
+            if value is None:
+                continue
+            if key.startswith("min_") and f"{key[4:]}_score" in ESG_SCORE_COLUMNS:
+                params.append(value)
+                query += f" AND s.{key[4:]}_score >= ${len(params)}"
+            elif key in ("country", "sector"):
+                params.append(value)
+                query += f" AND p.{key} = ${len(params)}"
+
+        params.extend([limit, offset])
+        query += f" ORDER BY s.{sort_by} DESC, s.project_id LIMIT ${len(params) - 1} OFFSET ${len(params)}"
+
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, *params)
+
+            scores = []
+            for row in rows:
+                score = dict(row)
+                for field in ("coverage", "framework_scores"):
+                    if isinstance(score[field], str):
+                        score[field] = json.loads(score[field])
+                scores.append(score)
+            return scores
+
+    async def get_esg_score(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the stored ESG score of a project
+
+        Args:
+            project_id: Project UUID
+
+        Returns:
+            Score or None if the project has not been scored
+        """
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow("""
+                SELECT * FROM esg_scores WHERE project_id = $1
+            """, project_id)
+
+            if not row:
+                return None
+            score = dict(row)
+            for field in ("coverage", "framework_scores"):
+                if isinstance(score[field], str):
+                    score[field] = json.loads(score[field])
+            return score
 
     # ========================================================================
     # SUPABASE STORAGE OPERATIONS
@@ -0,0 +1,223 @@
+"""
+InfraFlow AI - Document Classifier
+Local content-based document type classification from the first chunks
+"""
+
+from typing import Dict, Any, List, Optional
+from collections import Counter
+import os
+import math
+import logging
+import asyncio
+
+import numpy as np
+
+from retrieval import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Prototype vocabulary per DocumentType. Each profile is both the TF-IDF
+# prototype and the text embedded for the type's embedding centroid.
+TYPE_PROFILES = {
+    "feasibility_study": (
+        "feasibility study pre-feasibility project rationale demand forecast market "
+        "assessment site selection options analysis alternatives considered "
+        "preferred option technical feasibility economic feasibility financial "
+        "viability implementation plan project schedule conclusions recommendations "
+        "risk assessment stakeholder analysis"
+    ),
+    "financial_model": (
+        "financial model cash flow projections revenue opex capex ebitda "
+        "net present value npv internal rate of return irr wacc discount rate "
+        "debt service coverage ratio dscr llcr tariff sensitivity scenario "
+        "assumptions depreciation tax income statement balance sheet "
+        "senior debt equity drawdown repayment usd million per annum"
+    ),
+    "environmental_impact": (
+        "environmental impact assessment esia eia baseline conditions "
+        "biodiversity habitat species flora fauna air quality noise water "
+        "resources emissions greenhouse gas mitigation measures environmental "
+        "management plan monitoring resettlement affected communities "
+        "cultural heritage cumulative impacts public consultation"
+    ),
+    "technical_specs": (
+        "technical specification design basis equipment rating capacity mw "
+        "kv voltage transformer turbine inverter module efficiency performance "
+        "tolerance standards iec iso drawings layout single line diagram "
+        "commissioning testing materials dimensions operating parameters "
+        "maintenance requirements"
+    ),
+    "legal_agreement": (
+        "agreement contract parties hereby whereas shall clause article "
+        "term termination governing law arbitration dispute resolution "
+        "indemnity liability force majeure obligations representations "
+        "warranties power purchase agreement concession lender security "
+        "conditions precedent signed effective date schedule"
+    ),
+    "compliance_report": (
+        "compliance report audit monitoring report regulatory requirements "
+        "performance standards conformity non-compliance findings corrective "
+        "actions action plan permits licences reporting period inspection "
+        "equator principles ifc performance standards ebrd requirements "
+        "status of compliance"
+    )
+}
+
+DEFAULT_TYPE = "other"
+
+
+def _terms(text: str) -> List[str]:
+    """Unigrams plus bigrams with light plural folding"""
+    tokens = [
+        token[:-1] if len(token) > 4 and token.endswith("s") and not token.endswith("ss") else token
+        for token in tokenize(text)
+    ]
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def _softmax(scores: np.ndarray, temperature: float) -> np.ndarray:
+    shifted = (scores - scores.max()) / temperature
+    weights = np.exp(shifted)
+    return weights / weights.sum()
+
+
+class DocumentClassifier:
+    """
+    Classifies documents by type from their first chunks
+
+    Two local signals are combined:
+
+    - TF-IDF cosine between the sampled chunk text and each type profile
+    - cosine between the mean of the sampled chunk embeddings and each
+      type's embedding centroid, when chunk vectors are available
+
+    Both are turned into distributions with a softmax and averaged. The
+    type centroids are embedded once per process; classifying a document
+    reuses the vectors already computed for ingestion, so it costs no
+    extra API call and a few microseconds of NumPy.
+    """
+
+    def __init__(
+        self,
+        embeddings: Optional[Any] = None,
+        sample_chunks: Optional[int] = None,
+        min_confidence: Optional[float] = None
+    ):
+        """
+        Initialize classifier
+
+        Args:
+            embeddings: Embedding model used for the type centroids
+            sample_chunks: Chunks sampled per document (DOC_CLASSIFIER_CHUNKS)
+            min_confidence: Below this, callers should fall back to other
+                signals (DOC_CLASSIFIER_MIN_CONFIDENCE)
+        """
+        self.embeddings = embeddings
+        self.sample_chunks = sample_chunks or int(os.getenv("DOC_CLASSIFIER_CHUNKS", "8"))
+        self.min_confidence = (
+            min_confidence if min_confidence is not None
+            else float(os.getenv("DOC_CLASSIFIER_MIN_CONFIDENCE", "0.4"))
+        )
+        self.types = list(TYPE_PROFILES)
+        self._centroids: Optional[np.ndarray] = None
+        self._centroid_lock = asyncio.Lock()
+        self._build_tfidf()
+
+    def _build_tfidf(self):
+        """Prototype matrix (types x vocabulary), rows L2-normalized"""
+        profile_terms = [Counter(_terms(TYPE_PROFILES[t])) for t in self.types]
+        vocabulary = sorted(set().union(*profile_terms))
+        self._vocab = {term: i for i, term in enumerate(vocabulary)}
+
+        document_frequency = np.zeros(len(vocabulary))
+        for counts in profile_terms:
+            for term in counts:
+                document_frequency[self._vocab[term]] += 1
+        self._idf = np.log((1 + len(self.types)) / (1 + document_frequency)) + 1
+
+        prototypes = np.zeros((len(self.types), len(vocabulary)))
+        for row, counts in enumerate(profile_terms):
+            for term, count in counts.items():
+                prototypes[row, self._vocab[term]] = 1 + math.log(count)
+        prototypes *= self._idf
+        self._prototypes = prototypes / np.linalg.norm(prototypes, axis=1, keepdims=True)
+
+    def _tfidf_scores(self, texts: List[str]) -> Optional[np.ndarray]:
+        """Cosine of the sampled text against each type prototype"""
+        vector = np.zeros(len(self._vocab))
+        for term, count in Counter(_terms(" ".join(texts))).items():
+            index = self._vocab.get(term)
+            if index is not None:
+                vector[index] = 1 + math.log(count)
+        vector *= self._idf
+
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        return self._prototypes @ (vector / norm)
+
+    async def _type_centroids(self) -> Optional[np.ndarray]:
+        """Embed the type profiles once"""
+        if self._centroids is not None or self.embeddings is None:
+            return self._centroids
+
+        async with self._centroid_lock:
+            if self._centroids is None:
+                try:
+                    loop = asyncio.get_event_loop()
+                    vectors = await loop.run_in_executor(
+                        None,
+                        self.embeddings.embed_documents,
+                        [TYPE_PROFILES[t] for t in self.types]
+                    )
+                    centroids = np.asarray(vectors, dtype=np.float32)
+                    self._centroids = centroids / np.linalg.norm(centroids, axis=1, keepdims=True)
+                except Exception as e:
+                    logger.error(f"Error embedding document type centroids: {str(e)}")
+                    self.embeddings = None
+        return self._centroids
+
+    async def classify(
+        self,
+        texts: List[str],
+        vectors: Optional[List[List[float]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Classify a document from its first chunks
+
+        Args:
+            texts: Text of the first chunks
+            vectors: Embeddings of the first chunks, if already computed
+
+        Returns:
+            Dict with type, confidence (0-1), method and per-type scores
+        """
+        texts = texts[:self.sample_chunks]
+        distributions = []
+        methods = []
+
+        tfidf = self._tfidf_scores(texts) if texts else None
+        if tfidf is not None:
+            distributions.append(_softmax(tfidf, temperature=0.1))
+            methods.append("tfidf")
+
+        if vectors:
+            centroids = await self._type_centroids()
+            if centroids is not None:
+                mean = np.asarray(vectors[:self.sample_chunks], dtype=np.float32).mean(axis=0)
+                norm = np.linalg.norm(mean)
+                if norm > 0:
+                    distributions.append(_softmax(centroids @ (mean / norm), temperature=0.02))
+                    methods.append("embedding")
+
+        if not distributions:
+            return {"type": DEFAULT_TYPE, "confidence": 0.0, "method": None, "scores": {}}
+
+        probabilities = np.mean(distributions, axis=0)
+        best = int(np.argmax(probabilities))
+        return {
+            "type": self.types[best],
+            "confidence": round(float(probabilities[best]), 4),
+            "method": "+".join(methods),
+            "scores": {t: round(float(p), 4) for t, p in zip(self.types, probabilities)}
+        }
@@ -3,8 +3,9 @@ InfraFlow AI - Document Processor
 Document processing with LangChain and AI-powered extraction
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple, Callable, Awaitable
 import os
+import json
 import logging
 import tempfile
 import asyncio
@@ -20,11 +21,20 @@ from langchain_community.document_loaders import (
 )
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import Pinecone as PineconeLangChain
-from pinecone import Pinecone, ServerlessSpec
-import anthropic
 
 from database import Database
+from vector_store import create_vector_store
+from retrieval import create_hybrid_retriever
+from pdf_parser import iter_pdf_pages
+from spreadsheet_parser import is_spreadsheet, parse_workbook
+from document_classifier import DocumentClassifier
+from llm_gateway import get_llm_gateway
+from extraction_prompts import build_extraction_request, estimate_tokens
+from structured_output import parse_json_response
+from provenance import attribute_fields, merge_provenance, build_citation
+from search_cache import SearchCache, normalize_query
+from project_facts import get_fact_sheet_cache
+from ingestion_progress import ProgressReporter
 
 logger = logging.getLogger(__name__)
 
@@ -44,7 +54,8 @@ class DocumentProcessor:
             chunk_size=2000,
             chunk_overlap=200,
             length_function=len,
-            separators=["\n\n", "\n", " ", ""]
+            separators=["\n\n", "\n", " ", ""],
+            add_start_index=True
         )
 
         # Initialize embeddings
@@ -58,51 +69,32 @@ class DocumentProcessor:
             logger.warning("OpenAI API key not configured")
             self.embeddings = None
 
-        # Initialize Pinecone for vector storage
-        self.pinecone_api_key = os.getenv("PINECONE_API_KEY")
-        self.pinecone_env = os.getenv("PINECONE_ENVIRONMENT", "us-east-1")
-        self.pinecone_index = os.getenv("PINECONE_INDEX", "infraflow-docs")
+        # Content-based document type classifier (reuses chunk embeddings)
+        self.classifier = DocumentClassifier(self.embeddings)
 
-        if self.pinecone_api_key:
-            self.pc = Pinecone(api_key=self.pinecone_api_key)
-            self._ensure_pinecone_index()
-        else:
-            logger.warning("Pinecone API key not configured")
-            self.pc = None
+        # Vector storage (Pinecone or local memory-mapped index)
+        self.vector_store = create_vector_store()
 
-        # Initialize Claude for extraction
-        self.claude_api_key = os.getenv("ANTHROPIC_API_KEY")
-        if self.claude_api_key:
-            self.claude = anthropic.Anthropic(api_key=self.claude_api_key)
-        else:
-            logger.warning("Anthropic API key not configured")
-            self.claude = None
+        # Local chunk store with BM25 index for hybrid retrieval
+        self.retriever = create_hybrid_retriever()
+
+        # Query embedding LRU and per-namespace search result cache
+        self.search_cache = SearchCache()
+
+        # Consolidated project data shared with the analysis engines
+        self.facts = get_fact_sheet_cache()
+
+        # Shared Claude gateway for extraction
+        self.llm = get_llm_gateway()
 
         # Storage bucket for documents
         self.storage_bucket = os.getenv("STORAGE_BUCKET", "documents")
 
-    def _ensure_pinecone_index(self):
-        """Ensure Pinecone index exists"""
-        try:
-            # Check if index exists
-            existing_indexes = self.pc.list_indexes()
-            index_names = [index.name for index in existing_indexes]
-
-            if self.pinecone_index not in index_names:
-                logger.info(f"Creating Pinecone index: {self.pinecone_index}")
-                self.pc.create_index(
-                    name=self.pinecone_index,
-                    dimension=1536,  # OpenAI embedding dimension
-                    metric="cosine",
-                    spec=ServerlessSpec(
-                        cloud="aws",
-                        region=self.pinecone_env
-                    )
-                )
-                logger.info("Pinecone index created successfully")
-
-        except Exception as e:
-            logger.error(f"Error ensuring Pinecone index: {str(e)}")
+        # Streaming ingest pipeline: chunks per embedding/upsert batch, and
+        # how many batches may wait between the parser and the embedder
+        self.embedding_batch_size = int(os.getenv("EMBEDDING_BATCH_SIZE", "100"))
+        self.ingest_queue_size = int(os.getenv("INGEST_QUEUE_SIZE", "2"))
+        self.extraction_chunks = 5
 
     async def process_document(
         self,
@@ -126,69 +118,246 @@ class DocumentProcessor:
             temp_path = await self._save_temp_file(file)
 
             try:
-                # Stage 2: Load and parse document
-                raw_docs = await self._load_document(temp_path, file.filename)
+                return await self.run_pipeline(temp_path, file.filename, project_id)
+
+            finally:
+                # Cleanup temp file
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
 
-                # Stage 3: Smart chunking
-                chunks = self.text_splitter.split_documents(raw_docs)
-                logger.info(f"Document split into {len(chunks)} chunks")
+        except Exception as e:
+            logger.error(f"Error processing document {file.filename}: {str(e)}")
+            raise
 
-                # Stage 4: Extract key information using Claude
-                extracted_data = await self._extract_key_info(chunks, file.filename)
+    async def run_pipeline(
+        self,
+        file_path: str,
+        filename: str,
+        project_id: str,
+        checkpoint: Optional[Dict[str, Any]] = None,
+        on_checkpoint: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None,
+        progress: Optional[ProgressReporter] = None
+    ) -> Dict[str, Any]:
+        """
+        Run pipeline stages 2-7 on a file already on local disk
 
-                # Stage 5: Generate embeddings and store in vector DB
-                embeddings_id = None
-                if self.embeddings and self.pc:
-                    embeddings_id = await self._store_embeddings(
-                        chunks,
-                        project_id,
-                        file.filename
-                    )
+        Stages whose outputs are present in ``checkpoint`` are skipped, so a
+        retried job resumes at the stage that failed instead of re-paying
+        for extraction and embeddings.
 
-                # Stage 6: Upload to permanent storage
-                file_url = await self._upload_to_storage(temp_path, project_id, file.filename)
+        If the project already has a document with the same name, the file
+        is ingested as a new revision of it: an identical file is skipped
+        outright, otherwise only changed chunks are embedded and extracted
+        and the existing document row is updated in place.
 
-                # Stage 7: Save document metadata to database
+        Args:
+            file_path: Local path to the document
+            filename: Original filename
+            project_id: Project ID to associate document with
+            checkpoint: Outputs of previously completed stages
+            on_checkpoint: Awaited with (stage, checkpoint) after each stage
+            progress: Receives stage transitions, counts and timings
+
+        Returns:
+            Document metadata with extraction results
+        """
+        checkpoint = dict(checkpoint or {})
+        progress = progress or ProgressReporter()
+
+        async def save(stage: str):
+            if on_checkpoint:
+                await on_checkpoint(stage, checkpoint)
+
+        # Stages 2-5: Stream pages -> chunks -> embedding batches, and
+        # extract key information from the first chunks in parallel
+        if "extracted_data" not in checkpoint:
+            progress.stage("ingesting")
+            content_hash = await self._file_hash(file_path)
+            previous = await self.db.get_document_by_name(project_id, filename)
+
+            # A previous revision whose embedding failed is embedded again,
+            # even when the file itself is unchanged
+            reembed = bool(
+                previous and self.embeddings and self.vector_store
+                and not previous.get("embeddings_id")
+            )
+
+            if previous and previous.get("content_hash") == content_hash and not reembed:
+                logger.info(f"{filename} is unchanged since revision {previous.get('revision')}")
+                checkpoint.update({
+                    "extracted_data": previous.get("extracted_data") or {},
+                    "provenance": previous.get("provenance") or {},
+                    "embeddings_id": previous.get("embeddings_id"),
+                    "classification": {
+                        "type": previous.get("type"),
+                        "confidence": previous.get("type_confidence")
+                    },
+                    "file_url": previous["url"],
+                    "document_id": previous["id"]
+                })
+            else:
+                # Spreadsheets are read once into frames, yielding both the
+                # sheet text to index and typed financial time series
+                workbook = None
+                if is_spreadsheet(filename):
+                    with progress.timed("parse_spreadsheet"):
+                        workbook = await asyncio.get_event_loop().run_in_executor(
+                            None, parse_workbook, file_path, filename
+                        )
+
+                ingest_result = await self._ingest_chunks(
+                    file_path,
+                    project_id,
+                    filename,
+                    progress=progress,
+                    previous_extracted=(previous.get("extracted_data") or {}) if previous else None,
+                    documents=workbook["documents"] if workbook else None,
+                    previous_provenance=(previous.get("provenance") or {}) if previous else None,
+                    reembed=reembed
+                )
+                checkpoint.update({
+                    "extracted_data": ingest_result["extracted_data"],
+                    "provenance": ingest_result["provenance"],
+                    "embeddings_id": ingest_result["embeddings_id"],
+                    "chunk_count": ingest_result["chunk_count"],
+                    "classification": ingest_result["classification"],
+                    # Without a hash the next upload of the file is not
+                    # taken for unchanged, so its vectors are rebuilt
+                    "content_hash": None if ingest_result["embedding_failed"] else content_hash
+                })
+                if workbook:
+                    checkpoint["financial_series"] = workbook["series"]
+                if previous:
+                    checkpoint["previous_document_id"] = previous["id"]
+                    checkpoint["revision"] = (previous.get("revision") or 1) + 1
+            await save("ingested")
+
+        extracted_data = checkpoint["extracted_data"]
+
+        # Stage 6: Upload to permanent storage
+        if "file_url" not in checkpoint:
+            progress.stage("uploading")
+            checkpoint["file_url"] = await self._upload_to_storage(
+                file_path,
+                project_id,
+                filename
+            )
+            await save("uploaded")
+
+        # Stage 7: Save document metadata to database
+        classification = checkpoint.get("classification") or {}
+        document_type = self._detect_document_type(filename, classification)
+        if "document_id" not in checkpoint:
+            progress.stage("saving")
+            if checkpoint.get("previous_document_id"):
+                await self.db.update_document(checkpoint["previous_document_id"], {
+                    "type": document_type,
+                    "url": checkpoint["file_url"],
+                    "processed": True,
+                    "extracted_data": extracted_data,
+                    "provenance": checkpoint.get("provenance") or {},
+                    "embeddings_id": checkpoint.get("embeddings_id"),
+                    "content_hash": checkpoint.get("content_hash"),
+                    "revision": checkpoint["revision"],
+                    "type_confidence": classification.get("confidence")
+                })
+                checkpoint["document_id"] = checkpoint["previous_document_id"]
+            else:
                 document_data = {
                     "project_id": project_id,
-                    "name": file.filename,
-                    "type": self._detect_document_type(file.filename, extracted_data),
-                    "url": file_url,
+                    "name": filename,
+                    "type": document_type,
+                    "url": checkpoint["file_url"],
                     "processed": True,
                     "extracted_data": extracted_data,
-                    "embeddings_id": embeddings_id,
+                    "provenance": checkpoint.get("provenance") or {},
+                    "embeddings_id": checkpoint.get("embeddings_id"),
+                    "content_hash": checkpoint.get("content_hash"),
+                    "type_confidence": classification.get("confidence"),
                     "created_at": datetime.utcnow()
                 }
 
-                document_id = await self.db.create_document(document_data)
-
-                logger.info(f"Document processed successfully: {document_id}")
-
-                return {
-                    "id": document_id,
-                    "name": file.filename,
-                    "type": document_data["type"],
-                    "url": file_url,
-                    "extracted_data": extracted_data
-                }
-
-            finally:
-                # Cleanup temp file
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
+                checkpoint["document_id"] = await self.db.create_document(document_data)
 
-        except Exception as e:
-            logger.error(f"Error processing document {file.filename}: {str(e)}")
-            raise
+            if "financial_series" in checkpoint:
+                await self.db.replace_document_series(
+                    checkpoint["document_id"],
+                    project_id,
+                    checkpoint["financial_series"]
+                )
+            self.facts.invalidate(project_id)
+            await save("saved")
+
+        progress.finish()
+        logger.info(f"Document processed successfully: {checkpoint['document_id']}")
+
+        return {
+            "id": checkpoint["document_id"],
+            "name": filename,
+            "type": document_type,
+            "url": checkpoint["file_url"],
+            "extracted_data": extracted_data
+        }
+
+    async def _file_hash(self, file_path: str) -> str:
+        """SHA-256 of a file, read in blocks off the event loop"""
+        def digest() -> str:
+            sha = hashlib.sha256()
+            with open(file_path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    sha.update(block)
+            return sha.hexdigest()
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, digest)
 
     async def _save_temp_file(self, file: UploadFile) -> str:
         """Save uploaded file to temporary location"""
         suffix = os.path.splitext(file.filename)[1]
         with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            content = await file.read()
-            tmp.write(content)
+            # Copy in blocks so large uploads are never held in memory whole
+            while True:
+                block = await file.read(1024 * 1024)
+                if not block:
+                    break
+                tmp.write(block)
             return tmp.name
 
+    async def _iter_document(
+        self,
+        file_path: str,
+        filename: str
+    ) -> AsyncIterator[List[Any]]:
+        """
+        Yield parsed document pages in batches
+
+        PDFs are parsed page-range by page-range across a process pool and
+        yielded as each shard completes; other formats are yielded whole.
+
+        Args:
+            file_path: Path to file
+            filename: Original filename
+
+        Yields:
+            Lists of loaded documents
+        """
+        ext = os.path.splitext(filename)[1].lower()
+
+        if ext == '.pdf':
+            try:
+                async for pages in iter_pdf_pages(file_path):
+                    yield pages
+                return
+            except Exception as e:
+                logger.error(f"Error loading document {filename}: {str(e)}")
+                raise
+
+        yield await self._load_document(file_path, filename)
+
+    async def _iter_loaded(self, documents: List[Any]) -> AsyncIterator[List[Any]]:
+        """Yield already loaded documents as a single page batch"""
+        yield documents
+
     async def _load_document(self, file_path: str, filename: str) -> List[Any]:
         """
         Load document using appropriate loader based on file type
@@ -226,155 +395,499 @@ class DocumentProcessor:
     async def _extract_key_info(
         self,
         chunks: List[Any],
-        filename: str
+        filename: str,
+        tenant_id: Optional[str] = None,
+        document_type: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Extract key information from document using Claude
 
-        Implements extraction logic from SPARC lines 349-365
+        Implements extraction logic from SPARC lines 349-365. The fields,
+        schema and token budgets come from the per-type prompt registry in
+        extraction_prompts; the response is parsed incrementally and
+        coerced to the schema by the LLM gateway.
 
         Args:
             chunks: Document chunks
             filename: Document filename
+            tenant_id: Tenant key for LLM concurrency limiting
+            document_type: Detected document type, selects the prompt
 
         Returns:
             Extracted structured data
         """
-        if not self.claude:
+        if not self.llm.enabled:
             logger.warning("Claude not configured, skipping extraction")
             return {}
 
         try:
-            # Combine first few chunks for analysis
-            content = "\n\n".join([chunk.page_content for chunk in chunks[:5]])
-
-            # Truncate if too long
-            if len(content) > 100000:
-                content = content[:100000]
-
-            extraction_prompt = f"""
-Extract key information from this infrastructure project document ({filename}).
-
-Return a JSON object with the following fields (use null for missing information):
-- project_name: Name of the project
-- location: Project location (country, region, city)
-- total_investment: Total investment value (extract number only)
-- currency: Currency of investment
-- stakeholders: List of key stakeholders mentioned
-- technology: Technology type or specifications
-- capacity: Project capacity (e.g., MW, MW/h)
-- environmental_impact: Key environmental metrics or impacts
-- financial_structure: Description of financial structure
-- risk_factors: List of identified risk factors
-- timeline: Key milestones and timeline
-- sponsor: Project sponsor or developer
-- dfi_involvement: Any DFI or development bank involvement mentioned
-
-Document content:
-{content}
-"""
-
-            # Call Claude API
-            message = self.claude.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=2048,
-                messages=[{
-                    "role": "user",
-                    "content": extraction_prompt
-                }]
+            request = build_extraction_request(
+                document_type,
+                filename,
+                [chunk.page_content for chunk in chunks]
             )
 
-            # Parse response
-            response_text = message.content[0].text
-
-            # Extract JSON from response
-            import json
-            import re
-
-            # Try to find JSON in response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                extracted = json.loads(json_match.group())
-            else:
-                extracted = {}
+            response = await self.llm.complete_json(
+                request["prompt"],
+                request["schema"],
+                max_tokens=request["max_tokens"],
+                tenant_id=tenant_id,
+                purpose="extract_key_info"
+            )
 
-            logger.info(f"Extracted data from {filename}: {list(extracted.keys())}")
+            extracted = response["data"] or {}
+            logger.info(
+                f"Extracted {document_type or 'other'} fields from {filename}: "
+                f"{[k for k, v in extracted.items() if v not in (None, [])]}"
+                + (" (truncated)" if response["truncated"] else "")
+            )
             return extracted
 
         except Exception as e:
             logger.error(f"Error extracting information: {str(e)}")
             return {}
 
-    async def _store_embeddings(
+    async def _ingest_chunks(
         self,
-        chunks: List[Any],
+        file_path: str,
         project_id: str,
-        filename: str
-    ) -> str:
+        filename: str,
+        progress: Optional[ProgressReporter] = None,
+        previous_extracted: Optional[Dict[str, Any]] = None,
+        documents: Optional[List[Any]] = None,
+        previous_provenance: Optional[Dict[str, List[str]]] = None,
+        reembed: bool = False
+    ) -> Dict[str, Any]:
         """
-        Generate embeddings and store in Pinecone
+        Run the streaming ingest pipeline for one document
+
+        A producer parses and splits pages into fixed-size chunk batches; a
+        consumer indexes, embeds and upserts each batch. The bounded queue
+        between them keeps memory proportional to the batch size rather
+        than the document size. Key-information extraction starts as soon
+        as the first chunks are available.
+
+        When ``previous_extracted`` is given the file is a new revision of
+        an already ingested document. Chunks are diffed by content against
+        the previous revision's chunks: unchanged chunks keep their vectors
+        and are only moved to their new position, removed chunks are
+        deleted, and only changed chunks are embedded and extracted. The
+        extraction result is merged into ``previous_extracted``. With
+        ``reembed`` the previous revision's vectors are known to be
+        incomplete, so unchanged chunks are embedded again as well.
 
         Args:
-            chunks: Document chunks
+            file_path: Path to file
             project_id: Project ID
             filename: Document filename
+            progress: Receives page, chunk and embedding counts
+            previous_extracted: Extracted data of the previous revision
+            documents: Already loaded documents to chunk instead of the file
+            previous_provenance: Field-to-chunk references of the previous
+                revision
+            reembed: Embed unchanged chunks too (previous embedding failed)
 
         Returns:
-            Embeddings namespace ID
+            Dict with chunk_count, extracted_data, provenance, embeddings_id,
+            embedding_failed and classification
         """
+        progress = progress or ProgressReporter()
+        namespace = f"project_{project_id}"
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.ingest_queue_size)
+        head_chunks: List[Any] = []
+        head_ids: List[str] = []
+        extraction_task: Optional[asyncio.Task] = None
+        store_embeddings = bool(self.embeddings and self.vector_store)
+        stats = {"chunk_count": 0, "embedded": 0, "reused": 0, "embedding_failed": False}
+
+        incremental = previous_extracted is not None
+        previous_chunks: Dict[str, Dict[str, Any]] = {}
+        if incremental:
+            previous_chunks = self._content_keys(
+                await self.retriever.list_document_chunks(namespace, filename),
+                lambda record: record["text"]
+            )
+        occurrences: Dict[str, int] = {}
+        moved: List[Tuple[str, int, Dict[str, Any]]] = []
+
+        # First chunks (and their vectors, by chunk id) sampled for type
+        # classification
+        sample_texts: List[str] = []
+        sample_ids: List[str] = []
+        sample_vectors: Dict[str, List[float]] = {}
+
+        async def extract():
+            # Early TF-IDF pass over the first chunks picks the prompt; the
+            # final classification below also uses the chunk embeddings
+            early = await self.classifier.classify(sample_texts)
+            document_type = self._detect_document_type(filename, early)
+            with progress.timed("extract"):
+                return await self._extract_key_info(
+                    head_chunks,
+                    filename,
+                    tenant_id=project_id,
+                    document_type=document_type
+                )
+
+        def start_extraction():
+            nonlocal extraction_task
+            extraction_task = asyncio.create_task(extract())
+
+        async def produce():
+            batch = []
+            async for chunk_index, chunk in self._iter_chunks(
+                file_path, filename, progress, documents
+            ):
+                stats["chunk_count"] += 1
+                progress.increment("chunks")
+                key = self._content_key(chunk.page_content, occurrences)
+                metadata = self._chunk_metadata(chunk, project_id, filename, chunk_index)
+                existing = previous_chunks.pop(key, None)
+                chunk_id = existing["id"] if existing else self._chunk_id(project_id, filename, key)
+
+                if len(sample_texts) < self.classifier.sample_chunks:
+                    sample_texts.append(chunk.page_content)
+                    sample_ids.append(chunk_id)
+
+                # Unchanged since the previous revision: keep its vectors
+                # (unless they were never stored) and extracted data
+                if existing:
+                    stats["reused"] += 1
+                    if existing["chunk_index"] != chunk_index:
+                        moved.append((existing["id"], chunk_index, metadata))
+                    if not reembed:
+                        continue
+                elif len(head_chunks) < self.extraction_chunks:
+                    head_chunks.append(chunk)
+                    head_ids.append(chunk_id)
+                    if len(head_chunks) == self.extraction_chunks:
+                        start_extraction()
+
+                batch.append({
+                    "id": chunk_id,
+                    "text": chunk.page_content,
+                    "metadata": metadata
+                })
+
+                if len(batch) >= self.embedding_batch_size:
+                    await queue.put(batch)
+                    batch = []
+
+            if batch:
+                await queue.put(batch)
+            await queue.put(None)
+
+        async def consume():
+            while True:
+                batch = await queue.get()
+                if batch is None:
+                    return
+
+                with progress.timed("index"):
+                    await self._index_chunks(namespace, batch)
+
+                if store_embeddings and not stats["embedding_failed"]:
+                    with progress.timed("embed"):
+                        vectors = await self._store_embedding_batch(namespace, batch)
+                    if vectors is None:
+                        stats["embedding_failed"] = True
+                    else:
+                        stats["embedded"] += len(vectors)
+                        progress.increment("embedded", len(vectors))
+                        progress.increment(
+                            "embedding_tokens",
+                            sum(estimate_tokens(record["text"]) for record in batch)
+                        )
+                        for record, vector in zip(batch, vectors):
+                            if record["id"] in sample_ids:
+                                sample_vectors[record["id"]] = vector
+
+        producer = asyncio.create_task(produce())
+        consumer = asyncio.create_task(consume())
         try:
-            # Generate unique namespace for this project
-            namespace = f"project_{project_id}"
+            await asyncio.gather(producer, consumer)
+        except Exception:
+            producer.cancel()
+            consumer.cancel()
+            if extraction_task:
+                extraction_task.cancel()
+            raise
 
-            # Prepare texts for embedding
-            texts = [chunk.page_content for chunk in chunks]
-            metadatas = [
-                {
-                    "project_id": project_id,
-                    "filename": filename,
-                    "chunk_index": i,
-                    "source": chunk.metadata.get("source", "")
-                }
-                for i, chunk in enumerate(chunks)
-            ]
+        logger.info(f"Document split into {stats['chunk_count']} chunks")
+
+        removed = []
+        if incremental:
+            removed = [record["id"] for record in previous_chunks.values()]
+            await self._apply_revision_diff(namespace, moved, removed)
+            progress.update(reused=stats["reused"], removed=len(removed))
+            logger.info(
+                f"Revision of {filename}: {stats['reused']} chunks unchanged, "
+                f"{stats['chunk_count'] - stats['reused']} changed, {len(removed)} removed"
+            )
+
+        # A revision with no changed chunks needs no extraction at all
+        if extraction_task is None and (head_chunks or not incremental):
+            start_extraction()
+        extracted_data = await extraction_task if extraction_task else {}
 
-            # Generate embeddings
+        # Link each extracted fact to the chunks it was read from
+        provenance = attribute_fields(
+            extracted_data,
+            zip(head_ids, (chunk.page_content for chunk in head_chunks))
+        )
+        if incremental:
+            extracted_data = self._merge_extracted_data(previous_extracted, extracted_data)
+            provenance = merge_provenance(
+                previous_provenance, provenance, removed, extracted_data
+            )
+
+        embeddings_id = None
+        if store_embeddings and not stats["embedding_failed"]:
+            embeddings_id = namespace
+            logger.info(f"Stored {stats['embedded']} embeddings in namespace {namespace}")
+
+        # The embedding signal must describe the same chunks as the text
+        # sample; reused chunks have no fresh vector, so a revision whose
+        # first chunks are unchanged is classified on text alone
+        aligned = [sample_vectors.get(chunk_id) for chunk_id in sample_ids]
+        with progress.timed("classify"):
+            classification = await self.classifier.classify(
+                sample_texts,
+                aligned if aligned and all(v is not None for v in aligned) else None
+            )
+        logger.info(
+            f"Classified {filename} as {classification['type']} "
+            f"({classification['confidence']:.2f}, {classification['method']})"
+        )
+
+        return {
+            "chunk_count": stats["chunk_count"],
+            "extracted_data": extracted_data,
+            "provenance": provenance,
+            "embeddings_id": embeddings_id,
+            "embedding_failed": stats["embedding_failed"],
+            "classification": classification
+        }
+
+    def _content_key(self, text: str, occurrences: Dict[str, int]) -> str:
+        """
+        Position-independent identity of a chunk within a document
+
+        Repeated identical chunks (boilerplate, headers) are numbered in
+        order of appearance so each occurrence gets its own key.
+        """
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        occurrence = occurrences.get(digest, 0)
+        occurrences[digest] = occurrence + 1
+        return f"{digest}:{occurrence}"
+
+    def _content_keys(
+        self,
+        records: List[Dict[str, Any]],
+        text_of: Callable[[Dict[str, Any]], str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Map content keys to records given in chunk order"""
+        occurrences: Dict[str, int] = {}
+        return {self._content_key(text_of(record), occurrences): record for record in records}
+
+    async def _apply_revision_diff(
+        self,
+        namespace: str,
+        moved: List[Tuple[str, int, Dict[str, Any]]],
+        removed: List[str]
+    ):
+        """
+        Update positions of unchanged chunks and drop removed ones
+
+        Vector metadata of moved chunks is left as is; the chunk store is
+        the source of truth for chunk positions.
+        """
+        try:
+            await self.retriever.update_positions(namespace, moved)
+
+            if removed:
+                await self.retriever.delete_chunks(namespace, removed)
+                if self.vector_store:
+                    try:
+                        await self.vector_store.delete(namespace, ids=removed)
+                    except Exception as e:
+                        logger.error(f"Error deleting removed chunk vectors: {str(e)}")
+        finally:
+            self.search_cache.invalidate(namespace)
+
+    def _merge_extracted_data(
+        self,
+        previous: Dict[str, Any],
+        update: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Merge extraction results of changed regions into a previous result
+
+        Non-empty values from ``update`` replace scalars, lists are unioned
+        in order and nested dicts are merged recursively. Facts that only
+        appeared in removed regions are kept, since extraction results are
+        not attributed to chunks.
+        """
+        merged = dict(previous or {})
+        for key, value in (update or {}).items():
+            if value in (None, "", [], {}):
+                continue
+            current = merged.get(key)
+            if isinstance(current, dict) and isinstance(value, dict):
+                merged[key] = self._merge_extracted_data(current, value)
+            elif isinstance(current, list) and isinstance(value, list):
+                seen = {json.dumps(item, sort_keys=True, default=str) for item in current}
+                merged[key] = current + [
+                    item for item in value
+                    if json.dumps(item, sort_keys=True, default=str) not in seen
+                ]
+            else:
+                merged[key] = value
+        return merged
+
+    async def _iter_chunks(
+        self,
+        file_path: str,
+        filename: str,
+        progress: Optional[ProgressReporter] = None,
+        documents: Optional[List[Any]] = None
+    ) -> AsyncIterator[Tuple[int, Any]]:
+        """
+        Yield (chunk_index, chunk) pairs as pages are parsed and split
+
+        Args:
+            file_path: Path to file
+            filename: Original filename
+            progress: Receives parsed page counts and parse/split timings
+            documents: Already loaded documents to split instead of the file
+
+        Yields:
+            Chunk index within the document and the chunk
+        """
+        loop = asyncio.get_event_loop()
+        progress = progress or ProgressReporter()
+        if documents is not None:
+            pages = self._iter_loaded(documents)
+        else:
+            pages = self._iter_document(file_path, filename)
+        chunk_index = 0
+        while True:
+            with progress.timed("parse"):
+                try:
+                    page_docs = await pages.__anext__()
+                except StopAsyncIteration:
+                    break
+
+            if page_docs and "page" in page_docs[-1].metadata:
+                progress.update(
+                    pages_parsed=page_docs[-1].metadata["page"],
+                    total_pages=page_docs[-1].metadata.get("total_pages")
+                )
+
+            with progress.timed("split"):
+                chunks = await loop.run_in_executor(
+                    None,
+                    self.text_splitter.split_documents,
+                    page_docs
+                )
+            for chunk in chunks:
+                yield chunk_index, chunk
+                chunk_index += 1
+
+    async def _store_embedding_batch(
+        self,
+        namespace: str,
+        batch: List[Dict[str, Any]]
+    ) -> Optional[List[List[float]]]:
+        """
+        Embed one batch of chunks and upsert it into the vector store
+
+        Args:
+            namespace: Vector namespace
+            batch: Chunk records with id, text and metadata
+
+        Returns:
+            Stored vectors, or None on failure
+        """
+        try:
             loop = asyncio.get_event_loop()
             vectors = await loop.run_in_executor(
                 None,
                 self.embeddings.embed_documents,
-                texts
+                [record["text"] for record in batch]
             )
 
-            # Store in Pinecone
-            index = self.pc.Index(self.pinecone_index)
-
-            # Prepare vectors for upsert
-            vectors_to_upsert = []
-            for i, (vector, metadata) in enumerate(zip(vectors, metadatas)):
-                vector_id = hashlib.md5(
-                    f"{project_id}_{filename}_{i}".encode()
-                ).hexdigest()
-
-                vectors_to_upsert.append({
-                    "id": vector_id,
+            await self.vector_store.upsert(namespace, [
+                {
+                    "id": record["id"],
                     "values": vector,
-                    "metadata": {**metadata, "text": texts[i][:1000]}  # Store snippet
-                })
-
-            # Upsert in batches
-            batch_size = 100
-            for i in range(0, len(vectors_to_upsert), batch_size):
-                batch = vectors_to_upsert[i:i + batch_size]
-                index.upsert(vectors=batch, namespace=namespace)
+                    "metadata": {**record["metadata"], "text": record["text"][:1000]}  # Store snippet
+                }
+                for record, vector in zip(batch, vectors)
+            ])
 
-            logger.info(f"Stored {len(vectors)} embeddings in namespace {namespace}")
-            return namespace
+            return vectors
 
         except Exception as e:
             logger.error(f"Error storing embeddings: {str(e)}")
             return None
 
+        finally:
+            self.search_cache.invalidate(namespace)
+
+    def _chunk_id(self, project_id: str, filename: str, content_key: str) -> str:
+        """
+        Stable id shared by a chunk's vector and its chunk store entry
+
+        Derived from the chunk content rather than its position, so chunks
+        keep their id when earlier parts of a revised document change.
+        """
+        return hashlib.md5(
+            f"{project_id}_{filename}_{content_key}".encode()
+        ).hexdigest()
+
+    def _chunk_metadata(
+        self,
+        chunk: Any,
+        project_id: str,
+        filename: str,
+        chunk_index: int
+    ) -> Dict[str, Any]:
+        """Provenance metadata stored with each chunk"""
+        metadata = {
+            "project_id": project_id,
+            "filename": filename,
+            "chunk_index": chunk_index,
+            "source": chunk.metadata.get("source", "")
+        }
+        # Page number (1-based) when the loader provides one; vector stores
+        # reject null metadata values so it is omitted otherwise
+        if chunk.metadata.get("page") is not None:
+            metadata["page"] = chunk.metadata["page"]
+        if chunk.metadata.get("sheet") is not None:
+            metadata["sheet"] = chunk.metadata["sheet"]
+        # Character range within the page (or whole text when unpaged)
+        start = chunk.metadata.get("start_index")
+        if start is not None and start >= 0:
+            metadata["char_start"] = start
+            metadata["char_end"] = start + len(chunk.page_content)
+        return metadata
+
+    async def _index_chunks(self, namespace: str, batch: List[Dict[str, Any]]):
+        """
+        Store full chunk text and index it for BM25 keyword search
+
+        Args:
+            namespace: Chunk store namespace
+            batch: Chunk records with id, text and metadata
+        """
+        try:
+            await self.retriever.index_chunks(namespace, batch)
+        except Exception as e:
+            logger.error(f"Error indexing chunks: {str(e)}")
+        finally:
+            self.search_cache.invalidate(namespace)
+
     async def _upload_to_storage(
         self,
         file_path: str,
@@ -418,18 +931,22 @@ Document content:
     def _detect_document_type(
         self,
         filename: str,
-        extracted_data: Dict[str, Any]
+        classification: Dict[str, Any]
     ) -> str:
         """
-        Detect document type from filename and content
+        Detect document type from content, falling back to the filename
 
         Args:
             filename: Document filename
-            extracted_data: Extracted content
+            classification: Result of the content classifier
 
         Returns:
             Document type
         """
+        confidence = classification.get("confidence") or 0.0
+        if classification.get("type") and confidence >= self.classifier.min_confidence:
+            return classification["type"]
+
         filename_lower = filename.lower()
 
         # Check filename patterns
@@ -446,7 +963,8 @@ Document content:
         elif any(term in filename_lower for term in ['compliance', 'regulatory']):
             return "compliance_report"
         else:
-            return "other"
+            # A low-confidence content guess still beats "other"
+            return classification.get("type") or "other"
 
     async def generate_project_summary(
         self,
@@ -464,38 +982,20 @@ Document content:
             Project summary with key findings
         """
         try:
-            # Collect all extracted data
-            all_extracted_data = []
-            stakeholders = set()
-            total_investment = None
-            technologies = set()
-
-            for doc in documents:
-                if doc.get("extracted_data"):
-                    data = doc["extracted_data"]
-                    all_extracted_data.append(data)
-
-                    # Aggregate stakeholders
-                    if data.get("stakeholders"):
-                        stakeholders.update(data["stakeholders"])
-
-                    # Get investment amount
-                    if data.get("total_investment") and not total_investment:
-                        total_investment = data["total_investment"]
-
-                    # Collect technologies
-                    if data.get("technology"):
-                        technologies.add(data["technology"])
+            facts = self.facts.get(documents, project_id)
 
             # Generate summary
             summary = {
-                "total_documents": len(documents),
-                "processed_documents": sum(1 for d in documents if d.get("processed")),
-                "total_investment": total_investment,
-                "stakeholders": list(stakeholders),
-                "technologies": list(technologies),
-                "key_findings": await self._generate_key_findings(all_extracted_data),
-                "document_types": self._count_document_types(documents)
+                "total_documents": facts["total_documents"],
+                "processed_documents": facts["processed_documents"],
+                "total_investment": facts["total_investment"],
+                "stakeholders": facts["stakeholders"],
+                "technologies": facts["technologies"],
+                "key_findings": await self._generate_key_findings(
+                    facts["extracted"],
+                    tenant_id=project_id
+                ),
+                "document_types": facts["document_types"]
             }
 
             return summary
@@ -509,18 +1009,20 @@ Document content:
 
     async def _generate_key_findings(
         self,
-        extracted_data_list: List[Dict[str, Any]]
+        extracted_data_list: List[Dict[str, Any]],
+        tenant_id: Optional[str] = None
     ) -> List[str]:
         """
         Generate key findings from extracted data using Claude
 
         Args:
             extracted_data_list: List of extracted data from documents
+            tenant_id: Tenant key for LLM concurrency limiting
 
         Returns:
             List of key findings
         """
-        if not self.claude or not extracted_data_list:
+        if not self.llm.enabled or not extracted_data_list:
             return []
 
         try:
@@ -543,90 +1045,121 @@ Provide concise, actionable findings focusing on:
 Return findings as a JSON array of strings.
 """
 
-            message = self.claude.messages.create(
-                model="claude-3-5-sonnet-20241022",
+            response = await self.llm.complete(
+                prompt,
                 max_tokens=1024,
-                messages=[{
-                    "role": "user",
-                    "content": prompt
-                }]
+                tenant_id=tenant_id,
+                purpose="generate_key_findings"
             )
 
-            response_text = message.content[0].text
+            response_text = response["text"]
 
-            # Extract JSON array
-            import re
-            json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
-            if json_match:
-                findings = json.loads(json_match.group())
+            try:
+                findings = parse_json_response(response_text)
+            except ValueError:
+                findings = None
+            if isinstance(findings, list):
                 return findings
-            else:
-                return ["Analysis completed - see extracted data for details"]
+            return ["Analysis completed - see extracted data for details"]
 
         except Exception as e:
             logger.error(f"Error generating key findings: {str(e)}")
             return []
 
-    def _count_document_types(self, documents: List[Dict[str, Any]]) -> Dict[str, int]:
-        """Count documents by type"""
-        type_counts = {}
-        for doc in documents:
-            doc_type = doc.get("type", "unknown")
-            type_counts[doc_type] = type_counts.get(doc_type, 0) + 1
-        return type_counts
+    async def resolve_citations(self, document: Dict[str, Any], field: str) -> List[Dict[str, Any]]:
+        """
+        Page citations of one extracted field
+
+        Follows the field's chunk references to the chunk store, so the
+        snippet, page and character range come from primary-key lookups
+        without re-opening or re-parsing the file.
+
+        Args:
+            document: Document row with project_id, extracted_data and provenance
+            field: Extracted field name
+
+        Returns:
+            Citations (chunk_id, filename, page, char range, snippet), best first
+        """
+        refs = (document.get("provenance") or {}).get(field, [])
+        if not refs:
+            return []
+
+        chunks = await self.retriever.get_chunks(f"project_{document['project_id']}", refs)
+        value = (document.get("extracted_data") or {}).get(field)
+        return [build_citation(ref, chunks[ref], value) for ref in refs if ref in chunks]
+
+    async def embed_query(self, query: str) -> List[float]:
+        """Embed a search query, memoized in the search cache"""
+        vector = self.search_cache.get_embedding(query)
+        if vector is None:
+            loop = asyncio.get_event_loop()
+            vector = await loop.run_in_executor(None, self.embeddings.embed_query, query)
+            self.search_cache.put_embedding(query, vector)
+        return vector
 
     async def query_project_documents(
         self,
         project_id: str,
         query: str,
-        top_k: int = 5
+        top_k: int = 5,
+        use_reranker: bool = True,
+        query_vector: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
         """
-        Query project documents using vector similarity search
+        Query project documents using hybrid BM25 + vector search
+
+        Vector and keyword rankings are fused with reciprocal rank fusion,
+        so exact figures and standard names are found even when they are
+        semantically unremarkable. Results are cached per namespace until
+        the next write to it, and query embeddings are memoized, so a
+        repeated query costs neither an embedding call nor a vector store
+        round trip.
 
         Args:
             project_id: Project ID
             query: Search query
             top_k: Number of results to return
+            use_reranker: Apply the local re-ranker to fused candidates
+            query_vector: Precomputed query embedding (cross-project search
+                embeds the query once for every namespace)
 
         Returns:
-            List of relevant document chunks
+            List of relevant document chunks with full text
         """
-        if not self.embeddings or not self.pc:
-            logger.warning("Embeddings or Pinecone not configured")
-            return []
-
         try:
-            # Generate query embedding
-            loop = asyncio.get_event_loop()
-            query_vector = await loop.run_in_executor(
-                None,
-                self.embeddings.embed_query,
-                query
-            )
-
-            # Query Pinecone
-            index = self.pc.Index(self.pinecone_index)
             namespace = f"project_{project_id}"
+            candidate_k = max(top_k * 4, 20)
+
+            cache_key = (normalize_query(query), top_k, use_reranker)
+            cached = self.search_cache.get_results(namespace, cache_key)
+            if cached is not None:
+                return cached
+            generation = self.search_cache.generation(namespace)
+
+            vector_matches = []
+            if self.embeddings and self.vector_store:
+                if query_vector is None:
+                    query_vector = await self.embed_query(query)
+
+                vector_matches = await self.vector_store.query(
+                    namespace,
+                    query_vector,
+                    top_k=candidate_k
+                )
+            else:
+                logger.warning("Embeddings or vector store not configured, using keyword search only")
 
-            results = index.query(
-                vector=query_vector,
+            results = await self.retriever.search(
+                namespace,
+                query,
+                vector_matches=vector_matches,
                 top_k=top_k,
-                namespace=namespace,
-                include_metadata=True
+                candidate_k=candidate_k,
+                use_reranker=use_reranker
             )
-
-            # Format results
-            formatted_results = []
-            for match in results.matches:
-                formatted_results.append({
-                    "score": match.score,
-                    "text": match.metadata.get("text", ""),
-                    "filename": match.metadata.get("filename", ""),
-                    "chunk_index": match.metadata.get("chunk_index", 0)
-                })
-
-            return formatted_results
+            self.search_cache.put_results(namespace, cache_key, results, generation)
+            return results
 
         except Exception as e:
             logger.error(f"Error querying documents: {str(e)}")
@@ -0,0 +1,411 @@
+"""
+InfraFlow AI - ESG Scoring
+Numeric E/S/G pillar scores from ESG framework indicators, scored as matrices
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+import os
+import time
+import hashlib
+import asyncio
+import logging
+
+import numpy as np
+
+from requirement_matcher import RequirementMatcher
+from standards_registry import StandardsRegistry, get_standards_registry
+from project_facts import get_fact_sheet_cache, document_set_version
+
+logger = logging.getLogger(__name__)
+
+PILLARS = ("environmental", "social", "governance")
+
+# Framework pillars and categories (see esg_frameworks.json) by E/S/G pillar
+PILLAR_ALIASES: Dict[str, str] = {
+    "environmental": "environmental",
+    "environment": "environmental",
+    "climate_change": "environmental",
+    "water_security": "environmental",
+    "forests": "environmental",
+    "plastics": "environmental",
+    "ghg_emissions": "environmental",
+    "metrics_and_targets": "environmental",
+    "environmental_performance": "environmental",
+    "social": "social",
+    "social_capital": "social",
+    "human_capital": "social",
+    "social_impact": "social",
+    "governance": "governance",
+    "leadership_governance": "governance",
+    "business_model_innovation": "governance",
+    "strategy": "governance",
+    "risk_management": "governance",
+    "governance_structure": "governance",
+}
+
+# Fallback for indicators without a recognised pillar or category
+PILLAR_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "environmental": (
+        "carbon", "emission", "ghg", "energy", "water", "waste", "biodiversity",
+        "climate", "pollution", "forest", "plastic"
+    ),
+    "social": (
+        "diversity", "inclusion", "employee", "worker", "labor", "labour", "health",
+        "safety", "community", "communities", "human rights", "training"
+    ),
+    "governance": (
+        "board", "corruption", "bribery", "governance", "ethics", "tax", "oversight",
+        "remuneration", "compliance"
+    ),
+}
+
+# Credit for a requirement's status in a stored compliance result
+STATUS_VALUES: Dict[str, float] = {"supported": 1.0, "ambiguous": 0.5, "missing": 0.0}
+
+
+def _key(label: str) -> str:
+    return "_".join(label.lower().replace("&", " ").replace("-", " ").split())
+
+
+def indicator_pillar(requirement: Dict[str, Any]) -> Optional[str]:
+    """
+    E/S/G pillar of a framework requirement
+
+    Args:
+        requirement: Normalized registry requirement (text, pillar, category)
+
+    Returns:
+        "environmental", "social" or "governance", or None if unknown
+    """
+    for label in (requirement.get("pillar"), requirement.get("category")):
+        if label and _key(label) in PILLAR_ALIASES:
+            return PILLAR_ALIASES[_key(label)]
+
+    text = f"{requirement.get('category') or ''} {requirement['text']}".lower()
+    for pillar, keywords in PILLAR_KEYWORDS.items():
+        if any(keyword in text for keyword in keywords):
+            return pillar
+    return None
+
+
+class ESGScoringModel:
+    """
+    Indicators and weights of the ESG score
+
+    Every requirement of the selected ESG frameworks is one indicator,
+    assigned to an E/S/G pillar. Within a pillar each framework carries
+    the same weight, shared equally by its indicators, so frameworks
+    with long metric lists do not dominate. The weights form an
+    (indicators x pillars) matrix; scoring a portfolio is then
+
+        pillar_scores = 100 * X @ W          (projects x pillars)
+        overall = pillar_scores @ pillar_weights
+
+    where X holds each project's indicator values in [0, 1].
+    """
+
+    def __init__(
+        self,
+        registry: StandardsRegistry,
+        frameworks: Optional[List[str]] = None,
+        pillar_weights: Optional[Dict[str, float]] = None
+    ):
+        """
+        Build indicators and weight matrices
+
+        Args:
+            registry: Standards registry
+            frameworks: Framework codes (defaults to every esg_framework
+                entry plus esg_scoring)
+            pillar_weights: Weight of each pillar in the overall score
+        """
+        if frameworks is None:
+            frameworks = [
+                code for code in registry
+                if registry[code]["kind"] == "esg_framework" or code == "esg_scoring"
+            ]
+        self.frameworks = [code for code in frameworks if code in registry]
+
+        weights = pillar_weights or {pillar: 1.0 for pillar in PILLARS}
+        pillar_vector = np.array([weights.get(p, 0.0) for p in PILLARS], dtype=np.float64)
+        self.pillar_weights = pillar_vector / max(pillar_vector.sum(), 1e-12)
+
+        self.indicators: List[Dict[str, Any]] = []
+        for code in self.frameworks:
+            for requirement in registry[code]["requirements"]:
+                pillar = indicator_pillar(requirement)
+                if pillar is None:
+                    continue
+                self.indicators.append({
+                    "id": requirement["id"],
+                    "framework": code,
+                    "pillar": pillar,
+                    "text": requirement["text"],
+                    "category": requirement.get("category")
+                })
+
+        count = len(self.indicators)
+        pillar_index = {pillar: i for i, pillar in enumerate(PILLARS)}
+        framework_index = {code: i for i, code in enumerate(self.frameworks)}
+        self.indicator_pillars = np.array(
+            [pillar_index[i["pillar"]] for i in self.indicators], dtype=np.int64
+        )
+        self.indicator_frameworks = np.array(
+            [framework_index[i["framework"]] for i in self.indicators], dtype=np.int64
+        )
+
+        # Indicators per (framework, pillar) cell share that cell's weight
+        cells = np.zeros((len(self.frameworks), len(PILLARS)))
+        np.add.at(cells, (self.indicator_frameworks, self.indicator_pillars), 1)
+        self.weights = np.zeros((count, len(PILLARS)), dtype=np.float64)
+        if count:
+            self.weights[np.arange(count), self.indicator_pillars] = (
+                1.0 / cells[self.indicator_frameworks, self.indicator_pillars]
+            )
+        self.weights /= np.maximum(self.weights.sum(axis=0, keepdims=True), 1e-12)
+
+        # Per-framework score weights: each framework's indicators, equally
+        self.framework_weights = np.zeros((count, len(self.frameworks)), dtype=np.float64)
+        if count:
+            self.framework_weights[np.arange(count), self.indicator_frameworks] = 1.0
+        self.framework_weights /= np.maximum(self.framework_weights.sum(axis=0, keepdims=True), 1e-12)
+
+        # Indicator values are 0, 0.5 or 1; single precision halves the work
+        self.weights = self.weights.astype(np.float32)
+        self.framework_weights = self.framework_weights.astype(np.float32)
+        self.pillar_weights = self.pillar_weights.astype(np.float32)
+
+        # Indicator texts -> columns; one matcher scans facts for all of them
+        self.columns: Dict[str, List[int]] = {}
+        for column, indicator in enumerate(self.indicators):
+            self.columns.setdefault(indicator["text"], []).append(column)
+        self.matcher = RequirementMatcher(self.columns)
+        self.framework_columns: Dict[str, List[int]] = {}
+        for column, indicator in enumerate(self.indicators):
+            self.framework_columns.setdefault(indicator["framework"], []).append(column)
+
+        sha = hashlib.sha256()
+        for code in self.frameworks:
+            sha.update(f"{code}:{registry[code]['fingerprint']};".encode())
+        sha.update(self.pillar_weights.tobytes())
+        self.version = sha.hexdigest()[:16]
+
+    def indicator_values(
+        self,
+        facts: Dict[str, Any],
+        requirement_status: Optional[Dict[str, Dict[str, str]]] = None
+    ) -> np.ndarray:
+        """
+        Indicator values of one project
+
+        An indicator found in the extracted facts counts 1. A stored
+        compliance result for the framework can raise it: supported 1,
+        ambiguous 0.5.
+
+        Args:
+            facts: Consolidated compliance data of the project
+            requirement_status: Framework code -> requirement text -> status,
+                from the project's latest compliance checks
+
+        Returns:
+            Vector with one value in [0, 1] per indicator
+        """
+        values = np.zeros(len(self.indicators), dtype=np.float32)
+        for text in self.matcher.match(facts, max_hits=1):
+            values[self.columns[text]] = 1.0
+
+        for code, statuses in (requirement_status or {}).items():
+            for column in self.framework_columns.get(code, ()):
+                credit = STATUS_VALUES.get(statuses.get(self.indicators[column]["text"]), 0.0)
+                if credit > values[column]:
+                    values[column] = credit
+        return values
+
+    def score(self, values: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Score a portfolio
+
+        Args:
+            values: (projects x indicators) indicator values
+
+        Returns:
+            Dict of arrays: pillars (projects x 3), overall (projects),
+            frameworks (projects x frameworks), coverage (projects x 3,
+            share of each pillar's indicators with any evidence)
+        """
+        values = np.asarray(values, dtype=np.float32).reshape(-1, len(self.indicators))
+        pillars = 100.0 * (values @ self.weights)
+        present = (values > 0).astype(np.float32)
+        members = (self.weights > 0).astype(np.float32)
+        pillar_sizes = np.maximum(members.sum(axis=0), 1)
+        return {
+            "pillars": pillars,
+            "overall": pillars @ self.pillar_weights,
+            "frameworks": 100.0 * (values @ self.framework_weights),
+            "coverage": (present @ members) / pillar_sizes
+        }
+
+
+class ESGScoringEngine:
+    """
+    Scores projects and stores the results for ranking
+
+    The indicator model is rebuilt whenever the standards registry is
+    reloaded. Project facts come from the shared fact sheet cache, and
+    requirement-level results of earlier ESG framework checks are used
+    where they exist. All projects are scored in one matrix product.
+    """
+
+    def __init__(self, db: Any, registry: Optional[StandardsRegistry] = None):
+        """
+        Initialize engine
+
+        Args:
+            db: Database instance
+            registry: Standards registry
+        """
+        self.db = db
+        self.registry = registry or get_standards_registry()
+        self.facts = get_fact_sheet_cache()
+        self.concurrency = int(os.getenv("ESG_SCORING_CONCURRENCY", "16"))
+        self.max_projects = int(os.getenv("ESG_SCORING_MAX_PROJECTS", "5000"))
+
+        frameworks = os.getenv("ESG_FRAMEWORKS")
+        self.frameworks = [c.strip() for c in frameworks.split(",") if c.strip()] if frameworks else None
+        weights = [float(w) for w in os.getenv("ESG_PILLAR_WEIGHTS", "0.4,0.3,0.3").split(",")]
+        self.pillar_weights = dict(zip(PILLARS, weights))
+
+        self._model: Optional[ESGScoringModel] = None
+        self._model_registry_version: Optional[int] = None
+
+    @property
+    def model(self) -> ESGScoringModel:
+        """Scoring model for the current registry version"""
+        if self._model is None or self._model_registry_version != self.registry.version:
+            self._model = ESGScoringModel(self.registry, self.frameworks, self.pillar_weights)
+            self._model_registry_version = self.registry.version
+        return self._model
+
+    def score_facts(self, facts: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Score one project's consolidated compliance data
+
+        Args:
+            facts: Consolidated compliance data
+
+        Returns:
+            Overall and pillar scores
+        """
+        model = self.model
+        scores = model.score(model.indicator_values(facts)[None, :])
+        return {
+            "overall": round(float(scores["overall"][0]), 1),
+            **{
+                pillar: round(float(scores["pillars"][0, i]), 1)
+                for i, pillar in enumerate(PILLARS)
+            },
+            "model_version": model.version
+        }
+
+    async def score_portfolio(self, project_ids: List[str]) -> Dict[str, Any]:
+        """
+        Score and store a set of projects
+
+        Args:
+            project_ids: Projects to score
+
+        Returns:
+            Scored projects ranked by overall score, plus timings
+        """
+        started = time.perf_counter()
+        model = self.model
+        project_ids = list(dict.fromkeys(project_ids))[:self.max_projects]
+
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+
+        async def load(project_id: str):
+            async with semaphore:
+                try:
+                    documents = await self.db.list_project_documents(project_id)
+                    document_hash = document_set_version(documents, with_series=False)
+                    latest = await self.db.get_latest_compliance_results(project_id, model.frameworks)
+                    # Only results checked against the current documents count
+                    statuses = {
+                        code: row["result"]["requirement_status"]
+                        for code, row in latest.items()
+                        if row["document_set_hash"] == document_hash
+                        and row["result"].get("requirement_status")
+                    }
+                    return project_id, documents, document_hash, statuses
+                except Exception as e:
+                    logger.error(f"Error loading project {project_id} for ESG scoring: {str(e)}")
+                    return None
+
+        loaded = [row for row in await asyncio.gather(*(load(p) for p in project_ids)) if row]
+        load_ms = (time.perf_counter() - started) * 1000
+
+        values = np.zeros((len(loaded), len(model.indicators)), dtype=np.float32)
+        for row, (project_id, documents, _, statuses) in enumerate(loaded):
+            facts = self.facts.get(documents, project_id=project_id)["compliance_data"]
+            values[row] = model.indicator_values(facts, statuses)
+
+        scoring_started = time.perf_counter()
+        scores = model.score(values)
+        order = np.argsort(-scores["overall"], kind="stable")
+        score_ms = (time.perf_counter() - scoring_started) * 1000
+
+        results = []
+        for rank, row in enumerate(order, 1):
+            project_id = loaded[row][0]
+            results.append({
+                "project_id": project_id,
+                "rank": rank,
+                "overall_score": round(float(scores["overall"][row]), 2),
+                **{
+                    f"{pillar}_score": round(float(scores["pillars"][row, i]), 2)
+                    for i, pillar in enumerate(PILLARS)
+                },
+                "coverage": {
+                    pillar: round(float(scores["coverage"][row, i]), 3)
+                    for i, pillar in enumerate(PILLARS)
+                },
+                "framework_scores": {
+                    code: round(float(scores["frameworks"][row, i]), 2)
+                    for i, code in enumerate(model.frameworks)
+                },
+                "indicators_met": int((values[row] >= 1.0).sum()),
+                "model_version": model.version,
+                "document_set_hash": loaded[row][2]
+            })
+
+        if results:
+            await self.db.save_esg_scores(results)
+
+        logger.info(
+            f"Scored {len(results)} projects on {len(model.indicators)} ESG indicators "
+            f"({score_ms:.1f}ms scoring, {load_ms:.0f}ms loading)"
+        )
+        return {
+            "model_version": model.version,
+            "indicators": len(model.indicators),
+            "frameworks": model.frameworks,
+            "scored": len(results),
+            "failed": len(project_ids) - len(results),
+            "load_ms": round(load_ms, 1),
+            "score_ms": round(score_ms, 3),
+            "results": results
+        }
+
+    def describe(self) -> Dict[str, Any]:
+        """Indicators and weights of the current model"""
+        model = self.model
+        return {
+            "model_version": model.version,
+            "frameworks": model.frameworks,
+            "pillar_weights": dict(zip(PILLARS, model.pillar_weights.round(4).tolist())),
+            "indicators": [
+                {**indicator, "weight": round(float(model.weights[i, model.indicator_pillars[i]]), 5)}
+                for i, indicator in enumerate(model.indicators)
+            ]
+        }
+
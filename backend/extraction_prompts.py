@@ -0,0 +1,187 @@
+"""
+InfraFlow AI - Extraction Prompts
+Per-document-type extraction fields, JSON schemas and token budgets
+"""
+
+from typing import Dict, Any, List, Optional
+import os
+
+# Every extractable field: JSON schema plus the instruction shown to the model
+FIELDS: Dict[str, Dict[str, Any]] = {
+    "project_name": {
+        "schema": {"type": ["string", "null"]},
+        "description": "Name of the project"
+    },
+    "location": {
+        "schema": {"type": ["string", "null"]},
+        "description": "Project location (country, region, city)"
+    },
+    "sponsor": {
+        "schema": {"type": ["string", "null"]},
+        "description": "Project sponsor or developer"
+    },
+    "total_investment": {
+        "schema": {"type": ["number", "null"]},
+        "description": "Total investment value as a plain number"
+    },
+    "currency": {
+        "schema": {"type": ["string", "null"]},
+        "description": "ISO currency code of the investment"
+    },
+    "stakeholders": {
+        "schema": {"type": "array", "items": {"type": "string"}},
+        "description": "Key stakeholders mentioned"
+    },
+    "technology": {
+        "schema": {"type": ["string", "null"]},
+        "description": "Technology type or specifications"
+    },
+    "capacity": {
+        "schema": {"type": ["string", "null"]},
+        "description": "Project capacity with unit (e.g. 120 MW, 500 MWh)"
+    },
+    "environmental_impact": {
+        "schema": {"type": ["string", "null"]},
+        "description": "Key environmental metrics or impacts"
+    },
+    "financial_structure": {
+        "schema": {"type": ["string", "null"]},
+        "description": "Debt/equity structure, lenders and instruments"
+    },
+    "risk_factors": {
+        "schema": {"type": "array", "items": {"type": "string"}},
+        "description": "Identified risk factors"
+    },
+    "timeline": {
+        "schema": {"type": ["string", "null"]},
+        "description": "Key milestones and timeline"
+    },
+    "dfi_involvement": {
+        "schema": {"type": ["string", "null"]},
+        "description": "DFI or development bank involvement"
+    }
+}
+
+# Approximate output tokens each field type needs in a JSON answer
+_FIELD_OUTPUT_TOKENS = {"array": 150, "string": 60, "number": 15}
+
+COMMON_FIELDS = ["project_name", "location", "sponsor"]
+
+# Fields worth asking for per DocumentType; "other" asks for everything
+TYPE_FIELDS: Dict[str, List[str]] = {
+    "feasibility_study": [
+        "technology", "capacity", "total_investment", "currency", "timeline",
+        "risk_factors", "stakeholders", "dfi_involvement"
+    ],
+    "financial_model": [
+        "total_investment", "currency", "financial_structure", "capacity",
+        "dfi_involvement"
+    ],
+    "environmental_impact": [
+        "environmental_impact", "risk_factors", "stakeholders", "capacity",
+        "technology", "timeline"
+    ],
+    "technical_specs": [
+        "technology", "capacity", "timeline"
+    ],
+    "legal_agreement": [
+        "stakeholders", "financial_structure", "dfi_involvement", "timeline",
+        "risk_factors"
+    ],
+    "compliance_report": [
+        "environmental_impact", "risk_factors", "dfi_involvement", "timeline"
+    ],
+    "other": [name for name in FIELDS if name not in COMMON_FIELDS]
+}
+
+# Short framing per type, so the model knows where to look
+TYPE_INSTRUCTIONS: Dict[str, str] = {
+    "feasibility_study": "This is a feasibility study. Focus on the recommended option.",
+    "financial_model": "This is a financial model. Report figures exactly as stated.",
+    "environmental_impact": "This is an environmental and social impact assessment.",
+    "technical_specs": "This is a technical specification.",
+    "legal_agreement": "This is a legal agreement. Name the contracting parties.",
+    "compliance_report": "This is a compliance or monitoring report.",
+    "other": "This is an infrastructure project document."
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English)"""
+    return len(text) // 4 + 1
+
+
+def fields_for_type(document_type: Optional[str]) -> List[str]:
+    """Fields to extract for a document type"""
+    return COMMON_FIELDS + TYPE_FIELDS.get(document_type or "other", TYPE_FIELDS["other"])
+
+
+def build_extraction_request(
+    document_type: Optional[str],
+    filename: str,
+    texts: List[str],
+    input_token_budget: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Build a type-specific, token-budgeted extraction request
+
+    Chunk texts are packed in document order until the input budget
+    (EXTRACTION_INPUT_TOKENS) is spent; the last chunk that does not fit
+    is truncated. ``max_tokens`` is sized from the requested fields.
+
+    Args:
+        document_type: Detected DocumentType value
+        filename: Document filename
+        texts: Chunk texts in document order
+        input_token_budget: Token budget for document content
+
+    Returns:
+        Dict with prompt, schema, max_tokens and fields
+    """
+    document_type = document_type if document_type in TYPE_FIELDS else "other"
+    budget = input_token_budget or int(os.getenv("EXTRACTION_INPUT_TOKENS", "6000"))
+
+    fields = fields_for_type(document_type)
+    field_lines = "\n".join(f"- {name}: {FIELDS[name]['description']}" for name in fields)
+
+    packed = []
+    remaining = budget
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if tokens > remaining:
+            if remaining > 100:
+                packed.append(text[:remaining * 4])
+            break
+        packed.append(text)
+        remaining -= tokens
+    content = "\n\n".join(packed)
+
+    prompt = f"""{TYPE_INSTRUCTIONS[document_type]}
+Extract the following from {filename} (use null or [] when not stated):
+{field_lines}
+
+Document content:
+{content}"""
+
+    schema = {
+        "type": "object",
+        "properties": {name: FIELDS[name]["schema"] for name in fields}
+    }
+
+    max_tokens = 50 + sum(
+        _FIELD_OUTPUT_TOKENS[_primary_type(FIELDS[name]["schema"])] for name in fields
+    )
+
+    return {
+        "prompt": prompt,
+        "schema": schema,
+        "max_tokens": min(max_tokens, 2048),
+        "fields": fields
+    }
+
+
+def _primary_type(schema: Dict[str, Any]) -> str:
+    kind = schema["type"]
+    if isinstance(kind, list):
+        kind = next(k for k in kind if k != "null")
+    return kind
@@ -9,8 +9,9 @@ import numpy as np
 import pandas as pd
 from datetime import datetime
 import asyncio
-import anthropic
-import os
+
+from llm_gateway import get_llm_gateway
+from project_facts import get_fact_sheet_cache
 
 logger = logging.getLogger(__name__)
 
@@ -23,13 +24,11 @@ class FinancialEngine:
 
     def __init__(self):
         """Initialize financial engine"""
-        # Initialize Claude for financial analysis
-        self.claude_api_key = os.getenv("ANTHROPIC_API_KEY")
-        if self.claude_api_key:
-            self.claude = anthropic.Anthropic(api_key=self.claude_api_key)
-        else:
-            logger.warning("Anthropic API key not configured")
-            self.claude = None
+        # Shared Claude gateway for financial analysis
+        self.llm = get_llm_gateway()
+
+        # Shared consolidated project data
+        self.facts = get_fact_sheet_cache()
 
     async def create_model(
         self,
@@ -123,6 +122,12 @@ class FinancialEngine:
             annual_costs = assumptions.get("annual_costs", 0)
             revenue_growth_rate = assumptions.get("revenue_growth_rate", 0.03)
             tax_rate = assumptions.get("tax_rate", 0.20)
+            inflation_rate = assumptions.get("inflation_rate", 0.025)
+
+            # Explicit per-year projections (e.g. parsed from a sponsor model)
+            # take precedence; later years extrapolate from their last value
+            revenue_projection = assumptions.get("revenue_projection") or []
+            cost_projection = assumptions.get("cost_projection") or []
 
             # Generate cash flow projections
             cash_flows = []
@@ -138,10 +143,14 @@ class FinancialEngine:
 
             for year in range(1, project_lifetime + 1):
                 # Revenue grows each year
-                revenue = annual_revenue * ((1 + revenue_growth_rate) ** (year - 1))
+                revenue = self._project_value(
+                    revenue_projection, annual_revenue, revenue_growth_rate, year
+                )
 
                 # Costs may grow with inflation
-                costs = annual_costs * ((1 + assumptions.get("inflation_rate", 0.025)) ** (year - 1))
+                costs = self._project_value(
+                    cost_projection, annual_costs, inflation_rate, year
+                )
 
                 # EBITDA
                 ebitda = revenue - costs
@@ -190,6 +199,20 @@ class FinancialEngine:
             logger.error(f"Error calculating DCF: {str(e)}")
             raise
 
+    def _project_value(
+        self,
+        projection: List[float],
+        base: float,
+        growth_rate: float,
+        year: int
+    ) -> float:
+        """Value for an operating year from a projection or a growth curve"""
+        if year <= len(projection):
+            return projection[year - 1]
+        if projection:
+            return projection[-1] * ((1 + growth_rate) ** (year - len(projection)))
+        return base * ((1 + growth_rate) ** (year - 1))
+
     def _calculate_irr(self, cash_flows: List[float]) -> Optional[float]:
         """
         Calculate Internal Rate of Return using Newton-Raphson method
@@ -504,7 +527,8 @@ class FinancialEngine:
             # Generate AI-powered insights
             insights = await self._generate_financial_insights(
                 financial_data,
-                dcf_result
+                dcf_result,
+                tenant_id=project_id
             )
 
             return {
@@ -512,9 +536,10 @@ class FinancialEngine:
                 "npv": dcf_result.get("npv"),
                 "irr": dcf_result.get("irr"),
                 "payback_period": dcf_result.get("payback_period"),
+                "min_dscr": self._min_dscr(financial_data.get("series", {})),
                 "assumptions": assumptions,
                 "insights": insights,
-                "data_sources": [d.get("name") for d in documents if d.get("extracted_data")]
+                "data_sources": self.facts.get(documents, project_id)["data_sources"]
             }
 
         except Exception as e:
@@ -528,25 +553,13 @@ class FinancialEngine:
         self,
         documents: List[Dict[str, Any]]
     ) -> Dict[str, Any]:
-        """Extract financial data from document metadata"""
-        financial_data = {}
-
-        for doc in documents:
-            extracted = doc.get("extracted_data", {})
-
-            # Collect investment amounts
-            if extracted.get("total_investment"):
-                financial_data["total_investment"] = extracted["total_investment"]
-
-            # Collect financial structure
-            if extracted.get("financial_structure"):
-                financial_data["financial_structure"] = extracted["financial_structure"]
-
-            # Collect capacity (for revenue estimation)
-            if extracted.get("capacity"):
-                financial_data["capacity"] = extracted["capacity"]
+        """
+        Extract financial data from document metadata
 
-        return financial_data
+        Time series parsed from spreadsheets (``financial_series`` on each
+        document, newest document first) are collected under ``series``.
+        """
+        return self.facts.get(documents)["financial_data"]
 
     def _build_assumptions_from_data(
         self,
@@ -575,15 +588,93 @@ class FinancialEngine:
         if "annual_revenue" in assumptions:
             assumptions["annual_costs"] = assumptions["annual_revenue"] * 0.35
 
+        # Parsed spreadsheet series replace the estimates above
+        series = financial_data.get("series", {})
+        if series:
+            assumptions.update(self._assumptions_from_series(series))
+
         return assumptions
 
+    def _assumptions_from_series(
+        self,
+        series: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Derive DCF assumptions from revenue, opex and capex time series
+
+        The operating period starts at the first year with positive
+        revenue. Opex is aligned to the revenue periods by year.
+
+        Args:
+            series: Series name to {periods, values}
+
+        Returns:
+            Assumption overrides
+        """
+        overrides: Dict[str, Any] = {}
+        frames = {
+            name: pd.Series(data["values"], index=data["periods"], dtype=np.float64)
+            for name, data in series.items()
+            if data.get("periods")
+        }
+
+        if "capex" in frames:
+            overrides["initial_investment"] = float(frames["capex"].abs().sum())
+
+        revenue = frames.get("revenue")
+        if revenue is not None and (revenue > 0).any():
+            operating = revenue.loc[revenue.index[np.argmax(revenue.to_numpy() > 0)]:]
+            overrides["annual_revenue"] = float(operating.iloc[0])
+            overrides["revenue_projection"] = operating.tolist()
+
+            positive = operating[operating > 0]
+            if len(positive) >= 2:
+                cagr = (positive.iloc[-1] / positive.iloc[0]) ** (1 / (len(positive) - 1)) - 1
+                overrides["revenue_growth_rate"] = float(np.clip(cagr, -0.2, 0.2))
+
+            if "opex" in frames:
+                # Blank opex cells in operating years carry the prior year forward
+                costs = (
+                    frames["opex"].abs().reindex(operating.index)
+                    .replace(0.0, np.nan).ffill().fillna(0.0)
+                )
+                overrides["annual_costs"] = float(costs.iloc[0])
+                overrides["cost_projection"] = costs.tolist()
+
+        return overrides
+
+    def _min_dscr(self, series: Dict[str, Dict[str, Any]]) -> Optional[float]:
+        """
+        Minimum debt service coverage ratio from parsed series
+
+        Cash flow available for debt service is approximated as revenue
+        less opex, aligned by period.
+        """
+        if "debt_service" not in series or "revenue" not in series:
+            return None
+
+        def frame(name: str) -> pd.Series:
+            data = series[name]
+            return pd.Series(data["values"], index=data["periods"], dtype=np.float64)
+
+        debt_service = frame("debt_service").abs()
+        cfads = frame("revenue").reindex(debt_service.index).fillna(0.0)
+        if "opex" in series:
+            cfads = cfads - frame("opex").abs().reindex(debt_service.index).fillna(0.0)
+
+        servicing = debt_service > 0
+        if not servicing.any():
+            return None
+        return float((cfads[servicing] / debt_service[servicing]).min())
+
     async def _generate_financial_insights(
         self,
         financial_data: Dict[str, Any],
-        dcf_result: Dict[str, Any]
+        dcf_result: Dict[str, Any],
+        tenant_id: Optional[str] = None
     ) -> List[str]:
         """Generate AI-powered financial insights"""
-        if not self.claude:
+        if not self.llm.enabled:
             return ["Financial analysis completed - see metrics for details"]
 
         try:
@@ -610,16 +701,14 @@ Provide 5-7 concise financial insights focusing on:
 Return as JSON array of strings.
 """
 
-            message = self.claude.messages.create(
-                model="claude-3-5-sonnet-20241022",
+            response = await self.llm.complete(
+                prompt,
                 max_tokens=1024,
-                messages=[{
-                    "role": "user",
-                    "content": prompt
-                }]
+                tenant_id=tenant_id,
+                purpose="generate_financial_insights"
             )
 
-            response_text = message.content[0].text
+            response_text = response["text"]
 
             # Extract JSON
             import re
@@ -654,12 +743,7 @@ Return as JSON array of strings.
 
             # Extract risk factors from documents
             risk_factors = []
-            all_risks = []
-
-            for doc in documents:
-                extracted = doc.get("extracted_data", {})
-                if extracted.get("risk_factors"):
-                    all_risks.extend(extracted["risk_factors"])
+            all_risks = self.facts.get(documents, project_id)["risk_factors"]
 
             # Categorize and score risks
             risk_categories = {
@@ -671,7 +755,7 @@ Return as JSON array of strings.
             }
 
             # Use AI to categorize and score risks
-            if self.claude and all_risks:
+            if self.llm.enabled and all_risks:
                 categorized_risks = await self._categorize_risks(all_risks)
                 risk_factors = categorized_risks
             else:
@@ -0,0 +1,314 @@
+"""
+InfraFlow AI - Ingestion Progress
+Per-stage progress reporting and Server-Sent Event streams for document ingestion
+"""
+
+from typing import Dict, Any, List, Optional, Callable, AsyncIterator, Set
+from contextlib import contextmanager
+import json
+import time
+import logging
+import asyncio
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+class ProgressReporter:
+    """
+    Collects progress of one document through the ingestion pipeline
+
+    Tracks the current stage, page/chunk/embedding counts, wall-clock time
+    per stage and cumulative time per operation. Parsing, embedding and
+    extraction overlap in the streaming pipeline, so operation timings can
+    add up to more than the stage that contains them.
+    """
+
+    def __init__(
+        self,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+        min_interval: float = 0.25
+    ):
+        """
+        Initialize reporter
+
+        Args:
+            on_event: Called with each progress event
+            min_interval: Minimum seconds between count updates
+        """
+        self.on_event = on_event
+        self.min_interval = min_interval
+        self.state: Dict[str, Any] = {
+            "stage": None,
+            "pages_parsed": 0,
+            "total_pages": None,
+            "chunks": 0,
+            "embedded": 0,
+            "embedding_tokens": 0,
+            "stage_timings": {},
+            "operation_timings": {}
+        }
+        self._stage_started: Optional[float] = None
+        self._last_emit = 0.0
+
+    def stage(self, name: str):
+        """
+        Enter a pipeline stage, closing the timing of the previous one
+
+        Args:
+            name: Stage name
+        """
+        self._close_stage()
+        self.state["stage"] = name
+        self._stage_started = time.perf_counter()
+        self._emit("stage")
+
+    def finish(self, status: str = "completed", error: Optional[str] = None):
+        """
+        Close the current stage and emit a terminal event
+
+        Args:
+            status: completed or failed
+            error: Failure message
+        """
+        self._close_stage()
+        self.state["stage"] = status
+        if error:
+            self.state["error"] = error
+        self._emit(status)
+
+    def update(self, **counts):
+        """Set counters, e.g. total_pages"""
+        self.state.update(counts)
+        self._emit_throttled()
+
+    def increment(self, counter: str, amount: int = 1):
+        """Increase a counter, e.g. chunks or embedded"""
+        self.state[counter] = (self.state.get(counter) or 0) + amount
+        self._emit_throttled()
+
+    @contextmanager
+    def timed(self, operation: str):
+        """Add the duration of the block to an operation timing"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings = self.state["operation_timings"]
+            timings[operation] = round(
+                timings.get(operation, 0.0) + time.perf_counter() - start, 4
+            )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of the current state"""
+        return json.loads(json.dumps(self.state))
+
+    def _close_stage(self):
+        if self.state["stage"] and self._stage_started is not None:
+            self.state["stage_timings"][self.state["stage"]] = round(
+                time.perf_counter() - self._stage_started, 4
+            )
+        self._stage_started = None
+
+    def _emit_throttled(self):
+        if time.perf_counter() - self._last_emit >= self.min_interval:
+            self._emit("progress")
+
+    def _emit(self, event_type: str):
+        self._last_emit = time.perf_counter()
+        if self.on_event:
+            try:
+                self.on_event({"type": event_type, **self.snapshot()})
+            except Exception as e:
+                logger.warning(f"Progress listener failed: {str(e)}")
+
+
+class ProgressTracker:
+    """
+    In-process hub that fans ingestion events out to stream subscribers
+
+    Workers publish events for the jobs they run; SSE streams subscribe by
+    job ID. Jobs run by workers on other nodes are picked up from the
+    progress snapshots they persist to ``ingestion_jobs``.
+    """
+
+    def __init__(self, subscriber_queue_size: int = 256):
+        """
+        Initialize tracker
+
+        Args:
+            subscriber_queue_size: Events buffered per subscriber before
+                the oldest are dropped
+        """
+        self.subscriber_queue_size = subscriber_queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def reporter(self, job_id: str, batch_id: Optional[str] = None) -> ProgressReporter:
+        """
+        Create a reporter that publishes events for a job
+
+        Args:
+            job_id: Ingestion job ID
+            batch_id: Upload batch ID
+
+        Returns:
+            Progress reporter
+        """
+        def publish(event: Dict[str, Any]):
+            self.publish(job_id, {**event, "job_id": job_id, "batch_id": batch_id})
+
+        return ProgressReporter(on_event=publish)
+
+    def publish(self, job_id: str, event: Dict[str, Any]):
+        """Deliver an event to every subscriber of a job"""
+        for queue in self._subscribers.get(job_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def subscribe(self, job_ids: List[str]) -> asyncio.Queue:
+        """
+        Subscribe to events of several jobs
+
+        Args:
+            job_ids: Job IDs
+
+        Returns:
+            Queue receiving their events
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.subscriber_queue_size)
+        for job_id in job_ids:
+            self._subscribers.setdefault(job_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """Remove a subscriber queue"""
+        for job_id in list(self._subscribers):
+            self._subscribers[job_id].discard(queue)
+            if not self._subscribers[job_id]:
+                del self._subscribers[job_id]
+
+
+def summarize_batch(jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate job states into batch progress
+
+    Args:
+        jobs: Jobs of one upload batch
+
+    Returns:
+        Status counts, total chunks/embeddings and summed per-stage timings
+    """
+    status_counts: Dict[str, int] = {}
+    stage_timings: Dict[str, float] = {}
+    chunks = 0
+    embedded = 0
+
+    for job in jobs:
+        status_counts[job["status"]] = status_counts.get(job["status"], 0) + 1
+        progress = job.get("progress") or {}
+        chunks += progress.get("chunks") or 0
+        embedded += progress.get("embedded") or 0
+        for stage, seconds in (progress.get("stage_timings") or {}).items():
+            stage_timings[stage] = round(stage_timings.get(stage, 0.0) + seconds, 4)
+
+    return {
+        "total": len(jobs),
+        "status_counts": status_counts,
+        "done": sum(status_counts.get(s, 0) for s in TERMINAL_STATUSES),
+        "chunks": chunks,
+        "embedded": embedded,
+        "stage_timings": stage_timings
+    }
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _job_state(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "job_id": job["id"],
+        "batch_id": job.get("batch_id"),
+        "filename": job["filename"],
+        "status": job["status"],
+        "document_id": job.get("document_id"),
+        "attempts": job["attempts"],
+        "last_error": job.get("last_error"),
+        "progress": job.get("progress") or {}
+    }
+
+
+async def stream_ingestion_events(
+    load_jobs: Callable[[], Any],
+    tracker: ProgressTracker,
+    poll_interval: float = 2.0
+) -> AsyncIterator[str]:
+    """
+    Stream ingestion progress for a set of jobs as Server-Sent Events
+
+    Live events from workers in this process are forwarded as they happen.
+    Every ``poll_interval`` the job rows are re-read so that status changes
+    and progress from workers on other nodes are streamed too. The stream
+    ends once every job is completed or failed.
+
+    Args:
+        load_jobs: Coroutine function returning the current job rows
+        tracker: Progress tracker for in-process events
+        poll_interval: Seconds between job row refreshes
+
+    Yields:
+        SSE-formatted ``job``, ``progress``, ``batch`` and ``done`` events
+    """
+    jobs = await load_jobs()
+    queue = tracker.subscribe([job["id"] for job in jobs])
+    last_sent: Dict[str, str] = {}
+    last_batch = None
+
+    try:
+        while True:
+            for job in jobs:
+                state = _job_state(job)
+                fingerprint = json.dumps(state, sort_keys=True, default=str)
+                if last_sent.get(job["id"]) != fingerprint:
+                    last_sent[job["id"]] = fingerprint
+                    yield _sse("job", state)
+
+            batch = summarize_batch(jobs)
+            if len(jobs) > 1 and batch != last_batch:
+                last_batch = batch
+                yield _sse("batch", batch)
+
+            if all(job["status"] in TERMINAL_STATUSES for job in jobs):
+                yield _sse("done", batch)
+                return
+
+            deadline = time.monotonic() + poll_interval
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                yield _sse("progress", event)
+
+            yield ": keep-alive\n\n"
+            jobs = await load_jobs()
+
+    finally:
+        tracker.unsubscribe(queue)
+
+
+_tracker: Optional[ProgressTracker] = None
+
+
+def get_progress_tracker() -> ProgressTracker:
+    """Get the process-wide progress tracker"""
+    global _tracker
+    if _tracker is None:
+        _tracker = ProgressTracker()
+    return _tracker
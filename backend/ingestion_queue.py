@@ -0,0 +1,304 @@
+"""
+InfraFlow AI - Ingestion Queue
+Durable background document processing with a horizontally scalable worker pool
+"""
+
+from typing import Dict, Any, List, Optional
+import os
+import uuid
+import socket
+import logging
+import asyncio
+
+from fastapi import UploadFile
+
+from database import Database
+from document_processor import DocumentProcessor
+from ingestion_progress import ProgressReporter, get_progress_tracker
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseLostError(Exception):
+    """The job's lease expired and another worker may have claimed it"""
+    pass
+
+
+class IngestionQueue:
+    """
+    Enqueues uploaded documents for background processing
+
+    Uploaded files are staged on disk and a row is written to the
+    ``ingestion_jobs`` table; workers on any node sharing the staging
+    directory can then claim and process them.
+    """
+
+    def __init__(self, db: Database):
+        """
+        Initialize queue
+
+        Args:
+            db: Connected database
+        """
+        self.db = db
+        self.staging_dir = os.getenv("INGEST_STAGING_DIR", "./data/ingest")
+        self.max_attempts = int(os.getenv("INGEST_MAX_ATTEMPTS", "3"))
+        os.makedirs(self.staging_dir, exist_ok=True)
+
+    async def enqueue(
+        self,
+        file: UploadFile,
+        project_id: str,
+        user_id: Optional[str] = None,
+        batch_id: Optional[str] = None
+    ) -> str:
+        """
+        Stage an uploaded file and create its ingestion job
+
+        Args:
+            file: Uploaded file
+            project_id: Project ID
+            user_id: Uploading user
+            batch_id: Upload batch the file belongs to
+
+        Returns:
+            Job ID
+        """
+        staged_path = await self._stage_file(file, project_id)
+
+        try:
+            return await self.db.create_ingestion_job({
+                "project_id": project_id,
+                "filename": file.filename,
+                "staged_path": staged_path,
+                "max_attempts": self.max_attempts,
+                "batch_id": batch_id,
+                "created_by": user_id
+            })
+        except Exception:
+            os.unlink(staged_path)
+            raise
+
+    async def _stage_file(self, file: UploadFile, project_id: str) -> str:
+        """Copy upload to the staging directory in blocks"""
+        project_dir = os.path.join(self.staging_dir, project_id)
+        os.makedirs(project_dir, exist_ok=True)
+
+        suffix = os.path.splitext(file.filename)[1]
+        staged_path = os.path.join(project_dir, f"{uuid.uuid4().hex}{suffix}")
+
+        with open(staged_path, "wb") as staged:
+            while True:
+                block = await file.read(1024 * 1024)
+                if not block:
+                    break
+                staged.write(block)
+
+        return staged_path
+
+
+class IngestionWorkerPool:
+    """
+    Pool of async workers that claim and process ingestion jobs
+
+    Workers claim jobs with ``FOR UPDATE SKIP LOCKED``, so any number of
+    pools can run across API processes and dedicated worker nodes. Each
+    pipeline stage is checkpointed to the job row; retries resume at the
+    stage that failed. The progress flush doubles as a heartbeat renewing
+    the job lease, and every job write is fenced on the lease holder: a
+    worker that lost its lease abandons the job to the new owner.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        processor: DocumentProcessor,
+        num_workers: Optional[int] = None
+    ):
+        """
+        Initialize worker pool
+
+        Args:
+            db: Connected database
+            processor: Document processor used to run the pipeline
+            num_workers: Concurrent workers (INGEST_WORKERS by default)
+        """
+        self.db = db
+        self.processor = processor
+        self.num_workers = (
+            num_workers if num_workers is not None
+            else int(os.getenv("INGEST_WORKERS", "2"))
+        )
+        self.poll_interval = float(os.getenv("INGEST_POLL_INTERVAL", "2.0"))
+        self.lease_seconds = int(os.getenv("INGEST_LEASE_SECONDS", "900"))
+        self.retry_base_seconds = int(os.getenv("INGEST_RETRY_BASE_SECONDS", "30"))
+        self.progress_flush_seconds = float(os.getenv("INGEST_PROGRESS_FLUSH_SECONDS", "5.0"))
+        self.tracker = get_progress_tracker()
+        self.node_id = f"{socket.gethostname()}-{os.getpid()}"
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+
+    def start(self):
+        """Start worker tasks on the running event loop"""
+        self._stopping.clear()
+        for i in range(self.num_workers):
+            worker_id = f"{self.node_id}-{i}"
+            self._tasks.append(asyncio.create_task(self._worker_loop(worker_id)))
+        logger.info(f"Started {self.num_workers} ingestion workers on {self.node_id}")
+
+    async def stop(self):
+        """Stop workers; in-flight jobs are reclaimed after their lease expires"""
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker_loop(self, worker_id: str):
+        """Claim and process jobs until stopped"""
+        while not self._stopping.is_set():
+            try:
+                jobs = await self.db.claim_ingestion_jobs(
+                    worker_id,
+                    limit=1,
+                    lease_seconds=self.lease_seconds
+                )
+            except Exception as e:
+                logger.error(f"Error claiming ingestion jobs: {str(e)}")
+                jobs = []
+
+            if not jobs:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self.process_job(jobs[0], worker_id)
+
+    async def process_job(self, job: Dict[str, Any], worker_id: str):
+        """
+        Run the document pipeline for a claimed job
+
+        Args:
+            job: Claimed job row
+            worker_id: Worker holding the job lease
+        """
+        job_id = job["id"]
+        logger.info(
+            f"Processing ingestion job {job_id} ({job['filename']}), "
+            f"attempt {job['attempts']}, resuming after stage {job.get('stage')}"
+        )
+
+        progress = self.tracker.reporter(job_id, job.get("batch_id"))
+
+        async def on_checkpoint(stage: str, checkpoint: Dict[str, Any]):
+            if not await self.db.checkpoint_ingestion_job(job_id, worker_id, stage, checkpoint):
+                raise LeaseLostError(f"Lease of job {job_id} lost at stage {stage}")
+
+        pipeline = asyncio.create_task(self.processor.run_pipeline(
+            job["staged_path"],
+            job["filename"],
+            job["project_id"],
+            checkpoint=job.get("checkpoint"),
+            on_checkpoint=on_checkpoint,
+            progress=progress
+        ))
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, worker_id, progress))
+
+        try:
+            await asyncio.wait({pipeline, heartbeat}, return_when=asyncio.FIRST_COMPLETED)
+            if not pipeline.done():
+                pipeline.cancel()
+                await asyncio.gather(pipeline, return_exceptions=True)
+                raise LeaseLostError(f"Lease of job {job_id} expired during {progress.state.get('stage')}")
+            heartbeat.cancel()
+            result = pipeline.result()
+
+            await self.db.update_ingestion_progress(job_id, worker_id, progress.snapshot())
+            if not await self.db.complete_ingestion_job(job_id, worker_id, result["id"]):
+                raise LeaseLostError(f"Lease of job {job_id} lost before completion")
+            self._remove_staged_file(job["staged_path"])
+            logger.info(f"Ingestion job {job_id} completed: document {result['id']}")
+
+        except asyncio.CancelledError:
+            pipeline.cancel()
+            heartbeat.cancel()
+            raise
+        except LeaseLostError as e:
+            # The new owner carries on with the job and its staged file
+            heartbeat.cancel()
+            logger.warning(f"Abandoning ingestion job {job_id}: {str(e)}")
+        except Exception as e:
+            logger.error(f"Ingestion job {job_id} failed at attempt {job['attempts']}: {str(e)}")
+            heartbeat.cancel()
+            will_retry = job["attempts"] < job["max_attempts"]
+            progress.finish("retrying" if will_retry else "failed", error=str(e))
+
+            try:
+                await self.db.update_ingestion_progress(job_id, worker_id, progress.snapshot())
+                if will_retry:
+                    delay = self.retry_base_seconds * (2 ** (job["attempts"] - 1))
+                    held = await self.db.fail_ingestion_job(
+                        job_id, worker_id, str(e), retry_delay_seconds=delay
+                    )
+                else:
+                    held = await self.db.fail_ingestion_job(job_id, worker_id, str(e))
+            except Exception as db_error:
+                logger.error(f"Could not record failure of job {job_id}: {str(db_error)}")
+                return
+
+            if not held:
+                logger.warning(f"Abandoning ingestion job {job_id}: lease lost before failure was recorded")
+            elif not will_retry:
+                self._remove_staged_file(job["staged_path"])
+
+    async def _heartbeat(self, job_id: str, worker_id: str, progress: ProgressReporter):
+        """
+        Periodically persist progress and renew the job lease
+
+        Returns once the lease is lost, so the caller can abandon the job.
+        """
+        while True:
+            await asyncio.sleep(self.progress_flush_seconds)
+            try:
+                if not await self.db.update_ingestion_progress(job_id, worker_id, progress.snapshot()):
+                    return
+            except Exception as e:
+                logger.warning(f"Could not persist progress of job {job_id}: {str(e)}")
+
+    def _remove_staged_file(self, staged_path: str):
+        try:
+            if os.path.exists(staged_path):
+                os.unlink(staged_path)
+        except OSError as e:
+            logger.warning(f"Could not remove staged file {staged_path}: {str(e)}")
+
+
+async def run_workers():
+    """Run a standalone worker pool until interrupted"""
+    db = Database()
+    await db.connect()
+
+    processor = DocumentProcessor()
+    processor.db = db
+
+    pool = IngestionWorkerPool(db, processor)
+    pool.start()
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await pool.stop()
+        await db.disconnect()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    try:
+        asyncio.run(run_workers())
+    except KeyboardInterrupt:
+        logger.info("Ingestion workers stopped")
@@ -0,0 +1,481 @@
+"""
+InfraFlow AI - LLM Gateway
+Shared async Claude client with connection pooling, concurrency limits,
+retry/backoff and an on-disk response cache
+"""
+
+from typing import Dict, Any, Optional, Tuple, Callable, Awaitable, ContextManager
+import os
+import json
+import time
+import random
+import logging
+import asyncio
+import hashlib
+import tempfile
+from collections import deque
+from contextlib import asynccontextmanager, nullcontext
+from contextvars import ContextVar
+
+import httpx
+import anthropic
+
+from structured_output import IncrementalJSONParser, coerce_to_schema
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "claude-3-5-sonnet-20241022"
+
+# Set by callers that time their own work: entered while a call waits for
+# its concurrency slots, so that wait can be left out of their timeouts
+slot_wait: ContextVar[Optional[Callable[[], ContextManager]]] = ContextVar(
+    "slot_wait", default=None
+)
+
+
+class LLMGateway:
+    """
+    Single entry point for all Claude calls made by the backend services
+
+    Every service shares one AsyncAnthropic client backed by a pooled
+    httpx connection, so LLM latency never blocks the event loop and
+    concurrent requests reuse warm connections.
+    """
+
+    def __init__(self):
+        """Initialize gateway from environment configuration"""
+        self.api_key = os.getenv("ANTHROPIC_API_KEY")
+
+        # Concurrency limits
+        self.max_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+        self.tenant_concurrency = int(os.getenv("LLM_TENANT_CONCURRENCY", "4"))
+
+        # Retry policy
+        self.max_retries = int(os.getenv("LLM_MAX_RETRIES", "4"))
+        self.backoff_base = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+        self.backoff_max = float(os.getenv("LLM_BACKOFF_MAX", "30.0"))
+        self.timeout = float(os.getenv("LLM_TIMEOUT", "120"))
+
+        # Response cache
+        self.cache_enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+        self.cache_dir = os.getenv(
+            "LLM_CACHE_DIR",
+            os.path.join(tempfile.gettempdir(), "infraflow_llm_cache")
+        )
+        self.cache_ttl = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+
+        if self.api_key:
+            self.http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency
+                ),
+                timeout=httpx.Timeout(self.timeout, connect=10.0)
+            )
+            # Retries are handled here so they respect the concurrency limits
+            self.client = anthropic.AsyncAnthropic(
+                api_key=self.api_key,
+                http_client=self.http_client,
+                max_retries=0
+            )
+        else:
+            logger.warning("Anthropic API key not configured")
+            self.http_client = None
+            self.client = None
+
+        if self.cache_enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._global_semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._tenant_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+        # Call metrics
+        self._recent_calls = deque(maxlen=1000)
+        self._totals = {
+            "calls": 0,
+            "cache_hits": 0,
+            "errors": 0,
+            "retries": 0,
+            "parse_failures": 0,
+            "truncated_responses": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "latency_ms": 0.0
+        }
+
+    @property
+    def enabled(self) -> bool:
+        """Whether Claude calls can be made"""
+        return self.client is not None
+
+    async def complete(
+        self,
+        prompt: str,
+        model: str = DEFAULT_MODEL,
+        max_tokens: int = 1024,
+        system: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+        use_cache: bool = True,
+        purpose: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Send a single-turn prompt to Claude
+
+        Args:
+            prompt: User prompt text
+            model: Claude model name
+            max_tokens: Maximum tokens to generate
+            system: Optional system prompt
+            tenant_id: Tenant key for per-tenant concurrency limiting
+            use_cache: Serve and store the response in the on-disk cache
+            purpose: Short label recorded with the call metrics
+
+        Returns:
+            Dict with text, input_tokens, output_tokens, latency_ms and cached
+        """
+        if not self.enabled:
+            raise RuntimeError("Anthropic API key not configured")
+
+        cache_key = self._cache_key(model, prompt, max_tokens, system)
+
+        if use_cache and self.cache_enabled:
+            cached = await self._cache_get(cache_key)
+            if cached is not None:
+                self._record(purpose, model, tenant_id, cached, 0.0, cached=True)
+                return {**cached, "latency_ms": 0.0, "cached": True}
+
+        kwargs = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "messages": [{"role": "user", "content": prompt}]
+        }
+        if system:
+            kwargs["system"] = system
+
+        async with self._slots(tenant_id):
+            start = time.perf_counter()
+            message = await self._create_with_retry(kwargs)
+            latency_ms = (time.perf_counter() - start) * 1000
+
+        result = {
+            "text": "".join(
+                block.text for block in message.content if getattr(block, "text", None)
+            ),
+            "input_tokens": message.usage.input_tokens,
+            "output_tokens": message.usage.output_tokens
+        }
+
+        self._record(purpose, model, tenant_id, result, latency_ms, cached=False)
+
+        if use_cache and self.cache_enabled:
+            await self._cache_put(cache_key, result)
+
+        return {**result, "latency_ms": latency_ms, "cached": False}
+
+    async def complete_json(
+        self,
+        prompt: str,
+        schema: Dict[str, Any],
+        model: str = DEFAULT_MODEL,
+        max_tokens: int = 1024,
+        system: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+        use_cache: bool = True,
+        purpose: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Request a JSON object conforming to a JSON schema
+
+        The schema is appended to the prompt and the assistant turn is
+        prefilled with "{" so the model starts the object immediately. The
+        response is streamed through an incremental parser and the stream
+        is closed as soon as the object is complete, so no tokens are spent
+        on trailing prose. A response cut off by ``max_tokens`` is repaired
+        up to its last complete member instead of being discarded. The
+        result is coerced to the schema.
+
+        Args:
+            prompt: User prompt text
+            schema: JSON schema of the expected object
+            model: Claude model name
+            max_tokens: Maximum tokens to generate
+            system: Optional system prompt
+            tenant_id: Tenant key for per-tenant concurrency limiting
+            use_cache: Serve and store the result in the on-disk cache
+            purpose: Short label recorded with the call metrics
+
+        Returns:
+            Dict with data, input_tokens, output_tokens, latency_ms, cached
+            and truncated
+
+        Raises:
+            ValueError: The response contained no JSON object
+        """
+        if not self.enabled:
+            raise RuntimeError("Anthropic API key not configured")
+
+        full_prompt = (
+            f"{prompt}\n\nRespond with a single JSON object matching this JSON schema:\n"
+            f"{json.dumps(schema, separators=(',', ':'))}"
+        )
+        cache_key = self._cache_key(model, f"json:{full_prompt}", max_tokens, system)
+
+        if use_cache and self.cache_enabled:
+            cached = await self._cache_get(cache_key)
+            if cached is not None:
+                self._record(purpose, model, tenant_id, cached, 0.0, cached=True)
+                return {**cached, "latency_ms": 0.0, "cached": True}
+
+        kwargs = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "messages": [
+                {"role": "user", "content": full_prompt},
+                {"role": "assistant", "content": "{"}
+            ],
+            "stream": True
+        }
+        if system:
+            kwargs["system"] = system
+
+        async with self._slots(tenant_id):
+            start = time.perf_counter()
+            parser, usage = await self._with_retry(lambda: self._stream_json(kwargs))
+            latency_ms = (time.perf_counter() - start) * 1000
+
+        try:
+            data = coerce_to_schema(parser.result(), schema)
+        except ValueError:
+            self._totals["parse_failures"] += 1
+            self._record(purpose, model, tenant_id, usage, latency_ms, cached=False)
+            raise
+
+        result = {**usage, "data": data, "truncated": not parser.complete}
+        if result["truncated"]:
+            self._totals["truncated_responses"] += 1
+
+        self._record(purpose, model, tenant_id, result, latency_ms, cached=False)
+
+        if use_cache and self.cache_enabled and not result["truncated"]:
+            await self._cache_put(cache_key, result)
+
+        return {**result, "latency_ms": latency_ms, "cached": False}
+
+    async def _stream_json(
+        self,
+        kwargs: Dict[str, Any]
+    ) -> Tuple[IncrementalJSONParser, Dict[str, int]]:
+        """Stream a prefilled JSON response until the object closes"""
+        parser = IncrementalJSONParser()
+        parser.feed("{")
+        usage = {"input_tokens": 0, "output_tokens": 0}
+
+        stream = await self.client.messages.create(**kwargs)
+        try:
+            async for event in stream:
+                if event.type == "message_start":
+                    usage["input_tokens"] = event.message.usage.input_tokens
+                elif event.type == "content_block_delta":
+                    if parser.feed(getattr(event.delta, "text", "")):
+                        # Output usage arrives at the end; estimate it
+                        usage["output_tokens"] = max(1, parser.length // 4)
+                        break
+                elif event.type == "message_delta":
+                    usage["output_tokens"] = event.usage.output_tokens
+        finally:
+            await stream.response.aclose()
+
+        return parser, usage
+
+    async def _create_with_retry(self, kwargs: Dict[str, Any]) -> Any:
+        """Call messages.create with exponential backoff on transient errors"""
+        return await self._with_retry(lambda: self.client.messages.create(**kwargs))
+
+    async def _with_retry(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Run an API call with exponential backoff on transient errors"""
+        attempt = 0
+        while True:
+            try:
+                return await call()
+            except Exception as e:
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    self._totals["errors"] += 1
+                    raise
+
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                delay = delay * (0.5 + random.random() / 2)  # Jitter
+                attempt += 1
+                self._totals["retries"] += 1
+                logger.warning(
+                    f"LLM call failed ({type(e).__name__}), retry {attempt}/"
+                    f"{self.max_retries} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+    def _is_retryable(self, error: Exception) -> bool:
+        """Rate limits, overload, server errors and connection failures are retried"""
+        if isinstance(error, anthropic.APIConnectionError):
+            return True
+        if isinstance(error, anthropic.APIStatusError):
+            return error.status_code == 429 or error.status_code >= 500
+        return False
+
+    @asynccontextmanager
+    async def _slots(self, tenant_id: Optional[str]):
+        """
+        Hold a tenant slot and a global slot for the duration of a call
+
+        The tenant slot is taken first so a busy tenant never holds global
+        capacity while waiting. The caller's ``slot_wait`` context, if any,
+        is entered until both slots are held.
+
+        Args:
+            tenant_id: Tenant key for per-tenant concurrency limiting
+        """
+        tenant_semaphore = self._tenant_semaphore(tenant_id)
+        waiting = slot_wait.get()
+        with waiting() if waiting else nullcontext():
+            await tenant_semaphore.acquire()
+            try:
+                await self._global_semaphore.acquire()
+            except BaseException:
+                tenant_semaphore.release()
+                raise
+        try:
+            yield
+        finally:
+            self._global_semaphore.release()
+            tenant_semaphore.release()
+
+    def _tenant_semaphore(self, tenant_id: Optional[str]) -> asyncio.Semaphore:
+        """Get (or lazily create) the semaphore for a tenant"""
+        key = tenant_id or "_default"
+        if key not in self._tenant_semaphores:
+            self._tenant_semaphores[key] = asyncio.Semaphore(self.tenant_concurrency)
+        return self._tenant_semaphores[key]
+
+    # ========================================================================
+    # RESPONSE CACHE
+    # ========================================================================
+
+    def _cache_key(
+        self,
+        model: str,
+        prompt: str,
+        max_tokens: int,
+        system: Optional[str]
+    ) -> str:
+        """Cache key is the model plus a hash of everything sent to it"""
+        prompt_hash = hashlib.sha256(
+            json.dumps([prompt, system, max_tokens]).encode()
+        ).hexdigest()
+        return f"{model}_{prompt_hash}"
+
+    def _cache_path(self, key: str) -> str:
+        """Shard cache files by hash prefix to keep directories small"""
+        return os.path.join(self.cache_dir, key[-2:], f"{key}.json")
+
+    async def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Read a cached response, ignoring expired entries"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self._read_cache_file, key)
+
+    async def _cache_put(self, key: str, value: Dict[str, Any]):
+        """Write a response to the cache"""
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self._write_cache_file, key, value)
+
+    def _read_cache_file(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._cache_path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.cache_ttl:
+                return None
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache_file(self, key: str, value: Dict[str, Any]):
+        path = self._cache_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write atomically so concurrent readers never see partial files
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "w") as f:
+                json.dump(value, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write LLM cache entry: {str(e)}")
+
+    # ========================================================================
+    # METRICS
+    # ========================================================================
+
+    def _record(
+        self,
+        purpose: Optional[str],
+        model: str,
+        tenant_id: Optional[str],
+        result: Dict[str, Any],
+        latency_ms: float,
+        cached: bool
+    ):
+        """Record per-call latency and token usage"""
+        self._totals["calls"] += 1
+        if cached:
+            self._totals["cache_hits"] += 1
+        else:
+            self._totals["input_tokens"] += result.get("input_tokens", 0)
+            self._totals["output_tokens"] += result.get("output_tokens", 0)
+            self._totals["latency_ms"] += latency_ms
+
+        self._recent_calls.append({
+            "timestamp": time.time(),
+            "purpose": purpose,
+            "model": model,
+            "tenant_id": tenant_id,
+            "cached": cached,
+            "latency_ms": round(latency_ms, 1),
+            "input_tokens": result.get("input_tokens", 0),
+            "output_tokens": result.get("output_tokens", 0)
+        })
+
+        if not cached:
+            logger.info(
+                f"LLM call [{purpose or 'unlabeled'}] {latency_ms:.0f}ms, "
+                f"{result.get('input_tokens', 0)} in / {result.get('output_tokens', 0)} out tokens"
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get aggregate call statistics
+
+        Returns:
+            Totals plus the most recent calls
+        """
+        live_calls = self._totals["calls"] - self._totals["cache_hits"]
+        return {
+            **self._totals,
+            "avg_latency_ms": self._totals["latency_ms"] / live_calls if live_calls else 0.0,
+            "cache_hit_rate": (
+                self._totals["cache_hits"] / self._totals["calls"]
+                if self._totals["calls"] else 0.0
+            ),
+            "recent_calls": list(self._recent_calls)[-50:]
+        }
+
+    async def close(self):
+        """Close the pooled HTTP client"""
+        if self.http_client:
+            await self.http_client.aclose()
+
+
+_gateway: Optional[LLMGateway] = None
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Get the process-wide LLM gateway"""
+    global _gateway
+    if _gateway is None:
+        _gateway = LLMGateway()
+    return _gateway
@@ -5,12 +5,13 @@ Main application with all API endpoints for infrastructure finance intelligence
 
 from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import List, Optional, Dict, Any
 import uvicorn
 import logging
 from datetime import datetime
 import asyncio
+import uuid
 
 from models import (
     ProjectCreate,
@@ -22,14 +23,26 @@ from models import (
     FinancialModelResponse,
     ComplianceCheckRequest,
     ComplianceCheckResponse,
+    ComplianceScreeningRequest,
+    ESGScoringRequest,
     RiskAssessmentResponse,
+    SearchRequest,
+    SearchResponse,
     ErrorResponse
 )
-from database import Database
+from database import Database, ESG_SCORE_COLUMNS
 from document_processor import DocumentProcessor
 from financial_engine import FinancialEngine
 from compliance_checker import ComplianceChecker
-from auth import get_current_user, User
+from compliance_reports import ComplianceReportService, REPORT_FORMATS
+from compliance_screening import ComplianceScreener, ScreeningJob, stream_screening_events
+from esg_scoring import ESGScoringEngine, PILLARS
+from auth import get_current_user, get_current_admin_user, User
+from llm_gateway import get_llm_gateway
+from pdf_parser import shutdown_executor as shutdown_pdf_parser
+from ingestion_queue import IngestionQueue, IngestionWorkerPool
+from ingestion_progress import get_progress_tracker, stream_ingestion_events
+from namespace_manager import NamespaceManager
 
 # Configure logging
 logging.basicConfig(
@@ -60,7 +73,13 @@ app.add_middleware(
 db = Database()
 document_processor = DocumentProcessor()
 financial_engine = FinancialEngine()
-compliance_checker = ComplianceChecker()
+compliance_checker = ComplianceChecker(document_processor)
+compliance_screener = ComplianceScreener(db, compliance_checker)
+compliance_reports = ComplianceReportService(db, compliance_checker)
+esg_scoring = ESGScoringEngine(db, compliance_checker.standards)
+ingestion_queue = IngestionQueue(db)
+ingestion_workers = IngestionWorkerPool(db, document_processor)
+namespace_manager = NamespaceManager(db, document_processor)
 
 
 # Health check endpoint
@@ -74,6 +93,52 @@ async def health_check():
     }
 
 
+@app.get("/api/system/llm-stats", tags=["System"])
+async def llm_stats(admin: User = Depends(get_current_admin_user)):
+    """LLM call latency, token usage and cache statistics"""
+    return get_llm_gateway().get_stats()
+
+
+@app.get("/api/system/search-stats", tags=["System"])
+async def search_stats(admin: User = Depends(get_current_admin_user)):
+    """Query embedding and search result cache statistics"""
+    return document_processor.search_cache.get_stats()
+
+
+@app.get("/api/system/compliance-stats", tags=["System"])
+async def compliance_stats(admin: User = Depends(get_current_admin_user)):
+    """Compliance result cache statistics"""
+    return compliance_checker.get_cache_stats()
+
+
+@app.get("/api/system/standards", tags=["System"])
+async def list_standards(
+    kind: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Compliance standards and ESG frameworks available for checks"""
+    registry = compliance_checker.standards
+    return {
+        "version": registry.version,
+        "standards": registry.list_standards(kind)
+    }
+
+
+@app.post("/api/system/standards/reload", tags=["System"])
+async def reload_standards(admin: User = Depends(get_current_admin_user)):
+    """Re-read standards data files that changed on disk"""
+    registry = compliance_checker.standards
+    try:
+        reloaded = await asyncio.get_event_loop().run_in_executor(None, registry.reload)
+        return {"reloaded": reloaded, "version": registry.version, "standards": len(registry)}
+    except Exception as e:
+        logger.error(f"Error reloading standards: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to reload standards: {str(e)}"
+        )
+
+
 # ============================================================================
 # PROJECT ENDPOINTS
 # ============================================================================
@@ -292,6 +357,14 @@ async def delete_project(
             )
 
         await db.delete_project(project_id)
+
+        # Vectors and chunks live outside Postgres; the reconciler removes
+        # them later if this fails
+        try:
+            await namespace_manager.delete_project_namespaces(project_id)
+        except Exception as e:
+            logger.error(f"Error deleting vectors of project {project_id}: {str(e)}")
+
         return None
 
     except HTTPException:
@@ -319,7 +392,7 @@ async def upload_documents(
     current_user: User = Depends(get_current_user)
 ):
     """
-    Upload and process multiple documents for a project
+    Upload documents and queue them for background processing
 
     Args:
         project_id: Project ID to associate documents with
@@ -327,7 +400,7 @@ async def upload_documents(
         current_user: Authenticated user
 
     Returns:
-        List of processed document metadata
+        List of queued uploads with their ingestion job IDs
     """
     try:
         # Verify project exists and user has access
@@ -344,47 +417,39 @@ async def upload_documents(
                 detail="Access denied to this project"
             )
 
-        logger.info(f"Processing {len(files)} documents for project {project_id}")
+        logger.info(f"Queueing {len(files)} documents for project {project_id}")
 
-        # Process all documents concurrently
-        tasks = []
+        # Stage files and enqueue; workers process them in the background
+        batch_id = str(uuid.uuid4())
+        responses = []
         for file in files:
-            tasks.append(
-                document_processor.process_document(
+            try:
+                job_id = await ingestion_queue.enqueue(
                     file=file,
-                    project_id=project_id
+                    project_id=project_id,
+                    user_id=current_user.id,
+                    batch_id=batch_id
                 )
-            )
-
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Handle results and errors
-        responses = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                logger.error(f"Error processing {files[i].filename}: {str(result)}")
                 responses.append(
                     DocumentUploadResponse(
-                        id=None,
-                        name=files[i].filename,
-                        status="error",
-                        message=str(result)
+                        name=file.filename,
+                        status="queued",
+                        job_id=job_id,
+                        batch_id=batch_id,
+                        message="Document queued for processing"
                     )
                 )
-            else:
+            except Exception as e:
+                logger.error(f"Error queueing {file.filename}: {str(e)}")
                 responses.append(
                     DocumentUploadResponse(
-                        id=result["id"],
-                        name=result["name"],
-                        type=result["type"],
-                        status="processed",
-                        url=result["url"],
-                        extracted_data=result.get("extracted_data"),
-                        message="Document processed successfully"
+                        id=None,
+                        name=file.filename,
+                        status="error",
+                        message=str(e)
                     )
                 )
 
-        logger.info(f"Completed processing {len(files)} documents")
         return responses
 
     except HTTPException:
@@ -397,6 +462,128 @@ async def upload_documents(
         )
 
 
+async def _get_accessible_job(job_id: str, current_user: User) -> Dict[str, Any]:
+    """Load an ingestion job, enforcing project access"""
+    job = await db.get_ingestion_job(job_id)
+    project = await db.get_project(job["project_id"]) if job else None
+
+    # A job whose project is gone is as unreachable as a missing one
+    if not job or not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Ingestion job {job_id} not found"
+        )
+
+    if project.get("user_id") != current_user.id and not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+
+    return job
+
+
+def _event_stream_response(events) -> StreamingResponse:
+    """Wrap an SSE generator in a non-buffered streaming response"""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get(
+    "/api/documents/jobs/{job_id}/events",
+    tags=["Documents"]
+)
+async def stream_ingestion_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream processing progress of one uploaded document (Server-Sent Events)
+
+    Emits stage transitions, page/chunk/embedding counts and per-stage
+    timings until the job completes or fails.
+    """
+    await _get_accessible_job(job_id, current_user)
+
+    async def load_jobs():
+        return [await db.get_ingestion_job(job_id)]
+
+    return _event_stream_response(
+        stream_ingestion_events(load_jobs, get_progress_tracker())
+    )
+
+
+@app.get(
+    "/api/documents/batches/{batch_id}/events",
+    tags=["Documents"]
+)
+async def stream_ingestion_batch(
+    batch_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream processing progress of an upload batch (Server-Sent Events)
+
+    Emits per-document events plus aggregated batch progress until every
+    document in the batch is completed or failed.
+    """
+    jobs = await db.get_batch_ingestion_jobs(batch_id)
+    if not jobs:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Upload batch {batch_id} not found"
+        )
+    await _get_accessible_job(jobs[0]["id"], current_user)
+
+    async def load_jobs():
+        return await db.get_batch_ingestion_jobs(batch_id)
+
+    return _event_stream_response(
+        stream_ingestion_events(load_jobs, get_progress_tracker())
+    )
+
+
+@app.get(
+    "/api/documents/jobs/{job_id}",
+    tags=["Documents"]
+)
+async def get_ingestion_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Get background processing status of an uploaded document"""
+    try:
+        job = await _get_accessible_job(job_id, current_user)
+
+        return {
+            "id": job["id"],
+            "project_id": job["project_id"],
+            "document_id": job.get("document_id"),
+            "filename": job["filename"],
+            "status": job["status"],
+            "batch_id": job.get("batch_id"),
+            "stage": job.get("stage"),
+            "progress": job.get("progress"),
+            "attempts": job["attempts"],
+            "max_attempts": job["max_attempts"],
+            "last_error": job.get("last_error"),
+            "created_at": job.get("created_at"),
+            "updated_at": job.get("updated_at")
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching ingestion job: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
 @app.get(
     "/api/documents/{document_id}",
     tags=["Documents"]
@@ -435,6 +622,66 @@ async def get_document(
         )
 
 
+@app.get(
+    "/api/documents/{document_id}/citations/{field}",
+    tags=["Documents"]
+)
+async def get_field_citations(
+    document_id: str,
+    field: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Resolve an extracted fact to the page snippets it was read from
+
+    Args:
+        document_id: Document ID
+        field: Extracted field name (e.g. total_investment)
+        current_user: Authenticated user
+
+    Returns:
+        Field value and its citations with page, character range and snippet
+    """
+    try:
+        document = await db.get_document(document_id)
+
+        if not document:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Document {document_id} not found"
+            )
+
+        project = await db.get_project(document["project_id"])
+        if project.get("user_id") != current_user.id and not current_user.is_admin:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied to this document"
+            )
+
+        extracted_data = document.get("extracted_data") or {}
+        if field not in extracted_data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Field {field} not extracted from document {document_id}"
+            )
+
+        return {
+            "document_id": document_id,
+            "field": field,
+            "value": extracted_data[field],
+            "citations": await document_processor.resolve_citations(document, field)
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error resolving citations: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to resolve citations: {str(e)}"
+        )
+
+
 @app.get(
     "/api/projects/{project_id}/documents",
     tags=["Documents"]
@@ -472,6 +719,71 @@ async def list_project_documents(
         )
 
 
+# ============================================================================
+# SEARCH ENDPOINTS
+# ============================================================================
+
+@app.post(
+    "/api/search",
+    response_model=SearchResponse,
+    tags=["Search"]
+)
+async def search_projects(
+    search_request: SearchRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Semantic search across several projects
+
+    Args:
+        search_request: Query, optional project IDs and result count
+        current_user: Authenticated user
+
+    Returns:
+        Best matching chunks across the searched projects
+    """
+    try:
+        if search_request.project_ids:
+            owners = await db.get_project_owners(search_request.project_ids)
+            missing = set(search_request.project_ids) - set(owners)
+            if missing:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Projects not found: {', '.join(sorted(missing))}"
+                )
+            if not current_user.is_admin and any(
+                owner != current_user.id for owner in owners.values()
+            ):
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Access denied to one or more projects"
+                )
+            project_ids = list(owners)
+        else:
+            project_ids = await db.list_project_ids(current_user.id)
+
+        results = await namespace_manager.search(
+            project_ids,
+            search_request.query,
+            top_k=search_request.top_k
+        )
+
+        return SearchResponse(
+            query=search_request.query,
+            projects_searched=len(project_ids),
+            results=results
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error searching projects: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to search projects: {str(e)}"
+        )
+
+
 # ============================================================================
 # ANALYSIS ENDPOINTS
 # ============================================================================
@@ -522,7 +834,7 @@ async def analyze_project(
         logger.info(f"Starting comprehensive analysis for project {project_id}")
 
         # Get all project documents
-        documents = await db.list_project_documents(project_id)
+        documents = await db.list_project_documents(project_id, include_series=True)
 
         if not documents:
             raise HTTPException(
@@ -751,7 +1063,8 @@ async def run_compliance_check(
         compliance_results = await compliance_checker.check_standards(
             project_id=project_id,
             documents=documents,
-            standards=check_request.standards
+            standards=check_request.standards,
+            force=check_request.force
         )
 
         # Save compliance check to database
@@ -816,6 +1129,398 @@ async def list_compliance_checks(
         )
 
 
+@app.get(
+    "/api/projects/{project_id}/compliance-checks/{check_id}/report",
+    tags=["Compliance"]
+)
+async def download_compliance_report(
+    project_id: str,
+    check_id: str,
+    report_format: str = "markdown",
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Download the report of a compliance check (markdown or HTML)
+
+    The report is streamed while it is rendered and stored on first
+    download; later downloads are streamed from storage. The HTML report
+    carries print styles for saving as PDF.
+
+    Args:
+        project_id: Project ID
+        check_id: Compliance check ID
+        report_format: markdown or html
+        current_user: Authenticated user
+
+    Returns:
+        Streamed report
+    """
+    if report_format not in REPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported report format: {report_format}"
+        )
+
+    try:
+        # Verify project access
+        project = await db.get_project(project_id)
+        if not project:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Project {project_id} not found"
+            )
+
+        if project.get("user_id") != current_user.id and not current_user.is_admin:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied to this project"
+            )
+
+        check = await db.get_compliance_check(check_id)
+        if not check or str(check["project_id"]) != str(project_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Compliance check {check_id} not found"
+            )
+
+        stored, chunks = await compliance_reports.open(
+            project_id,
+            check,
+            report_format=report_format,
+            user_id=current_user.id
+        )
+        media_type, extension = REPORT_FORMATS[report_format]
+        return StreamingResponse(
+            chunks,
+            media_type=media_type,
+            headers={
+                "Content-Disposition": (
+                    f'attachment; filename="compliance-report-{check_id}.{extension}"'
+                ),
+                "X-Report-Source": "stored" if stored else "rendered"
+            }
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating compliance report: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to generate compliance report: {str(e)}"
+        )
+
+
+@app.post(
+    "/api/compliance/screenings",
+    status_code=status.HTTP_202_ACCEPTED,
+    tags=["Compliance"]
+)
+async def start_compliance_screening(
+    screening_request: ComplianceScreeningRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Screen a portfolio of projects against one standard
+
+    Projects are checked with embedding evidence and rules first; the
+    most uncertain are escalated to an LLM review within the request's
+    budget. Results are saved per project as they complete.
+
+    Args:
+        screening_request: Standard, projects (or project filters) and LLM budget
+        current_user: Authenticated user
+
+    Returns:
+        Job progress; follow it at /api/compliance/screenings/{job_id}
+    """
+    if screening_request.standard not in compliance_checker.standards:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown standard: {screening_request.standard}"
+        )
+
+    try:
+        filters = {
+            key: value for key, value in {
+                "country": screening_request.country,
+                "sector": screening_request.sector
+            }.items() if value
+        }
+        job = await compliance_screener.start(
+            screening_request.standard,
+            user_id=current_user.id,
+            is_admin=current_user.is_admin,
+            project_ids=screening_request.project_ids,
+            filters=filters,
+            llm_budget=screening_request.llm_budget
+        )
+        return job.progress()
+
+    except Exception as e:
+        logger.error(f"Error starting compliance screening: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to start compliance screening: {str(e)}"
+        )
+
+
+def _get_accessible_screening(job_id: str, current_user: User) -> ScreeningJob:
+    """Look up a screening job, enforcing ownership"""
+    job = compliance_screener.get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Screening job {job_id} not found"
+        )
+
+    if job.created_by != current_user.id and not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+
+    return job
+
+
+@app.get(
+    "/api/compliance/screenings/{job_id}",
+    tags=["Compliance"]
+)
+async def get_compliance_screening(
+    job_id: str,
+    status_filter: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Progress and per-project results of a screening job
+
+    Args:
+        job_id: Screening job ID
+        status_filter: Only return projects with this status (e.g. non_compliant)
+        current_user: Authenticated user
+
+    Returns:
+        Progress, throughput and results, failing projects first
+    """
+    return _get_accessible_screening(job_id, current_user).report(status_filter)
+
+
+@app.get(
+    "/api/compliance/screenings/{job_id}/events",
+    tags=["Compliance"]
+)
+async def stream_compliance_screening(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream a screening job's results and progress (Server-Sent Events)
+
+    Emits one ``result`` event per project as it is screened or
+    escalated, ``progress`` events with throughput, and ``done``.
+    """
+    job = _get_accessible_screening(job_id, current_user)
+    return _event_stream_response(stream_screening_events(job))
+
+
+# ============================================================================
+# ESG SCORING ENDPOINTS
+# ============================================================================
+
+@app.post(
+    "/api/esg/scores",
+    tags=["ESG"]
+)
+async def score_esg_portfolio(
+    scoring_request: ESGScoringRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Score projects on E/S/G indicators and store the scores
+
+    Each project is scored on the requirements of the GRI, SASB, TCFD and
+    CDP frameworks found in its documents or met in earlier compliance
+    checks, weighted per pillar. The whole portfolio is scored at once.
+
+    Args:
+        scoring_request: Projects (or project filters) to score
+        current_user: Authenticated user
+
+    Returns:
+        Projects ranked by overall score, with pillar and framework scores
+    """
+    try:
+        project_ids = scoring_request.project_ids
+        if project_ids is None:
+            filters = {
+                key: value for key, value in {
+                    "country": scoring_request.country,
+                    "sector": scoring_request.sector
+                }.items() if value
+            }
+            projects = await db.list_projects(
+                user_id=current_user.id,
+                filters=filters,
+                limit=esg_scoring.max_projects
+            )
+            project_ids = [str(p["id"]) for p in projects]
+        else:
+            owners = await db.get_project_owners(project_ids)
+            missing = [p for p in project_ids if p not in owners]
+            if missing:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Projects not found: {', '.join(missing[:10])}"
+                )
+            if not current_user.is_admin and any(
+                owner != current_user.id for owner in owners.values()
+            ):
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Access denied"
+                )
+
+        scored = await esg_scoring.score_portfolio(project_ids)
+        if scoring_request.top:
+            scored["results"] = scored["results"][:scoring_request.top]
+        return scored
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error scoring ESG portfolio: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to score ESG portfolio: {str(e)}"
+        )
+
+
+@app.get(
+    "/api/esg/scores",
+    tags=["ESG"]
+)
+async def list_esg_scores(
+    sort_by: str = "overall",
+    min_overall: Optional[float] = None,
+    min_environmental: Optional[float] = None,
+    min_social: Optional[float] = None,
+    min_governance: Optional[float] = None,
+    country: Optional[str] = None,
+    sector: Optional[str] = None,
+    limit: int = 50,
+    offset: int = 0,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Ranking of stored ESG scores
+
+    Args:
+        sort_by: overall, environmental, social or governance
+        min_overall: Minimum overall score (0-100)
+        min_environmental: Minimum environmental score
+        min_social: Minimum social score
+        min_governance: Minimum governance score
+        country: Project country
+        sector: Project sector
+        limit: Maximum results
+        offset: Pagination offset
+        current_user: Authenticated user
+
+    Returns:
+        Scored projects, best first (all projects for admins)
+    """
+    sort_column = f"{sort_by}_score"
+    if sort_column not in ESG_SCORE_COLUMNS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"sort_by must be one of: overall, {', '.join(PILLARS)}"
+        )
+
+    try:
+        scores = await db.list_esg_scores(
+            user_id=None if current_user.is_admin else current_user.id,
+            filters={
+                "min_overall": min_overall,
+                "min_environmental": min_environmental,
+                "min_social": min_social,
+                "min_governance": min_governance,
+                "country": country,
+                "sector": sector
+            },
+            sort_by=sort_column,
+            limit=limit,
+            offset=offset
+        )
+        return {"sort_by": sort_by, "count": len(scores), "scores": scores}
+
+    except Exception as e:
+        logger.error(f"Error listing ESG scores: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to list ESG scores: {str(e)}"
+        )
+
+
+@app.get(
+    "/api/esg/model",
+    tags=["ESG"]
+)
+async def get_esg_model(current_user: User = Depends(get_current_user)):
+    """ESG indicators, their pillars and weights"""
+    return esg_scoring.describe()
+
+
+@app.get(
+    "/api/projects/{project_id}/esg-score",
+    tags=["ESG"]
+)
+async def get_project_esg_score(
+    project_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stored ESG score of a project
+
+    Args:
+        project_id: Project UUID
+        current_user: Authenticated user
+
+    Returns:
+        Overall, pillar and framework scores
+    """
+    try:
+        project = await db.get_project(project_id)
+        if not project:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Project {project_id} not found"
+            )
+
+        if project.get("user_id") != current_user.id and not current_user.is_admin:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied to this project"
+            )
+
+        score = await db.get_esg_score(project_id)
+        if not score:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Project {project_id} has not been scored"
+            )
+        return score
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting ESG score: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get ESG score: {str(e)}"
+        )
+
+
 # ============================================================================
 # RISK ASSESSMENT ENDPOINTS
 # ============================================================================
@@ -942,6 +1647,10 @@ async def startup_event():
     logger.info("Starting InfraFlow AI API...")
     await db.connect()
     logger.info("Database connected")
+    document_processor.db = db
+    compliance_checker.db = db
+    ingestion_workers.start()
+    namespace_manager.start()
     logger.info("InfraFlow AI API is ready")
 
 
@@ -949,6 +1658,11 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Shutting down InfraFlow AI API...")
+    await ingestion_workers.stop()
+    await namespace_manager.stop()
+    await compliance_screener.stop()
+    await get_llm_gateway().close()
+    shutdown_pdf_parser()
     await db.disconnect()
     logger.info("Database disconnected")
 
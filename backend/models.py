@@ -183,6 +183,8 @@ class DocumentUploadResponse(BaseModel):
     status: str
     url: Optional[str] = None
     extracted_data: Optional[Dict[str, Any]] = None
+    job_id: Optional[str] = None
+    batch_id: Optional[str] = None
     message: str
 
     class Config:
@@ -362,6 +364,7 @@ class FinancialModelResponse(BaseModel):
 class ComplianceCheckRequest(BaseModel):
     """Request model for compliance checking"""
     standards: List[ComplianceStandard] = Field(..., min_items=1, description="Compliance standards to check")
+    force: bool = Field(False, description="Recompute results cached for the current documents")
 
     class Config:
         json_schema_extra = {
@@ -416,6 +419,43 @@ class ComplianceCheckResponse(BaseModel):
         }
 
 
+class ComplianceScreeningRequest(BaseModel):
+    """Request model for portfolio-wide compliance screening"""
+    standard: str = Field(..., description="Standard code to screen against (see /api/system/standards)")
+    project_ids: Optional[List[str]] = Field(None, description="Projects to screen; defaults to the user's projects")
+    country: Optional[str] = Field(None, description="Filter the user's projects by country")
+    sector: Optional[str] = Field(None, description="Filter the user's projects by sector")
+    llm_budget: Optional[int] = Field(None, ge=0, description="Projects that may be escalated to an LLM review")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "standard": "ifc_performance",
+                "sector": "renewable_energy",
+                "llm_budget": 25
+            }
+        }
+
+
+# ============================================================================
+# ESG SCORING MODELS
+# ============================================================================
+
+class ESGScoringRequest(BaseModel):
+    """Request model for scoring a portfolio on ESG indicators"""
+    project_ids: Optional[List[str]] = Field(None, description="Projects to score; defaults to the user's projects")
+    country: Optional[str] = Field(None, description="Filter the user's projects by country")
+    sector: Optional[str] = Field(None, description="Filter the user's projects by sector")
+    top: Optional[int] = Field(None, ge=1, description="Only return the best ranked projects (all are stored)")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "sector": "renewable_energy",
+                "top": 20
+            }
+        }
+
 # ============================================================================
 # RISK ASSESSMENT MODELS
 # ============================================================================
@@ -471,6 +511,43 @@ class RiskAssessmentResponse(BaseModel):
         }
 
 
+# ============================================================================
+# SEARCH MODELS
+# ============================================================================
+
+class SearchRequest(BaseModel):
+    """Request model for cross-project semantic search"""
+    query: str = Field(..., min_length=1, max_length=1000)
+    project_ids: Optional[List[str]] = Field(None, description="Projects to search; all of the user's projects if omitted")
+    top_k: int = Field(10, ge=1, le=100)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "query": "involuntary resettlement of affected households",
+                "top_k": 10
+            }
+        }
+
+
+class SearchResult(BaseModel):
+    """Single cross-project search hit"""
+    project_id: str
+    filename: str
+    chunk_index: int
+    text: str
+    score: float
+    vector_score: Optional[float] = None
+    bm25_score: Optional[float] = None
+
+
+class SearchResponse(BaseModel):
+    """Response model for cross-project search"""
+    query: str
+    projects_searched: int
+    results: List[SearchResult]
+
+
 # ============================================================================
 # ERROR MODELS
 # ============================================================================
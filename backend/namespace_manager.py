@@ -0,0 +1,243 @@
+"""
+InfraFlow AI - Namespace Manager
+Per-project vector namespaces, cross-project search and orphan cleanup
+"""
+
+from typing import Dict, Any, List, Optional, Set
+import os
+import uuid
+import heapq
+import logging
+import asyncio
+
+from database import Database
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE_PREFIX = "project_"
+
+
+def project_namespace(project_id: str) -> str:
+    """Vector and chunk store namespace of a project"""
+    return f"{NAMESPACE_PREFIX}{project_id}"
+
+
+def namespace_project_id(namespace: str) -> Optional[str]:
+    """Project ID of a project namespace, or None for other namespaces"""
+    if not namespace.startswith(NAMESPACE_PREFIX):
+        return None
+    project_id = namespace[len(NAMESPACE_PREFIX):]
+    try:
+        uuid.UUID(project_id)
+    except ValueError:
+        return None
+    return project_id
+
+
+def _merge_key(result: Dict[str, Any]) -> tuple:
+    """
+    Ranking key for results from different namespaces
+
+    Fused and re-ranked scores are normalized per namespace, so only the
+    cosine similarity is comparable across projects; the per-namespace
+    score breaks ties and orders keyword-only hits.
+    """
+    vector_score = result.get("vector_score")
+    return (
+        vector_score if vector_score is not None else -1.0,
+        result.get("rerank_score", result.get("score", 0.0))
+    )
+
+
+class NamespaceManager:
+    """
+    Owns the lifecycle of per-project namespaces
+
+    Each project keeps its vectors in its own namespace (``project_<id>``)
+    in both the vector store and the BM25 chunk store. The manager
+
+    - searches many projects at once: the query is embedded once, the
+      per-project hybrid searches run concurrently under a semaphore, and
+      the per-project top-k lists are merged with a heap
+    - deletes a project's namespaces when the project is deleted
+    - periodically removes namespaces whose project no longer exists
+      (e.g. a cascade delete that failed half-way, or rows deleted
+      directly in the database)
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        processor: Any,
+        search_concurrency: Optional[int] = None,
+        reconcile_interval: Optional[float] = None
+    ):
+        """
+        Initialize namespace manager
+
+        Args:
+            db: Connected database
+            processor: DocumentProcessor owning the vector and chunk stores
+            search_concurrency: Namespaces searched at once
+                (NAMESPACE_SEARCH_CONCURRENCY)
+            reconcile_interval: Seconds between orphan reconciliation
+                passes; 0 disables the background reconciler
+                (NAMESPACE_RECONCILE_INTERVAL)
+        """
+        self.db = db
+        self.processor = processor
+        self.search_concurrency = search_concurrency or int(
+            os.getenv("NAMESPACE_SEARCH_CONCURRENCY", "8")
+        )
+        self.reconcile_interval = (
+            reconcile_interval if reconcile_interval is not None
+            else float(os.getenv("NAMESPACE_RECONCILE_INTERVAL", "3600"))
+        )
+        self._task: Optional[asyncio.Task] = None
+        # Namespaces found orphaned by the previous pass
+        self._suspects: Set[str] = set()
+
+    # ========================================================================
+    # CROSS-PROJECT SEARCH
+    # ========================================================================
+
+    async def search(
+        self,
+        project_ids: List[str],
+        query: str,
+        top_k: int = 10,
+        per_project_k: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Hybrid search across several projects
+
+        Args:
+            project_ids: Projects to search (already access-checked)
+            query: Search query
+            top_k: Number of results to return
+            per_project_k: Results taken from each project before merging
+
+        Returns:
+            Result dicts as returned by DocumentProcessor
+            .query_project_documents, each with its project_id, best first
+        """
+        if not project_ids:
+            return []
+
+        per_project_k = per_project_k or top_k
+        query_vector = None
+        if self.processor.embeddings and self.processor.vector_store:
+            try:
+                query_vector = await self.processor.embed_query(query)
+            except Exception as e:
+                logger.error(f"Error embedding cross-project query: {str(e)}")
+
+        semaphore = asyncio.Semaphore(self.search_concurrency)
+
+        async def search_project(project_id: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                results = await self.processor.query_project_documents(
+                    project_id,
+                    query,
+                    top_k=per_project_k,
+                    query_vector=query_vector
+                )
+            for result in results:
+                result["project_id"] = project_id
+            return sorted(results, key=_merge_key, reverse=True)
+
+        per_project = await asyncio.gather(*(search_project(p) for p in project_ids))
+
+        # Each list is sorted, so a k-way heap merge stops after top_k pops
+        merged = heapq.merge(*per_project, key=_merge_key, reverse=True)
+        results = [result for _, result in zip(range(top_k), merged)]
+
+        logger.info(
+            f"Cross-project search over {len(project_ids)} projects "
+            f"returned {len(results)} results"
+        )
+        return results
+
+    # ========================================================================
+    # DELETION AND RECONCILIATION
+    # ========================================================================
+
+    async def delete_project_namespaces(self, project_id: str):
+        """
+        Delete every vector and chunk stored for a project
+
+        Args:
+            project_id: Project UUID
+        """
+        namespace = project_namespace(project_id)
+        try:
+            if self.processor.vector_store:
+                await self.processor.vector_store.delete(namespace, delete_all=True)
+            await self.processor.retriever.delete_chunks(namespace)
+        finally:
+            self.processor.search_cache.invalidate(namespace)
+            self.processor.facts.invalidate(project_id)
+        self._suspects.discard(namespace)
+        logger.info(f"Deleted namespace {namespace}")
+
+    async def list_project_namespaces(self) -> Set[str]:
+        """Project namespaces present in the vector or chunk store"""
+        namespaces = set(await self.processor.retriever.list_namespaces())
+        if self.processor.vector_store:
+            namespaces.update(await self.processor.vector_store.list_namespaces())
+        return {ns for ns in namespaces if namespace_project_id(ns)}
+
+    async def reconcile(self) -> Dict[str, Any]:
+        """
+        Delete namespaces whose project no longer exists
+
+        A namespace is only deleted when it is found orphaned by two
+        consecutive passes, so a project being created concurrently is
+        never touched.
+
+        Returns:
+            Dict with scanned, orphaned and deleted namespace counts
+        """
+        namespaces = await self.list_project_namespaces()
+        existing = await self.db.get_project_owners(
+            [namespace_project_id(ns) for ns in namespaces]
+        )
+        orphaned = {ns for ns in namespaces if namespace_project_id(ns) not in existing}
+
+        confirmed = orphaned & self._suspects
+        failed = set()
+        for namespace in confirmed:
+            try:
+                await self.delete_project_namespaces(namespace_project_id(namespace))
+            except Exception as e:
+                logger.error(f"Error deleting orphaned namespace {namespace}: {str(e)}")
+                failed.add(namespace)
+        deleted = len(confirmed) - len(failed)
+        self._suspects = (orphaned - confirmed) | failed
+
+        if orphaned:
+            logger.info(
+                f"Namespace reconciliation: {len(orphaned)} orphaned of "
+                f"{len(namespaces)}, {deleted} deleted"
+            )
+        return {"scanned": len(namespaces), "orphaned": len(orphaned), "deleted": deleted}
+
+    def start(self):
+        """Start the background reconciler on the running event loop"""
+        if self.reconcile_interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._reconcile_loop())
+
+    async def stop(self):
+        """Stop the background reconciler"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _reconcile_loop(self):
+        while True:
+            await asyncio.sleep(self.reconcile_interval)
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Error reconciling namespaces: {str(e)}")
@@ -0,0 +1,303 @@
+"""
+InfraFlow AI - Project Facts
+Consolidated, memoized fact sheet of a project's extracted document data
+"""
+
+from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+import os
+import json
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def document_set_version(documents: List[Dict[str, Any]], with_series: bool = True) -> str:
+    """
+    Version of a set of documents
+
+    Changes whenever a document is added, removed or revised, without
+    reading any extracted data.
+
+    Args:
+        documents: Project document rows
+        with_series: Whether rows listed with and without attached
+            ``financial_series`` get different versions
+
+    Returns:
+        Hex digest of the documents' ids, revisions and update times
+    """
+    sha = hashlib.sha256()
+    for key in sorted(
+        (
+            str(doc.get("id")),
+            str(doc.get("revision")),
+            str(doc.get("updated_at")),
+            with_series and "financial_series" in doc
+        )
+        for doc in documents
+    ):
+        sha.update(repr(key).encode())
+    return sha.hexdigest()
+
+
+def document_versions(documents: List[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Revision marker of each document in a set
+
+    Args:
+        documents: Project document rows
+
+    Returns:
+        Mapping of document id to "revision:updated_at"
+    """
+    return {
+        str(doc.get("id")): f"{doc.get('revision')}:{doc.get('updated_at')}"
+        for doc in documents
+    }
+
+
+def changed_documents(previous: Dict[str, str], current: Dict[str, str]) -> List[str]:
+    """
+    Documents added, revised or removed between two document sets
+
+    Args:
+        previous: ``document_versions`` of the earlier set
+        current: ``document_versions`` of the later set
+
+    Returns:
+        Sorted ids of the documents that differ
+    """
+    return sorted(
+        doc_id for doc_id in set(previous) | set(current)
+        if previous.get(doc_id) != current.get(doc_id)
+    )
+
+
+def _extracted(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Extracted data of a document row, decoding raw JSONB text"""
+    extracted = doc.get("extracted_data") or {}
+    if isinstance(extracted, str):
+        try:
+            extracted = json.loads(extracted)
+        except json.JSONDecodeError:
+            return {}
+    return extracted if isinstance(extracted, dict) else {}
+
+
+def build_fact_sheet(documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Consolidate a project's documents in a single pass
+
+    Args:
+        documents: Project document rows, newest first (``financial_series``
+            attached when the caller needs spreadsheet series)
+
+    Returns:
+        Dict with:
+        - merged: every document's extracted_data merged in row order
+        - extracted: non-empty extracted_data of each document
+        - compliance_data: consolidated data for compliance checks
+        - fact_sources: ids of the documents that supplied each top-level
+          compliance_data field
+        - financial_data: investment, structure, capacity and series
+        - risk_factors: risk factors of all documents
+        - stakeholders, technologies, total_investment, document_types,
+          total_documents, processed_documents, data_sources
+    """
+    merged: Dict[str, Any] = {}
+    extracted_list = []
+    stakeholders = []
+    technologies = []
+    risk_factors = []
+    total_investment = None
+    document_types: Dict[str, int] = {}
+    data_sources = []
+
+    compliance_data: Dict[str, Any] = {
+        "documents_available": [],
+        "stakeholders": [],
+        "environmental_data": {},
+        "social_data": {},
+        "governance_data": {}
+    }
+    financial_data: Dict[str, Any] = {}
+    fact_sources: Dict[str, List[str]] = {}
+
+    def supplied(field: str, doc_id: str):
+        sources = fact_sources.setdefault(field, [])
+        if doc_id not in sources:
+            sources.append(doc_id)
+
+    for doc in documents:
+        doc_id = str(doc.get("id"))
+        doc_type = doc.get("type", "unknown")
+        document_types[doc_type] = document_types.get(doc_type, 0) + 1
+        compliance_data["documents_available"].append({
+            "name": doc.get("name"),
+            "type": doc.get("type")
+        })
+        supplied("documents_available", doc_id)
+
+        # Exact time series from spreadsheet financial models, newest first
+        for name, series in (doc.get("financial_series") or {}).items():
+            financial_data.setdefault("series", {}).setdefault(name, series)
+
+        extracted = _extracted(doc)
+        if not extracted:
+            continue
+        extracted_list.append(extracted)
+        data_sources.append(doc.get("name"))
+
+        if extracted.get("stakeholders"):
+            stakeholders.extend(extracted["stakeholders"])
+            compliance_data["stakeholders"].extend(extracted["stakeholders"])
+            supplied("stakeholders", doc_id)
+        if extracted.get("technology") and extracted["technology"] not in technologies:
+            technologies.append(extracted["technology"])
+        if extracted.get("total_investment") and total_investment is None:
+            total_investment = extracted["total_investment"]
+        if extracted.get("risk_factors"):
+            risk_factors.extend(extracted["risk_factors"])
+
+        if extracted.get("environmental_impact"):
+            compliance_data["environmental_data"].update({
+                "impact_assessment": extracted["environmental_impact"]
+            })
+            supplied("environmental_data", doc_id)
+        if extracted.get("risk_factors"):
+            compliance_data["risk_factors"] = extracted["risk_factors"]
+            supplied("risk_factors", doc_id)
+        for key in ["financial_structure", "project_name", "location", "technology", "capacity"]:
+            if extracted.get(key):
+                compliance_data[key] = extracted[key]
+                supplied(key, doc_id)
+
+        for key in ["total_investment", "financial_structure", "capacity"]:
+            if extracted.get(key):
+                financial_data[key] = extracted[key]
+
+    for extracted in extracted_list:
+        merged.update(extracted)
+
+    # Deduplicate stakeholders, keeping first-seen order
+    stakeholders = list(dict.fromkeys(stakeholders))
+    compliance_data["stakeholders"] = list(dict.fromkeys(compliance_data["stakeholders"]))
+
+    return {
+        "merged": merged,
+        "extracted": extracted_list,
+        "compliance_data": compliance_data,
+        "fact_sources": fact_sources,
+        "financial_data": financial_data,
+        "risk_factors": risk_factors,
+        "stakeholders": stakeholders,
+        "technologies": technologies,
+        "total_investment": total_investment,
+        "document_types": document_types,
+        "total_documents": len(documents),
+        "processed_documents": sum(1 for d in documents if d.get("processed")),
+        "data_sources": data_sources
+    }
+
+
+class FactSheetCache:
+    """
+    LRU of project fact sheets keyed by document-set version
+
+    Analysis runs the summary, financial, compliance and risk passes
+    concurrently over the same documents; each reads the fact sheet
+    built by whichever asks first. Sheets are shared between callers
+    and must be treated as read-only.
+
+    The version key already changes when documents are added or revised,
+    including by other processes; ``invalidate`` additionally frees a
+    project's sheets as soon as this process writes to it.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        """
+        Initialize cache
+
+        Args:
+            max_entries: Fact sheets kept (FACT_SHEET_CACHE_SIZE); 0 disables caching
+        """
+        self.max_entries = (
+            max_entries if max_entries is not None
+            else int(os.getenv("FACT_SHEET_CACHE_SIZE", "256"))
+        )
+        self._lock = threading.Lock()
+        self._sheets: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._project_keys: Dict[str, set] = {}
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def get(
+        self,
+        documents: List[Dict[str, Any]],
+        project_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Fact sheet of a document set, built on first use
+
+        Args:
+            documents: Project document rows
+            project_id: Project the documents belong to (read from the
+                rows when omitted)
+
+        Returns:
+            Fact sheet (see ``build_fact_sheet``)
+        """
+        if project_id is None and documents:
+            project_id = documents[0].get("project_id")
+        project_key = str(project_id) if project_id is not None else ""
+        key = f"{project_key}:{document_set_version(documents)}"
+
+        with self._lock:
+            sheet = self._sheets.get(key)
+            if sheet is not None:
+                self._sheets.move_to_end(key)
+                self._stats["hits"] += 1
+                return sheet
+            self._stats["misses"] += 1
+
+        sheet = build_fact_sheet(documents)
+        if self.max_entries <= 0:
+            return sheet
+
+        with self._lock:
+            self._sheets[key] = sheet
+            self._project_keys.setdefault(project_key, set()).add(key)
+            while len(self._sheets) > self.max_entries:
+                evicted, _ = self._sheets.popitem(last=False)
+                owner = evicted.split(":", 1)[0]
+                self._project_keys.get(owner, set()).discard(evicted)
+        return sheet
+
+    def invalidate(self, project_id: str):
+        """Drop the fact sheets of a project after a document write"""
+        with self._lock:
+            for key in self._project_keys.pop(str(project_id), set()):
+                self._sheets.pop(key, None)
+            self._stats["invalidations"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._sheets)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+_cache: Optional[FactSheetCache] = None
+
+
+def get_fact_sheet_cache() -> FactSheetCache:
+    """Get the process-wide fact sheet cache"""
+    global _cache
+    if _cache is None:
+        _cache = FactSheetCache()
+    return _cache
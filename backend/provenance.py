@@ -0,0 +1,193 @@
+"""
+InfraFlow AI - Provenance
+Attribution of extracted facts to source chunks and page snippets
+"""
+
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+import re
+
+from retrieval import tokenize
+
+# Citations kept per field, and characters of context around a match
+MAX_REFS_PER_FIELD = 3
+SNIPPET_CHARS = 160
+
+# Token overlap needed to attribute a paraphrased value to a chunk
+MIN_TOKEN_OVERLAP = 0.6
+
+_DIGIT_COMMA = re.compile(r"(?<=\d),(?=\d{3})")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    """Lowercase, collapse whitespace and drop thousands separators"""
+    return _WHITESPACE.sub(" ", _DIGIT_COMMA.sub("", text)).lower().strip()
+
+
+def _value_strings(value: Any) -> List[str]:
+    """Searchable strings of an extracted value"""
+    if value is None or isinstance(value, bool):
+        return []
+    if isinstance(value, (int, float)):
+        number = int(value) if float(value).is_integer() else value
+        strings = [str(number)]
+        # Large amounts are usually written in millions or billions
+        for divisor in (1e9, 1e6):
+            if abs(value) >= divisor:
+                strings.append(f"{value / divisor:g}")
+                break
+        return strings
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    if isinstance(value, list):
+        return [s for item in value for s in _value_strings(item)]
+    if isinstance(value, dict):
+        return [s for item in value.values() for s in _value_strings(item)]
+    return []
+
+
+def _match_score(needle: str, text: str, text_tokens: set) -> float:
+    """1.0 for a verbatim match, else the share of the value's tokens present"""
+    normalized = _normalize(needle)
+    if not normalized:
+        return 0.0
+    if normalized in text:
+        return 1.0
+    tokens = set(tokenize(needle))
+    if len(tokens) < 3:
+        return 0.0
+    return len(tokens & text_tokens) / len(tokens)
+
+
+def attribute_fields(
+    extracted: Dict[str, Any],
+    chunks: Iterable[Tuple[str, str]]
+) -> Dict[str, List[str]]:
+    """
+    Link each extracted field to the chunks it was most likely read from
+
+    Values are matched verbatim (case, whitespace and thousands separators
+    ignored); longer values the model paraphrased are matched by token
+    overlap. Only the chunks that were sent to the model are considered.
+
+    Args:
+        extracted: Extracted field values
+        chunks: (chunk id, text) pairs given to the extraction prompt
+
+    Returns:
+        Mapping of field name to chunk ids, best match first
+    """
+    prepared = [
+        (chunk_id, _normalize(text), set(tokenize(text)))
+        for chunk_id, text in chunks
+    ]
+    provenance = {}
+
+    for field, value in (extracted or {}).items():
+        needles = _value_strings(value)
+        if not needles:
+            continue
+
+        scores: Dict[str, float] = {}
+        for chunk_id, text, tokens in prepared:
+            best = max(_match_score(needle, text, tokens) for needle in needles)
+            if best >= MIN_TOKEN_OVERLAP:
+                scores[chunk_id] = best
+
+        if scores:
+            ranked = sorted(scores, key=lambda chunk_id: -scores[chunk_id])
+            provenance[field] = ranked[:MAX_REFS_PER_FIELD]
+
+    return provenance
+
+
+def merge_provenance(
+    previous: Optional[Dict[str, List[str]]],
+    update: Dict[str, List[str]],
+    removed_ids: Iterable[str],
+    extracted: Optional[Dict[str, Any]] = None
+) -> Dict[str, List[str]]:
+    """
+    Merge provenance of a revision into that of the previous revision
+
+    References to chunks removed by the revision are dropped. Scalar
+    fields attributed in the update take its references; list fields,
+    whose values are unioned across revisions, keep both.
+
+    Args:
+        previous: Provenance of the previous revision
+        update: Provenance of the changed chunks
+        removed_ids: Chunk ids removed by the revision
+        extracted: Merged extracted data, to tell list fields apart
+    """
+    removed = set(removed_ids)
+    merged = {}
+    for field, refs in (previous or {}).items():
+        kept = [ref for ref in refs if ref not in removed]
+        if kept:
+            merged[field] = kept
+
+    for field, refs in update.items():
+        if isinstance((extracted or {}).get(field), list):
+            refs = refs + [ref for ref in merged.get(field, []) if ref not in refs]
+        merged[field] = refs
+    return merged
+
+
+def locate(text: str, value: Any) -> Optional[Tuple[int, int]]:
+    """
+    Character range of a value inside a chunk
+
+    Returns:
+        (start, end) offsets in ``text``, or None if the value is not found
+    """
+    lowered = text.lower()
+    for needle in _value_strings(value):
+        needle = needle.lower().strip()
+        position = lowered.find(needle)
+        if position >= 0:
+            return position, position + len(needle)
+
+        # Fall back to the longest token of the value present in the text
+        for token in sorted(set(tokenize(needle)), key=len, reverse=True):
+            if len(token) <= 3:
+                break
+            match = re.search(rf"\b{re.escape(token)}", lowered)
+            if match:
+                return match.start(), match.start() + len(token)
+    return None
+
+
+def build_citation(chunk_id: str, chunk: Dict[str, Any], value: Any) -> Dict[str, Any]:
+    """
+    Page citation of a value within a stored chunk
+
+    Args:
+        chunk_id: Chunk id
+        chunk: Chunk from the chunk store (text, filename, page, char range)
+        value: Extracted value to highlight
+
+    Returns:
+        Dict with chunk_id, filename, page, char_start, char_end and a
+        snippet around the value; offsets are relative to the page text
+    """
+    text = chunk["text"]
+    span = locate(text, value)
+    if span:
+        start = max(0, span[0] - SNIPPET_CHARS)
+        end = min(len(text), span[1] + SNIPPET_CHARS)
+    else:
+        start, end = 0, min(len(text), 2 * SNIPPET_CHARS)
+
+    chunk_start = chunk.get("char_start")
+    return {
+        "chunk_id": chunk_id,
+        "filename": chunk.get("filename"),
+        "chunk_index": chunk.get("chunk_index"),
+        "page": chunk.get("page"),
+        "sheet": chunk.get("metadata", {}).get("sheet"),
+        "char_start": chunk_start + start if chunk_start is not None else None,
+        "char_end": chunk_start + end if chunk_start is not None else None,
+        "snippet": text[start:end].strip(),
+        "exact": span is not None
+    }
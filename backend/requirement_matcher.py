@@ -0,0 +1,244 @@
+"""
+InfraFlow AI - Requirement Matcher
+Compiled multi-pattern matching of compliance requirements in project text
+"""
+
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+from collections import deque
+import re
+
+from retrieval import TOKEN_PATTERN, STOPWORDS
+
+# Alternative wordings of common requirements. Keys are matched after
+# normalization (see ``phrase_key``), so case, stopwords and plurals do not matter.
+SYNONYMS: Dict[str, List[str]] = {
+    "Environmental and Social Impact Assessment": [
+        "environmental impact assessment", "EIA", "environmental and social assessment"
+    ],
+    "Environmental and Social Management System": ["ESMS", "environmental management system"],
+    "Environmental and Social Management Plan": ["ESMP", "environmental management plan"],
+    "Stakeholder Engagement Plan": ["stakeholder engagement programme", "public consultation plan"],
+    "Stakeholder Engagement": ["public consultation", "community consultation"],
+    "Stakeholder engagement process": ["public consultation", "community consultation"],
+    "Grievance Mechanism": [
+        "grievance redress mechanism", "complaints mechanism", "grievance procedure"
+    ],
+    "Disclosure of project information": ["information disclosure", "public disclosure"],
+    "Do No Significant Harm to other objectives": ["do no significant harm"],
+    "Minimum Social Safeguards": ["social safeguards"],
+    "Independent environmental and social consultant": [
+        "independent E&S consultant", "independent environmental consultant"
+    ],
+    "Carbon footprint disclosure": [
+        "GHG emissions disclosure", "greenhouse gas emissions", "carbon emissions"
+    ],
+    "Anti-corruption measures": ["anti-bribery", "anti-corruption policy"],
+    "Board independence": ["independent directors", "independent board"],
+    "Local employment targets": ["local hiring", "local workforce"],
+    "Local supplier engagement": ["local procurement", "local suppliers"],
+    "Training and capacity building": ["skills transfer", "capacity building"],
+    "Community benefit agreements": ["community development agreement", "benefit sharing"],
+    "Monitoring and Review": ["monitoring and evaluation", "monitoring and reporting"],
+}
+
+# Parenthetical acronyms such as "(ESIA)" become variants of their phrase
+_PARENTHETICAL = re.compile(r"\(([^)]*)\)")
+_ACRONYM = re.compile(r"^[A-Z][A-Za-z&]{1,9}$")
+
+
+def stem(token: str) -> str:
+    """Light suffix stripping so plural and verb forms share a key"""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 5 and token.endswith("ing"):
+        return token[:-3]
+    if len(token) > 4 and token.endswith("ed"):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def phrase_tokens(text: str) -> List[str]:
+    """Stemmed tokens of a phrase, stopwords removed"""
+    return [
+        stem(token) for token in TOKEN_PATTERN.findall(text.lower())
+        if token not in STOPWORDS
+    ]
+
+
+def phrase_key(text: str) -> str:
+    """Canonical form of a phrase used to look up synonyms"""
+    return " ".join(phrase_tokens(text))
+
+
+def _synonym_index(synonyms: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Synonym table keyed by normalized phrase"""
+    index: Dict[str, List[str]] = {}
+    for phrase, alternatives in synonyms.items():
+        index.setdefault(phrase_key(phrase), []).extend(alternatives)
+    return index
+
+
+def phrase_variants(requirement: str, synonyms: Optional[Dict[str, List[str]]] = None) -> List[str]:
+    """
+    Phrases that count as evidence of a requirement
+
+    Args:
+        requirement: Requirement text, e.g. "Environmental and Social
+            Impact Assessment (ESIA)"
+        synonyms: Synonym table (defaults to ``SYNONYMS``)
+
+    Returns:
+        The requirement without parentheticals, acronyms given in
+        parentheses and known synonyms
+    """
+    index = _synonym_index(SYNONYMS if synonyms is None else synonyms)
+    base = _PARENTHETICAL.sub(" ", requirement).strip()
+    variants = [base]
+
+    for inner in _PARENTHETICAL.findall(requirement):
+        inner = inner.strip()
+        if _ACRONYM.match(inner) and inner.upper() == inner:
+            variants.append(inner)
+
+    variants.extend(index.get(phrase_key(base), []))
+    return variants
+
+
+class RequirementMatcher:
+    """
+    Aho-Corasick automaton over stemmed word tokens
+
+    Every variant of every requirement is compiled into one automaton, so
+    a text is scanned once regardless of how many requirements there are.
+    Matching on tokens rather than characters keeps matches on word
+    boundaries and makes them insensitive to case, punctuation, stopwords
+    and simple plurals.
+    """
+
+    def __init__(
+        self,
+        requirements: Iterable[str] = (),
+        synonyms: Optional[Dict[str, List[str]]] = None
+    ):
+        """
+        Compile requirements
+
+        Args:
+            requirements: Requirement texts
+            synonyms: Synonym table (defaults to ``SYNONYMS``)
+        """
+        # Trie: transitions, failure links and (requirement, variant, length) outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[str, str, int]]] = [[]]
+        self.requirements: List[str] = []
+
+        for requirement in requirements:
+            self.requirements.append(requirement)
+            for variant in phrase_variants(requirement, synonyms):
+                self._add(requirement, variant)
+        self._link()
+
+    def _add(self, requirement: str, variant: str):
+        tokens = phrase_tokens(variant)
+        if not tokens:
+            return
+        state = 0
+        for token in tokens:
+            following = self._goto[state].get(token)
+            if following is None:
+                following = len(self._goto)
+                self._goto[state][token] = following
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = following
+        if all(out[:2] != (requirement, variant) for out in self._out[state]):
+            self._out[state].append((requirement, variant, len(tokens)))
+
+    def _link(self):
+        """Breadth-first construction of failure links"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, following in self._goto[state].items():
+                queue.append(following)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[following] = target if target != following else 0
+                self._out[following] = self._out[following] + self._out[self._fail[following]]
+
+    def scan(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Find every requirement variant in a text
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Matches with requirement, variant, start and end character offsets
+        """
+        lowered = text.lower()
+        offsets = len(lowered) == len(text)
+        spans: List[Tuple[int, int]] = []
+        matches = []
+        state = 0
+
+        for match in TOKEN_PATTERN.finditer(lowered):
+            token = match.group()
+            if token in STOPWORDS:
+                continue
+            token = stem(token)
+            spans.append(match.span())
+
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+
+            for requirement, variant, length in self._out[state]:
+                start = spans[-length][0]
+                end = spans[-1][1]
+                matches.append({
+                    "requirement": requirement,
+                    "variant": variant,
+                    "start": start if offsets else None,
+                    "end": end if offsets else None,
+                    "text": (text if offsets else lowered)[start:end]
+                })
+        return matches
+
+    def match(self, data: Any, max_hits: int = 3) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Find requirements anywhere in (nested) project data
+
+        Args:
+            data: String, list or dict of project data
+            max_hits: Hit locations kept per requirement
+
+        Returns:
+            Mapping of matched requirement to hits, each with the field path
+            (e.g. ``environmental_data.impact_assessment``) and offsets
+        """
+        hits: Dict[str, List[Dict[str, Any]]] = {}
+        for path, text in _strings(data):
+            for found in self.scan(text):
+                found_hits = hits.setdefault(found.pop("requirement"), [])
+                if len(found_hits) < max_hits:
+                    found_hits.append({"field": path, **found})
+        return hits
+
+
+def _strings(data: Any, path: str = "") -> Iterable[Tuple[str, str]]:
+    """(field path, text) pairs of every string in nested data"""
+    if isinstance(data, str):
+        yield path, data
+    elif isinstance(data, dict):
+        for key, value in data.items():
+            yield from _strings(value, f"{path}.{key}" if path else str(key))
+    elif isinstance(data, (list, tuple)):
+        for index, value in enumerate(data):
+            yield from _strings(value, f"{path}[{index}]")
@@ -0,0 +1,541 @@
+"""
+InfraFlow AI - Hybrid Retrieval
+Local chunk store, incremental BM25 index and rank fusion for document search
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+import os
+import re
+import json
+import math
+import sqlite3
+import logging
+import asyncio
+import threading
+from collections import Counter, defaultdict
+
+logger = logging.getLogger(__name__)
+
+# Keeps figures like "4.5", "1,200" and "8%" and codes like "PS5" as single tokens
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.,][0-9]+)*%?")
+
+STOPWORDS = frozenset([
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has",
+    "in", "is", "it", "its", "of", "on", "or", "that", "the", "to", "was",
+    "were", "will", "with", "this", "which", "what", "how"
+])
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word/number tokenizer used for both indexing and queries"""
+    return [
+        token for token in TOKEN_PATTERN.findall(text.lower())
+        if token not in STOPWORDS
+    ]
+
+
+def reciprocal_rank_fusion(
+    rankings: List[List[str]],
+    k: int = 60
+) -> List[Tuple[str, float]]:
+    """
+    Fuse several ranked id lists with reciprocal rank fusion
+
+    Args:
+        rankings: Ranked lists of ids, best first
+        k: RRF damping constant
+
+    Returns:
+        (id, fused score) pairs sorted by score descending
+    """
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking):
+            scores[item_id] += 1.0 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def _location(metadata: Dict[str, Any]) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    """(page, char_start, char_end) of a chunk from its metadata"""
+    return metadata.get("page"), metadata.get("char_start"), metadata.get("char_end")
+
+
+class ChunkStore:
+    """
+    SQLite-backed store of full chunk text plus a BM25 inverted index
+
+    Chunks and postings are written together at ingest, so the lexical
+    index is always in sync with the stored text and grows incrementally.
+    """
+
+    def __init__(self, db_path: str, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize chunk store
+
+        Args:
+            db_path: SQLite database file
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalization
+        """
+        self.db_path = db_path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        """Create tables and indexes"""
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS chunks (
+                namespace TEXT NOT NULL,
+                chunk_id TEXT NOT NULL,
+                filename TEXT,
+                chunk_index INTEGER,
+                text TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                metadata TEXT,
+                page INTEGER,
+                char_start INTEGER,
+                char_end INTEGER,
+                PRIMARY KEY (namespace, chunk_id)
+            );
+
+            CREATE TABLE IF NOT EXISTS postings (
+                namespace TEXT NOT NULL,
+                term TEXT NOT NULL,
+                chunk_id TEXT NOT NULL,
+                tf INTEGER NOT NULL
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_postings_term
+                ON postings(namespace, term);
+            CREATE INDEX IF NOT EXISTS idx_postings_chunk
+                ON postings(namespace, chunk_id);
+            CREATE INDEX IF NOT EXISTS idx_chunks_filename
+                ON chunks(namespace, filename);
+        """)
+
+        # Page / character-range location columns added after the first release
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(chunks)")}
+        for column in ("page", "char_start", "char_end"):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE chunks ADD COLUMN {column} INTEGER")
+        self.conn.commit()
+
+    # ========================================================================
+    # WRITES
+    # ========================================================================
+
+    def add_chunks(self, namespace: str, chunks: List[Dict[str, Any]]):
+        """
+        Store chunks and index them for BM25
+
+        Args:
+            namespace: Namespace (one per project)
+            chunks: Dicts with id, text and metadata
+        """
+        if not chunks:
+            return
+
+        chunk_rows = []
+        posting_rows = []
+        for chunk in chunks:
+            tokens = tokenize(chunk["text"])
+            metadata = chunk.get("metadata", {})
+            chunk_rows.append((
+                namespace,
+                chunk["id"],
+                metadata.get("filename"),
+                metadata.get("chunk_index"),
+                chunk["text"],
+                len(tokens),
+                json.dumps(metadata, default=str),
+                *_location(metadata)
+            ))
+            for term, tf in Counter(tokens).items():
+                posting_rows.append((namespace, term, chunk["id"], tf))
+
+        with self._lock:
+            # Re-ingested chunks replace their previous postings
+            self.conn.executemany(
+                "DELETE FROM postings WHERE namespace = ? AND chunk_id = ?",
+                [(namespace, chunk["id"]) for chunk in chunks]
+            )
+            self.conn.executemany(
+                """
+                INSERT OR REPLACE INTO chunks (
+                    namespace, chunk_id, filename, chunk_index, text, length,
+                    metadata, page, char_start, char_end
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                chunk_rows
+            )
+            self.conn.executemany(
+                "INSERT INTO postings VALUES (?, ?, ?, ?)",
+                posting_rows
+            )
+            self.conn.commit()
+
+    def delete_chunks(
+        self,
+        namespace: str,
+        chunk_ids: Optional[List[str]] = None
+    ):
+        """
+        Delete chunks by id, or every chunk in the namespace
+
+        Args:
+            namespace: Namespace
+            chunk_ids: Chunk ids to delete; None deletes the whole namespace
+        """
+        with self._lock:
+            if chunk_ids is None:
+                self.conn.execute("DELETE FROM postings WHERE namespace = ?", (namespace,))
+                self.conn.execute("DELETE FROM chunks WHERE namespace = ?", (namespace,))
+            else:
+                rows = [(namespace, chunk_id) for chunk_id in chunk_ids]
+                self.conn.executemany(
+                    "DELETE FROM postings WHERE namespace = ? AND chunk_id = ?", rows
+                )
+                self.conn.executemany(
+                    "DELETE FROM chunks WHERE namespace = ? AND chunk_id = ?", rows
+                )
+            self.conn.commit()
+
+    def update_positions(
+        self,
+        namespace: str,
+        positions: List[Tuple[str, int, Dict[str, Any]]]
+    ):
+        """
+        Move existing chunks to new positions without re-indexing their text
+
+        Args:
+            namespace: Namespace
+            positions: (chunk id, chunk index, metadata) tuples
+        """
+        if not positions:
+            return
+
+        with self._lock:
+            self.conn.executemany(
+                """
+                UPDATE chunks
+                SET chunk_index = ?, metadata = ?, page = ?, char_start = ?, char_end = ?
+                WHERE namespace = ? AND chunk_id = ?
+                """,
+                [
+                    (
+                        chunk_index,
+                        json.dumps(metadata, default=str),
+                        *_location(metadata),
+                        namespace,
+                        chunk_id
+                    )
+                    for chunk_id, chunk_index, metadata in positions
+                ]
+            )
+            self.conn.commit()
+
+    # ========================================================================
+    # READS
+    # ========================================================================
+
+    def list_namespaces(self) -> List[str]:
+        """Namespaces holding at least one chunk"""
+        with self._lock:
+            rows = self.conn.execute("SELECT DISTINCT namespace FROM chunks").fetchall()
+        return [row[0] for row in rows]
+
+    def list_document_chunks(self, namespace: str, filename: str) -> List[Dict[str, Any]]:
+        """
+        All chunks of one document in chunk order
+
+        Returns:
+            Dicts with id, chunk_index and text
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                """
+                SELECT chunk_id, chunk_index, text
+                FROM chunks
+                WHERE namespace = ? AND filename = ?
+                ORDER BY chunk_index
+                """,
+                (namespace, filename)
+            ).fetchall()
+
+        return [{"id": row[0], "chunk_index": row[1], "text": row[2]} for row in rows]
+
+    def get_chunks(self, namespace: str, chunk_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch full chunk text and metadata by id
+
+        Returns:
+            Mapping of chunk id to {text, filename, chunk_index, metadata,
+            page, char_start, char_end}
+        """
+        if not chunk_ids:
+            return {}
+
+        placeholders = ",".join("?" * len(chunk_ids))
+        with self._lock:
+            rows = self.conn.execute(
+                f"""
+                SELECT chunk_id, filename, chunk_index, text, metadata,
+                       page, char_start, char_end
+                FROM chunks
+                WHERE namespace = ? AND chunk_id IN ({placeholders})
+                """,
+                [namespace, *chunk_ids]
+            ).fetchall()
+
+        return {
+            row[0]: {
+                "filename": row[1],
+                "chunk_index": row[2],
+                "text": row[3],
+                "metadata": json.loads(row[4]) if row[4] else {},
+                "page": row[5],
+                "char_start": row[6],
+                "char_end": row[7]
+            }
+            for row in rows
+        }
+
+    def bm25_search(
+        self,
+        namespace: str,
+        query: str,
+        top_k: int = 20
+    ) -> List[Tuple[str, float]]:
+        """
+        Rank chunks in a namespace by BM25
+
+        Args:
+            namespace: Namespace
+            query: Query text
+            top_k: Number of results
+
+        Returns:
+            (chunk_id, score) pairs, best first
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        placeholders = ",".join("?" * len(terms))
+        with self._lock:
+            total, avg_length = self.conn.execute(
+                "SELECT COUNT(*), AVG(length) FROM chunks WHERE namespace = ?",
+                (namespace,)
+            ).fetchone()
+            if not total:
+                return []
+
+            postings = self.conn.execute(
+                f"""
+                SELECT p.term, p.chunk_id, p.tf, c.length
+                FROM postings p
+                JOIN chunks c
+                  ON c.namespace = p.namespace AND c.chunk_id = p.chunk_id
+                WHERE p.namespace = ? AND p.term IN ({placeholders})
+                """,
+                [namespace, *terms]
+            ).fetchall()
+
+        document_frequency = Counter(term for term, _, _, _ in postings)
+        avg_length = avg_length or 1.0
+
+        scores: Dict[str, float] = defaultdict(float)
+        for term, chunk_id, tf, length in postings:
+            df = document_frequency[term]
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+            scores[chunk_id] += idf * tf * (self.k1 + 1) / norm
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+
+def rerank(query: str, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Lightweight local re-ranker
+
+    Boosts candidates by query-term coverage and exact phrase matches, which
+    favours passages that contain every figure or standard name asked about.
+
+    Args:
+        query: Query text
+        candidates: Dicts with text and score (fused score)
+
+    Returns:
+        Candidates re-sorted by adjusted score
+    """
+    query_terms = set(tokenize(query))
+    if not query_terms:
+        return candidates
+
+    phrase = " ".join(query.lower().split())
+    top_score = max((c["score"] for c in candidates), default=0.0) or 1.0
+
+    for candidate in candidates:
+        text = candidate.get("text", "").lower()
+        coverage = len(query_terms & set(tokenize(text))) / len(query_terms)
+        bonus = 0.5 * coverage + (0.5 if phrase and phrase in text else 0.0)
+        candidate["rerank_score"] = candidate["score"] / top_score + bonus
+
+    return sorted(candidates, key=lambda c: c["rerank_score"], reverse=True)
+
+
+class HybridRetriever:
+    """
+    Combines BM25 over the local chunk store with vector similarity
+
+    Each retriever contributes a ranked list; the lists are fused with
+    reciprocal rank fusion and full chunk text is read from the chunk store.
+    """
+
+    def __init__(self, chunk_store: ChunkStore, rrf_k: int = 60):
+        """
+        Initialize retriever
+
+        Args:
+            chunk_store: Local chunk store with BM25 index
+            rrf_k: Reciprocal rank fusion constant
+        """
+        self.chunk_store = chunk_store
+        self.rrf_k = rrf_k
+
+    async def index_chunks(self, namespace: str, chunks: List[Dict[str, Any]]):
+        """Add chunks to the chunk store and BM25 index"""
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self.chunk_store.add_chunks, namespace, chunks)
+
+    async def delete_chunks(self, namespace: str, chunk_ids: Optional[List[str]] = None):
+        """Remove chunks from the chunk store and BM25 index"""
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self.chunk_store.delete_chunks, namespace, chunk_ids)
+
+    async def list_namespaces(self) -> List[str]:
+        """Namespaces present in the chunk store"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.chunk_store.list_namespaces)
+
+    async def get_chunks(self, namespace: str, chunk_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Stored chunks with their page and character range, by id"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.chunk_store.get_chunks, namespace, chunk_ids)
+
+    async def list_document_chunks(self, namespace: str, filename: str) -> List[Dict[str, Any]]:
+        """Chunks previously indexed for a document, in chunk order"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None, self.chunk_store.list_document_chunks, namespace, filename
+        )
+
+    async def update_positions(
+        self,
+        namespace: str,
+        positions: List[Tuple[str, int, Dict[str, Any]]]
+    ):
+        """Record new positions of unchanged chunks"""
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self.chunk_store.update_positions, namespace, positions)
+
+    async def search(
+        self,
+        namespace: str,
+        query: str,
+        vector_matches: Optional[List[Dict[str, Any]]] = None,
+        top_k: int = 5,
+        candidate_k: int = 20,
+        use_reranker: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Hybrid search over a namespace
+
+        Args:
+            namespace: Namespace
+            query: Query text
+            vector_matches: Vector store matches (id, score), best first
+            top_k: Number of results to return
+            candidate_k: Candidates taken from each retriever before fusion
+            use_reranker: Apply the local re-ranker to fused candidates
+
+        Returns:
+            Result dicts with score, text, filename, chunk_index and
+            per-retriever scores
+        """
+        loop = asyncio.get_event_loop()
+        bm25_results = await loop.run_in_executor(
+            None,
+            self.chunk_store.bm25_search,
+            namespace,
+            query,
+            candidate_k
+        )
+
+        vector_matches = vector_matches or []
+        vector_scores = {match["id"]: match["score"] for match in vector_matches}
+        bm25_scores = dict(bm25_results)
+
+        fused = reciprocal_rank_fusion(
+            [
+                [match["id"] for match in vector_matches],
+                [chunk_id for chunk_id, _ in bm25_results]
+            ],
+            k=self.rrf_k
+        )[:candidate_k]
+
+        chunk_ids = [chunk_id for chunk_id, _ in fused]
+        chunks = await loop.run_in_executor(
+            None,
+            self.chunk_store.get_chunks,
+            namespace,
+            chunk_ids
+        )
+
+        vector_metadata = {match["id"]: match.get("metadata", {}) for match in vector_matches}
+        results = []
+        for chunk_id, score in fused:
+            chunk = chunks.get(chunk_id)
+            if chunk is None:
+                # Fall back to the snippet held in vector metadata
+                metadata = vector_metadata.get(chunk_id, {})
+                chunk = {
+                    "text": metadata.get("text", ""),
+                    "filename": metadata.get("filename", ""),
+                    "chunk_index": metadata.get("chunk_index", 0)
+                }
+
+            results.append({
+                "id": chunk_id,
+                "score": score,
+                "text": chunk["text"],
+                "filename": chunk["filename"],
+                "chunk_index": chunk["chunk_index"],
+                "vector_score": vector_scores.get(chunk_id),
+                "bm25_score": bm25_scores.get(chunk_id)
+            })
+
+        if use_reranker:
+            results = rerank(query, results)
+
+        return results[:top_k]
+
+
+def create_hybrid_retriever() -> HybridRetriever:
+    """Create the hybrid retriever over the configured chunk store"""
+    return HybridRetriever(
+        ChunkStore(os.getenv("CHUNK_STORE_PATH", "./data/chunks.db")),
+        rrf_k=int(os.getenv("RRF_K", "60"))
+    )
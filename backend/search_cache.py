@@ -0,0 +1,185 @@
+"""
+InfraFlow AI - Search Cache
+Query embedding LRU and per-namespace search result cache
+"""
+
+from typing import Dict, Any, List, Optional, Tuple, Hashable
+from collections import OrderedDict
+import os
+import copy
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace so trivially different queries share entries"""
+    return " ".join(query.split())
+
+
+class SearchCache:
+    """
+    In-process caches in front of document search
+
+    - Query embeddings: LRU keyed by normalized query text. Embeddings do
+      not depend on the corpus, so they are never invalidated.
+    - Search results: one LRU per namespace keyed by (query, top_k,
+      options). ``invalidate`` drops a namespace's results after any
+      upsert or delete to it. A generation counter per namespace stops a
+      search that started before a write from storing its stale results
+      after it.
+
+    Writes made by other processes (e.g. standalone ingestion workers) are
+    not seen by ``invalidate``; ``result_ttl`` bounds how long such results
+    can be served.
+    """
+
+    def __init__(
+        self,
+        embedding_size: Optional[int] = None,
+        results_per_namespace: Optional[int] = None,
+        result_ttl: Optional[float] = None
+    ):
+        """
+        Initialize caches
+
+        Args:
+            embedding_size: Query embeddings kept (SEARCH_EMBEDDING_CACHE_SIZE)
+            results_per_namespace: Result sets kept per namespace
+                (SEARCH_RESULT_CACHE_SIZE); 0 disables result caching
+            result_ttl: Seconds a result set stays valid (SEARCH_RESULT_CACHE_TTL)
+        """
+        self.embedding_size = (
+            embedding_size if embedding_size is not None
+            else int(os.getenv("SEARCH_EMBEDDING_CACHE_SIZE", "2048"))
+        )
+        self.results_per_namespace = (
+            results_per_namespace if results_per_namespace is not None
+            else int(os.getenv("SEARCH_RESULT_CACHE_SIZE", "128"))
+        )
+        self.result_ttl = (
+            result_ttl if result_ttl is not None
+            else float(os.getenv("SEARCH_RESULT_CACHE_TTL", "300"))
+        )
+
+        self._lock = threading.Lock()
+        self._embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._results: Dict[str, "OrderedDict[Hashable, Tuple[float, List[Dict[str, Any]]]]"] = {}
+        self._generations: Dict[str, int] = {}
+        self._stats = {
+            "embedding_hits": 0,
+            "embedding_misses": 0,
+            "result_hits": 0,
+            "result_misses": 0,
+            "result_stale_drops": 0,
+            "invalidations": 0
+        }
+
+    # ========================================================================
+    # QUERY EMBEDDINGS
+    # ========================================================================
+
+    def get_embedding(self, query: str) -> Optional[List[float]]:
+        """Cached embedding of a query, or None"""
+        key = normalize_query(query)
+        with self._lock:
+            vector = self._embeddings.get(key)
+            if vector is None:
+                self._stats["embedding_misses"] += 1
+                return None
+            self._embeddings.move_to_end(key)
+            self._stats["embedding_hits"] += 1
+            return vector
+
+    def put_embedding(self, query: str, vector: List[float]):
+        """Store a query embedding, evicting the least recently used"""
+        if self.embedding_size <= 0:
+            return
+        key = normalize_query(query)
+        with self._lock:
+            self._embeddings[key] = vector
+            self._embeddings.move_to_end(key)
+            while len(self._embeddings) > self.embedding_size:
+                self._embeddings.popitem(last=False)
+
+    # ========================================================================
+    # SEARCH RESULTS
+    # ========================================================================
+
+    def generation(self, namespace: str) -> int:
+        """Write generation of a namespace; pass it back to ``put_results``"""
+        with self._lock:
+            return self._generations.get(namespace, 0)
+
+    def get_results(self, namespace: str, key: Hashable) -> Optional[List[Dict[str, Any]]]:
+        """
+        Cached results of a search, or None
+
+        Returns a copy, so callers may annotate results freely.
+        """
+        with self._lock:
+            entries = self._results.get(namespace)
+            entry = entries.get(key) if entries else None
+            if entry is None or time.monotonic() - entry[0] > self.result_ttl:
+                if entry is not None:
+                    del entries[key]
+                self._stats["result_misses"] += 1
+                return None
+            entries.move_to_end(key)
+            self._stats["result_hits"] += 1
+            return copy.deepcopy(entry[1])
+
+    def put_results(
+        self,
+        namespace: str,
+        key: Hashable,
+        results: List[Dict[str, Any]],
+        generation: int
+    ):
+        """
+        Store search results unless the namespace was written since
+
+        Args:
+            namespace: Namespace searched
+            key: Search key (query and options)
+            results: Search results
+            generation: ``generation(namespace)`` taken before the search
+        """
+        if self.results_per_namespace <= 0:
+            return
+        with self._lock:
+            if self._generations.get(namespace, 0) != generation:
+                self._stats["result_stale_drops"] += 1
+                return
+            entries = self._results.setdefault(namespace, OrderedDict())
+            entries[key] = (time.monotonic(), copy.deepcopy(results))
+            entries.move_to_end(key)
+            while len(entries) > self.results_per_namespace:
+                entries.popitem(last=False)
+
+    def invalidate(self, namespace: str):
+        """Drop cached results of a namespace after a write to it"""
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            self._results.pop(namespace, None)
+            self._stats["invalidations"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Hit/miss counters, hit rates and current sizes
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["embedding_entries"] = len(self._embeddings)
+            stats["result_namespaces"] = len(self._results)
+            stats["result_entries"] = sum(len(entries) for entries in self._results.values())
+
+        for kind in ("embedding", "result"):
+            lookups = stats[f"{kind}_hits"] + stats[f"{kind}_misses"]
+            stats[f"{kind}_hit_rate"] = stats[f"{kind}_hits"] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,195 @@
+"""
+InfraFlow AI - Spreadsheet Parser
+Columnar parsing of financial model workbooks into typed time series
+"""
+
+from typing import Dict, Any, List, Optional
+import os
+import logging
+
+import numpy as np
+import pandas as pd
+from langchain.schema import Document
+
+logger = logging.getLogger(__name__)
+
+SPREADSHEET_EXTENSIONS = ('.xlsx', '.xlsm', '.xls', '.csv')
+
+# Row labels identifying each time series (matched case-insensitively)
+SERIES_PATTERNS = {
+    "revenue": r"\b(?:revenues?|sales|turnover|tariff income|energy income)\b",
+    "opex": r"\b(?:opex|operating (?:costs?|expenses?|expenditures?)|o\s*&\s*m|operations? and maintenance)\b",
+    "capex": r"\b(?:capex|capital (?:expenditures?|costs?|investments?)|construction costs?)\b",
+    "debt_service": r"\b(?:debt service|principal (?:and|&) interest|loan repayments?)\b"
+}
+
+# Derived rows that mention a series name but are not the series itself
+EXCLUDE_PATTERN = r"(?:ratio|dscr|llcr|margin|growth|coverage|per unit|%)"
+
+YEAR_MIN = 1990
+YEAR_MAX = 2100
+MIN_PERIODS = 3
+
+
+def is_spreadsheet(filename: str) -> bool:
+    """Whether a file should be parsed as a spreadsheet"""
+    return os.path.splitext(filename)[1].lower() in SPREADSHEET_EXTENSIONS
+
+
+def read_workbook(file_path: str, filename: str) -> Dict[str, pd.DataFrame]:
+    """
+    Load every sheet into a header-less DataFrame
+
+    Args:
+        file_path: Path to workbook
+        filename: Original filename (for the format)
+
+    Returns:
+        Mapping of sheet name to DataFrame
+    """
+    if filename.lower().endswith('.csv'):
+        return {"Sheet1": pd.read_csv(file_path, header=None)}
+    return pd.read_excel(file_path, sheet_name=None, header=None)
+
+
+def detect_series(frames: Dict[str, pd.DataFrame]) -> List[Dict[str, Any]]:
+    """
+    Find revenue, opex, capex and debt service time-series rows
+
+    Each sheet is coerced to a float matrix in one pass. The period axis is
+    the row with the most year-like integers; row labels are the leftmost
+    text cell before the first period column. Labels are matched against
+    ``SERIES_PATTERNS`` with vectorized string operations. When several
+    rows match, "total" rows win, then rows with the most values.
+
+    Args:
+        frames: Sheets from ``read_workbook``
+
+    Returns:
+        One dict per detected series with series, sheet, label, periods
+        and values (float64, missing cells as 0)
+    """
+    candidates: Dict[str, List[Dict[str, Any]]] = {name: [] for name in SERIES_PATTERNS}
+
+    for sheet_order, (sheet, frame) in enumerate(frames.items()):
+        if frame.empty:
+            continue
+
+        numeric = frame.apply(pd.to_numeric, errors="coerce")
+        values = numeric.to_numpy(dtype=np.float64)
+
+        # Period axis: row with the most year-like integers
+        with np.errstate(invalid="ignore"):
+            is_year = (values >= YEAR_MIN) & (values <= YEAR_MAX) & (np.mod(values, 1) == 0)
+        year_counts = is_year.sum(axis=1)
+        header_row = int(np.argmax(year_counts))
+        if year_counts[header_row] < MIN_PERIODS:
+            continue
+
+        period_cols = np.flatnonzero(is_year[header_row])
+        if period_cols[0] == 0:
+            continue
+        periods = values[header_row, period_cols].astype(np.int64)
+
+        # Leftmost text cell before the first period column
+        label_cells = frame.iloc[:, :period_cols[0]]
+        label_cells = label_cells.where(numeric.iloc[:, :period_cols[0]].isna())
+        labels = (
+            label_cells.bfill(axis=1).iloc[:, 0]
+            .fillna("").astype(str).str.strip()
+        )
+        lowered = labels.str.lower()
+
+        block = values[:, period_cols]
+        filled = (~np.isnan(block)).sum(axis=1)
+        eligible = (
+            (filled >= MIN_PERIODS)
+            & (np.arange(len(frame)) != header_row)
+            & ~lowered.str.contains(EXCLUDE_PATTERN, regex=True).to_numpy()
+        )
+
+        for name, pattern in SERIES_PATTERNS.items():
+            matches = np.flatnonzero(
+                eligible & lowered.str.contains(pattern, regex=True).to_numpy()
+            )
+            for row in matches:
+                candidates[name].append({
+                    "series": name,
+                    "sheet": str(sheet),
+                    "label": labels.iloc[row],
+                    "periods": periods,
+                    "values": np.nan_to_num(block[row], nan=0.0),
+                    "_rank": (
+                        not lowered.iloc[row].startswith("total"),
+                        -int(filled[row]),
+                        sheet_order,
+                        int(row)
+                    )
+                })
+
+    series = []
+    for name, found in candidates.items():
+        if not found:
+            continue
+        best = min(found, key=lambda candidate: candidate["_rank"])
+        series.append({
+            "series": name,
+            "sheet": best["sheet"],
+            "label": best["label"],
+            "periods": best["periods"].tolist(),
+            "values": best["values"].tolist()
+        })
+    return series
+
+
+def sheet_documents(frames: Dict[str, pd.DataFrame], file_path: str) -> List[Document]:
+    """
+    Render each sheet as text for chunking and retrieval
+
+    Args:
+        frames: Sheets from ``read_workbook``
+        file_path: Source path for metadata
+
+    Returns:
+        One LangChain Document per non-empty sheet
+    """
+    documents = []
+    for sheet, frame in frames.items():
+        frame = frame.dropna(how="all").dropna(axis=1, how="all")
+        if frame.empty:
+            continue
+        rows = frame.fillna("").astype(str).agg(" | ".join, axis=1)
+        documents.append(Document(
+            page_content=f"Sheet: {sheet}\n" + "\n".join(rows),
+            metadata={"source": file_path, "sheet": str(sheet)}
+        ))
+    return documents
+
+
+def parse_workbook(file_path: str, filename: str) -> Optional[Dict[str, Any]]:
+    """
+    Read a workbook once and return both its text and its time series
+
+    Args:
+        file_path: Path to workbook
+        filename: Original filename
+
+    Returns:
+        Dict with documents (per-sheet text) and series, or None if the
+        file cannot be read as a spreadsheet
+    """
+    try:
+        frames = read_workbook(file_path, filename)
+    except Exception as e:
+        logger.warning(f"Could not read {filename} as a spreadsheet: {str(e)}")
+        return None
+
+    series = detect_series(frames)
+    logger.info(
+        f"Parsed {len(frames)} sheets from {filename}, "
+        f"detected series: {[s['series'] for s in series]}"
+    )
+    return {
+        "documents": sheet_documents(frames, file_path),
+        "series": series
+    }
@@ -0,0 +1,486 @@
+"""
+InfraFlow AI - Standards Registry
+Compliance standards and ESG frameworks loaded from research data files
+"""
+
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+from collections.abc import Mapping
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+
+from requirement_matcher import RequirementMatcher, phrase_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "research_data"
+)
+DEFAULT_DATA_FILES = "compliance_standards.json,esg_frameworks.json"
+
+# Top-level list of each data file and the kind of entry it holds
+DATA_SECTIONS = {
+    "compliance_standards": "compliance_standard",
+    "esg_frameworks": "esg_framework"
+}
+
+# Data file entries whose name starts with one of these map onto the
+# built-in codes; other entries get a code from an explicit "code" field
+# or from their name
+STANDARD_ALIASES = [
+    ("ebrd", "ebrd_environmental"),
+    ("ifc performance", "ifc_performance"),
+    ("eu taxonomy", "eu_taxonomy"),
+    ("equator principles", "equator_principles")
+]
+
+# Sections whose items are categories of a standard, and the keys under
+# which individual requirements are listed
+CATEGORY_KEYS = (
+    "performance_requirements", "performance_standards", "principles",
+    "environmental_objectives", "four_pillars"
+)
+REQUIREMENT_KEYS = ("key_requirements", "metrics", "recommended_disclosures")
+
+# Standards defined in code. Data file entries with the same code extend
+# these; applicability says which project facts make a standard apply
+BUILTIN_STANDARDS: Dict[str, Dict[str, Any]] = {
+    "ebrd_environmental": {
+        "name": "EBRD Environmental and Social Policy",
+        "categories": [
+            "Environmental and Social Assessment",
+            "Labour and Working Conditions",
+            "Resource Efficiency and Pollution Prevention",
+            "Health and Safety",
+            "Land Acquisition and Involuntary Resettlement",
+            "Biodiversity Conservation",
+            "Indigenous Peoples",
+            "Cultural Heritage",
+            "Financial Intermediaries",
+            "Information Disclosure and Stakeholder Engagement"
+        ],
+        "key_requirements": [
+            "Environmental and Social Impact Assessment (ESIA)",
+            "Stakeholder Engagement Plan",
+            "Environmental and Social Management System (ESMS)",
+            "Grievance Mechanism",
+            "Disclosure of project information"
+        ],
+        "applicability": {"dfi_involvement": ["ebrd"]}
+    },
+    "ifc_performance": {
+        "name": "IFC Performance Standards",
+        "categories": [
+            "PS1: Assessment and Management of Environmental and Social Risks",
+            "PS2: Labor and Working Conditions",
+            "PS3: Resource Efficiency and Pollution Prevention",
+            "PS4: Community Health, Safety, and Security",
+            "PS5: Land Acquisition and Involuntary Resettlement",
+            "PS6: Biodiversity Conservation and Sustainable Management",
+            "PS7: Indigenous Peoples",
+            "PS8: Cultural Heritage"
+        ],
+        "key_requirements": [
+            "Environmental and Social Management System",
+            "Stakeholder Engagement",
+            "Environmental and Social Assessment",
+            "Management Program",
+            "Monitoring and Review"
+        ],
+        "applicability": {"dfi_involvement": ["ifc", "world bank", "adb", "afdb"]}
+    },
+    "eu_taxonomy": {
+        "name": "EU Taxonomy for Sustainable Activities",
+        "categories": [
+            "Climate Change Mitigation",
+            "Climate Change Adaptation",
+            "Sustainable Use of Water and Marine Resources",
+            "Transition to Circular Economy",
+            "Pollution Prevention and Control",
+            "Protection of Healthy Ecosystems"
+        ],
+        "key_requirements": [
+            "Substantial Contribution to Environmental Objective",
+            "Do No Significant Harm (DNSH) to other objectives",
+            "Minimum Social Safeguards",
+            "Technical Screening Criteria compliance"
+        ],
+        "applicability": {"location": ["eu", "europe", "european"]}
+    },
+    "local_content": {
+        "name": "Local Content Requirements",
+        "categories": [
+            "Local Employment",
+            "Local Procurement",
+            "Skills Transfer",
+            "Community Development"
+        ],
+        "key_requirements": [
+            "Local employment targets",
+            "Local supplier engagement",
+            "Training and capacity building",
+            "Community benefit agreements"
+        ],
+        "applicability": {"always": True}
+    },
+    "esg_scoring": {
+        "name": "ESG Scoring Framework",
+        "categories": [
+            "Environmental Performance",
+            "Social Impact",
+            "Governance Structure"
+        ],
+        "key_requirements": [
+            "Carbon footprint disclosure",
+            "Diversity and inclusion metrics",
+            "Board independence",
+            "Anti-corruption measures"
+        ],
+        "applicability": {"always": True}
+    },
+    "equator_principles": {
+        "name": "Equator Principles",
+        "categories": [
+            "Review and Categorization",
+            "Environmental and Social Assessment",
+            "Applicable Standards",
+            "Action Plan and Management System",
+            "Stakeholder Engagement",
+            "Grievance Mechanism",
+            "Independent Review",
+            "Covenants",
+            "Independent Monitoring and Reporting",
+            "Reporting and Transparency"
+        ],
+        "key_requirements": [
+            "Project categorization (A, B, or C)",
+            "Environmental and Social Impact Assessment",
+            "Environmental and Social Management Plan",
+            "Stakeholder engagement process",
+            "Independent environmental and social consultant"
+        ],
+        "applicability": {"financial_structure": ["project finance"]}
+    }
+}
+
+
+def standard_code(entry: Dict[str, Any]) -> str:
+    """Registry code of a data file entry"""
+    if entry.get("code"):
+        return str(entry["code"])
+    name = str(entry.get("name", "")).lower()
+    for prefix, code in STANDARD_ALIASES:
+        if name.startswith(prefix):
+            return code
+    return re.sub(r"[^a-z0-9]+", "_", name).strip("_")
+
+
+def _label(item: Dict[str, Any]) -> Optional[str]:
+    """Display label of a category-like item"""
+    name = item.get("name") or item.get("topic") or item.get("category") or item.get("pillar")
+    if item.get("code") and name:
+        return f"{item['code']}: {name}"
+    return name or item.get("code")
+
+
+def _collect_requirements(
+    node: Any,
+    requirements: List[Dict[str, Any]],
+    category: Optional[str] = None,
+    pillar: Optional[str] = None,
+    key: Optional[str] = None
+):
+    """Append requirements found anywhere under a data file node"""
+    if isinstance(node, dict):
+        label = _label(node) if key is not None else None
+        category = label or category
+        for child_key, value in node.items():
+            if child_key == "key_metrics" and isinstance(value, dict):
+                # ESG frameworks group metrics by pillar
+                for child_pillar, metrics in value.items():
+                    _collect_requirements(metrics, requirements, category, child_pillar, "metrics")
+            elif child_key == "key_metrics":
+                _collect_requirements(value, requirements, category, pillar, "metrics")
+            elif isinstance(value, (dict, list)):
+                _collect_requirements(value, requirements, category, pillar, child_key)
+
+        # Principles described but without listed requirements are requirements themselves
+        if key in CATEGORY_KEYS and label and not any(k in node for k in REQUIREMENT_KEYS):
+            requirements.append({
+                "text": node.get("name") or label,
+                "category": label,
+                "pillar": pillar,
+                "description": node.get("description")
+            })
+
+    elif isinstance(node, list):
+        for item in node:
+            if isinstance(item, str) and key in REQUIREMENT_KEYS:
+                requirements.append({"text": item, "category": category, "pillar": pillar})
+            elif isinstance(item, (dict, list)):
+                _collect_requirements(item, requirements, category, pillar, key)
+
+
+def normalize_standard(
+    code: str,
+    builtin: Optional[Dict[str, Any]],
+    entries: List[Tuple[str, str, Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """
+    Build a registry record from a built-in definition and data file entries
+
+    Args:
+        code: Standard code
+        builtin: Built-in definition, if any
+        entries: (source file, kind, raw entry) from data files
+
+    Returns:
+        Standard record with name, version, fingerprint, categories,
+        key_requirements (texts), requirements (with category/pillar),
+        applicability and sources
+    """
+    record: Dict[str, Any] = {
+        "code": code,
+        "kind": "compliance_standard",
+        "name": code,
+        "version": None,
+        "categories": [],
+        "requirements": [],
+        "applicability": {},
+        "sources": []
+    }
+
+    if builtin:
+        record["name"] = builtin["name"]
+        record["categories"] = list(builtin.get("categories", []))
+        record["requirements"] = [
+            {"text": text, "category": None, "pillar": None}
+            for text in builtin.get("key_requirements", [])
+        ]
+        record["applicability"] = dict(builtin.get("applicability", {}))
+        record["sources"].append("builtin")
+
+    for source, kind, entry in entries:
+        record["kind"] = kind
+        if not builtin:
+            record["name"] = entry.get("name", code)
+        record["version"] = entry.get("version") or record["version"]
+        for field in ("organization", "effective_date", "documentation_url", "website", "full_name"):
+            if entry.get(field):
+                record[field] = entry[field]
+        if entry.get("applicability"):
+            record["applicability"].update(entry["applicability"])
+
+        categories = [
+            _label(item) for key in CATEGORY_KEYS
+            for item in entry.get(key, []) if isinstance(item, dict) and _label(item)
+        ] or [c for c in entry.get("categories", []) if isinstance(c, str)]
+        if categories:
+            record["categories"] = categories
+
+        _collect_requirements(entry, record["requirements"])
+        record["sources"].append(source)
+
+    # Deduplicate requirements on their normalized wording
+    seen = set()
+    requirements = []
+    for requirement in record["requirements"]:
+        normalized = phrase_key(requirement["text"])
+        if normalized and normalized not in seen:
+            seen.add(normalized)
+            requirement["id"] = f"{code}:{len(requirements) + 1}"
+            requirements.append(requirement)
+    record["requirements"] = requirements
+    record["key_requirements"] = [r["text"] for r in requirements]
+
+    record["fingerprint"] = hashlib.sha256(
+        json.dumps(record, sort_keys=True, default=str).encode()
+    ).hexdigest()[:16]
+    return record
+
+
+class StandardsRegistry(Mapping):
+    """
+    Read-only mapping of standard code to standard record
+
+    Data files are read and indexed once at startup; a standard is
+    normalized and its requirement matcher compiled the first time it is
+    requested. ``reload`` re-reads files whose modification time changed
+    and swaps the index atomically, so new standards or requirement
+    updates take effect without a restart or code change.
+    """
+
+    def __init__(
+        self,
+        data_dir: Optional[str] = None,
+        data_files: Optional[List[str]] = None
+    ):
+        """
+        Initialize registry
+
+        Args:
+            data_dir: Directory of data files (STANDARDS_DATA_DIR)
+            data_files: File names (STANDARDS_DATA_FILES, comma-separated)
+        """
+        self.data_dir = data_dir or os.getenv("STANDARDS_DATA_DIR", DEFAULT_DATA_DIR)
+        self.data_files = data_files or [
+            name.strip() for name in
+            os.getenv("STANDARDS_DATA_FILES", DEFAULT_DATA_FILES).split(",")
+            if name.strip()
+        ]
+
+        self._lock = threading.Lock()
+        self._mtimes: Dict[str, float] = {}
+        # code -> [(source, kind, raw entry)]
+        self._index: Dict[str, List[Tuple[str, str, Dict[str, Any]]]] = {}
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._matchers: Dict[str, RequirementMatcher] = {}
+        self.version = 0
+
+        self.reload(force=True)
+
+    # ========================================================================
+    # LOADING
+    # ========================================================================
+
+    def _paths(self) -> List[str]:
+        return [os.path.join(self.data_dir, name) for name in self.data_files]
+
+    def _read_index(self) -> Dict[str, List[Tuple[str, str, Dict[str, Any]]]]:
+        index: Dict[str, List[Tuple[str, str, Dict[str, Any]]]] = {}
+        for path in self._paths():
+            if not os.path.exists(path):
+                logger.warning(f"Standards data file not found: {path}")
+                continue
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+            except Exception as e:
+                logger.error(f"Error reading standards file {path}: {str(e)}")
+                continue
+
+            source = os.path.basename(path)
+            for section, kind in DATA_SECTIONS.items():
+                for entry in data.get(section, []):
+                    if isinstance(entry, dict) and entry.get("name"):
+                        index.setdefault(standard_code(entry), []).append((source, kind, entry))
+        return index
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Re-read data files if any changed since the last load
+
+        Args:
+            force: Reload even if no file changed
+
+        Returns:
+            Whether the registry was reloaded
+        """
+        mtimes = {
+            path: os.path.getmtime(path) for path in self._paths() if os.path.exists(path)
+        }
+        if not force and mtimes == self._mtimes:
+            return False
+
+        index = self._read_index()
+        with self._lock:
+            self._index = index
+            self._mtimes = mtimes
+            self._records = {}
+            self._matchers = {}
+            self.version += 1
+
+        logger.info(
+            f"Standards registry v{self.version}: {len(self)} standards "
+            f"({len(index)} from data files)"
+        )
+        return True
+
+    # ========================================================================
+    # LOOKUP
+    # ========================================================================
+
+    def __getitem__(self, code: str) -> Dict[str, Any]:
+        with self._lock:
+            record = self._records.get(code)
+            if record is not None:
+                return record
+            builtin = BUILTIN_STANDARDS.get(code)
+            entries = self._index.get(code)
+        if builtin is None and entries is None:
+            raise KeyError(code)
+
+        record = normalize_standard(code, builtin, entries or [])
+        with self._lock:
+            return self._records.setdefault(code, record)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            codes = list(BUILTIN_STANDARDS) + [c for c in self._index if c not in BUILTIN_STANDARDS]
+        return iter(codes)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(set(BUILTIN_STANDARDS) | set(self._index))
+
+    def __contains__(self, code: object) -> bool:
+        with self._lock:
+            return code in BUILTIN_STANDARDS or code in self._index
+
+    def matcher(self, code: str) -> RequirementMatcher:
+        """Compiled requirement matcher of a standard"""
+        with self._lock:
+            matcher = self._matchers.get(code)
+        if matcher is not None:
+            return matcher
+        matcher = RequirementMatcher(self[code]["key_requirements"])
+        with self._lock:
+            return self._matchers.setdefault(code, matcher)
+
+    def applicability(self, code: str) -> Dict[str, Any]:
+        """Applicability rules of a standard without normalizing it"""
+        with self._lock:
+            rules = dict((BUILTIN_STANDARDS.get(code) or {}).get("applicability", {}))
+            for _, _, entry in self._index.get(code, []):
+                rules.update(entry.get("applicability") or {})
+        return rules
+
+    def list_standards(self, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Summary of registered standards
+
+        Args:
+            kind: Only "compliance_standard" or "esg_framework" entries
+
+        Returns:
+            Code, name, kind, version, fingerprint and requirement count of each
+        """
+        summaries = []
+        for code in self:
+            record = self[code]
+            if kind and record["kind"] != kind:
+                continue
+            summaries.append({
+                "code": code,
+                "name": record["name"],
+                "kind": record["kind"],
+                "version": record["version"],
+                "fingerprint": record["fingerprint"],
+                "requirements": len(record["requirements"]),
+                "sources": record["sources"]
+            })
+        return summaries
+
+
+_registry: Optional[StandardsRegistry] = None
+
+
+def get_standards_registry() -> StandardsRegistry:
+    """Get the process-wide standards registry"""
+    global _registry
+    if _registry is None:
+        _registry = StandardsRegistry()
+    return _registry
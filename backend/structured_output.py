@@ -0,0 +1,219 @@
+"""
+InfraFlow AI - Structured Output
+Incremental JSON parsing of streamed LLM output and JSON-schema coercion
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+import re
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+_CLOSERS = {"{": "}", "[": "]"}
+_NUMBER_PATTERN = re.compile(r"-?\d+(?:\.\d+)?")
+_MULTIPLIERS = {
+    "thousand": 1e3, "k": 1e3,
+    "million": 1e6, "mn": 1e6, "m": 1e6,
+    "billion": 1e9, "bn": 1e9, "b": 1e9
+}
+
+
+class IncrementalJSONParser:
+    """
+    Scans streamed text for the first complete top-level JSON value
+
+    Text is fed as it arrives; ``feed`` returns True as soon as the value
+    closes, so the caller can stop the stream instead of paying for any
+    trailing prose. If the stream ends early (e.g. ``max_tokens``), the
+    longest prefix ending at a complete member is repaired by closing the
+    open containers, so a truncated response still yields its finished
+    fields.
+    """
+
+    def __init__(self):
+        self.buffer: List[str] = []
+        self.length = 0
+        self.started = False
+        self.complete = False
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._start = 0
+        self._end: Optional[int] = None
+        # (cut position, open containers) after each complete member
+        self._safe_point: Optional[Tuple[int, List[str]]] = None
+
+    def feed(self, text: str) -> bool:
+        """
+        Consume a chunk of text
+
+        Returns:
+            True once the top-level value is complete
+        """
+        if self.complete:
+            return True
+
+        offset = self.length
+        self.buffer.append(text)
+        self.length += len(text)
+
+        for i, char in enumerate(text):
+            position = offset + i
+
+            if not self.started:
+                if char in _CLOSERS:
+                    self.started = True
+                    self._start = position
+                    self._stack.append(char)
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in _CLOSERS:
+                self._stack.append(char)
+            elif char in "}]":
+                self._stack.pop()
+                if not self._stack:
+                    self.complete = True
+                    self._end = position + 1
+                    return True
+                self._safe_point = (position + 1, list(self._stack))
+            elif char == ",":
+                self._safe_point = (position, list(self._stack))
+
+        return False
+
+    @property
+    def text(self) -> str:
+        return "".join(self.buffer)
+
+    def result(self) -> Any:
+        """
+        Parse the completed value, or repair a truncated one
+
+        Returns:
+            Parsed JSON value
+
+        Raises:
+            ValueError: No JSON value was found
+        """
+        text = self.text
+        if self.complete:
+            return json.loads(text[self._start:self._end])
+
+        if not self.started:
+            raise ValueError("No JSON value in response")
+
+        if self._safe_point is None:
+            # Nothing finished inside the top-level container
+            return json.loads(text[self._start] + _CLOSERS[text[self._start]])
+
+        cut, stack = self._safe_point
+        repaired = text[self._start:cut] + "".join(_CLOSERS[c] for c in reversed(stack))
+        logger.warning("Repaired truncated JSON response")
+        return json.loads(repaired)
+
+
+def parse_json_response(text: str) -> Any:
+    """
+    Parse the first JSON value in a complete response
+
+    Unlike a greedy regex, this stops at the end of the first balanced
+    value, so prose or a second object after it does not break parsing.
+    """
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    return parser.result()
+
+
+def _coerce_number(value: Any) -> Optional[float]:
+    """Numbers from values like 1200000, "1,200,000" or "USD 1.2 billion" """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if not isinstance(value, str):
+        return None
+
+    text = value.replace(",", "").lower()
+    match = _NUMBER_PATTERN.search(text)
+    if not match:
+        return None
+
+    number = float(match.group())
+    suffix = re.match(r"\s*([a-z]+)", text[match.end():])
+    if suffix and suffix.group(1) in _MULTIPLIERS:
+        number *= _MULTIPLIERS[suffix.group(1)]
+    return int(number) if number.is_integer() else number
+
+
+def coerce_to_schema(value: Any, schema: Dict[str, Any]) -> Any:
+    """
+    Coerce a parsed value to a JSON schema subset
+
+    Supports object (known properties only), array, string, number,
+    integer and boolean types, with ``null`` allowed everywhere. Values
+    that cannot be coerced become None rather than failing the whole
+    extraction.
+
+    Args:
+        value: Parsed JSON value
+        schema: JSON schema
+
+    Returns:
+        Coerced value
+    """
+    if value is None:
+        return None
+
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), None)
+
+    if kind == "object":
+        if not isinstance(value, dict):
+            return None
+        properties = schema.get("properties")
+        if properties is None:
+            return value
+        return {
+            key: coerce_to_schema(value.get(key), subschema)
+            for key, subschema in properties.items()
+        }
+
+    if kind == "array":
+        if value in ("", {}):
+            return []
+        if not isinstance(value, list):
+            value = [value]
+        item_schema = schema.get("items", {})
+        items = [coerce_to_schema(item, item_schema) for item in value]
+        return [item for item in items if item is not None]
+
+    if kind in ("number", "integer"):
+        number = _coerce_number(value)
+        if number is not None and kind == "integer":
+            number = int(number)
+        return number
+
+    if kind == "string":
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return str(value)
+
+    if kind == "boolean":
+        if isinstance(value, str):
+            return value.strip().lower() in ("true", "yes", "1")
+        return bool(value)
+
+    return value
@@ -0,0 +1,9 @@
+"""
+InfraFlow AI - Test configuration
+Makes the backend modules importable when pytest runs from backend/
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,172 @@
+"""
+InfraFlow AI - Compliance Screening tests
+Two-pass portfolio screening with an LLM escalation budget
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from compliance_screening import ComplianceScreener, LLMBudget, stream_screening_events
+
+
+class FakeDatabase:
+    def __init__(self, projects, documents):
+        self.projects = projects
+        self.documents = documents
+        self.checks = {}
+
+    async def list_projects(self, user_id=None, filters=None, limit=100):
+        return [p for p in self.projects.values() if p["user_id"] == user_id]
+
+    async def get_project(self, project_id):
+        return self.projects.get(project_id)
+
+    async def list_project_documents(self, project_id):
+        return self.documents.get(project_id, [])
+
+    async def create_compliance_check(self, check_data):
+        check_id = f"check-{len(self.checks) + 1}"
+        self.checks[check_id] = check_data
+        return check_id
+
+    async def update_compliance_check(self, check_id, check_data):
+        self.checks[check_id] = check_data
+
+
+class FakeChecker:
+    """Screening leaves ``unresolved`` requirements; a full check settles them"""
+
+    def __init__(self, unresolved):
+        self.unresolved = unresolved
+        self.llm = SimpleNamespace(enabled=True)
+        self.calls = []
+
+    async def check_standards(self, project_id, documents, standard_codes, use_llm=True):
+        self.calls.append((project_id, use_llm))
+        standard = standard_codes[0]
+        unresolved = self.unresolved.get(project_id, 0)
+        if use_llm:
+            standard_result = {"status": "compliant", "issues": [], "method": "ai"}
+        else:
+            standard_result = {
+                "status": "partial" if unresolved else "compliant",
+                "issues": [{"severity": "medium"}] * unresolved,
+                "screened": True,
+                "unresolved": unresolved
+            }
+        return {
+            "standard_results": {standard: standard_result},
+            "overall_status": standard_result["status"],
+            "issues": standard_result["issues"],
+            "recommendations": [],
+            "total_issues": len(standard_result["issues"]),
+            "critical_issues": 0,
+            "high_issues": 0
+        }
+
+
+def _setup(unresolved, llm_budget):
+    projects = {
+        f"p{i}": {"id": f"p{i}", "name": f"Project {i}", "user_id": "u1"}
+        for i in range(5)
+    }
+    projects["other"] = {"id": "other", "name": "Other", "user_id": "u2"}
+    documents = {pid: [{"id": f"d-{pid}"}] for pid in projects if pid != "p4"}
+    db = FakeDatabase(projects, documents)
+    checker = FakeChecker(unresolved)
+    return db, checker, ComplianceScreener(db, checker, concurrency=2, llm_budget=llm_budget)
+
+
+async def _finish(job):
+    """Stream a job's events until it is done"""
+    return [event async for event in stream_screening_events(job, heartbeat=1.0)]
+
+
+def test_llm_budget():
+    budget = LLMBudget(2)
+    assert [budget.try_acquire() for _ in range(3)] == [True, True, False]
+    assert (budget.used, budget.remaining) == (2, 0)
+    assert LLMBudget(-1).limit == 0
+
+
+def test_screens_then_escalates_most_unresolved_first():
+    db, checker, screener = _setup({"p0": 1, "p1": 5, "p2": 3}, llm_budget=2)
+
+    async def run():
+        job = await screener.start("ifc_performance", user_id="u1")
+        return job, await _finish(job)
+
+    job, events = asyncio.run(run())
+    progress = job.progress()
+
+    assert job.status == "completed"
+    assert progress["total_projects"] == 5
+    assert progress["processed_projects"] == 5
+    assert (job.counts["screened"], job.counts["skipped"], job.counts["escalated"]) == (4, 1, 2)
+    assert progress["llm_budget"] == {"limit": 2, "used": 2}
+
+    escalated = [pid for pid, use_llm in checker.calls if use_llm]
+    assert sorted(escalated) == ["p1", "p2"]
+    assert job.results["p1"]["status"] == "compliant"
+    assert job.results["p0"]["status"] == "partial"
+    assert job.results["p4"] == {
+        "project_id": "p4", "project_name": "Project 4", "status": "skipped", "reason": "no_documents"
+    }
+
+    # One history row per screened project; escalation updates it in place
+    assert len(db.checks) == 4
+    assert job.results["p1"]["check_id"] in db.checks
+    assert db.checks[job.results["p1"]["check_id"]]["status"] == "compliant"
+
+    assert events[-1].startswith("event: done")
+    assert sum(e.startswith("event: result") for e in events) >= 5
+
+
+def test_non_admin_cannot_screen_other_users_projects():
+    db, checker, screener = _setup({"other": 4}, llm_budget=5)
+
+    async def run():
+        job = await screener.start("ifc_performance", user_id="u1", project_ids=["other", "p0"])
+        await _finish(job)
+        return job
+
+    job = asyncio.run(run())
+    assert job.results["other"]["reason"] == "forbidden"
+    assert [pid for pid, _ in checker.calls] == ["p0"]
+
+
+def test_escalation_keeps_screened_outcome_when_project_is_gone():
+    db, checker, screener = _setup({"p0": 2}, llm_budget=1)
+    original = checker.check_standards
+
+    async def check_and_delete(project_id, documents, standard_codes, use_llm=True):
+        result = await original(project_id, documents, standard_codes, use_llm)
+        db.projects.pop(project_id, None)
+        return result
+
+    checker.check_standards = check_and_delete
+
+    async def run():
+        job = await screener.start("ifc_performance", user_id="u1", project_ids=["p0"])
+        await _finish(job)
+        return job
+
+    job = asyncio.run(run())
+    progress = job.progress()
+    assert progress["processed_projects"] == progress["total_projects"] == 1
+    assert job.results["p0"]["status"] == "partial"
+    assert job.counts["skipped"] == 0
+
+
+def test_report_orders_failing_projects_first_and_filters():
+    db, checker, screener = _setup({"p0": 1}, llm_budget=0)
+
+    async def run():
+        job = await screener.start("ifc_performance", user_id="u1")
+        await _finish(job)
+        return job
+
+    job = asyncio.run(run())
+    report = job.report()
+    assert report["results"][0]["status"] == "partial"
+    assert [r["project_id"] for r in job.report("skipped")["results"]] == ["p4"]
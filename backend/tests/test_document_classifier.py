@@ -0,0 +1,90 @@
+"""
+InfraFlow AI - Document Classifier tests
+Content-based type detection from TF-IDF and embedding centroids
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from document_classifier import DocumentClassifier, TYPE_PROFILES, DEFAULT_TYPE
+
+
+class OneHotEmbeddings:
+    """Embeds each type profile as a unit vector along its own axis"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return np.eye(len(texts)).tolist()
+
+
+class FailingEmbeddings:
+    def embed_documents(self, texts):
+        raise RuntimeError("embedding service unavailable")
+
+
+def test_classifies_from_text():
+    classifier = DocumentClassifier()
+
+    financial = asyncio.run(classifier.classify([
+        "Cash flow projections: revenue, opex and capex in USD million per annum.",
+        "Project IRR 11.2%, NPV at a WACC of 8%, minimum DSCR 1.35."
+    ]))
+    assert financial["type"] == "financial_model"
+    assert financial["method"] == "tfidf"
+    assert 0 < financial["confidence"] <= 1
+    assert sum(financial["scores"].values()) == pytest.approx(1.0, abs=1e-3)
+
+    esia = asyncio.run(classifier.classify([
+        "Environmental and social impact assessment: baseline biodiversity, "
+        "habitat and air quality surveys, mitigation measures and monitoring."
+    ]))
+    assert esia["type"] == "environmental_impact"
+
+
+def test_unknown_content_falls_back_to_default():
+    result = asyncio.run(DocumentClassifier().classify(["zzz qqq"]))
+    assert result == {"type": DEFAULT_TYPE, "confidence": 0.0, "method": None, "scores": {}}
+    assert asyncio.run(DocumentClassifier().classify([]))["type"] == DEFAULT_TYPE
+
+
+def test_embedding_signal_is_combined_and_centroids_cached():
+    embeddings = OneHotEmbeddings()
+    classifier = DocumentClassifier(embeddings=embeddings)
+    legal = list(TYPE_PROFILES).index("legal_agreement")
+    vector = np.eye(len(TYPE_PROFILES))[legal].tolist()
+
+    async def run():
+        first = await classifier.classify([], vectors=[vector])
+        second = await classifier.classify(["governing law and arbitration clause"], vectors=[vector])
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first["type"] == "legal_agreement"
+    assert first["method"] == "embedding"
+    assert second["method"] == "tfidf+embedding"
+    assert embeddings.calls == 1
+
+
+def test_embedding_failure_leaves_tfidf():
+    classifier = DocumentClassifier(embeddings=FailingEmbeddings())
+    result = asyncio.run(classifier.classify(
+        ["power purchase agreement between the parties, governing law, force majeure"],
+        vectors=[[1.0] * len(TYPE_PROFILES)]
+    ))
+    assert result["type"] == "legal_agreement"
+    assert result["method"] == "tfidf"
+    assert classifier.embeddings is None
+
+
+def test_only_sampled_chunks_count():
+    classifier = DocumentClassifier(sample_chunks=1)
+    result = asyncio.run(classifier.classify([
+        "Audit monitoring report: non-compliance findings and corrective actions.",
+        "Cash flow revenue opex capex ebitda npv irr wacc dscr " * 20
+    ]))
+    assert result["type"] == "compliance_report"
@@ -0,0 +1,170 @@
+"""
+InfraFlow AI - ESG Scoring tests
+Indicator weights, matrix scoring and portfolio ranking
+"""
+
+import asyncio
+import json
+import os
+
+import numpy as np
+import pytest
+
+from esg_scoring import ESGScoringEngine, ESGScoringModel, PILLARS, indicator_pillar
+from project_facts import document_set_version
+from standards_registry import StandardsRegistry
+
+
+FRAMEWORKS = [
+    {
+        "name": "Climate Framework",
+        "key_metrics": {"environmental": ["Scope 1 emissions"]}
+    },
+    {
+        "name": "Broad Framework",
+        "key_metrics": {
+            "environmental": ["Water withdrawal", "Waste generated", "Biodiversity plan"],
+            "social": ["Worker safety record"],
+            "governance": ["Board oversight"]
+        }
+    }
+]
+
+
+@pytest.fixture
+def registry(tmp_path):
+    path = tmp_path / "frameworks.json"
+    with open(path, "w") as f:
+        json.dump({"esg_frameworks": FRAMEWORKS}, f)
+    os.utime(path, (1000, 1000))
+    return StandardsRegistry(str(tmp_path), ["frameworks.json"])
+
+
+@pytest.fixture
+def model(registry):
+    return ESGScoringModel(registry, ["climate_framework", "broad_framework"])
+
+
+def _column(model, text):
+    return next(i for i, indicator in enumerate(model.indicators) if indicator["text"] == text)
+
+
+def test_indicator_pillar():
+    assert indicator_pillar({"text": "Anything", "pillar": "Human Capital"}) == "social"
+    assert indicator_pillar({"text": "Anything", "category": "Climate Change"}) == "environmental"
+    assert indicator_pillar({"text": "Anti-bribery policy"}) == "governance"
+    assert indicator_pillar({"text": "Revenue growth"}) is None
+
+
+def test_frameworks_share_each_pillar_equally(model):
+    assert len(model.indicators) == 6
+    np.testing.assert_allclose(model.weights.sum(axis=0), np.ones(len(PILLARS)), rtol=1e-6)
+
+    environmental = PILLARS.index("environmental")
+    assert model.weights[_column(model, "Scope 1 emissions"), environmental] == pytest.approx(0.5)
+    assert model.weights[_column(model, "Water withdrawal"), environmental] == pytest.approx(0.5 / 3)
+
+
+def test_score_bounds_and_coverage(model):
+    values = np.zeros((3, len(model.indicators)), dtype=np.float32)
+    values[1] = 1.0
+    values[2, _column(model, "Scope 1 emissions")] = 1.0
+
+    scores = model.score(values)
+    assert scores["pillars"].shape == (3, 3)
+    np.testing.assert_allclose(scores["overall"][:2], [0.0, 100.0], atol=1e-4)
+    assert scores["pillars"][2, PILLARS.index("environmental")] == pytest.approx(50.0)
+    assert scores["frameworks"][2].tolist() == pytest.approx([100.0, 0.0])
+    assert scores["coverage"][2].tolist() == pytest.approx([0.25, 0.0, 0.0])
+
+
+def test_indicator_values_from_facts_and_stored_results(model):
+    facts = {"environmental_data": {"impact_assessment": "Annual scope 1 emissions are disclosed"}}
+    statuses = {
+        "broad_framework": {"Board oversight": "ambiguous", "Worker safety record": "missing"},
+        "climate_framework": {"Scope 1 emissions": "missing"}
+    }
+
+    values = model.indicator_values(facts, statuses)
+    assert values[_column(model, "Scope 1 emissions")] == 1.0
+    assert values[_column(model, "Board oversight")] == 0.5
+    assert values[_column(model, "Worker safety record")] == 0.0
+
+
+class FakeDatabase:
+    def __init__(self, documents, results):
+        self.documents = documents
+        self.results = results
+        self.saved = None
+
+    async def list_project_documents(self, project_id):
+        if project_id not in self.documents:
+            raise RuntimeError("project unavailable")
+        return self.documents[project_id]
+
+    async def get_latest_compliance_results(self, project_id, frameworks):
+        return self.results.get(project_id, {})
+
+    async def save_esg_scores(self, scores):
+        self.saved = scores
+
+
+def _document(project_id, text):
+    return {
+        "id": f"d-{project_id}",
+        "project_id": project_id,
+        "revision": 1,
+        "extracted_data": {"environmental_impact": text}
+    }
+
+
+def test_score_portfolio_ranks_and_stores(registry):
+    documents = {
+        "strong": [_document("strong", "Water withdrawal, waste generated and scope 1 emissions")],
+        "weak": [_document("weak", "Scope 1 emissions")],
+        "stale": [_document("stale", "No data")]
+    }
+    current = document_set_version(documents["weak"], with_series=False)
+    results = {
+        "weak": {"broad_framework": {
+            "document_set_hash": current,
+            "result": {"requirement_status": {"Board oversight": "supported"}}
+        }},
+        "stale": {"broad_framework": {
+            "document_set_hash": "outdated",
+            "result": {"requirement_status": {"Board oversight": "supported"}}
+        }}
+    }
+    db = FakeDatabase(documents, results)
+    engine = ESGScoringEngine(db, registry)
+    engine.frameworks = ["climate_framework", "broad_framework"]
+
+    summary = asyncio.run(engine.score_portfolio(["weak", "stale", "strong", "missing", "weak"]))
+
+    assert (summary["scored"], summary["failed"]) == (3, 1)
+    ranked = [r["project_id"] for r in summary["results"]]
+    assert ranked == ["weak", "strong", "stale"]
+    assert [r["rank"] for r in summary["results"]] == [1, 2, 3]
+
+    stale = summary["results"][2]
+    assert stale["overall_score"] == 0.0
+    assert stale["governance_score"] == 0.0
+    assert db.saved == summary["results"]
+    assert summary["results"][0]["model_version"] == engine.model.version
+
+
+def test_model_follows_registry_reloads(registry, tmp_path):
+    engine = ESGScoringEngine(FakeDatabase({}, {}), registry)
+    engine.frameworks = ["climate_framework"]
+    version = engine.model.version
+    assert engine.model is engine.model
+
+    path = tmp_path / "frameworks.json"
+    frameworks = [dict(FRAMEWORKS[0], version="2")]
+    with open(path, "w") as f:
+        json.dump({"esg_frameworks": frameworks}, f)
+    os.utime(path, (2000, 2000))
+    registry.reload()
+
+    assert engine.model.version != version
+    assert engine.score_facts({"text": "scope 1 emissions"})["environmental"] == 100.0
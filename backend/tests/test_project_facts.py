@@ -0,0 +1,127 @@
+"""
+InfraFlow AI - Project Facts tests
+Document-set versions, fact sheet consolidation and the fact sheet cache
+"""
+
+import json
+
+from project_facts import (
+    FactSheetCache,
+    build_fact_sheet,
+    changed_documents,
+    document_set_version,
+    document_versions
+)
+
+
+def _documents():
+    return [
+        {
+            "id": "d2",
+            "project_id": "p1",
+            "name": "model.xlsx",
+            "type": "financial_model",
+            "revision": 2,
+            "updated_at": "2025-02-01",
+            "processed": True,
+            "extracted_data": json.dumps({
+                "total_investment": 250000000,
+                "financial_structure": "70/30 debt/equity",
+                "stakeholders": ["IFC", "Ministry of Energy"]
+            }),
+            "financial_series": {"revenue": [10, 12, 14]}
+        },
+        {
+            "id": "d1",
+            "project_id": "p1",
+            "name": "esia.pdf",
+            "type": "environmental_impact",
+            "revision": 1,
+            "updated_at": "2025-01-01",
+            "processed": True,
+            "extracted_data": {
+                "total_investment": 240000000,
+                "environmental_impact": "Moderate, mitigated",
+                "risk_factors": ["resettlement"],
+                "stakeholders": ["IFC", "Local communities"],
+                "technology": "solar PV"
+            }
+        },
+        {"id": "d3", "project_id": "p1", "name": "scan.pdf", "extracted_data": "not json"}
+    ]
+
+
+def test_document_set_version_tracks_membership_and_revisions():
+    documents = _documents()
+    version = document_set_version(documents)
+
+    assert document_set_version(list(reversed(documents))) == version
+    assert document_set_version(documents[:2]) != version
+
+    revised = [dict(documents[0], revision=3)] + documents[1:]
+    assert document_set_version(revised) != version
+
+    without_series = [{k: v for k, v in d.items() if k != "financial_series"} for d in documents]
+    assert document_set_version(without_series) != version
+    assert document_set_version(without_series, with_series=False) == document_set_version(
+        documents, with_series=False
+    )
+
+
+def test_changed_documents():
+    before = document_versions(_documents())
+    after = document_versions([dict(_documents()[0], revision=3), _documents()[2]])
+    assert changed_documents(before, after) == ["d1", "d2"]
+    assert changed_documents(before, before) == []
+
+
+def test_build_fact_sheet_consolidates_in_row_order():
+    sheet = build_fact_sheet(_documents())
+
+    assert sheet["total_documents"] == 3
+    assert sheet["processed_documents"] == 2
+    assert sheet["data_sources"] == ["model.xlsx", "esia.pdf"]
+    assert sheet["total_investment"] == 250000000
+    assert sheet["stakeholders"] == ["IFC", "Ministry of Energy", "Local communities"]
+    assert sheet["technologies"] == ["solar PV"]
+    assert sheet["financial_data"]["series"] == {"revenue": [10, 12, 14]}
+    assert sheet["document_types"]["financial_model"] == 1
+
+    compliance = sheet["compliance_data"]
+    assert compliance["environmental_data"] == {"impact_assessment": "Moderate, mitigated"}
+    assert compliance["financial_structure"] == "70/30 debt/equity"
+    assert sheet["fact_sources"]["stakeholders"] == ["d2", "d1"]
+    assert sheet["fact_sources"]["environmental_data"] == ["d1"]
+
+    # Later rows win in the merged view
+    assert sheet["merged"]["total_investment"] == 240000000
+
+
+def test_cache_reuses_sheet_until_documents_change():
+    cache = FactSheetCache(max_entries=8)
+    documents = _documents()
+
+    first = cache.get(documents)
+    assert cache.get(documents) is first
+    assert cache.get([dict(documents[0], revision=3)] + documents[1:]) is not first
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 2)
+
+
+def test_cache_invalidate_and_eviction():
+    cache = FactSheetCache(max_entries=1)
+    first = cache.get(_documents())
+    cache.get([{"id": "x", "project_id": "p2"}])
+    assert cache.get(_documents()) is not first
+
+    sheet = cache.get(_documents())
+    cache.invalidate("p1")
+    assert cache.get(_documents()) is not sheet
+    assert cache.get_stats()["invalidations"] == 1
+
+
+def test_cache_disabled():
+    cache = FactSheetCache(max_entries=0)
+    assert cache.get(_documents()) is not cache.get(_documents())
+    assert cache.get_stats()["entries"] == 0
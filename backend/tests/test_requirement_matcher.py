@@ -0,0 +1,67 @@
+"""
+InfraFlow AI - Requirement Matcher tests
+Phrase normalization, requirement variants and multi-pattern scanning
+"""
+
+from requirement_matcher import RequirementMatcher, phrase_key, phrase_variants
+
+
+def test_phrase_key_ignores_case_stopwords_and_plurals():
+    assert phrase_key("The Grievance Mechanisms") == phrase_key("grievance mechanism")
+    assert phrase_key("Monitoring of emissions") == phrase_key("monitored emission")
+
+
+def test_phrase_variants_include_acronyms_and_synonyms():
+    variants = phrase_variants("Environmental and Social Impact Assessment (ESIA)")
+    assert variants[0] == "Environmental and Social Impact Assessment"
+    assert "ESIA" in variants
+    assert "EIA" in variants
+
+    # Lowercase or long parentheticals are not treated as acronyms
+    assert phrase_variants("Resettlement plan (where applicable)") == ["Resettlement plan"]
+
+
+def test_scan_reports_requirement_and_offsets():
+    matcher = RequirementMatcher(["Grievance Mechanism", "Stakeholder Engagement Plan"])
+    text = "The project has a Grievance Redress Mechanism and a stakeholder engagement plan."
+
+    matches = matcher.scan(text)
+    found = {m["requirement"]: m for m in matches}
+    assert set(found) == {"Grievance Mechanism", "Stakeholder Engagement Plan"}
+
+    grievance = found["Grievance Mechanism"]
+    assert grievance["variant"] == "grievance redress mechanism"
+    assert text[grievance["start"]:grievance["end"]] == "Grievance Redress Mechanism"
+    assert found["Stakeholder Engagement Plan"]["text"] == "stakeholder engagement plan"
+
+
+def test_scan_finds_overlapping_and_nested_phrases():
+    matcher = RequirementMatcher(
+        ["Environmental and Social Management Plan", "Management Plan"],
+        synonyms={}
+    )
+    matches = matcher.scan("An environmental & social management plans annex")
+    assert sorted(m["requirement"] for m in matches) == [
+        "Environmental and Social Management Plan",
+        "Management Plan"
+    ]
+
+
+def test_scan_respects_word_boundaries():
+    matcher = RequirementMatcher(["Board independence"], synonyms={})
+    assert matcher.scan("Keyboard independence day") == []
+    assert len(matcher.scan("BOARD INDEPENDENCE is assessed")) == 1
+
+
+def test_match_walks_nested_data():
+    matcher = RequirementMatcher(["ESMS", "Local employment targets"], synonyms={})
+    data = {
+        "governance_data": {"systems": ["An ESMS certified to ISO 14001"]},
+        "social_data": {"workforce": "Local employment targets of 60%"},
+        "capacity": 50
+    }
+    hits = matcher.match(data)
+    assert hits["ESMS"][0]["field"] == "governance_data.systems[0]"
+    assert hits["Local employment targets"][0]["field"] == "social_data.workforce"
+
+    assert len(matcher.match(["ESMS ESMS ESMS ESMS"], max_hits=2)["ESMS"]) == 2
@@ -0,0 +1,114 @@
+"""
+InfraFlow AI - Retrieval tests
+Tokenizer, BM25 chunk store, reciprocal rank fusion and hybrid search
+"""
+
+import asyncio
+
+import pytest
+
+from retrieval import ChunkStore, HybridRetriever, reciprocal_rank_fusion, rerank, tokenize
+
+
+CHUNKS = [
+    {
+        "id": "c1",
+        "text": "The solar plant has an installed capacity of 50 MW and an IRR of 12.5%.",
+        "metadata": {"filename": "feasibility.pdf", "chunk_index": 0, "page": 1}
+    },
+    {
+        "id": "c2",
+        "text": "Resettlement action plan for affected households near the wind farm.",
+        "metadata": {"filename": "esia.pdf", "chunk_index": 0, "page": 3}
+    },
+    {
+        "id": "c3",
+        "text": "Stakeholder engagement plan and grievance mechanism for the wind farm.",
+        "metadata": {"filename": "esia.pdf", "chunk_index": 1, "page": 4}
+    }
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    chunk_store = ChunkStore(str(tmp_path / "chunks.db"))
+    chunk_store.add_chunks("project_a", CHUNKS)
+    return chunk_store
+
+
+def test_tokenize_keeps_figures_and_drops_stopwords():
+    assert tokenize("The IRR is 12.5% for the 1,200 MW plant") == ["irr", "12.5%", "1,200", "mw", "plant"]
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "a", "d"]], k=60)
+    ids = [item_id for item_id, _ in fused]
+    assert set(ids[:2]) == {"a", "b"}
+    assert ids[-1] in ("c", "d")
+    assert fused[0][1] == pytest.approx(1 / 61 + 1 / 62)
+
+
+def test_bm25_ranks_matching_chunks(store):
+    results = store.bm25_search("project_a", "resettlement households")
+    assert results[0][0] == "c2"
+    assert [chunk_id for chunk_id, _ in results] == ["c2"]
+
+    wind = dict(store.bm25_search("project_a", "wind farm"))
+    assert set(wind) == {"c2", "c3"}
+    assert store.bm25_search("project_a", "the of") == []
+    assert store.bm25_search("other_project", "wind") == []
+
+
+def test_reindexed_chunk_replaces_postings(store):
+    store.add_chunks("project_a", [{
+        "id": "c2",
+        "text": "Biodiversity baseline survey.",
+        "metadata": {"filename": "esia.pdf", "chunk_index": 0}
+    }])
+    assert store.bm25_search("project_a", "resettlement") == []
+    assert store.bm25_search("project_a", "biodiversity")[0][0] == "c2"
+
+
+def test_delete_and_positions(store):
+    store.delete_chunks("project_a", ["c1"])
+    assert store.get_chunks("project_a", ["c1"]) == {}
+
+    store.update_positions("project_a", [("c3", 0, {"page": 9, "char_start": 10, "char_end": 20})])
+    chunk = store.get_chunks("project_a", ["c3"])["c3"]
+    assert (chunk["chunk_index"], chunk["page"], chunk["char_start"]) == (0, 9, 10)
+
+    store.delete_chunks("project_a")
+    assert store.list_namespaces() == []
+
+
+def test_rerank_prefers_full_query_coverage():
+    candidates = [
+        {"text": "grievance process", "score": 1.0},
+        {"text": "stakeholder engagement plan with grievance mechanism", "score": 0.9}
+    ]
+    ranked = rerank("grievance mechanism", candidates)
+    assert ranked[0]["text"].startswith("stakeholder")
+
+
+def test_hybrid_search_fuses_vector_and_bm25(store):
+    retriever = HybridRetriever(store)
+    vector_matches = [
+        {"id": "c3", "score": 0.9, "metadata": {}},
+        {"id": "missing", "score": 0.8, "metadata": {"text": "snippet", "filename": "x.pdf"}}
+    ]
+    results = asyncio.run(retriever.search(
+        "project_a",
+        "stakeholder grievance",
+        vector_matches=vector_matches,
+        top_k=3,
+        use_reranker=False
+    ))
+
+    assert results[0]["id"] == "c3"
+    assert results[0]["vector_score"] == 0.9
+    assert results[0]["bm25_score"] > 0
+    assert results[0]["filename"] == "esia.pdf"
+
+    fallback = next(r for r in results if r["id"] == "missing")
+    assert fallback["text"] == "snippet"
+    assert fallback["bm25_score"] is None
@@ -0,0 +1,130 @@
+"""
+InfraFlow AI - Standards Registry tests
+Loading, merging and reloading standards from research data files
+"""
+
+import json
+import os
+
+import pytest
+
+from standards_registry import BUILTIN_STANDARDS, StandardsRegistry, standard_code
+
+
+def _write(path, data, mtime=None):
+    with open(path, "w") as f:
+        json.dump(data, f)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def _registry(tmp_path, compliance=None, esg=None):
+    _write(tmp_path / "standards.json", {"compliance_standards": compliance or []}, mtime=1000)
+    _write(tmp_path / "frameworks.json", {"esg_frameworks": esg or []}, mtime=1000)
+    return StandardsRegistry(str(tmp_path), ["standards.json", "frameworks.json"])
+
+
+def test_standard_code():
+    assert standard_code({"name": "IFC Performance Standards 2012"}) == "ifc_performance"
+    assert standard_code({"name": "GRI Standards (2021)"}) == "gri_standards_2021"
+    assert standard_code({"name": "Anything", "code": "custom"}) == "custom"
+
+
+def test_builtins_without_data_files(tmp_path):
+    registry = StandardsRegistry(str(tmp_path), ["missing.json"])
+    assert set(registry) == set(BUILTIN_STANDARDS)
+    assert "ifc_performance" in registry
+
+    record = registry["ebrd_environmental"]
+    assert record["sources"] == ["builtin"]
+    assert record["requirements"][0]["id"] == "ebrd_environmental:1"
+    assert "Grievance Mechanism" in record["key_requirements"]
+
+    with pytest.raises(KeyError):
+        registry["unknown"]
+
+
+def test_data_file_entries_extend_builtins_and_add_standards(tmp_path):
+    registry = _registry(
+        tmp_path,
+        compliance=[{
+            "name": "IFC Performance Standards",
+            "version": "2012",
+            "performance_standards": [
+                {"code": "PS1", "name": "Assessment", "key_requirements": [
+                    "Environmental and Social Management Systems",
+                    "Grievance mechanism for affected communities"
+                ]},
+                {"code": "PS7", "name": "Indigenous Peoples", "description": "FPIC where required"}
+            ]
+        }],
+        esg=[{
+            "name": "TCFD Recommendations",
+            "key_metrics": {"environmental": ["Scope 1 emissions"], "governance": ["Board oversight"]}
+        }]
+    )
+
+    ifc = registry["ifc_performance"]
+    assert ifc["version"] == "2012"
+    assert ifc["sources"] == ["builtin", "standards.json"]
+    assert ifc["categories"] == ["PS1: Assessment", "PS7: Indigenous Peoples"]
+    texts = ifc["key_requirements"]
+    # Deduplicated against the built-in wording
+    assert texts.count("Environmental and Social Management System") == 1
+    assert "Environmental and Social Management Systems" not in texts
+    assert "Grievance mechanism for affected communities" in texts
+    assert "Indigenous Peoples" in texts
+
+    tcfd = registry["tcfd_recommendations"]
+    assert tcfd["kind"] == "esg_framework"
+    assert {(r["text"], r["pillar"]) for r in tcfd["requirements"]} == {
+        ("Scope 1 emissions", "environmental"),
+        ("Board oversight", "governance")
+    }
+    assert [s["code"] for s in registry.list_standards(kind="esg_framework")] == ["tcfd_recommendations"]
+
+
+def test_applicability_merges_without_normalizing(tmp_path):
+    registry = _registry(tmp_path, compliance=[{
+        "name": "Equator Principles",
+        "applicability": {"project_cost_min_usd": 10000000}
+    }])
+    assert registry.applicability("equator_principles") == {
+        "financial_structure": ["project finance"],
+        "project_cost_min_usd": 10000000
+    }
+    assert registry.applicability("unknown") == {}
+
+
+def test_matcher_is_compiled_once(tmp_path):
+    registry = _registry(tmp_path)
+    matcher = registry.matcher("local_content")
+    assert registry.matcher("local_content") is matcher
+    assert [m["requirement"] for m in matcher.scan("Local hiring targets")] == ["Local employment targets"]
+
+
+def test_reload_picks_up_changed_files(tmp_path):
+    registry = _registry(tmp_path)
+    fingerprint = registry["eu_taxonomy"]["fingerprint"]
+    assert registry.reload() is False
+
+    _write(tmp_path / "standards.json", {"compliance_standards": [
+        {"name": "EU Taxonomy", "version": "2023", "key_requirements": ["Climate risk assessment"]},
+        {"name": "New Standard", "key_requirements": ["Annual report"]}
+    ]}, mtime=2000)
+
+    assert registry.reload() is True
+    assert registry.version == 2
+    assert "new_standard" in registry
+    updated = registry["eu_taxonomy"]
+    assert updated["fingerprint"] != fingerprint
+    assert "Climate risk assessment" in updated["key_requirements"]
+
+
+def test_bundled_research_data_loads():
+    registry = StandardsRegistry()
+    assert set(BUILTIN_STANDARDS) <= set(registry)
+    for code in registry:
+        record = registry[code]
+        assert record["key_requirements"], code
+        assert len(record["fingerprint"]) == 16
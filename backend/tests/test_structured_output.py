@@ -0,0 +1,80 @@
+"""
+InfraFlow AI - Structured Output tests
+Incremental JSON parsing, truncation repair and schema coercion
+"""
+
+import pytest
+
+from structured_output import IncrementalJSONParser, coerce_to_schema, parse_json_response
+
+
+def test_parser_completes_on_first_value_across_chunks():
+    parser = IncrementalJSONParser()
+    chunks = ['Here you go: {"name": "Solar', ' {A}", "items": [1, ', '2]}', ' and more prose {"x": 1}']
+
+    done = [parser.feed(chunk) for chunk in chunks]
+    assert done == [False, False, True, True]
+    assert parser.result() == {"name": "Solar {A}", "items": [1, 2]}
+
+
+def test_parser_handles_escaped_quotes_and_brackets_in_strings():
+    text = '{"quote": "he said \\"}]\\" twice", "n": 1} trailing'
+    assert parse_json_response(text) == {"quote": 'he said "}]" twice', "n": 1}
+
+
+def test_truncated_response_keeps_complete_members():
+    parser = IncrementalJSONParser()
+    parser.feed('{"a": 1, "b": [1, 2, {"c": 3}], "d": "unfinish')
+    assert parser.complete is False
+    assert parser.result() == {"a": 1, "b": [1, 2, {"c": 3}]}
+
+
+def test_truncated_before_any_member_yields_empty_container():
+    parser = IncrementalJSONParser()
+    parser.feed('[{"a": ')
+    assert parser.result() == []
+
+
+def test_no_json_raises():
+    with pytest.raises(ValueError):
+        parse_json_response("I could not find any figures.")
+
+
+def test_coerce_to_schema():
+    schema = {
+        "type": "object",
+        "properties": {
+            "capex": {"type": "number"},
+            "capacity_mw": {"type": ["integer", "null"]},
+            "lenders": {"type": "array", "items": {"type": "string"}},
+            "operational": {"type": "boolean"},
+            "notes": {"type": "string"},
+            "missing": {"type": "number"}
+        }
+    }
+    value = {
+        "capex": "USD 1.2 billion",
+        "capacity_mw": "450.7 MW",
+        "lenders": "IFC",
+        "operational": "Yes",
+        "notes": {"source": "p. 4"},
+        "extra": "dropped"
+    }
+
+    assert coerce_to_schema(value, schema) == {
+        "capex": 1200000000,
+        "capacity_mw": 450,
+        "lenders": ["IFC"],
+        "operational": True,
+        "notes": '{"source": "p. 4"}',
+        "missing": None
+    }
+
+
+def test_coerce_drops_uncoercible_values():
+    assert coerce_to_schema("n/a", {"type": "number"}) is None
+    assert coerce_to_schema(True, {"type": "number"}) is None
+    assert coerce_to_schema("1,250,000", {"type": "integer"}) == 1250000
+    assert coerce_to_schema(["3", "x", 4], {"type": "array", "items": {"type": "number"}}) == [3, 4]
+    assert coerce_to_schema("", {"type": "array"}) == []
+    assert coerce_to_schema([], {"type": "object", "properties": {}}) is None
@@ -0,0 +1,147 @@
+"""
+InfraFlow AI - Vector Store tests
+Local memory-mapped backend: search, filters, deletes, persistence and IVF
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from vector_store import LocalVectorStore, _matches_filter
+
+
+def _vectors(count, dimension=8, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {"id": f"v{i}", "values": rng.normal(size=dimension).tolist(), "metadata": {"i": i}}
+        for i in range(count)
+    ]
+
+
+def test_query_returns_nearest_vectors_by_cosine(tmp_path):
+    store = LocalVectorStore(str(tmp_path), dimension=8)
+    vectors = _vectors(50)
+
+    async def run():
+        await store.upsert("ns", vectors)
+        return await store.query("ns", vectors[7]["values"], top_k=3)
+
+    matches = asyncio.run(run())
+    assert len(matches) == 3
+    assert matches[0]["id"] == "v7"
+    assert matches[0]["score"] == pytest.approx(1.0, abs=1e-5)
+    assert matches[0]["metadata"] == {"i": 7}
+    assert [m["score"] for m in matches] == sorted((m["score"] for m in matches), reverse=True)
+
+
+def test_query_applies_metadata_filter(tmp_path):
+    store = LocalVectorStore(str(tmp_path), dimension=8)
+    vectors = _vectors(50)
+
+    async def run():
+        await store.upsert("ns", vectors)
+        return await store.query("ns", vectors[7]["values"], top_k=5, filter={"i": {"$gte": 40}})
+
+    matches = asyncio.run(run())
+    assert len(matches) == 5
+    assert all(m["metadata"]["i"] >= 40 for m in matches)
+
+
+def test_upsert_overwrites_and_delete_removes(tmp_path):
+    store = LocalVectorStore(str(tmp_path), dimension=8)
+    vectors = _vectors(10)
+
+    async def run():
+        await store.upsert("ns", vectors)
+        await store.upsert("ns", [{"id": "v1", "values": vectors[2]["values"], "metadata": {"i": 99}}])
+        await store.delete("ns", ids=["v2"])
+        return await store.query("ns", vectors[2]["values"], top_k=10)
+
+    matches = asyncio.run(run())
+    ids = [m["id"] for m in matches]
+    assert ids[0] == "v1"
+    assert matches[0]["metadata"] == {"i": 99}
+    assert "v2" not in ids
+    assert len(ids) == 9
+
+
+def test_rejects_vectors_of_wrong_dimension(tmp_path):
+    store = LocalVectorStore(str(tmp_path), dimension=8)
+    with pytest.raises(ValueError):
+        asyncio.run(store.upsert("ns", [{"id": "a", "values": [1.0, 2.0]}]))
+
+
+def test_namespace_survives_reopen(tmp_path):
+    vectors = _vectors(20)
+    asyncio.run(LocalVectorStore(str(tmp_path), dimension=8).upsert("ns", vectors))
+    asyncio.run(LocalVectorStore(str(tmp_path), dimension=8).delete("ns", ids=["v3"]))
+
+    store = LocalVectorStore(str(tmp_path), dimension=8)
+    matches = asyncio.run(store.query("ns", vectors[4]["values"], top_k=20))
+    assert matches[0]["id"] == "v4"
+    assert "v3" not in [m["id"] for m in matches]
+    assert asyncio.run(store.list_namespaces()) == ["ns"]
+
+
+def test_delete_all_drops_namespace(tmp_path):
+    store = LocalVectorStore(str(tmp_path), dimension=8)
+
+    async def run():
+        await store.upsert("ns", _vectors(5))
+        await store.delete("ns", delete_all=True)
+        return await store.list_namespaces(), await store.query("ns", [1.0] * 8)
+
+    namespaces, matches = asyncio.run(run())
+    assert namespaces == []
+    assert matches == []
+
+
+def test_query_many_matches_single_queries(tmp_path):
+    store = LocalVectorStore(str(tmp_path), dimension=8)
+    vectors = _vectors(40)
+    queries = [v["values"] for v in vectors[:5]]
+
+    async def run():
+        await store.upsert("ns", vectors)
+        await store.delete("ns", ids=["v0"])
+        batch = await store.query_many("ns", queries, top_k=3)
+        single = [await store.query("ns", q, top_k=3) for q in queries]
+        return batch, single
+
+    batch, single = asyncio.run(run())
+    assert [[m["id"] for m in r] for r in batch] == [[m["id"] for m in r] for r in single]
+    assert all("v0" not in [m["id"] for m in r] for r in batch)
+
+
+def test_ivf_search_finds_exact_match_and_overwritten_rows(tmp_path):
+    store = LocalVectorStore(str(tmp_path), dimension=8, ivf_threshold=100, nprobe=1)
+    vectors = _vectors(400)
+    query = np.random.default_rng(99).normal(size=8).tolist()
+
+    async def run():
+        await store.upsert("ns", vectors)
+        first = await store.query("ns", vectors[123]["values"], top_k=1)
+        # Overwrite an indexed row; it must move to its new list
+        await store.upsert("ns", [{"id": "v0", "values": query, "metadata": {"i": 0}}])
+        second = await store.query("ns", query, top_k=1)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first[0]["id"] == "v123"
+    assert second[0]["id"] == "v0"
+
+    ns = store._namespace("ns")
+    rows = np.concatenate(ns.ivf_lists)
+    assert len(rows) == len(set(rows.tolist())) == ns.ivf_rows
+
+
+def test_matches_filter_operators():
+    metadata = {"type": "esia", "page": 4}
+    assert _matches_filter(metadata, {"type": "esia"})
+    assert _matches_filter(metadata, {"type": {"$in": ["esia", "permit"]}})
+    assert not _matches_filter(metadata, {"type": {"$nin": ["esia"]}})
+    assert _matches_filter(metadata, {"page": {"$gt": 3, "$lte": 4}})
+    assert not _matches_filter(metadata, {"missing": {"$gt": 0}})
+    assert _matches_filter(metadata, {"$or": [{"type": "permit"}, {"page": 4}]})
+    assert not _matches_filter(metadata, {"$and": [{"type": "esia"}, {"page": {"$ne": 4}}]})
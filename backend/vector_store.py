@@ -0,0 +1,681 @@
+"""
+InfraFlow AI - Vector Store
+Pluggable vector storage with Pinecone and local memory-mapped backends
+"""
+
+from typing import Dict, Any, List, Optional
+import os
+import json
+import logging
+import asyncio
+import shutil
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIMENSION = 1536  # OpenAI text-embedding-3-small
+
+
+class VectorStore:
+    """
+    Interface shared by all vector store backends
+
+    Vectors are passed as dicts with ``id``, ``values`` and ``metadata``;
+    query matches are returned as dicts with ``id``, ``score`` and ``metadata``.
+    """
+
+    async def upsert(self, namespace: str, vectors: List[Dict[str, Any]]):
+        """Insert or replace vectors in a namespace"""
+        raise NotImplementedError
+
+    async def query(
+        self,
+        namespace: str,
+        vector: List[float],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Return the top_k most similar vectors in a namespace"""
+        raise NotImplementedError
+
+    async def query_many(
+        self,
+        namespace: str,
+        vectors: List[List[float]],
+        top_k: int = 5
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Return the top_k matches of each of several query vectors
+
+        Backends that hold vectors locally answer all queries with one
+        matrix product; the default issues the queries concurrently.
+        """
+        return list(await asyncio.gather(*(
+            self.query(namespace, vector, top_k=top_k) for vector in vectors
+        )))
+
+    async def delete(
+        self,
+        namespace: str,
+        ids: Optional[List[str]] = None,
+        delete_all: bool = False
+    ):
+        """Delete vectors by id, or the whole namespace"""
+        raise NotImplementedError
+
+    async def list_namespaces(self) -> List[str]:
+        """Names of all non-empty namespaces"""
+        raise NotImplementedError
+
+
+class PineconeVectorStore(VectorStore):
+    """Pinecone serverless backend"""
+
+    def __init__(self, api_key: str, index_name: str, environment: str = "us-east-1"):
+        """
+        Initialize Pinecone client and index handle
+
+        Args:
+            api_key: Pinecone API key
+            index_name: Index name
+            environment: Serverless region
+        """
+        from pinecone import Pinecone
+
+        self.pc = Pinecone(api_key=api_key)
+        self.index_name = index_name
+        self.environment = environment
+        self._ensure_index()
+
+        # Reuse one index handle (and its connection pool) for every call
+        self.index = self.pc.Index(self.index_name)
+
+    def _ensure_index(self):
+        """Ensure Pinecone index exists"""
+        from pinecone import ServerlessSpec
+
+        try:
+            existing_indexes = self.pc.list_indexes()
+            index_names = [index.name for index in existing_indexes]
+
+            if self.index_name not in index_names:
+                logger.info(f"Creating Pinecone index: {self.index_name}")
+                self.pc.create_index(
+                    name=self.index_name,
+                    dimension=EMBEDDING_DIMENSION,
+                    metric="cosine",
+                    spec=ServerlessSpec(
+                        cloud="aws",
+                        region=self.environment
+                    )
+                )
+                logger.info("Pinecone index created successfully")
+
+        except Exception as e:
+            logger.error(f"Error ensuring Pinecone index: {str(e)}")
+
+    async def upsert(self, namespace: str, vectors: List[Dict[str, Any]]):
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(
+            None,
+            lambda: self.index.upsert(vectors=vectors, namespace=namespace)
+        )
+
+    async def query(
+        self,
+        namespace: str,
+        vector: List[float],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        loop = asyncio.get_event_loop()
+        results = await loop.run_in_executor(
+            None,
+            lambda: self.index.query(
+                vector=vector,
+                top_k=top_k,
+                namespace=namespace,
+                filter=filter,
+                include_metadata=True
+            )
+        )
+        return [
+            {"id": match.id, "score": match.score, "metadata": match.metadata or {}}
+            for match in results.matches
+        ]
+
+    async def delete(
+        self,
+        namespace: str,
+        ids: Optional[List[str]] = None,
+        delete_all: bool = False
+    ):
+        loop = asyncio.get_event_loop()
+        if delete_all:
+            await loop.run_in_executor(
+                None,
+                lambda: self.index.delete(delete_all=True, namespace=namespace)
+            )
+        elif ids:
+            await loop.run_in_executor(
+                None,
+                lambda: self.index.delete(ids=ids, namespace=namespace)
+            )
+
+    async def list_namespaces(self) -> List[str]:
+        loop = asyncio.get_event_loop()
+        stats = await loop.run_in_executor(None, self.index.describe_index_stats)
+        return list(stats.namespaces or {})
+
+
+class _LocalNamespace:
+    """
+    One namespace of the local store
+
+    Vectors live in an append-only float32 matrix in a memory-mapped file,
+    L2-normalized so cosine similarity is a single dot product. Metadata and
+    deletions are journaled to a JSON-lines file and replayed on open.
+    """
+
+    def __init__(self, path: str, dimension: int):
+        self.path = path
+        self.dimension = dimension
+        self.lock = threading.RLock()
+
+        self.ids: List[Optional[str]] = []
+        self.metadata: List[Optional[Dict[str, Any]]] = []
+        self.id_to_row: Dict[str, int] = {}
+        self.count = 0
+        self.capacity = 0
+        self.matrix: Optional[np.memmap] = None
+
+        # IVF index over rows [0, ivf_rows); later rows are scanned directly
+        self.ivf_centroids: Optional[np.ndarray] = None
+        self.ivf_lists: List[np.ndarray] = []
+        self.ivf_assignments: Optional[np.ndarray] = None
+        self.ivf_rows = 0
+
+        os.makedirs(self.path, exist_ok=True)
+        self._load()
+
+    @property
+    def vectors_file(self) -> str:
+        return os.path.join(self.path, "vectors.f32")
+
+    @property
+    def journal_file(self) -> str:
+        return os.path.join(self.path, "journal.jsonl")
+
+    @property
+    def live_count(self) -> int:
+        return len(self.id_to_row)
+
+    def _load(self):
+        """Replay the journal and map the vector file"""
+        if os.path.exists(self.journal_file):
+            with open(self.journal_file, "r") as f:
+                for line in f:
+                    record = json.loads(line)
+                    row = record["row"]
+                    while len(self.ids) <= row:
+                        self.ids.append(None)
+                        self.metadata.append(None)
+                    if record.get("deleted"):
+                        self.id_to_row.pop(self.ids[row], None)
+                        self.ids[row] = None
+                        self.metadata[row] = None
+                    else:
+                        self.ids[row] = record["id"]
+                        self.metadata[row] = record.get("metadata", {})
+                        self.id_to_row[record["id"]] = row
+            self.count = len(self.ids)
+
+        if os.path.exists(self.vectors_file):
+            size = os.path.getsize(self.vectors_file)
+            self.capacity = size // (4 * self.dimension)
+            if self.capacity:
+                self.matrix = np.memmap(
+                    self.vectors_file,
+                    dtype=np.float32,
+                    mode="r+",
+                    shape=(self.capacity, self.dimension)
+                )
+
+    def _ensure_capacity(self, needed: int):
+        """Grow the memory-mapped file geometrically"""
+        if needed <= self.capacity:
+            return
+
+        new_capacity = max(needed, self.capacity * 2, 1024)
+        if self.matrix is not None:
+            self.matrix.flush()
+            del self.matrix
+
+        with open(self.vectors_file, "ab") as f:
+            f.truncate(new_capacity * self.dimension * 4)
+
+        self.capacity = new_capacity
+        self.matrix = np.memmap(
+            self.vectors_file,
+            dtype=np.float32,
+            mode="r+",
+            shape=(self.capacity, self.dimension)
+        )
+
+    def upsert(self, vectors: List[Dict[str, Any]]):
+        """
+        Insert new vectors at the tail, overwrite existing ones in place
+
+        Overwritten rows covered by the IVF index move to the list of
+        their new nearest centroid.
+        """
+        with self.lock:
+            values = np.asarray([v["values"] for v in vectors], dtype=np.float32)
+            if values.ndim != 2 or values.shape[1] != self.dimension:
+                raise ValueError(
+                    f"Expected vectors of dimension {self.dimension}, got {values.shape}"
+                )
+
+            norms = np.linalg.norm(values, axis=1, keepdims=True)
+            values = values / np.maximum(norms, 1e-12)
+
+            new_ids = [v["id"] for v in vectors if v["id"] not in self.id_to_row]
+            self._ensure_capacity(self.count + len(new_ids))
+
+            journal = []
+            indexed = []
+            for vector, normalized in zip(vectors, values):
+                vector_id = vector["id"]
+                row = self.id_to_row.get(vector_id)
+                if row is None:
+                    row = self.count
+                    self.count += 1
+                    self.ids.append(vector_id)
+                    self.metadata.append(None)
+                    self.id_to_row[vector_id] = row
+                elif row < self.ivf_rows:
+                    indexed.append(row)
+
+                self.matrix[row] = normalized
+                self.metadata[row] = vector.get("metadata", {})
+                journal.append({
+                    "id": vector_id,
+                    "row": row,
+                    "metadata": self.metadata[row]
+                })
+
+            if indexed:
+                self._reassign_ivf(np.asarray(indexed, dtype=np.int64))
+
+            self.matrix.flush()
+            self._append_journal(journal)
+
+    def delete(self, ids: List[str]):
+        """Tombstone vectors; their rows are skipped by every search"""
+        with self.lock:
+            journal = []
+            for vector_id in ids:
+                row = self.id_to_row.pop(vector_id, None)
+                if row is None:
+                    continue
+                self.ids[row] = None
+                self.metadata[row] = None
+                journal.append({"id": vector_id, "row": row, "deleted": True})
+            self._append_journal(journal)
+
+    def _append_journal(self, records: List[Dict[str, Any]]):
+        if not records:
+            return
+        with open(self.journal_file, "a") as f:
+            for record in records:
+                f.write(json.dumps(record, default=str) + "\n")
+
+    def search(
+        self,
+        query: np.ndarray,
+        top_k: int,
+        filter: Optional[Dict[str, Any]],
+        ivf_threshold: int,
+        nprobe: int
+    ) -> List[Dict[str, Any]]:
+        """Brute-force search for small namespaces, IVF probing for large ones"""
+        with self.lock:
+            if self.count == 0 or self.matrix is None:
+                return []
+
+            full_scan = self.live_count < ivf_threshold
+            if full_scan:
+                candidates = np.arange(self.count)
+            else:
+                if self.ivf_rows == 0 or self.count >= 2 * self.ivf_rows:
+                    self._build_ivf()
+                candidates = self._ivf_candidates(query, nprobe)
+
+            live = np.fromiter(
+                (
+                    self.ids[row] is not None
+                    and (filter is None or _matches_filter(self.metadata[row], filter))
+                    for row in candidates
+                ),
+                dtype=bool,
+                count=len(candidates)
+            )
+            if not live.any():
+                return []
+
+            # One BLAS matrix-vector product over the candidate rows
+            if full_scan and live.all():
+                scores = self.matrix[:self.count] @ query
+            else:
+                candidates = candidates[live]
+                scores = self.matrix[candidates] @ query
+
+            k = min(top_k, len(candidates))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+
+            return [
+                {
+                    "id": self.ids[candidates[i]],
+                    "score": float(scores[i]),
+                    "metadata": self.metadata[candidates[i]]
+                }
+                for i in top
+            ]
+
+    def search_many(self, queries: np.ndarray, top_k: int) -> List[List[Dict[str, Any]]]:
+        """
+        Exact top_k of every query over all live rows
+
+        Scores are one (rows x queries) matrix product per block of rows,
+        so matching a batch costs a single pass over the vectors.
+        """
+        with self.lock:
+            results: List[List[Dict[str, Any]]] = [[] for _ in range(len(queries))]
+            if self.count == 0 or self.matrix is None or not len(queries):
+                return results
+
+            dead = np.fromiter(
+                (vector_id is None for vector_id in self.ids[:self.count]),
+                dtype=bool,
+                count=self.count
+            )
+            best_rows = np.empty((0, len(queries)), dtype=np.int64)
+            best_scores = np.empty((0, len(queries)), dtype=np.float32)
+
+            for start in range(0, self.count, 65536):
+                block = self.matrix[start:start + 65536][:self.count - start]
+                scores = block @ queries.T
+                scores[dead[start:start + len(block)]] = -np.inf
+
+                k = min(top_k, len(block))
+                top = np.argpartition(-scores, k - 1, axis=0)[:k]
+                best_rows = np.vstack([best_rows, top + start])
+                best_scores = np.vstack([best_scores, np.take_along_axis(scores, top, axis=0)])
+
+            order = np.argsort(-best_scores, axis=0)[:top_k]
+            for q in range(len(queries)):
+                for i in order[:, q]:
+                    score = float(best_scores[i, q])
+                    if score == -np.inf:
+                        break
+                    row = int(best_rows[i, q])
+                    results[q].append({
+                        "id": self.ids[row],
+                        "score": score,
+                        "metadata": self.metadata[row]
+                    })
+            return results
+
+    def _build_ivf(self, iterations: int = 10):
+        """Cluster current rows with k-means into inverted lists"""
+        data = self.matrix[:self.count]
+        n_lists = max(1, int(np.sqrt(self.count)))
+
+        rng = np.random.default_rng(0)
+        sample_size = min(self.count, n_lists * 64)
+        sample = data[rng.choice(self.count, sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = sample[assignments == c]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    centroids[c] = centroid / max(np.linalg.norm(centroid), 1e-12)
+
+        assignments = np.empty(self.count, dtype=np.int64)
+        for start in range(0, self.count, 65536):
+            block = data[start:start + 65536]
+            assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+        order = np.argsort(assignments, kind="stable")
+        boundaries = np.searchsorted(assignments[order], np.arange(n_lists + 1))
+
+        self.ivf_centroids = centroids
+        self.ivf_lists = [order[boundaries[c]:boundaries[c + 1]] for c in range(n_lists)]
+        self.ivf_assignments = assignments
+        self.ivf_rows = self.count
+        logger.info(f"Built IVF index for {self.path}: {n_lists} lists over {self.count} rows")
+
+    def _reassign_ivf(self, rows: np.ndarray):
+        """Move overwritten indexed rows to the list of their nearest centroid"""
+        nearest = np.argmax(self.matrix[rows] @ self.ivf_centroids.T, axis=1)
+        for row, new in zip(rows, nearest):
+            old = self.ivf_assignments[row]
+            if old == new:
+                continue
+            self.ivf_lists[old] = self.ivf_lists[old][self.ivf_lists[old] != row]
+            self.ivf_lists[new] = np.append(self.ivf_lists[new], row)
+            self.ivf_assignments[row] = new
+
+    def _ivf_candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        """Rows in the nprobe closest lists plus rows added since the last build"""
+        nprobe = min(nprobe, len(self.ivf_lists))
+        probe = np.argpartition(-(self.ivf_centroids @ query), nprobe - 1)[:nprobe]
+        parts = [self.ivf_lists[c] for c in probe]
+        parts.append(np.arange(self.ivf_rows, self.count))
+        return np.concatenate(parts)
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-process vector store backed by memory-mapped files
+
+    Each namespace is a directory holding a float32 matrix and a metadata
+    journal. Works fully offline and needs no external service.
+    """
+
+    def __init__(
+        self,
+        base_path: str,
+        dimension: int = EMBEDDING_DIMENSION,
+        ivf_threshold: int = 20000,
+        nprobe: int = 8
+    ):
+        """
+        Initialize local store
+
+        Args:
+            base_path: Directory holding one subdirectory per namespace
+            dimension: Vector dimension
+            ivf_threshold: Live vector count above which IVF search is used
+            nprobe: Number of IVF lists probed per query
+        """
+        self.base_path = base_path
+        self.dimension = dimension
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        self._namespaces: Dict[str, _LocalNamespace] = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.base_path, exist_ok=True)
+
+    def _namespace_path(self, namespace: str) -> str:
+        safe_name = "".join(
+            ch if ch.isalnum() or ch in "-_" else "_" for ch in namespace
+        )
+        return os.path.join(self.base_path, safe_name)
+
+    def _namespace(self, namespace: str) -> _LocalNamespace:
+        with self._lock:
+            if namespace not in self._namespaces:
+                self._namespaces[namespace] = _LocalNamespace(
+                    self._namespace_path(namespace),
+                    self.dimension
+                )
+            return self._namespaces[namespace]
+
+    def _drop_namespace(self, namespace: str):
+        """Remove a namespace and its files"""
+        with self._lock:
+            ns = self._namespaces.pop(namespace, None)
+            if ns is not None:
+                with ns.lock:
+                    ns.matrix = None
+            shutil.rmtree(self._namespace_path(namespace), ignore_errors=True)
+
+    async def upsert(self, namespace: str, vectors: List[Dict[str, Any]]):
+        if not vectors:
+            return
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self._namespace(namespace).upsert, vectors)
+
+    async def query(
+        self,
+        namespace: str,
+        vector: List[float],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+        # Even small searches leave the event loop: they wait on the
+        # namespace lock held by upserts running in the executor
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None,
+            lambda: self._namespace(namespace).search(
+                query,
+                top_k,
+                filter,
+                self.ivf_threshold,
+                self.nprobe
+            )
+        )
+
+    async def query_many(
+        self,
+        namespace: str,
+        vectors: List[List[float]],
+        top_k: int = 5
+    ) -> List[List[Dict[str, Any]]]:
+        queries = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1)
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None,
+            self._namespace(namespace).search_many,
+            queries,
+            top_k
+        )
+
+    async def delete(
+        self,
+        namespace: str,
+        ids: Optional[List[str]] = None,
+        delete_all: bool = False
+    ):
+        loop = asyncio.get_event_loop()
+        if delete_all:
+            await loop.run_in_executor(None, self._drop_namespace, namespace)
+        elif ids:
+            await loop.run_in_executor(None, self._namespace(namespace).delete, ids)
+
+    async def list_namespaces(self) -> List[str]:
+        # Directory names equal namespace names for project namespaces
+        # (project_<uuid>), which contain only safe characters
+        names = [
+            name for name in os.listdir(self.base_path)
+            if os.path.isdir(os.path.join(self.base_path, name))
+        ]
+        return [name for name in names if self._namespace(name).live_count > 0]
+
+
+def _matches_filter(metadata: Dict[str, Any], filter: Dict[str, Any]) -> bool:
+    """
+    Evaluate a Pinecone-style metadata filter
+
+    Supports equality shorthand, $eq, $ne, $in, $nin, $gt, $gte, $lt, $lte,
+    and top-level $and / $or.
+    """
+    for key, condition in filter.items():
+        if key == "$and":
+            if not all(_matches_filter(metadata, sub) for sub in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(_matches_filter(metadata, sub) for sub in condition):
+                return False
+            continue
+
+        value = metadata.get(key)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        for op, operand in condition.items():
+            if op == "$eq" and value != operand:
+                return False
+            if op == "$ne" and value == operand:
+                return False
+            if op == "$in" and value not in operand:
+                return False
+            if op == "$nin" and value in operand:
+                return False
+            if op in ("$gt", "$gte", "$lt", "$lte"):
+                if value is None:
+                    return False
+                if op == "$gt" and not value > operand:
+                    return False
+                if op == "$gte" and not value >= operand:
+                    return False
+                if op == "$lt" and not value < operand:
+                    return False
+                if op == "$lte" and not value <= operand:
+                    return False
+    return True
+
+
+def create_vector_store() -> Optional[VectorStore]:
+    """
+    Create the configured vector store backend
+
+    VECTOR_STORE selects "pinecone" or "local". When unset, Pinecone is used
+    if PINECONE_API_KEY is configured and the local store otherwise.
+
+    Returns:
+        Vector store instance, or None if Pinecone was requested but is not configured
+    """
+    pinecone_api_key = os.getenv("PINECONE_API_KEY")
+    backend = os.getenv("VECTOR_STORE", "pinecone" if pinecone_api_key else "local").lower()
+
+    if backend == "local":
+        return LocalVectorStore(
+            base_path=os.getenv("LOCAL_VECTOR_STORE_PATH", "./data/vectors"),
+            ivf_threshold=int(os.getenv("LOCAL_VECTOR_IVF_THRESHOLD", "20000")),
+            nprobe=int(os.getenv("LOCAL_VECTOR_NPROBE", "8"))
+        )
+
+    if not pinecone_api_key:
+        logger.warning("Pinecone API key not configured")
+        return None
+
+    return PineconeVectorStore(
+        api_key=pinecone_api_key,
+        index_name=os.getenv("PINECONE_INDEX", "infraflow-docs"),
+        environment=os.getenv("PINECONE_ENVIRONMENT", "us-east-1")
+    )
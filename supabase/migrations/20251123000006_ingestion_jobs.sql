@@ -0,0 +1,79 @@
+-- InfraFlow AI Platform - Document Ingestion Queue
+-- Migration: 20251123000006_ingestion_jobs.sql
+-- Description: Durable job queue for background document processing
+
+-- ============================================================================
+-- INGESTION_JOBS TABLE
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS ingestion_jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    document_id UUID REFERENCES documents(id) ON DELETE SET NULL,
+    filename TEXT NOT NULL,
+    staged_path TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    stage TEXT,
+    checkpoint JSONB DEFAULT '{}'::jsonb,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    last_error TEXT,
+    locked_by TEXT,
+    locked_at TIMESTAMP WITH TIME ZONE,
+    available_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    created_by TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+    CONSTRAINT ingestion_jobs_status_check
+        CHECK (status IN ('pending', 'processing', 'completed', 'failed'))
+);
+
+COMMENT ON TABLE ingestion_jobs IS 'Background document processing jobs claimed by ingestion workers';
+COMMENT ON COLUMN ingestion_jobs.stage IS 'Last completed pipeline stage: ingested, uploaded, saved';
+COMMENT ON COLUMN ingestion_jobs.checkpoint IS 'Outputs of completed stages: {extracted_data, embeddings_id, chunk_count, file_url, document_id}';
+COMMENT ON COLUMN ingestion_jobs.locked_at IS 'Lease start; processing jobs with an expired lease are reclaimed';
+
+CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_claim
+    ON ingestion_jobs(status, available_at, created_at);
+CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_project_id
+    ON ingestion_jobs(project_id);
+
+CREATE TRIGGER update_ingestion_jobs_updated_at BEFORE UPDATE ON ingestion_jobs
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- ============================================================================
+-- CLAIM FUNCTION
+-- ============================================================================
+
+-- Claim pending (or lease-expired) jobs without blocking other workers
+CREATE OR REPLACE FUNCTION claim_ingestion_jobs(
+    worker_id TEXT,
+    batch_size INT DEFAULT 1,
+    lease_seconds INT DEFAULT 900
+)
+RETURNS SETOF ingestion_jobs AS $$
+BEGIN
+    RETURN QUERY
+    UPDATE ingestion_jobs j
+    SET status = 'processing',
+        locked_by = worker_id,
+        locked_at = NOW(),
+        attempts = j.attempts + 1
+    WHERE j.id IN (
+        SELECT q.id
+        FROM ingestion_jobs q
+        WHERE (
+            (q.status = 'pending' AND q.available_at <= NOW())
+            OR (q.status = 'processing'
+                AND q.locked_at < NOW() - make_interval(secs => lease_seconds))
+        )
+        ORDER BY q.created_at ASC
+        LIMIT batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING j.*;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+COMMENT ON FUNCTION claim_ingestion_jobs IS
+    'Atomically claims ingestion jobs for a worker using FOR UPDATE SKIP LOCKED';
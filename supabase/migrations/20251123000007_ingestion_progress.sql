@@ -0,0 +1,15 @@
+-- InfraFlow AI Platform - Ingestion Progress
+-- Migration: 20251123000007_ingestion_progress.sql
+-- Description: Upload batches and per-stage progress snapshots for ingestion jobs
+
+-- ============================================================================
+-- INGESTION_JOBS PROGRESS COLUMNS
+-- ============================================================================
+ALTER TABLE ingestion_jobs ADD COLUMN IF NOT EXISTS batch_id UUID;
+ALTER TABLE ingestion_jobs ADD COLUMN IF NOT EXISTS progress JSONB DEFAULT '{}'::jsonb;
+
+COMMENT ON COLUMN ingestion_jobs.batch_id IS 'Upload request the job belongs to';
+COMMENT ON COLUMN ingestion_jobs.progress IS 'Latest progress snapshot: {stage, pages_parsed, total_pages, chunks, embedded, timings}';
+
+CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_batch_id
+    ON ingestion_jobs(batch_id);
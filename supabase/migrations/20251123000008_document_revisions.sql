@@ -0,0 +1,16 @@
+-- InfraFlow AI Platform - Document Revisions
+-- Migration: 20251123000008_document_revisions.sql
+-- Description: Track document revisions for incremental re-ingestion
+
+-- ============================================================================
+-- DOCUMENTS REVISION COLUMNS
+-- ============================================================================
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS content_hash TEXT;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS revision INTEGER DEFAULT 1;
+
+COMMENT ON COLUMN documents.content_hash IS 'SHA-256 of the latest uploaded revision; identical re-uploads are skipped';
+COMMENT ON COLUMN documents.revision IS 'Revision number, incremented when a document with the same name is re-uploaded';
+
+-- Match uploads to the previous revision of the same logical document
+CREATE INDEX IF NOT EXISTS idx_documents_project_name
+    ON documents(project_id, name) WHERE deleted_at IS NULL;
@@ -0,0 +1,43 @@
+-- InfraFlow AI Platform - Document Financial Series
+-- Migration: 20251123000009_document_series.sql
+-- Description: Typed time series parsed from spreadsheet financial models
+
+-- ============================================================================
+-- DOCUMENT_SERIES TABLE
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS document_series (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    document_id UUID NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    series TEXT NOT NULL,
+    sheet TEXT,
+    label TEXT,
+    periods INTEGER[] NOT NULL,
+    values DOUBLE PRECISION[] NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+    CONSTRAINT document_series_unique UNIQUE (document_id, series),
+    CONSTRAINT document_series_series_check
+        CHECK (series IN ('revenue', 'opex', 'capex', 'debt_service')),
+    CONSTRAINT document_series_length_check
+        CHECK (array_length(periods, 1) = array_length(values, 1))
+);
+
+COMMENT ON TABLE document_series IS 'Revenue, opex, capex and debt service rows detected in uploaded spreadsheets';
+COMMENT ON COLUMN document_series.periods IS 'Period axis (years), aligned with values';
+COMMENT ON COLUMN document_series.label IS 'Row label the series was detected from';
+
+CREATE INDEX IF NOT EXISTS idx_document_series_project_id
+    ON document_series(project_id);
+
+ALTER TABLE document_series ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view project document series"
+    ON document_series FOR SELECT
+    USING (
+        auth.uid() IS NOT NULL
+        AND (
+            has_project_access(project_id)
+            OR is_admin()
+        )
+    );
@@ -0,0 +1,10 @@
+-- InfraFlow AI Platform - Document Type Confidence
+-- Migration: 20251123000010_document_type_confidence.sql
+-- Description: Confidence of the content-based document type classifier
+
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS type_confidence FLOAT;
+
+ALTER TABLE documents ADD CONSTRAINT documents_type_confidence_check
+    CHECK (type_confidence IS NULL OR (type_confidence >= 0 AND type_confidence <= 1));
+
+COMMENT ON COLUMN documents.type_confidence IS 'Classifier confidence (0-1) for documents.type; NULL when typed from the filename only';
@@ -0,0 +1,7 @@
+-- InfraFlow AI Platform - Extraction Provenance
+-- Migration: 20251123000011_document_provenance.sql
+-- Description: Links extracted fields to the chunks they were read from
+
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS provenance JSONB DEFAULT '{}'::jsonb;
+
+COMMENT ON COLUMN documents.provenance IS 'Map of extracted_data field to chunk ids (best match first); chunk page and character ranges live in the chunk store';
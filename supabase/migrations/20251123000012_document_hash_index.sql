@@ -0,0 +1,5 @@
+-- InfraFlow AI Platform - Content Hash Index
+-- Migration: 20251123000012_document_hash_index.sql
+-- Description: Index for content-hash deduplication during bulk ingestion
+
+CREATE INDEX IF NOT EXISTS idx_documents_project_hash ON documents(project_id, content_hash);
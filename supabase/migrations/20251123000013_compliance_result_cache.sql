@@ -0,0 +1,19 @@
+-- InfraFlow AI Platform - Compliance Result Cache
+-- Migration: 20251123000013_compliance_result_cache.sql
+-- Description: Key per-standard compliance results by standard version and document set
+
+-- ============================================================================
+-- COMPLIANCE_CHECKS CACHE COLUMNS
+-- ============================================================================
+ALTER TABLE compliance_checks ADD COLUMN IF NOT EXISTS standard_version TEXT;
+ALTER TABLE compliance_checks ADD COLUMN IF NOT EXISTS document_set_hash TEXT;
+ALTER TABLE compliance_checks ADD COLUMN IF NOT EXISTS result JSONB;
+
+COMMENT ON COLUMN compliance_checks.standard_version IS 'Fingerprint of the standard definition the check ran against';
+COMMENT ON COLUMN compliance_checks.document_set_hash IS 'Version of the project document set the check ran against';
+COMMENT ON COLUMN compliance_checks.result IS 'Full per-standard result, reused while standard and documents are unchanged';
+
+-- Look up a reusable result for a project's current documents
+CREATE INDEX IF NOT EXISTS idx_compliance_checks_cache
+    ON compliance_checks(project_id, document_set_hash, standard)
+    WHERE result IS NOT NULL;
@@ -0,0 +1,7 @@
+-- InfraFlow AI Platform - Partial Compliance Status
+-- Migration: 20251123000014_compliance_partial_status.sql
+-- Description: Allow per-standard results that are partially compliant
+
+-- Compliance checks and portfolio screenings store the checker's status
+-- (compliant, partial, non_compliant) for every standard
+ALTER TYPE compliance_status ADD VALUE IF NOT EXISTS 'partial';
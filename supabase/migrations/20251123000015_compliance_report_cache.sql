@@ -0,0 +1,17 @@
+-- InfraFlow AI Platform - Stored Compliance Reports
+-- Migration: 20251123000015_compliance_report_cache.sql
+-- Description: Keep rendered compliance reports per compliance check and format
+
+-- ============================================================================
+-- REPORTS COLUMNS
+-- ============================================================================
+ALTER TABLE reports ADD COLUMN IF NOT EXISTS compliance_check_id UUID
+    REFERENCES compliance_checks(id) ON DELETE CASCADE;
+ALTER TABLE reports ADD COLUMN IF NOT EXISTS body TEXT;
+
+COMMENT ON COLUMN reports.compliance_check_id IS 'Compliance check a rendered compliance report was generated from';
+COMMENT ON COLUMN reports.body IS 'Rendered report (markdown or HTML), streamed on repeat downloads';
+
+-- One rendering per check, format and template version
+CREATE UNIQUE INDEX IF NOT EXISTS idx_reports_compliance_check
+    ON reports(compliance_check_id, format, template_used);
@@ -0,0 +1,47 @@
+-- InfraFlow AI Platform - ESG Scores
+-- Migration: 20251123000016_esg_scores.sql
+-- Description: Store numeric E/S/G pillar scores per project for ranking and filtering
+
+-- ============================================================================
+-- ESG_SCORES TABLE
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS esg_scores (
+    project_id UUID PRIMARY KEY REFERENCES projects(id) ON DELETE CASCADE,
+    overall_score DOUBLE PRECISION NOT NULL,
+    environmental_score DOUBLE PRECISION NOT NULL,
+    social_score DOUBLE PRECISION NOT NULL,
+    governance_score DOUBLE PRECISION NOT NULL,
+    coverage JSONB DEFAULT '{}'::jsonb,
+    framework_scores JSONB DEFAULT '{}'::jsonb,
+    indicators_met INTEGER DEFAULT 0,
+    model_version TEXT NOT NULL,
+    document_set_hash TEXT,
+    scored_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+COMMENT ON TABLE esg_scores IS 'Latest ESG score of each project (0-100 per pillar)';
+COMMENT ON COLUMN esg_scores.coverage IS 'Share of each pillar''s indicators with any evidence';
+COMMENT ON COLUMN esg_scores.framework_scores IS 'Score per ESG framework (GRI, SASB, TCFD, CDP, ...)';
+COMMENT ON COLUMN esg_scores.model_version IS 'Fingerprint of the indicator set and weights used';
+
+-- Rankings by overall score and by pillar
+CREATE INDEX IF NOT EXISTS idx_esg_scores_overall
+    ON esg_scores(overall_score DESC);
+CREATE INDEX IF NOT EXISTS idx_esg_scores_environmental
+    ON esg_scores(environmental_score DESC);
+CREATE INDEX IF NOT EXISTS idx_esg_scores_social
+    ON esg_scores(social_score DESC);
+CREATE INDEX IF NOT EXISTS idx_esg_scores_governance
+    ON esg_scores(governance_score DESC);
+
+ALTER TABLE esg_scores ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view project ESG scores"
+    ON esg_scores FOR SELECT
+    USING (
+        auth.uid() IS NOT NULL
+        AND (
+            has_project_access(project_id)
+            OR is_admin()
+        )
+    );
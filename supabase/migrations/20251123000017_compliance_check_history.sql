@@ -0,0 +1,292 @@
+-- InfraFlow AI Platform - Compliance Check History
+-- Migration: 20251123000017_compliance_check_history.sql
+-- Description: Keep cached per-standard results out of compliance check history
+
+-- Rows with a stored result are per-standard cache entries written by the
+-- compliance checker; each user-facing check (API call or screening) is a
+-- separate row without one. Views and functions that report check history
+-- count only the latter.
+
+CREATE INDEX IF NOT EXISTS idx_compliance_checks_history
+    ON compliance_checks(project_id, checked_at DESC)
+    WHERE result IS NULL;
+
+-- ============================================================================
+-- ACTIVE PROJECTS VIEW
+-- ============================================================================
+
+CREATE OR REPLACE VIEW v_active_projects AS
+SELECT
+    p.id,
+    p.name,
+    p.sponsor,
+    p.country,
+    p.sector,
+    p.total_value,
+    p.currency,
+    p.status,
+    p.risk_score,
+    p.created_at,
+    COUNT(DISTINCT d.id) as document_count,
+    COUNT(DISTINCT d.id) FILTER (WHERE d.processed = TRUE) as processed_documents,
+    COUNT(DISTINCT fm.id) as financial_model_count,
+    COUNT(DISTINCT cc.id) as compliance_check_count,
+    COUNT(DISTINCT cc.id) FILTER (WHERE cc.status = 'compliant') as compliant_checks,
+    COUNT(DISTINCT ra.id) as risk_assessment_count,
+    COUNT(DISTINCT s.id) as stakeholder_count,
+    MAX(fm.irr) as latest_irr,
+    MAX(fm.npv) as latest_npv
+FROM projects p
+LEFT JOIN documents d ON d.project_id = p.id AND d.deleted_at IS NULL
+LEFT JOIN financial_models fm ON fm.project_id = p.id AND fm.deleted_at IS NULL
+LEFT JOIN compliance_checks cc ON cc.project_id = p.id AND cc.deleted_at IS NULL
+    AND cc.result IS NULL
+LEFT JOIN risk_assessments ra ON ra.project_id = p.id AND ra.deleted_at IS NULL
+LEFT JOIN stakeholders s ON s.project_id = p.id AND s.deleted_at IS NULL
+WHERE p.deleted_at IS NULL
+AND p.status IN ('pipeline', 'under_review', 'approved', 'active')
+GROUP BY p.id;
+
+-- ============================================================================
+-- PROJECT DASHBOARD VIEW
+-- ============================================================================
+
+CREATE OR REPLACE VIEW v_project_dashboard AS
+SELECT
+    p.id,
+    p.name,
+    p.sponsor,
+    p.country,
+    p.sector,
+    p.total_value,
+    p.currency,
+    p.status,
+    p.risk_score,
+    p.dfi_partners,
+    p.created_at,
+
+    -- Document metrics
+    json_build_object(
+        'total', COUNT(DISTINCT d.id),
+        'processed', COUNT(DISTINCT d.id) FILTER (WHERE d.processed = TRUE),
+        'pending', COUNT(DISTINCT d.id) FILTER (WHERE d.processed = FALSE)
+    ) as documents,
+
+    -- Financial metrics
+    json_build_object(
+        'irr', MAX(fm.irr),
+        'npv', MAX(fm.npv),
+        'payback_period', MAX(fm.payback_period),
+        'models_count', COUNT(DISTINCT fm.id)
+    ) as financial_metrics,
+
+    -- Compliance metrics
+    json_build_object(
+        'total_checks', COUNT(DISTINCT cc.id),
+        'compliant', COUNT(DISTINCT cc.id) FILTER (WHERE cc.status = 'compliant'),
+        'non_compliant', COUNT(DISTINCT cc.id) FILTER (WHERE cc.status = 'non_compliant'),
+        'average_score', AVG(cc.score)
+    ) as compliance,
+
+    -- Risk metrics
+    json_build_object(
+        'overall_score', p.risk_score,
+        'assessments_count', COUNT(DISTINCT ra.id),
+        'latest_assessment', MAX(ra.assessment_date)
+    ) as risk,
+
+    -- Stakeholder metrics
+    json_build_object(
+        'total', COUNT(DISTINCT s.id),
+        'active', COUNT(DISTINCT s.id) FILTER (WHERE s.engagement_status = 'active')
+    ) as stakeholders
+
+FROM projects p
+LEFT JOIN documents d ON d.project_id = p.id AND d.deleted_at IS NULL
+LEFT JOIN financial_models fm ON fm.project_id = p.id AND fm.deleted_at IS NULL
+LEFT JOIN compliance_checks cc ON cc.project_id = p.id AND cc.deleted_at IS NULL
+    AND cc.result IS NULL
+LEFT JOIN risk_assessments ra ON ra.project_id = p.id AND ra.deleted_at IS NULL
+LEFT JOIN stakeholders s ON s.project_id = p.id AND s.deleted_at IS NULL
+WHERE p.deleted_at IS NULL
+GROUP BY p.id;
+
+-- ============================================================================
+-- COMPLIANCE SUMMARY VIEW
+-- ============================================================================
+
+CREATE OR REPLACE VIEW v_compliance_summary AS
+SELECT
+    p.id as project_id,
+    p.name as project_name,
+    COUNT(cc.id) as total_checks,
+    COUNT(cc.id) FILTER (WHERE cc.status = 'compliant') as compliant_count,
+    COUNT(cc.id) FILTER (WHERE cc.status = 'non_compliant') as non_compliant_count,
+    COUNT(cc.id) FILTER (WHERE cc.status = 'pending') as pending_count,
+    AVG(cc.score) as average_score,
+    array_agg(DISTINCT cc.standard) FILTER (WHERE cc.standard IS NOT NULL) as standards_checked,
+
+    -- Critical issues count
+    (SELECT COUNT(*)
+     FROM compliance_checks cc2,
+          jsonb_array_elements(cc2.issues) as issue
+     WHERE cc2.project_id = p.id
+     AND cc2.deleted_at IS NULL
+     AND cc2.result IS NULL
+     AND issue->>'severity' = 'critical') as critical_issues_count,
+
+    MAX(cc.checked_at) as last_check_date
+
+FROM projects p
+LEFT JOIN compliance_checks cc ON cc.project_id = p.id AND cc.deleted_at IS NULL
+    AND cc.result IS NULL
+WHERE p.deleted_at IS NULL
+GROUP BY p.id;
+
+-- ============================================================================
+-- HIGH RISK PROJECTS VIEW
+-- ============================================================================
+
+CREATE OR REPLACE VIEW v_high_risk_projects AS
+SELECT
+    p.id,
+    p.name,
+    p.country,
+    p.sector,
+    p.total_value,
+    p.risk_score,
+    p.status,
+
+    -- Risk breakdown
+    (SELECT json_agg(
+        json_build_object(
+            'assessment_type', ra.assessment_type,
+            'score', ra.overall_risk_score,
+            'date', ra.assessment_date
+        )
+     )
+     FROM risk_assessments ra
+     WHERE ra.project_id = p.id
+     AND ra.deleted_at IS NULL) as risk_assessments,
+
+    -- Non-compliant checks
+    (SELECT COUNT(*)
+     FROM compliance_checks cc
+     WHERE cc.project_id = p.id
+     AND cc.status = 'non_compliant'
+     AND cc.deleted_at IS NULL
+     AND cc.result IS NULL) as non_compliant_checks,
+
+    -- Critical issues
+    (SELECT json_agg(issue)
+     FROM (
+         SELECT jsonb_array_elements(cc.issues) as issue
+         FROM compliance_checks cc
+         WHERE cc.project_id = p.id
+         AND cc.status = 'non_compliant'
+         AND cc.deleted_at IS NULL
+         AND cc.result IS NULL
+     ) issues
+     WHERE (issue->>'severity') = 'critical') as critical_issues
+
+FROM projects p
+WHERE p.deleted_at IS NULL
+AND p.risk_score >= 70
+ORDER BY p.risk_score DESC;
+
+-- ============================================================================
+-- PROJECT SUMMARY FUNCTION
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION get_project_summary(project_uuid UUID)
+RETURNS JSON AS $$
+DECLARE
+    result JSON;
+BEGIN
+    SELECT json_build_object(
+        'project_id', p.id,
+        'project_name', p.name,
+        'status', p.status,
+        'risk_score', p.risk_score,
+        'total_value', p.total_value,
+        'currency', p.currency,
+        'document_count', (
+            SELECT COUNT(*) FROM documents
+            WHERE project_id = p.id AND deleted_at IS NULL
+        ),
+        'processed_documents', (
+            SELECT COUNT(*) FROM documents
+            WHERE project_id = p.id AND processed = TRUE AND deleted_at IS NULL
+        ),
+        'compliance_checks', (
+            SELECT COUNT(*) FROM compliance_checks
+            WHERE project_id = p.id AND deleted_at IS NULL
+            AND compliance_checks.result IS NULL
+        ),
+        'compliant_checks', (
+            SELECT COUNT(*) FROM compliance_checks
+            WHERE project_id = p.id AND status = 'compliant' AND deleted_at IS NULL
+            AND compliance_checks.result IS NULL
+        ),
+        'financial_models', (
+            SELECT COUNT(*) FROM financial_models
+            WHERE project_id = p.id AND deleted_at IS NULL
+        ),
+        'latest_irr', (
+            SELECT irr FROM financial_models
+            WHERE project_id = p.id AND deleted_at IS NULL
+            ORDER BY version DESC LIMIT 1
+        ),
+        'stakeholder_count', (
+            SELECT COUNT(*) FROM stakeholders
+            WHERE project_id = p.id AND deleted_at IS NULL
+        ),
+        'risk_assessments', (
+            SELECT COUNT(*) FROM risk_assessments
+            WHERE project_id = p.id AND deleted_at IS NULL
+        )
+    ) INTO result
+    FROM projects p
+    WHERE p.id = project_uuid;
+
+    RETURN result;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- ============================================================================
+-- COMPLIANCE STATUS FUNCTION
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION get_compliance_status(project_uuid UUID)
+RETURNS JSON AS $$
+DECLARE
+    result JSON;
+BEGIN
+    SELECT json_build_object(
+        'total_checks', COUNT(*),
+        'compliant', COUNT(*) FILTER (WHERE status = 'compliant'),
+        'non_compliant', COUNT(*) FILTER (WHERE status = 'non_compliant'),
+        'pending', COUNT(*) FILTER (WHERE status = 'pending'),
+        'average_score', AVG(score),
+        'standards_checked', json_agg(DISTINCT standard),
+        'critical_issues', (
+            SELECT json_agg(issue)
+            FROM (
+                SELECT jsonb_array_elements(issues) as issue
+                FROM compliance_checks
+                WHERE project_id = project_uuid
+                AND status = 'non_compliant'
+                AND deleted_at IS NULL
+                AND compliance_checks.result IS NULL
+            ) i
+            WHERE (issue->>'severity') = 'critical'
+        )
+    ) INTO result
+    FROM compliance_checks
+    WHERE project_id = project_uuid
+    AND deleted_at IS NULL
+    AND compliance_checks.result IS NULL;
+
+    RETURN result;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;